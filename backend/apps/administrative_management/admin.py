@@ -1,10 +1,11 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
 from django.utils.html import format_html
 from django.urls import reverse
 from django.db.models import Count, Sum
 from .models import (
     # 办公用品
-    OfficeSupply, SupplyPurchase, SupplyPurchaseItem, SupplyRequest, SupplyRequestItem,
+    OfficeSupply, SupplyPurchase, SupplyPurchaseItem, SupplyRequest, SupplyRequestItem, SupplyStockMovement,
     # 会议室
     MeetingRoom, MeetingRoomBooking,
     # 用车
@@ -20,6 +21,8 @@ from .models import (
     # 报销
     ExpenseReimbursement, ExpenseItem,
 )
+from .services_announcements import on_announcement_changed
+from .services_inventory import issue_request, receive_purchase
 
 
 # ==================== 办公用品管理 ====================
@@ -49,6 +52,12 @@ class OfficeSupplyAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_readonly_fields(self, request, obj=None):
+        # 已有用品的库存只能通过收货、领用或盘点流水变动
+        if obj is not None:
+            return self.readonly_fields + ('current_stock',)
+        return self.readonly_fields
+    
     def stock_status(self, obj):
         """库存状态"""
         if obj.is_low_stock:
@@ -79,6 +88,7 @@ class SupplyPurchaseAdmin(admin.ModelAdmin):
     readonly_fields = ('purchase_number', 'created_time')
     date_hierarchy = 'purchase_date'
     inlines = [SupplyPurchaseItemInline]
+    actions = ['receive_into_stock']
     fieldsets = (
         ('基本信息', {
             'fields': ('purchase_number', 'purchase_date', 'supplier', 'status')
@@ -96,6 +106,19 @@ class SupplyPurchaseAdmin(admin.ModelAdmin):
             'fields': ('notes', 'created_by', 'created_time')
         }),
     )
+    
+    def receive_into_stock(self, request, queryset):
+        """确认收货并入库（未批准的采购单跳过）"""
+        received, skipped = 0, []
+        for purchase in queryset:
+            try:
+                received += receive_purchase(purchase, operator=request.user)
+            except ValidationError as exc:
+                skipped.append(f'{purchase.purchase_number}: {exc.messages[0]}')
+        self.message_user(request, f'已入库 {received} 条采购明细。')
+        for message in skipped:
+            self.message_user(request, message, level=messages.ERROR)
+    receive_into_stock.short_description = '确认收货并入库'
 
 
 class SupplyRequestItemInline(admin.TabularInline):
@@ -118,6 +141,7 @@ class SupplyRequestAdmin(admin.ModelAdmin):
     readonly_fields = ('request_number', 'created_time')
     date_hierarchy = 'request_date'
     inlines = [SupplyRequestItemInline]
+    actions = ['issue_from_stock']
     fieldsets = (
         ('基本信息', {
             'fields': ('request_number', 'applicant', 'request_date', 'purpose', 'status')
@@ -132,6 +156,36 @@ class SupplyRequestAdmin(admin.ModelAdmin):
             'fields': ('notes', 'created_time')
         }),
     )
+    
+    def issue_from_stock(self, request, queryset):
+        """发放并出库（未批准或库存不足的申请单整单跳过）"""
+        issued, failed = 0, []
+        for supply_request in queryset:
+            try:
+                issued += issue_request(supply_request, operator=request.user)
+            except ValidationError as exc:
+                failed.append(f'{supply_request.request_number}: {exc.messages[0]}')
+        self.message_user(request, f'已出库 {issued} 条领用明细。')
+        for message in failed:
+            self.message_user(request, message, level=messages.ERROR)
+    issue_from_stock.short_description = '发放并出库'
+
+
+@admin.register(SupplyStockMovement)
+class SupplyStockMovementAdmin(admin.ModelAdmin):
+    """库存流水（只读）"""
+    list_display = ('supply', 'movement_type', 'quantity', 'balance_after', 'unit_price', 'operator', 'notes', 'created_time')
+    list_filter = ('movement_type', 'created_time')
+    search_fields = ('supply__code', 'supply__name', 'notes')
+    ordering = ('-created_time',)
+    list_per_page = 50
+    list_select_related = ('supply', 'operator')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 # ==================== 会议室管理 ====================
@@ -340,6 +394,18 @@ class AnnouncementAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        on_announcement_changed()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        on_announcement_changed()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        on_announcement_changed()
+
 
 @admin.register(AnnouncementRead)
 class AnnouncementReadAdmin(admin.ModelAdmin):
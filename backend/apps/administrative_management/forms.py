@@ -9,6 +9,15 @@ from backend.apps.system_management.models import Role
 
 class OfficeSupplyForm(forms.ModelForm):
     """办公用品表单"""
+
+    # 编辑时记录表单渲染时的库存，提交时据此判断用户是否修改了库存、库存是否已被出入库改动
+    stock_snapshot = forms.IntegerField(required=False, widget=forms.HiddenInput)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['stock_snapshot'].required = True
+            self.fields['stock_snapshot'].initial = self.instance.current_stock
     
     class Meta:
         model = OfficeSupply
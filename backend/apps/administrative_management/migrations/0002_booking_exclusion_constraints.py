@@ -0,0 +1,83 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:56
+
+from datetime import datetime
+
+import backend.apps.administrative_management.models
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+from django.utils import timezone
+
+CONFLICT_REASON = '系统检测到与其他预订时间冲突或时段无效，已自动取消'
+
+
+def _cancel_conflicts(bookings, start_of, end_of, resource_of, cancel):
+    """保留先创建的预订，与之重叠或时段无效的后续预订取消"""
+    kept = {}
+    for booking in bookings:
+        start, end = start_of(booking), end_of(booking)
+        occupied = kept.setdefault(resource_of(booking), [])
+        if end <= start or any(start < other_end and other_start < end for other_start, other_end in occupied):
+            cancel(booking)
+            continue
+        occupied.append((start, end))
+
+
+def resolve_existing_conflicts(apps, schema_editor):
+    now = timezone.now()
+    MeetingRoomBooking = apps.get_model('administrative_management', 'MeetingRoomBooking')
+    VehicleBooking = apps.get_model('administrative_management', 'VehicleBooking')
+
+    def cancel_meeting(booking):
+        booking.status = 'cancelled'
+        booking.cancelled_time = now
+        booking.cancelled_reason = CONFLICT_REASON
+        booking.save(update_fields=['status', 'cancelled_time', 'cancelled_reason'])
+
+    def cancel_vehicle(booking):
+        booking.status = 'cancelled'
+        booking.notes = f"{booking.notes}\n{CONFLICT_REASON}".strip()
+        booking.save(update_fields=['status', 'notes'])
+
+    _cancel_conflicts(
+        MeetingRoomBooking.objects.filter(status__in=['pending', 'confirmed']).order_by('id'),
+        lambda b: datetime.combine(b.booking_date, b.start_time),
+        lambda b: datetime.combine(b.booking_date, b.end_time),
+        lambda b: b.room_id,
+        cancel_meeting,
+    )
+    _cancel_conflicts(
+        VehicleBooking.objects.filter(status__in=['pending_approval', 'approved', 'in_use']).order_by('id'),
+        lambda b: b.start_time,
+        lambda b: b.end_time,
+        lambda b: b.vehicle_id,
+        cancel_vehicle,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administrative_management', '0001_initial'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(resolve_existing_conflicts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='meetingroombooking',
+            constraint=models.CheckConstraint(check=models.Q(('end_time__gt', models.F('start_time')), models.Q(('status__in', ['pending', 'confirmed']), _negated=True), _connector='OR'), name='meeting_booking_time_order', violation_error_message='结束时间必须晚于开始时间'),
+        ),
+        migrations.AddConstraint(
+            model_name='meetingroombooking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ['pending', 'confirmed'])), expressions=[('room', '='), (backend.apps.administrative_management.models.TsRange(backend.apps.administrative_management.models.DateTimeCombine(models.F('booking_date'), models.F('start_time')), backend.apps.administrative_management.models.DateTimeCombine(models.F('booking_date'), models.F('end_time'))), '&&')], name='meeting_booking_no_overlap', violation_error_message='该会议室在所选时间段已有预订'),
+        ),
+        migrations.AddConstraint(
+            model_name='vehiclebooking',
+            constraint=models.CheckConstraint(check=models.Q(('end_time__gt', models.F('start_time')), models.Q(('status__in', ['pending_approval', 'approved', 'in_use']), _negated=True), _connector='OR'), name='vehicle_booking_time_order', violation_error_message='结束时间必须晚于开始时间'),
+        ),
+        migrations.AddConstraint(
+            model_name='vehiclebooking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ['pending_approval', 'approved', 'in_use'])), expressions=[('vehicle', '='), (backend.apps.administrative_management.models.TsTzRange(models.F('start_time'), models.F('end_time')), '&&')], name='vehicle_booking_no_overlap', violation_error_message='该车辆在所选时间段已被占用'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('administrative_management', '0002_booking_exclusion_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnouncementUnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='announcement_unread_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+                ('unread_count', models.PositiveIntegerField(default=0, verbose_name='未读数量')),
+                ('refreshed_on', models.DateField(blank=True, null=True, verbose_name='校准日期')),
+                ('updated_time', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '公告未读计数',
+                'verbose_name_plural': '公告未读计数',
+                'db_table': 'admin_announcement_unread_counter',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='announcementread',
+            index=models.Index(fields=['user', 'announcement'], name='admin_annou_user_id_f4539d_idx'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.expressions
+import django.utils.timezone
+
+
+def record_opening_balances(apps, schema_editor):
+    """为现有库存写入期初流水，使流水合计与 current_stock 一致"""
+    OfficeSupply = apps.get_model('administrative_management', 'OfficeSupply')
+    SupplyStockMovement = apps.get_model('administrative_management', 'SupplyStockMovement')
+    SupplyStockMovement.objects.bulk_create([
+        SupplyStockMovement(
+            supply_id=supply.pk,
+            movement_type='adjustment',
+            quantity=supply.current_stock,
+            balance_after=supply.current_stock,
+            unit_price=supply.purchase_price,
+            notes='期初库存',
+        )
+        for supply in OfficeSupply.objects.exclude(current_stock=0).only('pk', 'current_stock', 'purchase_price')
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('administrative_management', '0003_announcement_unread_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplyStockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('movement_type', models.CharField(choices=[('receipt', '采购入库'), ('issue', '领用出库'), ('adjustment', '盘点调整')], max_length=20, verbose_name='变动类型')),
+                ('quantity', models.IntegerField(verbose_name='变动数量')),
+                ('balance_after', models.IntegerField(verbose_name='变动后库存')),
+                ('unit_price', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='单价')),
+                ('notes', models.CharField(blank=True, max_length=200, verbose_name='备注')),
+                ('created_time', models.DateTimeField(default=django.utils.timezone.now, verbose_name='发生时间')),
+            ],
+            options={
+                'verbose_name': '库存流水',
+                'verbose_name_plural': '库存流水',
+                'db_table': 'admin_supply_stock_movement',
+                'ordering': ['-created_time', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='officesupply',
+            index=models.Index(django.db.models.expressions.CombinedExpression(models.F('current_stock'), '-', models.F('min_stock')), condition=models.Q(('is_active', True), ('min_stock__gt', 0)), name='admin_supply_stock_gap_idx'),
+        ),
+        migrations.AddField(
+            model_name='supplystockmovement',
+            name='operator',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='supply_stock_movements', to=settings.AUTH_USER_MODEL, verbose_name='经办人'),
+        ),
+        migrations.AddField(
+            model_name='supplystockmovement',
+            name='purchase_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='administrative_management.supplypurchaseitem', verbose_name='采购明细'),
+        ),
+        migrations.AddField(
+            model_name='supplystockmovement',
+            name='request_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='administrative_management.supplyrequestitem', verbose_name='领用明细'),
+        ),
+        migrations.AddField(
+            model_name='supplystockmovement',
+            name='supply',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to='administrative_management.officesupply', verbose_name='办公用品'),
+        ),
+        migrations.AddIndex(
+            model_name='supplystockmovement',
+            index=models.Index(fields=['supply', '-created_time'], name='admin_suppl_supply__94c7db_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplystockmovement',
+            index=models.Index(fields=['movement_type', 'created_time'], name='admin_suppl_movemen_4d3d5f_idx'),
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
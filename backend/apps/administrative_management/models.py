@@ -1,10 +1,53 @@
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
 from django.db import models
 from django.utils import timezone
-from django.db.models import Max
+from django.db.models import F, Func, Max, Q
 from datetime import datetime
 from backend.apps.system_management.models import User, Department
 
 
+# ==================== 时段表达式 ====================
+
+class DateTimeCombine(Func):
+    """date + time，得到不带时区的时间戳"""
+    arg_joiner = ' + '
+    template = '(%(expressions)s)'
+    output_field = models.DateTimeField()
+
+
+class TsRange(Func):
+    """tsrange(开始, 结束)，默认左闭右开"""
+    function = 'TSRANGE'
+    output_field = DateTimeRangeField()
+
+
+class TsTzRange(Func):
+    """tstzrange(开始, 结束)，默认左闭右开"""
+    function = 'TSTZRANGE'
+    output_field = DateTimeRangeField()
+
+
+class RangeOverlaps(Func):
+    """范围重叠判断（&&），可直接用于 filter()"""
+    arg_joiner = ' && '
+    template = '(%(expressions)s)'
+    output_field = models.BooleanField()
+
+
+def meeting_booking_period(date_field='booking_date', start_field='start_time', end_field='end_time'):
+    """会议室预订占用时段；与排他约束使用同一表达式，查询才能命中 GiST 索引"""
+    return TsRange(
+        DateTimeCombine(F(date_field), F(start_field)),
+        DateTimeCombine(F(date_field), F(end_field)),
+    )
+
+
+def vehicle_booking_period():
+    """用车申请占用时段"""
+    return TsTzRange(F('start_time'), F('end_time'))
+
+
 # ==================== 办公用品管理 ====================
 
 class OfficeSupply(models.Model):
@@ -41,6 +84,12 @@ class OfficeSupply(models.Model):
         indexes = [
             models.Index(fields=['code']),
             models.Index(fields=['category', 'is_active']),
+            # 低库存监控：与 services_inventory.low_stock_supplies 的过滤表达式保持一致
+            models.Index(
+                F('current_stock') - F('min_stock'),
+                name='admin_supply_stock_gap_idx',
+                condition=Q(is_active=True, min_stock__gt=0),
+            ),
         ]
     
     def __str__(self):
@@ -191,6 +240,39 @@ class SupplyRequestItem(models.Model):
         return f"{self.request.request_number} - {self.supply.name}"
 
 
+class SupplyStockMovement(models.Model):
+    """库存流水（入库为正数、出库为负数）"""
+    MOVEMENT_TYPE_CHOICES = [
+        ('receipt', '采购入库'),
+        ('issue', '领用出库'),
+        ('adjustment', '盘点调整'),
+    ]
+    
+    supply = models.ForeignKey(OfficeSupply, on_delete=models.PROTECT, related_name='stock_movements', verbose_name='办公用品')
+    movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPE_CHOICES, verbose_name='变动类型')
+    quantity = models.IntegerField(verbose_name='变动数量')
+    balance_after = models.IntegerField(verbose_name='变动后库存')
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name='单价')
+    purchase_item = models.ForeignKey(SupplyPurchaseItem, on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements', verbose_name='采购明细')
+    request_item = models.ForeignKey(SupplyRequestItem, on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements', verbose_name='领用明细')
+    operator = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='supply_stock_movements', verbose_name='经办人')
+    notes = models.CharField(max_length=200, blank=True, verbose_name='备注')
+    created_time = models.DateTimeField(default=timezone.now, verbose_name='发生时间')
+    
+    class Meta:
+        db_table = 'admin_supply_stock_movement'
+        verbose_name = '库存流水'
+        verbose_name_plural = verbose_name
+        ordering = ['-created_time', '-id']
+        indexes = [
+            models.Index(fields=['supply', '-created_time']),
+            models.Index(fields=['movement_type', 'created_time']),
+        ]
+    
+    def __str__(self):
+        return f"{self.supply.name} {self.quantity:+d}"
+
+
 # ==================== 会议室管理 ====================
 
 class MeetingRoom(models.Model):
@@ -254,6 +336,9 @@ class MeetingRoomBooking(models.Model):
     actual_end_time = models.DateTimeField(null=True, blank=True, verbose_name='实际结束时间')
     created_time = models.DateTimeField(default=timezone.now, verbose_name='创建时间')
     
+    # 占用会议室的状态，参与冲突校验
+    BLOCKING_STATUSES = ('pending', 'confirmed')
+
     class Meta:
         db_table = 'admin_meeting_room_booking'
         verbose_name = '会议室预订'
@@ -263,6 +348,23 @@ class MeetingRoomBooking(models.Model):
             models.Index(fields=['room', 'booking_date', 'start_time']),
             models.Index(fields=['status']),
         ]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(end_time__gt=F('start_time')) | ~Q(status__in=['pending', 'confirmed']),
+                name='meeting_booking_time_order',
+                violation_error_message='结束时间必须晚于开始时间',
+            ),
+            ExclusionConstraint(
+                name='meeting_booking_no_overlap',
+                index_type='GIST',
+                expressions=[
+                    ('room', RangeOperators.EQUAL),
+                    (meeting_booking_period(), RangeOperators.OVERLAPS),
+                ],
+                condition=Q(status__in=['pending', 'confirmed']),
+                violation_error_message='该会议室在所选时间段已有预订',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.booking_number} - {self.room.name} ({self.booking_date})"
@@ -375,6 +477,9 @@ class VehicleBooking(models.Model):
     notes = models.TextField(blank=True, verbose_name='备注')
     created_time = models.DateTimeField(default=timezone.now, verbose_name='创建时间')
     
+    # 占用车辆的状态，参与冲突校验
+    BLOCKING_STATUSES = ('pending_approval', 'approved', 'in_use')
+
     class Meta:
         db_table = 'admin_vehicle_booking'
         verbose_name = '用车申请'
@@ -384,6 +489,23 @@ class VehicleBooking(models.Model):
             models.Index(fields=['vehicle', 'start_time', 'end_time']),
             models.Index(fields=['status']),
         ]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(end_time__gt=F('start_time')) | ~Q(status__in=['pending_approval', 'approved', 'in_use']),
+                name='vehicle_booking_time_order',
+                violation_error_message='结束时间必须晚于开始时间',
+            ),
+            ExclusionConstraint(
+                name='vehicle_booking_no_overlap',
+                index_type='GIST',
+                expressions=[
+                    ('vehicle', RangeOperators.EQUAL),
+                    (vehicle_booking_period(), RangeOperators.OVERLAPS),
+                ],
+                condition=Q(status__in=['pending_approval', 'approved', 'in_use']),
+                violation_error_message='该车辆在所选时间段已被占用',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.booking_number} - {self.vehicle.plate_number}"
@@ -590,11 +712,30 @@ class AnnouncementRead(models.Model):
         verbose_name_plural = verbose_name
         unique_together = [['announcement', 'user']]
         ordering = ['-read_time']
+        indexes = [
+            models.Index(fields=['user', 'announcement']),
+        ]
     
     def __str__(self):
         return f"{self.announcement.title} - {self.user.username}"
 
 
+class AnnouncementUnreadCounter(models.Model):
+    """用户公告未读计数（发布时累加、阅读时递减，每日首次访问时校准）"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='announcement_unread_counter', verbose_name='用户')
+    unread_count = models.PositiveIntegerField(default=0, verbose_name='未读数量')
+    refreshed_on = models.DateField(null=True, blank=True, verbose_name='校准日期')
+    updated_time = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+    
+    class Meta:
+        db_table = 'admin_announcement_unread_counter'
+        verbose_name = '公告未读计数'
+        verbose_name_plural = verbose_name
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.unread_count}"
+
+
 # ==================== 印章管理 ====================
 
 class Seal(models.Model):
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from rest_framework import serializers
+
+from .models import MeetingRoom, Vehicle
+from .services_availability import DEFAULT_DAY_END, DEFAULT_DAY_START
+
+
+class MeetingRoomSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MeetingRoom
+        fields = ['id', 'code', 'name', 'location', 'capacity', 'equipment', 'status']
+
+
+class VehicleSerializer(serializers.ModelSerializer):
+    vehicle_type_display = serializers.CharField(source='get_vehicle_type_display', read_only=True)
+
+    class Meta:
+        model = Vehicle
+        fields = ['id', 'plate_number', 'brand', 'vehicle_type', 'vehicle_type_display', 'status']
+
+
+class RoomAvailabilityQuerySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    start = serializers.TimeField()
+    end = serializers.TimeField()
+    capacity = serializers.IntegerField(min_value=0, required=False, default=0)
+    equipment = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+
+    def validate(self, attrs):
+        if attrs['end'] <= attrs['start']:
+            raise serializers.ValidationError('结束时间必须晚于开始时间')
+        return attrs
+
+
+class RoomFreeSlotQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField(required=False)
+    duration = serializers.IntegerField(min_value=15, max_value=720, required=False, default=60,
+                                        help_text='最短空闲时长（分钟）')
+    capacity = serializers.IntegerField(min_value=0, required=False, default=0)
+    day_start = serializers.TimeField(required=False, default=DEFAULT_DAY_START)
+    day_end = serializers.TimeField(required=False, default=DEFAULT_DAY_END)
+
+    def validate(self, attrs):
+        attrs['date_to'] = attrs.get('date_to') or attrs['date_from']
+        attrs['duration'] = timedelta(minutes=attrs['duration'])
+        if attrs['day_end'] <= attrs['day_start']:
+            raise serializers.ValidationError('工作结束时间必须晚于开始时间')
+        return attrs
+
+
+class RoomTimelineQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField(required=False)
+    room = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+
+class VehicleAvailabilityQuerySerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    vehicle_type = serializers.ChoiceField(choices=Vehicle.VEHICLE_TYPE_CHOICES, required=False)
+
+    def validate(self, attrs):
+        if attrs['end'] <= attrs['start']:
+            raise serializers.ValidationError('结束时间必须晚于开始时间')
+        return attrs
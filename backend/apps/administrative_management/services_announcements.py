@@ -0,0 +1,173 @@
+"""
+公告阅读状态
+
+未读数保存在 AnnouncementUnreadCounter 中：发布时按受众批量累加，阅读时递减，
+首页直接读取计数，不再对全部公告做反连接。定时发布（发布日期晚于今天）的公告
+由每日首次访问时的校准补齐，编辑、停用等变更则使计数失效后按需重算。
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, Max, Min, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from backend.apps.system_management.models import User
+
+from .models import Announcement, AnnouncementRead, AnnouncementUnreadCounter
+
+
+def visible_announcements(today: Optional[date] = None):
+    """已发布且启用的公告"""
+    return Announcement.objects.filter(is_active=True, publish_date__lte=today or timezone.localdate())
+
+
+def _targets_user(user) -> Q:
+    """公告发布范围是否覆盖该用户"""
+    through_departments = Announcement.target_departments.through.objects.filter(
+        announcement=OuterRef('pk'), department_id=user.department_id,
+    )
+    through_roles = Announcement.target_roles.through.objects.filter(
+        announcement=OuterRef('pk'), role__in=user.roles.all(),
+    )
+    through_users = Announcement.target_users.through.objects.filter(
+        announcement=OuterRef('pk'), user_id=user.pk,
+    )
+    return (
+        Q(target_scope='all')
+        | Q(Exists(through_departments), target_scope='department')
+        | Q(Exists(through_roles), target_scope='specific_roles')
+        | Q(Exists(through_users), target_scope='specific_users')
+    )
+
+
+def announcements_for_user(user, today: Optional[date] = None):
+    """该用户可见的公告"""
+    return visible_announcements(today).filter(_targets_user(user))
+
+
+def unread_announcements_for_user(user, today: Optional[date] = None):
+    read = AnnouncementRead.objects.filter(announcement=OuterRef('pk'), user=user)
+    return announcements_for_user(user, today).filter(~Exists(read))
+
+
+def announcement_audience(announcement: Announcement):
+    """公告的目标用户（仅启用账号）"""
+    users = User.objects.filter(is_active=True)
+    scope = announcement.target_scope
+    if scope == 'department':
+        return users.filter(department__in=announcement.target_departments.all())
+    if scope == 'specific_roles':
+        return users.filter(pk__in=User.roles.through.objects.filter(
+            role__in=announcement.target_roles.all(),
+        ).values('user_id'))
+    if scope == 'specific_users':
+        return users.filter(pk__in=announcement.target_users.all())
+    return users
+
+
+def recount_unread(user, today: Optional[date] = None) -> int:
+    """按实际数据重算单个用户的未读数"""
+    today = today or timezone.localdate()
+    count = unread_announcements_for_user(user, today).count()
+    AnnouncementUnreadCounter.objects.update_or_create(
+        user=user, defaults={'unread_count': count, 'refreshed_on': today},
+    )
+    return count
+
+
+def unread_announcement_count(user) -> int:
+    """当前用户的未读公告数；当天已校准时只读一行计数"""
+    if not user.is_authenticated:
+        return 0
+    today = timezone.localdate()
+    counter = AnnouncementUnreadCounter.objects.filter(user=user).values('unread_count', 'refreshed_on').first()
+    if counter is None or counter['refreshed_on'] != today:
+        return recount_unread(user, today)
+    return counter['unread_count']
+
+
+def on_announcement_published(announcement: Announcement) -> None:
+    """新公告发布后为受众的未读数加一（须在保存多对多字段之后调用）"""
+    # 以数据库中的值判断（publish_date 默认值为 datetime，直接比较会出错）
+    if not visible_announcements().filter(pk=announcement.pk).exists():
+        return
+    audience = announcement_audience(announcement).values('pk')
+    AnnouncementUnreadCounter.objects.filter(user__in=audience).update(
+        unread_count=F('unread_count') + 1, updated_time=timezone.now(),
+    )
+
+
+def on_announcement_changed() -> None:
+    """公告被编辑、停用或删除后，让所有计数在下次访问时重算"""
+    AnnouncementUnreadCounter.objects.update(refreshed_on=None)
+
+
+def mark_read(user, announcement: Announcement) -> bool:
+    """记录阅读；首次阅读时累加查看次数并递减未读数，返回是否首次阅读"""
+    with transaction.atomic():
+        _, created = AnnouncementRead.objects.get_or_create(announcement=announcement, user=user)
+        if not created:
+            return False
+        Announcement.objects.filter(pk=announcement.pk).update(view_count=F('view_count') + 1)
+        if announcements_for_user(user).filter(pk=announcement.pk).exists():
+            AnnouncementUnreadCounter.objects.filter(user=user).update(
+                unread_count=Greatest(F('unread_count') - 1, Value(0)), updated_time=timezone.now(),
+            )
+    return True
+
+
+def mark_all_read(user) -> int:
+    """将用户可见的未读公告全部标记为已读，返回新标记数量"""
+    today = timezone.localdate()
+    with transaction.atomic():
+        unread_ids = list(unread_announcements_for_user(user, today).values_list('pk', flat=True))
+        if unread_ids:
+            now = timezone.now()
+            AnnouncementRead.objects.bulk_create(
+                [AnnouncementRead(announcement_id=pk, user=user, read_time=now) for pk in unread_ids],
+                ignore_conflicts=True,
+            )
+            read_counts = (
+                AnnouncementRead.objects.filter(announcement=OuterRef('pk'))
+                .order_by().values('announcement').annotate(total=Count('pk')).values('total')
+            )
+            Announcement.objects.filter(pk__in=unread_ids).update(
+                view_count=Coalesce(Subquery(read_counts), Value(0)),
+            )
+        AnnouncementUnreadCounter.objects.update_or_create(
+            user=user, defaults={'unread_count': 0, 'refreshed_on': today},
+        )
+    return len(unread_ids)
+
+
+def read_receipt_summary(announcement: Announcement) -> Dict:
+    """阅读回执汇总：受众人数、已读人数及按部门分布，全部由聚合查询得出"""
+    has_read = Exists(AnnouncementRead.objects.filter(announcement=announcement, user=OuterRef('pk')))
+    audience = announcement_audience(announcement).annotate(has_read=has_read)
+    totals = audience.aggregate(total=Count('pk'), read=Count('pk', filter=Q(has_read=True)))
+    departments = [
+        {
+            'department': row['department__name'] or '未分配部门',
+            'total': row['total'],
+            'read': row['read'],
+            'read_rate': round(row['read'] * 100 / row['total'], 1) if row['total'] else 0,
+        }
+        for row in audience.order_by().values('department__name').annotate(
+            total=Count('pk'), read=Count('pk', filter=Q(has_read=True)),
+        ).order_by('-total', 'department__name')
+    ]
+    read_times = announcement.read_records.aggregate(first=Min('read_time'), last=Max('read_time'))
+    total, read = totals['total'], totals['read']
+    return {
+        'audience': total,
+        'read': read,
+        'unread': total - read,
+        'read_rate': round(read * 100 / total, 1) if total else 0,
+        'first_read': read_times['first'],
+        'last_read': read_times['last'],
+        'departments': departments,
+    }
@@ -0,0 +1,228 @@
+"""
+会议室与车辆的可用性查询
+
+占用判断统一使用模型中的时段表达式（与排他约束一致），
+重叠过滤可命中约束自带的 GiST 索引。
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Exists, OuterRef, Value
+from django.utils import timezone
+
+from .models import (
+    DateTimeCombine,
+    MeetingRoom,
+    MeetingRoomBooking,
+    RangeOverlaps,
+    TsRange,
+    TsTzRange,
+    Vehicle,
+    VehicleBooking,
+    meeting_booking_period,
+    vehicle_booking_period,
+)
+
+# 单次查询允许的最大跨度，避免一次拉取过多预订
+MAX_WINDOW_DAYS = 31
+DEFAULT_DAY_START = time(8, 0)
+DEFAULT_DAY_END = time(20, 0)
+
+
+def _meeting_window(date_from: date, start: time, date_to: date, end: time) -> TsRange:
+    return TsRange(
+        DateTimeCombine(Value(date_from), Value(start)),
+        DateTimeCombine(Value(date_to), Value(end)),
+    )
+
+
+def _meeting_overlaps(date_from: date, start: time, date_to: date, end: time) -> RangeOverlaps:
+    return RangeOverlaps(meeting_booking_period(), _meeting_window(date_from, start, date_to, end))
+
+
+def _vehicle_overlaps(start: datetime, end: datetime) -> RangeOverlaps:
+    return RangeOverlaps(vehicle_booking_period(), TsTzRange(Value(start), Value(end)))
+
+
+def _check_window(date_from: date, date_to: date) -> None:
+    if date_to < date_from:
+        raise ValidationError('结束日期不能早于开始日期')
+    if (date_to - date_from).days >= MAX_WINDOW_DAYS:
+        raise ValidationError(f'查询跨度不能超过 {MAX_WINDOW_DAYS} 天')
+
+
+def active_meeting_bookings(date_from: date, date_to: date, rooms: Optional[Iterable] = None):
+    """与 [date_from 00:00, date_to+1 00:00) 重叠的有效会议室预订"""
+    _check_window(date_from, date_to)
+    bookings = MeetingRoomBooking.objects.filter(
+        _meeting_overlaps(date_from, time.min, date_to + timedelta(days=1), time.min),
+        status__in=MeetingRoomBooking.BLOCKING_STATUSES,
+    )
+    if rooms is not None:
+        bookings = bookings.filter(room__in=rooms)
+    return bookings
+
+
+def find_available_rooms(booking_date: date, start: time, end: time, min_capacity: int = 0,
+                         equipment: Sequence[str] = ()):
+    """指定时段内空闲、容量满足且具备所需设备的会议室"""
+    if end <= start:
+        raise ValidationError('结束时间必须晚于开始时间')
+    busy = MeetingRoomBooking.objects.filter(
+        _meeting_overlaps(booking_date, start, booking_date, end),
+        room=OuterRef('pk'),
+        status__in=MeetingRoomBooking.BLOCKING_STATUSES,
+    )
+    rooms = MeetingRoom.objects.filter(is_active=True, status='available', capacity__gte=min_capacity)
+    if equipment:
+        rooms = rooms.filter(equipment__contains=list(equipment))
+    return rooms.filter(~Exists(busy)).order_by('capacity', 'code')
+
+
+def rooms_free_now():
+    """当前时刻空闲的会议室"""
+    now = timezone.localtime().replace(second=0, microsecond=0)
+    end = (now + timedelta(minutes=1)).time()
+    return find_available_rooms(now.date(), now.time(), end if end > now.time() else time.max)
+
+
+def vehicles_free_now():
+    """当前时刻未被占用的车辆"""
+    now = timezone.now()
+    return find_available_vehicles(now, now + timedelta(minutes=1))
+
+
+def find_available_vehicles(start: datetime, end: datetime, vehicle_type: Optional[str] = None):
+    """指定时段内未被占用的可用车辆"""
+    if end <= start:
+        raise ValidationError('结束时间必须晚于开始时间')
+    busy = VehicleBooking.objects.filter(
+        _vehicle_overlaps(start, end),
+        vehicle=OuterRef('pk'),
+        status__in=VehicleBooking.BLOCKING_STATUSES,
+    )
+    vehicles = Vehicle.objects.filter(is_active=True, status='available')
+    if vehicle_type:
+        vehicles = vehicles.filter(vehicle_type=vehicle_type)
+    return vehicles.filter(~Exists(busy)).order_by('plate_number')
+
+
+def _free_intervals(busy: List[Tuple[datetime, datetime]], window_start: datetime, window_end: datetime,
+                    min_duration: timedelta) -> List[Tuple[datetime, datetime]]:
+    """在窗口内扣除已占用区间（已按开始时间排序），返回满足最短时长的空闲区间"""
+    free = []
+    cursor = window_start
+    for busy_start, busy_end in busy:
+        if busy_end <= cursor:
+            continue
+        if busy_start >= window_end:
+            break
+        if busy_start - cursor >= min_duration:
+            free.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+    if window_end - cursor >= min_duration:
+        free.append((cursor, window_end))
+    return free
+
+
+def _booking_interval(booking: MeetingRoomBooking) -> Tuple[datetime, datetime]:
+    return (
+        datetime.combine(booking.booking_date, booking.start_time),
+        datetime.combine(booking.booking_date, booking.end_time),
+    )
+
+
+def room_free_slots(date_from: date, date_to: Optional[date] = None, duration: timedelta = timedelta(hours=1),
+                    min_capacity: int = 0, day_start: time = DEFAULT_DAY_START,
+                    day_end: time = DEFAULT_DAY_END) -> List[Dict]:
+    """按天计算各会议室在工作时段内的空闲时间段（一次查询会议室，一次查询预订）"""
+    date_to = date_to or date_from
+    rooms = list(
+        MeetingRoom.objects.filter(is_active=True, status='available', capacity__gte=min_capacity)
+        .order_by('capacity', 'code')
+    )
+    busy_by_room = defaultdict(list)
+    for booking in active_meeting_bookings(date_from, date_to, rooms).order_by('booking_date', 'start_time'):
+        busy_by_room[booking.room_id].append(_booking_interval(booking))
+
+    days = [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+    result = []
+    for room in rooms:
+        slots = []
+        busy = busy_by_room.get(room.id, [])
+        for day in days:
+            window_start, window_end = datetime.combine(day, day_start), datetime.combine(day, day_end)
+            for start, end in _free_intervals(busy, window_start, window_end, duration):
+                slots.append({'date': day, 'start': start.time(), 'end': end.time()})
+        result.append({'room': room, 'slots': slots})
+    return result
+
+
+def room_timelines(date_from: date, date_to: Optional[date] = None, rooms: Optional[Iterable] = None) -> List[Dict]:
+    """会议室占用时间轴，供日历渲染"""
+    date_to = date_to or date_from
+    room_qs = MeetingRoom.objects.filter(is_active=True).order_by('code')
+    if rooms is not None:
+        room_qs = room_qs.filter(pk__in=[getattr(room, 'pk', room) for room in rooms])
+    room_list = list(room_qs)
+
+    entries = defaultdict(list)
+    bookings = (
+        active_meeting_bookings(date_from, date_to, room_list)
+        .select_related('booker')
+        .order_by('booking_date', 'start_time')
+    )
+    for booking in bookings:
+        entries[booking.room_id].append({
+            'booking_id': booking.id,
+            'booking_number': booking.booking_number,
+            'date': booking.booking_date,
+            'start': booking.start_time,
+            'end': booking.end_time,
+            'title': booking.meeting_topic,
+            'status': booking.status,
+            'booker': booking.booker.get_full_name() or booking.booker.username,
+            'attendees_count': booking.attendees_count,
+        })
+    return [
+        {'room': room, 'occupancy': entries.get(room.id, [])}
+        for room in room_list
+    ]
+
+
+def vehicle_timelines(start: datetime, end: datetime) -> List[Dict]:
+    """车辆占用时间轴"""
+    if end <= start:
+        raise ValidationError('结束时间必须晚于开始时间')
+    if end - start > timedelta(days=MAX_WINDOW_DAYS):
+        raise ValidationError(f'查询跨度不能超过 {MAX_WINDOW_DAYS} 天')
+    vehicles = list(Vehicle.objects.filter(is_active=True).order_by('plate_number'))
+    entries = defaultdict(list)
+    bookings = (
+        VehicleBooking.objects.filter(
+            _vehicle_overlaps(start, end),
+            vehicle__in=vehicles,
+            status__in=VehicleBooking.BLOCKING_STATUSES,
+        )
+        .select_related('applicant', 'driver')
+        .order_by('start_time')
+    )
+    for booking in bookings:
+        entries[booking.vehicle_id].append({
+            'booking_id': booking.id,
+            'booking_number': booking.booking_number,
+            'start': timezone.localtime(booking.start_time),
+            'end': timezone.localtime(booking.end_time),
+            'destination': booking.destination,
+            'status': booking.status,
+            'applicant': booking.applicant.get_full_name() or booking.applicant.username,
+            'driver': booking.driver.get_full_name() or booking.driver.username,
+        })
+    return [
+        {'vehicle': vehicle, 'occupancy': entries.get(vehicle.id, [])}
+        for vehicle in vehicles
+    ]
@@ -0,0 +1,163 @@
+"""
+办公用品库存
+
+所有库存变动都经由本模块：以 F() 表达式原子地更新 current_stock，并写入一条
+SupplyStockMovement 流水，避免并发领用时的丢失更新。库存估值、低库存监控均在
+数据库中聚合完成。
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import (
+    OfficeSupply,
+    SupplyPurchase,
+    SupplyPurchaseItem,
+    SupplyRequest,
+    SupplyRequestItem,
+    SupplyStockMovement,
+)
+
+STOCK_VALUE = ExpressionWrapper(
+    F('purchase_price') * F('current_stock'),
+    output_field=DecimalField(max_digits=18, decimal_places=2),
+)
+STOCK_GAP = F('current_stock') - F('min_stock')
+# 只有审批通过的单据才能动库存
+RECEIVABLE_PURCHASE_STATUSES = ('approved', 'purchased')
+ISSUABLE_REQUEST_STATUSES = ('approved',)
+
+
+def _apply_movement(supply_id: int, quantity: int, movement_type: str, *, operator=None,
+                    unit_price: Optional[Decimal] = None, purchase_item=None, request_item=None,
+                    notes: str = '') -> SupplyStockMovement:
+    """原子地变更库存并记录流水；出库不足时抛出 ValidationError"""
+    supplies = OfficeSupply.objects.filter(pk=supply_id)
+    if quantity < 0:
+        supplies = supplies.filter(current_stock__gte=-quantity)
+    with transaction.atomic():
+        if not supplies.update(current_stock=F('current_stock') + quantity, updated_time=timezone.now()):
+            supply = OfficeSupply.objects.get(pk=supply_id)
+            raise ValidationError(f'{supply.name} 库存不足（当前 {supply.current_stock}，需要 {-quantity}）')
+        # 行已被本事务的 UPDATE 锁定，读取到的即为本次变动后的余额
+        balance, price = OfficeSupply.objects.filter(pk=supply_id).values_list('current_stock', 'purchase_price').get()
+        return SupplyStockMovement.objects.create(
+            supply_id=supply_id,
+            movement_type=movement_type,
+            quantity=quantity,
+            balance_after=balance,
+            unit_price=price if unit_price is None else unit_price,
+            purchase_item=purchase_item,
+            request_item=request_item,
+            operator=operator,
+            notes=notes,
+        )
+
+
+def receive_purchase_item(item: SupplyPurchaseItem, quantity: Optional[int] = None, operator=None):
+    """采购明细收货入库，默认收取剩余未收数量"""
+    quantity = item.quantity - item.received_quantity if quantity is None else quantity
+    if quantity <= 0:
+        return None
+    with transaction.atomic():
+        SupplyPurchaseItem.objects.filter(pk=item.pk).update(received_quantity=F('received_quantity') + quantity)
+        return _apply_movement(
+            item.supply_id, quantity, 'receipt', operator=operator, unit_price=item.unit_price,
+            purchase_item=item, notes=item.purchase.purchase_number,
+        )
+
+
+def receive_purchase(purchase: SupplyPurchase, operator=None) -> int:
+    """整单收货：全部明细入库并将采购单置为已收货，返回入库流水条数；未批准的采购单抛出 ValidationError"""
+    with transaction.atomic():
+        purchase = SupplyPurchase.objects.select_for_update().get(pk=purchase.pk)
+        if purchase.status == 'received':
+            return 0
+        if purchase.status not in RECEIVABLE_PURCHASE_STATUSES:
+            raise ValidationError(f'采购单{purchase.get_status_display()}，批准后才能收货入库')
+        movements = [
+            receive_purchase_item(item, operator=operator)
+            for item in purchase.items.select_related('purchase')
+        ]
+        purchase.status = 'received'
+        purchase.received_by = operator
+        purchase.received_time = timezone.now()
+        purchase.save(update_fields=['status', 'received_by', 'received_time'])
+    return sum(1 for movement in movements if movement)
+
+
+def issue_request_item(item: SupplyRequestItem, quantity: Optional[int] = None, operator=None):
+    """领用明细发放出库，默认按批准数量（未填写时按申请数量）发放剩余部分"""
+    if quantity is None:
+        quantity = (item.approved_quantity or item.requested_quantity) - item.issued_quantity
+    if quantity <= 0:
+        return None
+    with transaction.atomic():
+        SupplyRequestItem.objects.filter(pk=item.pk).update(issued_quantity=F('issued_quantity') + quantity)
+        return _apply_movement(
+            item.supply_id, -quantity, 'issue', operator=operator,
+            request_item=item, notes=item.request.request_number,
+        )
+
+
+def issue_request(supply_request: SupplyRequest, operator=None) -> int:
+    """整单发放：任一用品库存不足则整单回滚，返回出库流水条数；未批准的领用单抛出 ValidationError"""
+    with transaction.atomic():
+        supply_request = SupplyRequest.objects.select_for_update().get(pk=supply_request.pk)
+        if supply_request.status == 'issued':
+            return 0
+        if supply_request.status not in ISSUABLE_REQUEST_STATUSES:
+            raise ValidationError(f'领用单{supply_request.get_status_display()}，批准后才能发放出库')
+        # 按用品主键顺序更新，避免两张领用单交叉加锁造成死锁
+        items = supply_request.items.select_related('request').order_by('supply_id', 'pk')
+        movements = [issue_request_item(item, operator=operator) for item in items]
+        supply_request.status = 'issued'
+        supply_request.issued_by = operator
+        supply_request.issued_time = timezone.now()
+        supply_request.save(update_fields=['status', 'issued_by', 'issued_time'])
+    return sum(1 for movement in movements if movement)
+
+
+def adjust_stock(supply: OfficeSupply, counted: int, operator=None, notes: str = '盘点调整',
+                 expected: Optional[int] = None):
+    """盘点后将库存调整为实盘数量；给出 expected 时，库存已不等于该值说明盘点期间有出入库，拒绝调整"""
+    if counted < 0:
+        raise ValidationError('库存数量不能为负数')
+    with transaction.atomic():
+        current = OfficeSupply.objects.select_for_update().values_list('current_stock', flat=True).get(pk=supply.pk)
+        if expected is not None and current != expected:
+            raise ValidationError(f'库存已由 {expected} 变为 {current}，请刷新后重新盘点')
+        if counted == current:
+            return None
+        return _apply_movement(supply.pk, counted - current, 'adjustment', operator=operator, notes=notes)
+
+
+def low_stock_supplies():
+    """库存不高于最低库存的在用用品，过滤表达式命中 admin_supply_stock_gap_idx"""
+    return (
+        OfficeSupply.objects.alias(stock_gap=STOCK_GAP)
+        .filter(is_active=True, min_stock__gt=0, stock_gap__lte=0)
+        .order_by('stock_gap', 'code')
+    )
+
+
+def inventory_summary() -> Dict:
+    """用品数量、低库存数与库存总值，一次聚合查询"""
+    low_stock = Q(is_active=True, min_stock__gt=0, current_stock__lte=F('min_stock'))
+    return OfficeSupply.objects.aggregate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(is_active=True)),
+        low_stock=Count('pk', filter=low_stock),
+        total_value=Coalesce(
+            Sum(STOCK_VALUE, filter=Q(is_active=True)),
+            Decimal('0'),
+            output_field=DecimalField(max_digits=18, decimal_places=2),
+        ),
+    )
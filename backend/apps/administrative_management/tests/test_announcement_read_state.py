@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from backend.apps.administrative_management.models import (
+    Announcement,
+    AnnouncementRead,
+    AnnouncementUnreadCounter,
+)
+from backend.apps.administrative_management.services_announcements import (
+    mark_all_read,
+    mark_read,
+    on_announcement_published,
+    read_receipt_summary,
+    unread_announcement_count,
+)
+from backend.apps.system_management.models import Department
+
+
+class AnnouncementReadStateTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.dept = Department.objects.create(name="技术部", code="TECH")
+        self.publisher = User.objects.create_superuser(
+            username="publisher", password="pass1234", email="publisher@example.com"
+        )
+        self.reader = User.objects.create_user(username="reader", password="pass1234", department=self.dept)
+        self.other = User.objects.create_user(username="other", password="pass1234")
+
+    def _publish(self, **kwargs):
+        departments = kwargs.pop("departments", [])
+        announcement = Announcement.objects.create(
+            title=kwargs.pop("title", "公告"), content="内容", publisher=self.publisher, **kwargs
+        )
+        announcement.target_departments.set(departments)
+        on_announcement_published(announcement)
+        return announcement
+
+    def test_counter_follows_publish_and_read(self):
+        self._publish(title="全员公告")
+        self.assertEqual(unread_announcement_count(self.reader), 1)
+
+        second = self._publish(title="部门公告", target_scope="department", departments=[self.dept])
+        counter = AnnouncementUnreadCounter.objects.get(user=self.reader)
+        self.assertEqual(counter.unread_count, 2)
+        # 不在目标部门的用户不受影响
+        self.assertEqual(unread_announcement_count(self.other), 1)
+
+        self.assertTrue(mark_read(self.reader, second))
+        self.assertFalse(mark_read(self.reader, second))
+        second.refresh_from_db()
+        self.assertEqual(second.view_count, 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(unread_announcement_count(self.reader), 1)
+
+    def test_scheduled_announcement_counted_after_daily_recount(self):
+        self.assertEqual(unread_announcement_count(self.reader), 0)
+        self._publish(publish_date=timezone.localdate() + timedelta(days=1))
+        self.assertEqual(unread_announcement_count(self.reader), 0)
+
+        AnnouncementUnreadCounter.objects.update(refreshed_on=timezone.localdate() - timedelta(days=1))
+        Announcement.objects.update(publish_date=timezone.localdate())
+        self.assertEqual(unread_announcement_count(self.reader), 1)
+
+    def test_mark_all_read_and_receipt_summary(self):
+        announcements = [self._publish(title=f"公告{i}") for i in range(3)]
+        mark_read(self.reader, announcements[0])
+
+        self.assertEqual(mark_all_read(self.reader), 2)
+        self.assertEqual(unread_announcement_count(self.reader), 0)
+        self.assertEqual(AnnouncementRead.objects.filter(user=self.reader).count(), 3)
+        self.assertEqual(mark_all_read(self.reader), 0)
+
+        summary = read_receipt_summary(announcements[1])
+        self.assertEqual(summary["audience"], 3)
+        self.assertEqual(summary["read"], 1)
+        self.assertEqual(summary["unread"], 2)
+        by_department = {row["department"]: row for row in summary["departments"]}
+        self.assertEqual(by_department["技术部"]["read"], 1)
+        self.assertEqual(by_department["未分配部门"]["total"], 2)
+
+    def test_detail_records_read_and_mark_all_read_view(self):
+        first = self._publish()
+        self._publish()
+        self.client.force_login(self.publisher)
+        response = self.client.get(reverse("admin_pages:announcement_detail", args=[first.id]))
+        self.assertContains(response, "阅读回执")
+        self.assertEqual(unread_announcement_count(self.publisher), 1)
+
+        response = self.client.post(reverse("admin_pages:announcement_mark_all_read"))
+        self.assertRedirects(response, reverse("admin_pages:announcement_management"), fetch_redirect_response=False)
+        self.assertEqual(unread_announcement_count(self.publisher), 0)
@@ -0,0 +1,114 @@
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from backend.apps.administrative_management.models import (
+    MeetingRoom,
+    MeetingRoomBooking,
+    Vehicle,
+    VehicleBooking,
+)
+from backend.apps.administrative_management.services_availability import (
+    find_available_rooms,
+    find_available_vehicles,
+    room_free_slots,
+)
+
+
+class BookingAvailabilityTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            username="admin_booker", password="pass1234", email="booker@example.com"
+        )
+        self.small = MeetingRoom.objects.create(code="R-101", name="小会议室", capacity=6, equipment=["tv"])
+        self.large = MeetingRoom.objects.create(code="R-201", name="大会议室", capacity=20, equipment=["projector"])
+        self.day = date(2026, 3, 2)
+
+    def _book(self, room, start, end, status="confirmed"):
+        return MeetingRoomBooking.objects.create(
+            room=room, booker=self.user, booking_date=self.day,
+            start_time=start, end_time=end, status=status,
+        )
+
+    def test_overlapping_room_booking_is_rejected(self):
+        self._book(self.small, time(9), time(10))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self._book(self.small, time(9, 30), time(11))
+        # 首尾相接不算冲突，已取消的预订不占用
+        self._book(self.small, time(10), time(11))
+        self._book(self.small, time(9), time(10), status="cancelled")
+
+        clash = MeetingRoomBooking(
+            room=self.small, booker=self.user, booking_date=self.day,
+            start_time=time(10, 30), end_time=time(12), booking_number="ADM-BOOK-TEST",
+        )
+        with self.assertRaisesMessage(ValidationError, "该会议室在所选时间段已有预订"):
+            clash.full_clean()
+
+    def test_find_available_rooms_filters_by_time_capacity_and_equipment(self):
+        self._book(self.large, time(14), time(16))
+        free = find_available_rooms(self.day, time(15), time(15, 30))
+        self.assertEqual(list(free), [self.small])
+        self.assertEqual(list(find_available_rooms(self.day, time(9), time(10), min_capacity=10)), [self.large])
+        self.assertEqual(list(find_available_rooms(self.day, time(9), time(10), equipment=["tv"])), [self.small])
+        with self.assertRaises(ValidationError):
+            find_available_rooms(self.day, time(10), time(9))
+
+    def test_room_free_slots_returns_gaps_between_bookings(self):
+        self._book(self.small, time(9), time(10))
+        self._book(self.small, time(10, 30), time(12))
+        rows = room_free_slots(self.day, duration=timedelta(minutes=45))
+        slots = {row["room"].code: row["slots"] for row in rows}
+        self.assertEqual(
+            [(slot["start"], slot["end"]) for slot in slots["R-101"]],
+            [(time(8), time(9)), (time(12), time(20))],
+        )
+        self.assertEqual(len(slots["R-201"]), 1)
+
+    def test_vehicle_overlap_and_availability(self):
+        vehicle = Vehicle.objects.create(plate_number="沪A12345", brand="测试车型")
+        start = timezone.make_aware(datetime(2026, 3, 2, 9))
+        VehicleBooking.objects.create(
+            vehicle=vehicle, applicant=self.user, driver=self.user, purpose="外出",
+            start_time=start, end_time=start + timedelta(hours=3), status="approved",
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            VehicleBooking.objects.create(
+                vehicle=vehicle, applicant=self.user, driver=self.user, purpose="冲突",
+                start_time=start + timedelta(hours=1), end_time=start + timedelta(hours=4),
+                status="pending_approval",
+            )
+        # 草稿不占用车辆
+        VehicleBooking.objects.create(
+            vehicle=vehicle, applicant=self.user, driver=self.user, purpose="草稿",
+            start_time=start, end_time=start + timedelta(hours=1),
+        )
+        self.assertFalse(find_available_vehicles(start, start + timedelta(hours=1)).exists())
+        self.assertTrue(find_available_vehicles(start + timedelta(hours=3), start + timedelta(hours=4)).exists())
+
+    def test_availability_api(self):
+        self._book(self.small, time(9), time(10))
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("administrative_api:meeting-room-available"),
+            {"date": self.day.isoformat(), "start": "09:30", "end": "10:30"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([room["code"] for room in response.json()["results"]], ["R-201"])
+
+        response = self.client.get(
+            reverse("administrative_api:meeting-room-timeline"), {"date_from": self.day.isoformat()}
+        )
+        occupancy = {row["room"]["code"]: row["occupancy"] for row in response.json()["results"]}
+        self.assertEqual(len(occupancy["R-101"]), 1)
+
+        response = self.client.get(
+            reverse("administrative_api:meeting-room-available"),
+            {"date": self.day.isoformat(), "start": "11:00", "end": "10:00"},
+        )
+        self.assertEqual(response.status_code, 400)
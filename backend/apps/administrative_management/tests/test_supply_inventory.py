@@ -0,0 +1,181 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from backend.apps.administrative_management.models import (
+    OfficeSupply,
+    SupplyPurchase,
+    SupplyPurchaseItem,
+    SupplyRequest,
+    SupplyRequestItem,
+    SupplyStockMovement,
+)
+from backend.apps.administrative_management.services_inventory import (
+    adjust_stock,
+    inventory_summary,
+    issue_request,
+    low_stock_supplies,
+    receive_purchase,
+)
+
+
+class SupplyInventoryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            username="stock_admin", password="pass1234", email="stock@example.com"
+        )
+        self.paper = OfficeSupply.objects.create(
+            code="SUP-1", name="A4纸", purchase_price=Decimal("25.50"), current_stock=10, min_stock=5,
+            created_by=self.user,
+        )
+        self.pen = OfficeSupply.objects.create(
+            code="SUP-2", name="签字笔", purchase_price=Decimal("2.00"), current_stock=3, min_stock=5,
+            created_by=self.user,
+        )
+
+    def _request(self, status="approved", **quantities):
+        supply_request = SupplyRequest.objects.create(applicant=self.user, status=status)
+        for code, quantity in quantities.items():
+            SupplyRequestItem.objects.create(
+                request=supply_request, supply=OfficeSupply.objects.get(code=code.replace("_", "-")),
+                requested_quantity=quantity, approved_quantity=quantity,
+            )
+        return supply_request
+
+    def test_receive_purchase_updates_stock_and_ledger(self):
+        purchase = SupplyPurchase.objects.create(supplier="文具店", created_by=self.user, status="purchased")
+        SupplyPurchaseItem.objects.create(purchase=purchase, supply=self.pen, quantity=20, unit_price=Decimal("1.80"))
+
+        self.assertEqual(receive_purchase(purchase, operator=self.user), 1)
+        self.assertEqual(receive_purchase(purchase, operator=self.user), 0)
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.current_stock, 23)
+        movement = SupplyStockMovement.objects.get(supply=self.pen)
+        self.assertEqual((movement.movement_type, movement.quantity, movement.balance_after), ("receipt", 20, 23))
+        self.assertEqual(movement.unit_price, Decimal("1.80"))
+        purchase.refresh_from_db()
+        self.assertEqual(purchase.status, "received")
+
+    def test_unapproved_documents_do_not_move_stock(self):
+        for status in ("draft", "pending_approval", "rejected"):
+            purchase = SupplyPurchase.objects.create(supplier="文具店", created_by=self.user, status=status)
+            SupplyPurchaseItem.objects.create(purchase=purchase, supply=self.pen, quantity=20, unit_price=Decimal("1.80"))
+            with self.assertRaises(ValidationError):
+                receive_purchase(purchase, operator=self.user)
+            purchase.refresh_from_db()
+            self.assertEqual(purchase.status, status)
+
+            supply_request = self._request(status=status, SUP_1=2)
+            with self.assertRaises(ValidationError):
+                issue_request(supply_request, operator=self.user)
+            supply_request.refresh_from_db()
+            self.assertEqual(supply_request.status, status)
+        self.assertEqual(OfficeSupply.objects.get(pk=self.pen.pk).current_stock, 3)
+        self.assertEqual(OfficeSupply.objects.get(pk=self.paper.pk).current_stock, 10)
+        self.assertFalse(SupplyStockMovement.objects.exists())
+
+    def test_admin_actions_report_skipped_documents(self):
+        rejected = SupplyPurchase.objects.create(supplier="文具店", created_by=self.user, status="rejected")
+        approved = SupplyPurchase.objects.create(supplier="文具店", created_by=self.user, status="approved")
+        for purchase in (rejected, approved):
+            SupplyPurchaseItem.objects.create(purchase=purchase, supply=self.pen, quantity=5, unit_price=Decimal("1.80"))
+        draft, ready = self._request(status="draft", SUP_1=1), self._request(SUP_1=1)
+        self.client.force_login(self.user)
+
+        response = self.client.post(reverse("admin:administrative_management_supplypurchase_changelist"), {
+            "action": "receive_into_stock", "_selected_action": [rejected.pk, approved.pk],
+        }, follow=True)
+        notices = [str(message) for message in response.context["messages"]]
+        self.assertIn("已入库 1 条采购明细。", notices)
+        self.assertTrue(any(rejected.purchase_number in notice for notice in notices))
+        self.assertEqual(OfficeSupply.objects.get(pk=self.pen.pk).current_stock, 8)
+
+        response = self.client.post(reverse("admin:administrative_management_supplyrequest_changelist"), {
+            "action": "issue_from_stock", "_selected_action": [draft.pk, ready.pk],
+        }, follow=True)
+        notices = [str(message) for message in response.context["messages"]]
+        self.assertIn("已出库 1 条领用明细。", notices)
+        self.assertTrue(any(draft.request_number in notice for notice in notices))
+        self.assertEqual(OfficeSupply.objects.get(pk=self.paper.pk).current_stock, 9)
+
+    def test_issue_uses_atomic_decrements_and_rolls_back_on_shortage(self):
+        first, second = self._request(SUP_1=4), self._request(SUP_1=4)
+        stale = OfficeSupply.objects.get(pk=self.paper.pk)
+        issue_request(first, operator=self.user)
+        issue_request(second, operator=self.user)
+        self.paper.refresh_from_db()
+        self.assertEqual(self.paper.current_stock, 2)
+        # 过期的实例不会覆盖已发放的扣减
+        self.assertEqual(stale.current_stock, 10)
+
+        short = self._request(SUP_1=1, SUP_2=5)
+        with self.assertRaises(ValidationError):
+            issue_request(short, operator=self.user)
+        self.paper.refresh_from_db()
+        self.assertEqual(self.paper.current_stock, 2)
+        short.refresh_from_db()
+        self.assertEqual(short.status, "approved")
+        self.assertEqual(SupplyStockMovement.objects.filter(supply=self.paper).count(), 2)
+
+    def test_summary_and_low_stock_watch_run_in_sql(self):
+        OfficeSupply.objects.create(
+            code="SUP-3", name="停用", purchase_price=Decimal("100"), current_stock=1, min_stock=5,
+            is_active=False, created_by=self.user,
+        )
+        with self.assertNumQueries(1):
+            summary = inventory_summary()
+        self.assertEqual(summary["total"], 3)
+        self.assertEqual(summary["active"], 2)
+        self.assertEqual(summary["low_stock"], 1)
+        self.assertEqual(summary["total_value"], Decimal("261.00"))
+        self.assertEqual(list(low_stock_supplies()), [self.pen])
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse("admin_pages:supplies_management")), "¥261.00")
+        self.assertContains(self.client.get(reverse("admin_pages:administrative_home")), "库存总值 ¥261.00")
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        self.assertIn("admin_supply_stock_gap_idx", low_stock_supplies().explain())
+
+    def test_adjust_and_edit_form_record_stocktake(self):
+        self.assertIsNone(adjust_stock(self.paper, 10))
+        adjust_stock(self.paper, 7, operator=self.user)
+        response = self._edit_paper(current_stock=12, stock_snapshot=7)
+        self.assertEqual(response.status_code, 302)
+        self.paper.refresh_from_db()
+        self.assertEqual((self.paper.current_stock, self.paper.unit), (12, "包"))
+        self.assertEqual(
+            list(SupplyStockMovement.objects.filter(supply=self.paper).order_by("id").values_list("quantity", flat=True)),
+            [-3, 5],
+        )
+
+    def _edit_paper(self, **data):
+        self.client.force_login(self.user)
+        return self.client.post(reverse("admin_pages:supply_update", args=[self.paper.id]), {
+            "code": "SUP-1", "name": "A4纸", "category": "consumable", "unit": "包",
+            "purchase_price": "25.50", "min_stock": 5, "max_stock": 0, "is_active": "on", **data,
+        })
+
+    def test_edit_form_does_not_undo_movements_made_after_rendering(self):
+        # 表单在库存为 10 时渲染，提交前入库 20
+        purchase = SupplyPurchase.objects.create(supplier="文具店", created_by=self.user, status="approved")
+        SupplyPurchaseItem.objects.create(purchase=purchase, supply=self.paper, quantity=20, unit_price=Decimal("25"))
+        receive_purchase(purchase, operator=self.user)
+
+        # 未改动库存：只保存其他字段，入库保留
+        response = self._edit_paper(current_stock=10, stock_snapshot=10, min_stock=8)
+        self.assertEqual(response.status_code, 302)
+        self.paper.refresh_from_db()
+        self.assertEqual((self.paper.current_stock, self.paper.min_stock), (30, 8))
+
+        # 按旧库存盘点：拒绝并提示刷新，不写调整流水
+        response = self._edit_paper(current_stock=9, stock_snapshot=10, name="A4复印纸")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "请刷新后重新盘点")
+        self.paper.refresh_from_db()
+        self.assertEqual((self.paper.current_stock, self.paper.name), (30, "A4纸"))
+        self.assertFalse(SupplyStockMovement.objects.filter(supply=self.paper, movement_type="adjustment").exists())
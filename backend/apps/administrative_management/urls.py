@@ -34,6 +34,7 @@ urlpatterns = [
     # 公告通知
     path("announcements/", views_pages.announcement_management, name="announcement_management"),
     path("announcements/create/", views_pages.announcement_create, name="announcement_create"),
+    path("announcements/mark-all-read/", views_pages.announcement_mark_all_read, name="announcement_mark_all_read"),
     path("announcements/<int:announcement_id>/", views_pages.announcement_detail, name="announcement_detail"),
     path("announcements/<int:announcement_id>/edit/", views_pages.announcement_update, name="announcement_update"),
     
@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .views_api import MeetingRoomViewSet, VehicleViewSet
+
+router = DefaultRouter()
+router.register(r"meeting-rooms", MeetingRoomViewSet, basename="meeting-room")
+router.register(r"vehicles", VehicleViewSet, basename="vehicle")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
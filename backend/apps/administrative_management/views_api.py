@@ -0,0 +1,130 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from backend.apps.system_management.services import user_has_permission
+from backend.core.pagination import KeysetPagination
+
+from .models import MeetingRoom, Vehicle
+from .serializers import (
+    MeetingRoomSerializer,
+    RoomAvailabilityQuerySerializer,
+    RoomFreeSlotQuerySerializer,
+    RoomTimelineQuerySerializer,
+    VehicleAvailabilityQuerySerializer,
+    VehicleSerializer,
+)
+from .services_availability import (
+    find_available_rooms,
+    find_available_vehicles,
+    room_free_slots,
+    room_timelines,
+    vehicle_timelines,
+)
+
+
+class HasAdministrativePermission(permissions.BasePermission):
+    """按视图声明的 administrative_permission 校验行政管理权限"""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        code = getattr(view, 'administrative_permission', None)
+        return user.is_superuser or not code or user_has_permission(user, code)
+
+
+def _query_params(serializer_class, request):
+    serializer = serializer_class(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def _call(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    except DjangoValidationError as exc:
+        raise ValidationError(exc.messages)
+
+
+class MeetingRoomViewSet(viewsets.ReadOnlyModelViewSet):
+    """会议室列表与可用性查询"""
+    serializer_class = MeetingRoomSerializer
+    permission_classes = [HasAdministrativePermission]
+    pagination_class = KeysetPagination
+    administrative_permission = 'administrative_management.meeting_room.view'
+    queryset = MeetingRoom.objects.filter(is_active=True)
+
+    @action(detail=False, methods=['get'])
+    def available(self, request):
+        """某日某时段可用的会议室：?date=&start=&end=&capacity=&equipment="""
+        params = _query_params(RoomAvailabilityQuerySerializer, request)
+        rooms = _call(
+            find_available_rooms,
+            params['date'], params['start'], params['end'],
+            min_capacity=params['capacity'], equipment=params['equipment'],
+        )
+        return Response({'results': MeetingRoomSerializer(rooms, many=True).data})
+
+    @action(detail=False, methods=['get'], url_path='free-slots')
+    def free_slots(self, request):
+        """一天或一周内各会议室的空闲时间段"""
+        params = _query_params(RoomFreeSlotQuerySerializer, request)
+        rows = _call(
+            room_free_slots,
+            params['date_from'], params['date_to'],
+            duration=params['duration'], min_capacity=params['capacity'],
+            day_start=params['day_start'], day_end=params['day_end'],
+        )
+        return Response({
+            'results': [
+                {'room': MeetingRoomSerializer(row['room']).data, 'slots': row['slots']}
+                for row in rows
+            ]
+        })
+
+    @action(detail=False, methods=['get'])
+    def timeline(self, request):
+        """会议室占用时间轴：?date_from=&date_to=&room="""
+        params = _query_params(RoomTimelineQuerySerializer, request)
+        rows = _call(
+            room_timelines,
+            params['date_from'], params.get('date_to'),
+            rooms=params['room'] or None,
+        )
+        return Response({
+            'results': [
+                {'room': MeetingRoomSerializer(row['room']).data, 'occupancy': row['occupancy']}
+                for row in rows
+            ]
+        })
+
+
+class VehicleViewSet(viewsets.ReadOnlyModelViewSet):
+    """车辆列表与可用性查询"""
+    serializer_class = VehicleSerializer
+    permission_classes = [HasAdministrativePermission]
+    pagination_class = KeysetPagination
+    administrative_permission = 'administrative_management.vehicle.view'
+    queryset = Vehicle.objects.filter(is_active=True)
+
+    @action(detail=False, methods=['get'])
+    def available(self, request):
+        """某时段可用车辆：?start=&end=&vehicle_type="""
+        params = _query_params(VehicleAvailabilityQuerySerializer, request)
+        vehicles = _call(find_available_vehicles, params['start'], params['end'], params.get('vehicle_type'))
+        return Response({'results': VehicleSerializer(vehicles, many=True).data})
+
+    @action(detail=False, methods=['get'])
+    def timeline(self, request):
+        """车辆占用时间轴：?start=&end="""
+        params = _query_params(VehicleAvailabilityQuerySerializer, request)
+        rows = _call(vehicle_timelines, params['start'], params['end'])
+        return Response({
+            'results': [
+                {'vehicle': VehicleSerializer(row['vehicle']).data, 'occupancy': row['occupancy']}
+                for row in rows
+            ]
+        })
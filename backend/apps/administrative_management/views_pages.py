@@ -1,8 +1,10 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.db.models import Count, Sum, Q, F, Max
+from django.db.models import Count, Sum, Q, Max
 from django.core.paginator import Paginator
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.urls import reverse, NoReverseMatch
 from django.utils import timezone
 from django.forms import inlineformset_factory
@@ -21,6 +23,12 @@ from .models import (
     FixedAsset, AssetTransfer, AssetMaintenance,
     ExpenseReimbursement, ExpenseItem,
 )
+from .services_announcements import (
+    mark_all_read, mark_read, on_announcement_changed, on_announcement_published,
+    read_receipt_summary, unread_announcement_count,
+)
+from .services_availability import rooms_free_now, vehicles_free_now
+from .services_inventory import adjust_stock, inventory_summary, low_stock_supplies
 from .forms import (
     OfficeSupplyForm, MeetingRoomForm, VehicleForm, ReceptionRecordForm,
     AnnouncementForm, SealForm, FixedAssetForm, ExpenseReimbursementForm, ExpenseItemForm
@@ -190,13 +198,11 @@ def administrative_home(request):
         # 办公用品统计
         if _permission_granted('administrative_management.supplies.view', permission_codes):
             try:
-                total_supplies = OfficeSupply.objects.count()
-                active_supplies = OfficeSupply.objects.filter(is_active=True).count()
-                low_stock_count = OfficeSupply.objects.filter(
-                    current_stock__lte=F('min_stock'),
-                    min_stock__gt=0
-                ).count()
-                total_value = sum(float(s.purchase_price) * s.current_stock for s in OfficeSupply.objects.filter(is_active=True))
+                inventory = inventory_summary()
+                total_supplies = inventory['total']
+                active_supplies = inventory['active']
+                low_stock_count = inventory['low_stock']
+                total_value = inventory['total_value']
                 
                 try:
                     url = reverse('admin_pages:supplies_management')
@@ -293,12 +299,7 @@ def administrative_home(request):
                     is_active=True,
                     publish_date__lte=today
                 ).count()
-                unread_count = Announcement.objects.filter(
-                    is_active=True,
-                    publish_date__lte=today
-                ).exclude(
-                    read_records__user=request.user
-                ).count() if request.user.is_authenticated else 0
+                unread_count = unread_announcement_count(request.user)
                 
                 try:
                     url = reverse('admin_pages:announcement_management')
@@ -434,7 +435,10 @@ def supply_create(request):
                     seq = 1
                 supply.code = f'SUPPLY-{current_year}-{seq:04d}'
             supply.created_by = request.user
-            supply.save()
+            opening_stock, supply.current_stock = supply.current_stock, 0
+            with transaction.atomic():
+                supply.save()
+                adjust_stock(supply, opening_stock, operator=request.user, notes='期初库存')
             messages.success(request, f'办公用品 {supply.name} 创建成功！')
             return redirect('admin_pages:supply_detail', supply_id=supply.id)
     else:
@@ -467,9 +471,23 @@ def supply_update(request, supply_id):
     if request.method == 'POST':
         form = OfficeSupplyForm(request.POST, instance=supply)
         if form.is_valid():
-            form.save()
-            messages.success(request, f'办公用品 {supply.name} 更新成功！')
-            return redirect('admin_pages:supply_detail', supply_id=supply.id)
+            # 库存数量不随表单整行覆盖：未改动库存时保留期间的出入库，改动时以盘点调整记入流水，
+            # 且表单渲染后库存已变动则拒绝，避免用旧数值冲掉期间的入库/领用
+            counted = form.cleaned_data['current_stock']
+            snapshot = form.cleaned_data['stock_snapshot']
+            supply = form.save(commit=False)
+            try:
+                with transaction.atomic():
+                    supply.save(update_fields=[
+                        name for name in OfficeSupplyForm.Meta.fields if name != 'current_stock'
+                    ] + ['updated_time'])
+                    if counted != snapshot:
+                        adjust_stock(supply, counted, operator=request.user, expected=snapshot)
+            except ValidationError as exc:
+                form.add_error('current_stock', exc)
+            else:
+                messages.success(request, f'办公用品 {supply.name} 更新成功！')
+                return redirect('admin_pages:supply_detail', supply_id=supply.id)
     else:
         form = OfficeSupplyForm(instance=supply)
     
@@ -516,7 +534,7 @@ def supplies_management(request):
         elif is_active == 'false':
             supplies = supplies.filter(is_active=False)
         if low_stock == 'true':
-            supplies = supplies.filter(current_stock__lte=F('min_stock'))
+            supplies = supplies.filter(pk__in=low_stock_supplies().values('pk'))
         
         # 分页
         paginator = Paginator(supplies, 20)
@@ -530,13 +548,11 @@ def supplies_management(request):
     
     # 统计信息
     try:
-        total_supplies = OfficeSupply.objects.count()
-        active_supplies = OfficeSupply.objects.filter(is_active=True).count()
-        low_stock_count = OfficeSupply.objects.filter(
-            current_stock__lte=F('min_stock'),
-            min_stock__gt=0
-        ).count()
-        total_value = sum(float(s.purchase_price) * s.current_stock for s in OfficeSupply.objects.filter(is_active=True))
+        inventory = inventory_summary()
+        total_supplies = inventory['total']
+        active_supplies = inventory['active']
+        low_stock_count = inventory['low_stock']
+        total_value = inventory['total_value']
         
         summary_cards = [
             {"label": "用品总数", "value": total_supplies, "hint": "系统中维护的办公用品数量"},
@@ -590,6 +606,8 @@ def supply_detail(request, supply_id):
     except Exception:
         requests = []
     
+    movements = supply.stock_movements.select_related('operator')[:20]
+    
     context = _context(
         f"办公用品详情 - {supply.name}",
         "📦",
@@ -601,6 +619,7 @@ def supply_detail(request, supply_id):
         'supply': supply,
         'purchases': purchases,
         'requests': requests,
+        'movements': movements,
     })
     return render(request, "administrative_management/supply_detail.html", context)
 
@@ -838,6 +857,7 @@ def announcement_create(request):
             announcement.publisher = request.user
             announcement.save()
             form.save_m2m()  # 保存 ManyToMany 字段
+            on_announcement_published(announcement)
             messages.success(request, f'公告通知 {announcement.title} 创建成功！')
             return redirect('admin_pages:announcement_detail', announcement_id=announcement.id)
     else:
@@ -875,6 +895,7 @@ def announcement_update(request, announcement_id):
         if form.is_valid():
             form.save()
             form.save_m2m()  # 保存 ManyToMany 字段
+            on_announcement_changed()
             messages.success(request, f'公告通知 {announcement.title} 更新成功！')
             return redirect('admin_pages:announcement_detail', announcement_id=announcement.id)
     else:
@@ -1229,6 +1250,7 @@ def meeting_room_management(request):
         summary_cards = [
             {"label": "会议室总数", "value": total_rooms, "hint": "系统中维护的会议室数量"},
             {"label": "可用会议室", "value": available_rooms, "hint": "当前可用的会议室数量"},
+            {"label": "此刻空闲", "value": rooms_free_now().count(), "hint": "当前时段没有预订的可用会议室"},
             {"label": "启用会议室", "value": active_rooms, "hint": "状态为启用的会议室数量"},
             {"label": "今日预订", "value": today_bookings, "hint": "今日已预订的会议数量"},
         ]
@@ -1352,6 +1374,7 @@ def vehicle_management(request):
             {"label": "车辆总数", "value": total_vehicles, "hint": "系统中维护的车辆数量"},
             {"label": "可用车辆", "value": available_vehicles, "hint": "当前可用的车辆数量"},
             {"label": "在用车辆", "value": active_vehicles, "hint": "状态为启用的车辆数量"},
+            {"label": "此刻空闲", "value": vehicles_free_now().count(), "hint": "当前时段未被占用的可用车辆"},
             {"label": "今日用车", "value": today_bookings, "hint": "今日已批准或使用中的申请数量"},
         ]
     except Exception as e:
@@ -1604,6 +1627,7 @@ def announcement_management(request):
             {"label": "生效公告", "value": active_announcements, "hint": "状态为启用的公告数量"},
             {"label": "置顶公告", "value": top_announcements, "hint": "置顶的生效公告数量"},
             {"label": "本月发布", "value": this_month_count, "hint": "本月发布的公告数量"},
+            {"label": "我的未读", "value": unread_announcement_count(request.user), "hint": "发布给我且尚未阅读的公告"},
         ]
     except Exception as e:
         import logging
@@ -1637,25 +1661,21 @@ def announcement_detail(request, announcement_id):
     """公告通知详情"""
     announcement = get_object_or_404(Announcement, id=announcement_id)
     
-    # 增加查看次数（仅首次查看）
+    # 记录阅读并增加查看次数（仅首次查看）
     if request.user.is_authenticated:
         try:
-            from .models import AnnouncementRead
-            AnnouncementRead.objects.get_or_create(
-                announcement=announcement,
-                user=request.user
-            )
-            # 更新查看次数
-            announcement.view_count = announcement.read_records.count()
-            announcement.save(update_fields=['view_count'])
+            if mark_read(request.user, announcement):
+                announcement.view_count += 1
         except Exception:
             pass
     
     # 获取阅读记录（最近20条）
     try:
         read_records = announcement.read_records.select_related('user').order_by('-read_time')[:20]
+        read_summary = read_receipt_summary(announcement)
     except Exception:
         read_records = []
+        read_summary = None
     
     context = _context(
         f"公告详情 - {announcement.title}",
@@ -1667,10 +1687,23 @@ def announcement_detail(request, announcement_id):
     context.update({
         'announcement': announcement,
         'read_records': read_records,
+        'read_summary': read_summary,
     })
     return render(request, "administrative_management/announcement_detail.html", context)
 
 
+@login_required
+def announcement_mark_all_read(request):
+    """将当前用户的未读公告全部标记为已读"""
+    if request.method == 'POST':
+        marked = mark_all_read(request.user)
+        if marked:
+            messages.success(request, f'已将 {marked} 条公告标记为已读')
+        else:
+            messages.info(request, '没有未读公告')
+    return redirect('admin_pages:announcement_management')
+
+
 @login_required
 def seal_management(request):
     """印章管理"""
@@ -6,3 +6,7 @@ class CustomerSuccessConfig(AppConfig):
     name = 'backend.apps.customer_success'
     verbose_name = '客户成功'
 
+    def ready(self):
+        from .services_rollups import connect_rollup_signals
+
+        connect_rollup_signals()
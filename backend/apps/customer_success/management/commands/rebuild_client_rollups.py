@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from backend.apps.customer_success.services_rollups import rebuild_client_rollups, stale_client_count
+
+
+class Command(BaseCommand):
+    help = "Recompute Client.total_contract_amount / total_payment_amount from contracts and payment plans"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many clients have drifted rollups",
+        )
+
+    def handle(self, *args, **options):
+        stale = stale_client_count()
+        self.stdout.write(f"{stale} client(s) with stale rollups")
+        if options["dry_run"]:
+            return
+        updated = rebuild_client_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Client rollups rebuilt for {updated} client(s)."))
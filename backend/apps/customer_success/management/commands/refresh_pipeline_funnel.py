@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.apps.customer_success.services_pipeline import REFRESH_BATCH_SIZE, refresh_pipeline_funnel, refresh_state
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply new opportunity status-log rows to the funnel table, starting after the stored high-water mark; "
+        "recent rows below the mark that committed late are picked up as well"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=REFRESH_BATCH_SIZE,
+            help=f"Status-log rows applied per transaction (default: {REFRESH_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+        processed = refresh_pipeline_funnel(options["batch_size"])
+        state = refresh_state()
+        self.stdout.write(self.style.SUCCESS(
+            f"Applied {processed} status log(s); high-water mark is now {state.last_log_id}."
+        ))
@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.apps.customer_success.services_receivables import capture_aging_snapshot, mark_overdue_plans
+
+
+class Command(BaseCommand):
+    help = "Daily receivables job: flag overdue payment plans in one UPDATE, then store the aging snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            help="Business date in YYYY-MM-DD (default: today); used to re-run a missed day",
+        )
+        parser.add_argument(
+            "--skip-snapshot",
+            action="store_true",
+            help="Only correct overdue statuses",
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options["date"]:
+            try:
+                today = date.fromisoformat(options["date"])
+            except ValueError as exc:
+                raise CommandError(f"Invalid --date: {options['date']}") from exc
+        changed = mark_overdue_plans(today)
+        self.stdout.write(f"{changed} payment plan status(es) corrected")
+        if options["skip_snapshot"]:
+            return
+        snapshot = capture_aging_snapshot(today)
+        self.stdout.write(self.style.SUCCESS(
+            f"Aging snapshot {snapshot.snapshot_date}: outstanding {snapshot.total_outstanding}, "
+            f"{snapshot.overdue_plan_count} overdue plan(s)"
+        ))
@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def rebuild_client_rollups(apps, schema_editor):
+    """汇总字段此前从未维护，按现有合同与回款计划校准一次"""
+    Client = apps.get_model('customer_success', 'Client')
+    BusinessContract = apps.get_model('customer_success', 'BusinessContract')
+    BusinessPaymentPlan = apps.get_model('customer_success', 'BusinessPaymentPlan')
+    amount_field = models.DecimalField(max_digits=12, decimal_places=2)
+    contract_totals = (
+        BusinessContract.objects.filter(
+            client=OuterRef('pk'), is_active=True,
+            status__in=('signed', 'effective', 'executing', 'completed'),
+        )
+        .order_by().values('client').annotate(total=Sum('contract_amount')).values('total')
+    )
+    payment_totals = (
+        BusinessPaymentPlan.objects.filter(contract__client=OuterRef('pk'))
+        .exclude(status='cancelled')
+        .order_by().values('contract__client').annotate(total=Sum('actual_amount')).values('total')
+    )
+    Client.objects.update(
+        total_contract_amount=Coalesce(Subquery(contract_totals), Decimal('0'), output_field=amount_field),
+        total_payment_amount=Coalesce(Subquery(payment_totals), Decimal('0'), output_field=amount_field),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer_success', '0008_businessopportunity_client_client_type_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_client_rollups, migrations.RunPython.noop),
+    ]
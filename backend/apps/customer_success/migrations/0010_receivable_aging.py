@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:38
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer_success', '0009_rebuild_client_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceivableAgingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField(unique=True, verbose_name='快照日期')),
+                ('total_outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='待回款金额')),
+                ('not_due_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='未到期金额')),
+                ('days_0_30_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='逾期0-30天金额')),
+                ('days_31_60_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='逾期31-60天金额')),
+                ('days_61_90_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='逾期61-90天金额')),
+                ('days_over_90_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='逾期90天以上金额')),
+                ('open_plan_count', models.PositiveIntegerField(default=0, verbose_name='待回款节点数')),
+                ('overdue_plan_count', models.PositiveIntegerField(default=0, verbose_name='逾期节点数')),
+                ('client_count', models.PositiveIntegerField(default=0, verbose_name='涉及客户数')),
+                ('created_time', models.DateTimeField(default=django.utils.timezone.now, verbose_name='生成时间')),
+            ],
+            options={
+                'verbose_name': '应收账龄快照',
+                'verbose_name_plural': '应收账龄快照',
+                'db_table': 'business_receivable_aging_snapshot',
+                'ordering': ['-snapshot_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='businesspaymentplan',
+            index=models.Index(fields=['status', 'planned_date'], name='business_pa_status_bd9995_idx'),
+        ),
+    ]
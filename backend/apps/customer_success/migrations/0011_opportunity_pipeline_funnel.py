@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer_success', '0010_receivable_aging'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineRefreshState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True, verbose_name='刷新项')),
+                ('last_log_id', models.BigIntegerField(default=0, verbose_name='已处理日志ID')),
+                ('refreshed_time', models.DateTimeField(blank=True, null=True, verbose_name='刷新时间')),
+            ],
+            options={
+                'verbose_name': '商机漏斗刷新状态',
+                'verbose_name_plural': '商机漏斗刷新状态',
+                'db_table': 'business_pipeline_refresh_state',
+            },
+        ),
+        migrations.CreateModel(
+            name='OpportunityStageVisit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('potential', '潜在客户'), ('initial_contact', '初步接触'), ('requirement_confirmed', '需求确认'), ('quotation', '方案报价'), ('negotiation', '商务谈判'), ('won', '赢单'), ('lost', '输单'), ('cancelled', '已取消')], max_length=30, verbose_name='阶段')),
+                ('entered_time', models.DateTimeField(verbose_name='进入时间')),
+                ('exited_time', models.DateTimeField(blank=True, null=True, verbose_name='离开时间')),
+                ('next_stage', models.CharField(blank=True, choices=[('potential', '潜在客户'), ('initial_contact', '初步接触'), ('requirement_confirmed', '需求确认'), ('quotation', '方案报价'), ('negotiation', '商务谈判'), ('won', '赢单'), ('lost', '输单'), ('cancelled', '已取消')], max_length=30, verbose_name='流转至')),
+                ('duration_hours', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='停留时长（小时）')),
+                ('entered_log', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='customer_success.opportunitystatuslog', verbose_name='进入日志')),
+                ('exited_log', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='customer_success.opportunitystatuslog', verbose_name='离开日志')),
+                ('opportunity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stage_visits', to='customer_success.businessopportunity', verbose_name='商机')),
+            ],
+            options={
+                'verbose_name': '商机阶段停留记录',
+                'verbose_name_plural': '商机阶段停留记录',
+                'db_table': 'business_opportunity_stage_visit',
+                'ordering': ['opportunity', 'entered_time'],
+                'indexes': [models.Index(fields=['stage', 'entered_time'], name='business_op_stage_8cf2c4_idx'), models.Index(fields=['opportunity', 'exited_time'], name='business_op_opportu_3e495d_idx')],
+            },
+        ),
+    ]
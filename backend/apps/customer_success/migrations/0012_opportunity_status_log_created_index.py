@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer_success', '0011_opportunity_pipeline_funnel'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='opportunitystatuslog',
+            index=models.Index(fields=['created_time'], name='business_op_created_de2cfa_idx'),
+        ),
+    ]
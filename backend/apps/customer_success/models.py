@@ -167,7 +167,16 @@ class Client(models.Model):
         else:
             return 'observing'  # 观察客户
     
+    # 由 services_rollups 以 F() 增量维护的汇总字段
+    ROLLUP_FIELDS = ('total_contract_amount', 'total_payment_amount')
+    
     def save(self, *args, **kwargs):
+        # 整行保存已有客户时不回写汇总字段，避免覆盖并发的增量更新
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.ROLLUP_FIELDS
+            ]
         # 自动计算评分和分级
         if not self.score or kwargs.get('update_score', False):
             self.score = self.calculate_score()
@@ -429,11 +438,38 @@ class BusinessPaymentPlan(models.Model):
         verbose_name = '商务回款计划'
         verbose_name_plural = verbose_name
         ordering = ['planned_date']
+        indexes = [
+            models.Index(fields=['status', 'planned_date']),
+        ]
 
     def __str__(self):
         return f"{self.contract_id} - {self.phase_name}"
 
 
+class ReceivableAgingSnapshot(models.Model):
+    """应收账龄日快照（全公司口径，供账龄趋势图使用）"""
+    snapshot_date = models.DateField(unique=True, verbose_name='快照日期')
+    total_outstanding = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='待回款金额')
+    not_due_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='未到期金额')
+    days_0_30_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='逾期0-30天金额')
+    days_31_60_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='逾期31-60天金额')
+    days_61_90_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='逾期61-90天金额')
+    days_over_90_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='逾期90天以上金额')
+    open_plan_count = models.PositiveIntegerField(default=0, verbose_name='待回款节点数')
+    overdue_plan_count = models.PositiveIntegerField(default=0, verbose_name='逾期节点数')
+    client_count = models.PositiveIntegerField(default=0, verbose_name='涉及客户数')
+    created_time = models.DateTimeField(default=timezone.now, verbose_name='生成时间')
+
+    class Meta:
+        db_table = 'business_receivable_aging_snapshot'
+        verbose_name = '应收账龄快照'
+        verbose_name_plural = verbose_name
+        ordering = ['-snapshot_date']
+
+    def __str__(self):
+        return f"{self.snapshot_date} - {self.total_outstanding}"
+
+
 class ContractFile(models.Model):
     """合同文件"""
     FILE_TYPE_CHOICES = [
@@ -919,8 +955,52 @@ class OpportunityStatusLog(models.Model):
         verbose_name = '商机状态流转日志'
         verbose_name_plural = verbose_name
         ordering = ['-created_time']
+        indexes = [
+            # 漏斗刷新回扫安全窗口内的日志
+            models.Index(fields=['created_time']),
+        ]
     
     def __str__(self):
         from_label = dict(BusinessOpportunity.STATUS_CHOICES).get(self.from_status, '未知')
         to_label = dict(BusinessOpportunity.STATUS_CHOICES).get(self.to_status, '未知')
         return f"{self.opportunity.opportunity_number} - {from_label} → {to_label}"
+
+
+class OpportunityStageVisit(models.Model):
+    """商机阶段停留记录（漏斗事实表，由状态流转日志增量生成）"""
+    opportunity = models.ForeignKey(BusinessOpportunity, on_delete=models.CASCADE, related_name='stage_visits', verbose_name='商机')
+    stage = models.CharField(max_length=30, choices=BusinessOpportunity.STATUS_CHOICES, verbose_name='阶段')
+    entered_time = models.DateTimeField(verbose_name='进入时间')
+    exited_time = models.DateTimeField(null=True, blank=True, verbose_name='离开时间')
+    next_stage = models.CharField(max_length=30, choices=BusinessOpportunity.STATUS_CHOICES, blank=True, verbose_name='流转至')
+    duration_hours = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name='停留时长（小时）')
+    entered_log = models.ForeignKey(OpportunityStatusLog, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='进入日志')
+    exited_log = models.ForeignKey(OpportunityStatusLog, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='离开日志')
+
+    class Meta:
+        db_table = 'business_opportunity_stage_visit'
+        verbose_name = '商机阶段停留记录'
+        verbose_name_plural = verbose_name
+        ordering = ['opportunity', 'entered_time']
+        indexes = [
+            models.Index(fields=['stage', 'entered_time']),
+            models.Index(fields=['opportunity', 'exited_time']),
+        ]
+
+    def __str__(self):
+        return f"{self.opportunity_id} - {self.get_stage_display()}"
+
+
+class PipelineRefreshState(models.Model):
+    """漏斗增量刷新的高水位（已处理的最大状态日志 ID）"""
+    key = models.CharField(max_length=50, unique=True, verbose_name='刷新项')
+    last_log_id = models.BigIntegerField(default=0, verbose_name='已处理日志ID')
+    refreshed_time = models.DateTimeField(null=True, blank=True, verbose_name='刷新时间')
+
+    class Meta:
+        db_table = 'business_pipeline_refresh_state'
+        verbose_name = '商机漏斗刷新状态'
+        verbose_name_plural = verbose_name
+
+    def __str__(self):
+        return f"{self.key} @ {self.last_log_id}"
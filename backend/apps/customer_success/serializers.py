@@ -1,4 +1,9 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
+
+from backend.core.sparse_fields import FieldPlan, SparseFieldsMixin
+
 from .models import Client, ClientContact, ClientProject
 
 class ClientContactSerializer(serializers.ModelSerializer):
@@ -14,35 +19,64 @@ class ClientProjectSerializer(serializers.ModelSerializer):
         model = ClientProject
         fields = '__all__'
 
-class ClientSerializer(serializers.ModelSerializer):
+def _client_project_count(**filters):
+    rows = (
+        ClientProject.objects.filter(client=OuterRef('pk'), **filters)
+        .order_by().values('client').annotate(total=Count('pk')).values('total')[:1]
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+CLIENT_COUNT_PLANS = {
+    'project_count': FieldPlan(annotate={'project_count': _client_project_count()}),
+    'active_project_count': FieldPlan(annotate={'active_project_count': _client_project_count(status='in_progress')}),
+}
+
+CLIENT_FIELDS = [
+    'id', 'name', 'short_name', 'code',
+    'client_level', 'credit_level', 'industry',
+    'address', 'phone', 'email', 'website',
+    'total_contract_amount', 'total_payment_amount',
+    'is_active', 'health_score', 'description',
+    'created_by', 'created_by_name',
+    'created_time', 'updated_time',
+    'contacts', 'projects',
+    'project_count', 'active_project_count'
+]
+
+
+class ClientCountMixin:
+    def get_project_count(self, obj):
+        count = getattr(obj, 'project_count', None)
+        return obj.clientproject_set.count() if count is None else count
+
+    def get_active_project_count(self, obj):
+        count = getattr(obj, 'active_project_count', None)
+        return obj.clientproject_set.filter(status='in_progress').count() if count is None else count
+
+
+class ClientSerializer(ClientCountMixin, SparseFieldsMixin, serializers.ModelSerializer):
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     contacts = ClientContactSerializer(many=True, read_only=True)
-    projects = ClientProjectSerializer(many=True, read_only=True)
+    projects = ClientProjectSerializer(source='clientproject_set', many=True, read_only=True)
     
     # 统计字段
-    project_count = serializers.IntegerField(read_only=True, source='get_project_count')
-    active_project_count = serializers.IntegerField(read_only=True, source='get_active_project_count')
+    project_count = serializers.SerializerMethodField()
+    active_project_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Client
-        fields = [
-            'id', 'name', 'short_name', 'code',
-            'client_level', 'credit_level', 'industry',
-            'address', 'phone', 'email', 'website',
-            'total_contract_amount', 'total_payment_amount',
-            'is_active', 'health_score', 'description',
-            'created_by', 'created_by_name',
-            'created_time', 'updated_time',
-            'contacts', 'projects',
-            'project_count', 'active_project_count'
-        ]
-        read_only_fields = ['created_time', 'updated_time']
-    
-    def get_project_count(self, obj):
-        return obj.projects.count()
-    
-    def get_active_project_count(self, obj):
-        return obj.projects.filter(status='in_progress').count()
+        fields = CLIENT_FIELDS
+        # 合同/回款汇总由合同与回款计划事件维护
+        read_only_fields = ['created_time', 'updated_time', 'total_contract_amount', 'total_payment_amount']
+        query_plan = CLIENT_COUNT_PLANS
+
+
+class ClientListSerializer(ClientSerializer):
+    """客户列表：联系人、关联项目默认不返回，通过 ?expand=contacts,projects 展开"""
+
+    class Meta(ClientSerializer.Meta):
+        expandable_fields = ('contacts', 'projects')
 
 class ClientCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,291 @@
+"""
+商机漏斗分析
+
+OpportunityStageVisit 是漏斗事实表：商机每进入一个阶段记一行，离开时补上离开时间、去向和停留时长。
+refresh_pipeline_funnel 从 PipelineRefreshState 记录的高水位之后按 ID 顺序读取新的状态流转日志，
+关闭商机当前阶段并打开新阶段，批量写入后推进高水位；从不全量重算，多年数据也只处理新增日志。
+商机第一条日志之前的阶段以商机创建时间为进入时间补记。
+
+PostgreSQL 的自增 ID 在插入时分配、提交顺序却不定：慢事务里的日志可能在更大的 ID 处理完之后才可见。
+因此每次刷新还回扫高水位以下、REFRESH_SAFETY_WINDOW 内写入的日志，凡是没有对应阶段记录
+（按 entered_log 判断）的，把该商机的阶段记录按全部日志重建一遍。
+
+分析查询都在数据库中聚合：
+- 阶段转化：各阶段到达的商机数（去重）与下一阶段之比（流转只能逐级推进，到达某阶段即经过了之前各阶段），停留时长中位数用 PERCENTILE_CONT；
+- 加权金额：活跃商机按预计签约月份、负责商务分组汇总；
+- 赢单/输单：按客户等级统计赢单率与签约金额。
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.db.models import Aggregate, Count, Exists, FloatField, OuterRef, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from backend.core.dashboard_cache import bump_data_version
+
+from .models import BusinessOpportunity, Client, OpportunityStageVisit, OpportunityStatusLog, PipelineRefreshState
+
+REFRESH_KEY = 'opportunity_funnel'
+REFRESH_BATCH_SIZE = 2000
+# 回扫窗口须大于最长的写日志事务时长
+REFRESH_SAFETY_WINDOW = timedelta(minutes=30)
+# 漏斗阶段顺序（赢单为漏斗终点）
+FUNNEL_STAGES = ('potential', 'initial_contact', 'requirement_confirmed', 'quotation', 'negotiation', 'won')
+CLOSED_STAGES = ('won', 'lost', 'cancelled')
+DROPPED_STAGES = ('lost', 'cancelled')
+STAGE_LABELS = dict(BusinessOpportunity.STATUS_CHOICES)
+ZERO = Decimal('0')
+
+
+class Median(Aggregate):
+    """PostgreSQL 连续中位数"""
+    function = 'PERCENTILE_CONT'
+    name = 'Median'
+    template = '%(function)s(0.5) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+
+# ---------------------------------------------------------------------------
+# 增量刷新
+# ---------------------------------------------------------------------------
+
+def _hours(start: datetime, end: datetime) -> Decimal:
+    return Decimal(max((end - start).total_seconds(), 0) / 3600).quantize(Decimal('0.01'))
+
+
+def _apply_batch(logs: List[dict]) -> None:
+    opportunity_ids = {log['opportunity_id'] for log in logs}
+    open_visits: Dict[int, OpportunityStageVisit] = {
+        visit.opportunity_id: visit
+        for visit in OpportunityStageVisit.objects.filter(opportunity_id__in=opportunity_ids, exited_time__isnull=True)
+    }
+    seen = set(
+        OpportunityStageVisit.objects.filter(opportunity_id__in=opportunity_ids - set(open_visits))
+        .values_list('opportunity_id', flat=True).distinct()
+    )
+    # 首次出现的商机：第一条日志前的阶段从创建时间算起
+    created = dict(
+        BusinessOpportunity.objects.filter(id__in=opportunity_ids - set(open_visits) - seen)
+        .values_list('id', 'created_time')
+    )
+
+    to_create, to_update = [], {}
+    for log in logs:
+        opportunity_id = log['opportunity_id']
+        visit = open_visits.get(opportunity_id)
+        if visit is None and opportunity_id in created and log['from_status']:
+            visit = OpportunityStageVisit(
+                opportunity_id=opportunity_id,
+                stage=log['from_status'],
+                entered_time=min(created.pop(opportunity_id), log['created_time']),
+            )
+            to_create.append(visit)
+        if visit is not None:
+            visit.exited_time = log['created_time']
+            visit.next_stage = log['to_status']
+            visit.duration_hours = _hours(visit.entered_time, log['created_time'])
+            visit.exited_log_id = log['id']
+            if visit.pk:
+                to_update[visit.pk] = visit
+        entered = OpportunityStageVisit(
+            opportunity_id=opportunity_id,
+            stage=log['to_status'],
+            entered_time=log['created_time'],
+            entered_log_id=log['id'],
+        )
+        to_create.append(entered)
+        open_visits[opportunity_id] = entered
+        created.pop(opportunity_id, None)
+
+    OpportunityStageVisit.objects.bulk_update(
+        list(to_update.values()), ['exited_time', 'next_stage', 'duration_hours', 'exited_log'],
+    )
+    OpportunityStageVisit.objects.bulk_create(to_create)
+
+
+def _late_opportunity_ids(high_water_mark: int, since: datetime) -> List[int]:
+    """高水位以下、安全窗口内提交较晚而未被处理的日志所属商机"""
+    return list(
+        OpportunityStatusLog.objects.filter(id__lte=high_water_mark, created_time__gte=since)
+        .filter(~Exists(OpportunityStageVisit.objects.filter(entered_log_id=OuterRef('pk'))))
+        .order_by().values_list('opportunity_id', flat=True).distinct()
+    )
+
+
+def _rebuild_opportunities(opportunity_ids: List[int], high_water_mark: int) -> int:
+    """迟到日志插在已处理日志之间，只能按全部日志重建这些商机的阶段记录"""
+    OpportunityStageVisit.objects.filter(opportunity_id__in=opportunity_ids).delete()
+    logs = list(
+        OpportunityStatusLog.objects.filter(opportunity_id__in=opportunity_ids, id__lte=high_water_mark)
+        .order_by('id')
+        .values('id', 'opportunity_id', 'from_status', 'to_status', 'created_time')
+    )
+    _apply_batch(logs)
+    return len(logs)
+
+
+def refresh_pipeline_funnel(batch_size: int = REFRESH_BATCH_SIZE,
+                            safety_window: timedelta = REFRESH_SAFETY_WINDOW) -> int:
+    """处理高水位之后的新状态日志及安全窗口内的迟到日志，返回写入的日志条数；每批一个事务，中断后可从高水位续跑"""
+    processed = 0
+    PipelineRefreshState.objects.get_or_create(key=REFRESH_KEY)
+    with transaction.atomic():
+        state = PipelineRefreshState.objects.select_for_update().get(key=REFRESH_KEY)
+        late = _late_opportunity_ids(state.last_log_id, timezone.now() - safety_window)
+        if late:
+            processed += _rebuild_opportunities(late, state.last_log_id)
+    while True:
+        with transaction.atomic():
+            state = PipelineRefreshState.objects.select_for_update().get(key=REFRESH_KEY)
+            logs = list(
+                OpportunityStatusLog.objects.filter(id__gt=state.last_log_id)
+                .order_by('id')
+                .values('id', 'opportunity_id', 'from_status', 'to_status', 'created_time')[:batch_size]
+            )
+            if logs:
+                _apply_batch(logs)
+                state.last_log_id = logs[-1]['id']
+            state.refreshed_time = timezone.now()
+            state.save(update_fields=['last_log_id', 'refreshed_time'])
+        processed += len(logs)
+        if len(logs) < batch_size:
+            break
+    if processed:
+        bump_data_version(OpportunityStageVisit)
+    return processed
+
+
+def refresh_state() -> Optional[PipelineRefreshState]:
+    return PipelineRefreshState.objects.filter(key=REFRESH_KEY).first()
+
+
+# ---------------------------------------------------------------------------
+# 分析查询
+# ---------------------------------------------------------------------------
+
+def _opportunity_scope(prefix: str = '', since=None, until=None, business_manager_id=None) -> Q:
+    condition = Q()
+    if since:
+        condition &= Q(**{f'{prefix}created_time__gte': since})
+    if until:
+        condition &= Q(**{f'{prefix}created_time__lt': until})
+    if business_manager_id:
+        condition &= Q(**{f'{prefix}business_manager_id': business_manager_id})
+    return condition
+
+
+def _ratio(value, base) -> Optional[float]:
+    return round(value / base * 100, 1) if base else None
+
+
+def stage_conversion(since=None, until=None, business_manager_id=None) -> List[dict]:
+    """按创建时间圈定商机，统计各漏斗阶段到达数、流失数、转化率和停留时长中位数"""
+    scope = _opportunity_scope('opportunity__', since, until, business_manager_id)
+    rows = {
+        row['stage']: row
+        for row in OpportunityStageVisit.objects.filter(scope)
+        .values('stage')
+        .annotate(
+            reached=Count('opportunity', distinct=True),
+            dropped=Count('opportunity', distinct=True, filter=Q(next_stage__in=DROPPED_STAGES)),
+            median_hours=Median('duration_hours', filter=Q(exited_time__isnull=False)),
+        )
+    }
+    # 尚无流转日志的商机计入其当前阶段及之前各阶段；已输单/取消的只计入漏斗入口
+    untouched = [0] * len(FUNNEL_STAGES)
+    for status, total in (
+        BusinessOpportunity.objects.filter(_opportunity_scope('', since, until, business_manager_id))
+        .filter(~Exists(OpportunityStageVisit.objects.filter(opportunity=OuterRef('pk'))))
+        .values('status').annotate(total=Count('id')).values_list('status', 'total')
+    ):
+        depth = FUNNEL_STAGES.index(status) if status in FUNNEL_STAGES else 0
+        for index in range(depth + 1):
+            untouched[index] += total
+
+    funnel = []
+    for index, stage in enumerate(FUNNEL_STAGES):
+        row = rows.get(stage, {})
+        median = row.get('median_hours')
+        funnel.append({
+            'stage': stage,
+            'label': STAGE_LABELS[stage],
+            'reached': row.get('reached', 0) + untouched[index],
+            'dropped': row.get('dropped', 0),
+            'median_hours': round(median, 1) if median is not None else None,
+        })
+    for current, following in zip(funnel, funnel[1:]):
+        current['conversion_rate'] = _ratio(following['reached'], current['reached'])
+    funnel[-1]['conversion_rate'] = None
+    return funnel
+
+
+def weighted_pipeline(business_manager_id=None) -> List[dict]:
+    """活跃商机按预计签约月份与负责商务汇总加权金额"""
+    rows = (
+        BusinessOpportunity.objects.filter(is_active=True)
+        .exclude(status__in=CLOSED_STAGES)
+        .filter(_opportunity_scope('', business_manager_id=business_manager_id))
+        .annotate(month=TruncMonth('expected_sign_date'))
+        .values('month', 'business_manager_id', 'business_manager__username',
+                'business_manager__first_name', 'business_manager__last_name')
+        .annotate(count=Count('id'), estimated=Sum('estimated_amount'), weighted=Sum('weighted_amount'))
+        .order_by('month', '-weighted')
+    )
+    return [
+        {
+            'month': row['month'],
+            'business_manager_id': row['business_manager_id'],
+            'business_manager': f"{row['business_manager__first_name']} {row['business_manager__last_name']}".strip()
+            or row['business_manager__username'],
+            'count': row['count'],
+            'estimated_amount': row['estimated'] or ZERO,
+            'weighted_amount': row['weighted'] or ZERO,
+        }
+        for row in rows
+    ]
+
+
+def win_loss_by_client_level(since=None, until=None, business_manager_id=None) -> List[dict]:
+    """按客户等级统计已关闭商机的赢单/输单"""
+    rows = {
+        row['client__client_level']: row
+        for row in BusinessOpportunity.objects.filter(status__in=('won', 'lost'))
+        .filter(_opportunity_scope('', since, until, business_manager_id))
+        .values('client__client_level')
+        .annotate(
+            won=Count('id', filter=Q(status='won')),
+            lost=Count('id', filter=Q(status='lost')),
+            won_amount=Sum('actual_amount', filter=Q(status='won')),
+        )
+    }
+    result = []
+    for level, label in Client.CLIENT_LEVELS:
+        row = rows.get(level)
+        if not row:
+            continue
+        result.append({
+            'client_level': level,
+            'label': label,
+            'won': row['won'],
+            'lost': row['lost'],
+            'win_rate': _ratio(row['won'], row['won'] + row['lost']),
+            'won_amount': row['won_amount'] or ZERO,
+        })
+    return result
+
+
+def opportunity_counters(queryset=None) -> dict:
+    """商机管理页统计卡片，一次聚合"""
+    queryset = BusinessOpportunity.objects.all() if queryset is None else queryset
+    active = ~Q(status__in=CLOSED_STAGES)
+    return queryset.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=active),
+        weighted=Sum('weighted_amount', filter=active),
+        won=Count('id', filter=Q(status='won')),
+    )
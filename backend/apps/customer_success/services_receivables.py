@@ -0,0 +1,189 @@
+"""
+应收账龄
+
+回款计划的待回款金额 = max(计划金额 - 实际到账, 0)，只统计待回款、部分回款、已逾期且合同仍有效的计划。
+账龄按计划日期已过天数分段（未到期含当天到期，其后为 0-30、31-60、61-90、90 天以上），金额和笔数都用
+带 FILTER 的 SUM/COUNT 在数据库中一次算出，可按客户、项目、商务经理分组。
+
+每日任务 refresh_receivables 先用一条 UPDATE 校正逾期状态，再写入当天的账龄快照，
+收款跟踪页的趋势图读快照表，不回溯历史计划。
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from backend.core.dashboard_cache import bump_data_version
+
+from .models import BusinessPaymentPlan, ReceivableAgingSnapshot
+
+OPEN_STATUSES = ('pending', 'partial', 'overdue')
+# 合同终止、取消后其回款计划不再计入应收
+CLOSED_CONTRACT_STATUSES = ('terminated', 'cancelled')
+ZERO = Decimal('0')
+AMOUNT_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+AGING_BUCKETS = (
+    ('not_due', '未到期'),
+    ('days_0_30', '逾期30天以内'),
+    ('days_31_60', '逾期31-60天'),
+    ('days_61_90', '逾期61-90天'),
+    ('days_over_90', '逾期90天以上'),
+)
+OVERDUE_BUCKETS = tuple(key for key, _ in AGING_BUCKETS if key != 'not_due')
+
+# 分组口径：维度 -> (分组 ID 字段, 展示字段)
+GROUPINGS = {
+    'client': ('contract__client_id', ('contract__client__name',)),
+    'project': ('contract__project_id', ('contract__project__project_number', 'contract__project__name')),
+    'business_manager': (
+        'contract__project__business_manager_id',
+        (
+            'contract__project__business_manager__username',
+            'contract__project__business_manager__first_name',
+            'contract__project__business_manager__last_name',
+        ),
+    ),
+}
+
+UNPAID = Q(actual_amount__isnull=True) | Q(actual_amount__lt=F('planned_amount'))
+
+
+def _outstanding():
+    return Greatest(
+        F('planned_amount') - Coalesce(F('actual_amount'), Value(ZERO), output_field=AMOUNT_FIELD),
+        Value(ZERO),
+        output_field=AMOUNT_FIELD,
+    )
+
+
+def bucket_filters(today: date) -> Dict[str, Q]:
+    """各账龄段对应的计划日期区间"""
+    return {
+        'not_due': Q(planned_date__gte=today),
+        'days_0_30': Q(planned_date__lt=today, planned_date__gte=today - timedelta(days=30)),
+        'days_31_60': Q(planned_date__lt=today - timedelta(days=30), planned_date__gte=today - timedelta(days=60)),
+        'days_61_90': Q(planned_date__lt=today - timedelta(days=60), planned_date__gte=today - timedelta(days=90)),
+        'days_over_90': Q(planned_date__lt=today - timedelta(days=90)),
+    }
+
+
+def receivable_plans():
+    """仍有待回款金额的回款计划"""
+    return (
+        BusinessPaymentPlan.objects.filter(status__in=OPEN_STATUSES, contract__is_active=True)
+        .filter(UNPAID)
+        .exclude(contract__status__in=CLOSED_CONTRACT_STATUSES)
+    )
+
+
+def _aggregates(today: date) -> dict:
+    outstanding = _outstanding()
+    expressions = {
+        'total_outstanding': Coalesce(Sum(outstanding), Value(ZERO), output_field=AMOUNT_FIELD),
+        'open_plan_count': Count('id'),
+        'overdue_plan_count': Count('id', filter=Q(planned_date__lt=today)),
+    }
+    for key, condition in bucket_filters(today).items():
+        expressions[f'{key}_amount'] = Coalesce(
+            Sum(outstanding, filter=condition), Value(ZERO), output_field=AMOUNT_FIELD,
+        )
+    return expressions
+
+
+def _with_overdue(row: dict) -> dict:
+    row['overdue_amount'] = sum((row[f'{key}_amount'] for key in OVERDUE_BUCKETS), ZERO)
+    return row
+
+
+def aging_summary(today: Optional[date] = None) -> dict:
+    """全公司账龄汇总，一次聚合查询"""
+    today = today or timezone.localdate()
+    expressions = _aggregates(today)
+    expressions['client_count'] = Count('contract__client_id', distinct=True)
+    return _with_overdue(receivable_plans().aggregate(**expressions))
+
+
+def _display(dimension: str, row: dict) -> str:
+    if dimension == 'client':
+        return row['contract__client__name'] or '未关联客户'
+    if dimension == 'project':
+        number = row['contract__project__project_number']
+        return f"{number} · {row['contract__project__name']}" if number else '未关联项目'
+    full_name = f"{row['contract__project__business_manager__first_name'] or ''} " \
+                f"{row['contract__project__business_manager__last_name'] or ''}".strip()
+    return full_name or row['contract__project__business_manager__username'] or '未指定商务经理'
+
+
+def aging_by(dimension: str, today: Optional[date] = None, limit: Optional[int] = None) -> List[dict]:
+    """按客户、项目或商务经理分组的账龄，按待回款金额降序"""
+    today = today or timezone.localdate()
+    key_field, label_fields = GROUPINGS[dimension]
+    rows = (
+        receivable_plans()
+        .values(key_field, *label_fields)
+        .annotate(**_aggregates(today))
+        .order_by('-total_outstanding', key_field)
+    )
+    if limit:
+        rows = rows[:limit]
+    return [
+        _with_overdue({
+            'id': row[key_field],
+            'label': _display(dimension, row),
+            'total_outstanding': row['total_outstanding'],
+            'open_plan_count': row['open_plan_count'],
+            'overdue_plan_count': row['overdue_plan_count'],
+            **{f'{key}_amount': row[f'{key}_amount'] for key, _ in AGING_BUCKETS},
+        })
+        for row in rows
+    ]
+
+
+def mark_overdue_plans(today: Optional[date] = None) -> int:
+    """一条 UPDATE 校正逾期状态：过期未结清的改为已逾期，计划日期已顺延的恢复为待回款/部分回款"""
+    today = today or timezone.localdate()
+    changed = (
+        receivable_plans()
+        .filter(
+            (Q(planned_date__lt=today) & ~Q(status='overdue'))
+            | Q(planned_date__gte=today, status='overdue')
+        )
+        .update(status=Case(
+            When(planned_date__lt=today, then=Value('overdue')),
+            When(actual_amount__gt=0, then=Value('partial')),
+            default=Value('pending'),
+        ))
+    )
+    if changed:
+        # update() 不触发信号，显式刷新看板缓存版本
+        bump_data_version(BusinessPaymentPlan)
+    return changed
+
+
+def capture_aging_snapshot(today: Optional[date] = None) -> ReceivableAgingSnapshot:
+    """写入（或覆盖）当天的账龄快照"""
+    today = today or timezone.localdate()
+    summary = aging_summary(today)
+    fields = [field.name for field in ReceivableAgingSnapshot._meta.concrete_fields
+              if field.name not in ('id', 'snapshot_date', 'created_time')]
+    snapshot, _ = ReceivableAgingSnapshot.objects.update_or_create(
+        snapshot_date=today,
+        defaults={**{name: summary[name] for name in fields}, 'created_time': timezone.now()},
+    )
+    return snapshot
+
+
+def aging_trend(days: int = 90, today: Optional[date] = None) -> List[dict]:
+    """最近 days 天的账龄快照，按日期升序"""
+    today = today or timezone.localdate()
+    return list(
+        ReceivableAgingSnapshot.objects.filter(snapshot_date__gt=today - timedelta(days=days), snapshot_date__lte=today)
+        .order_by('snapshot_date')
+        .values('snapshot_date', 'total_outstanding', *[f'{key}_amount' for key, _ in AGING_BUCKETS])
+    )
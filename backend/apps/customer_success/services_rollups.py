@@ -0,0 +1,179 @@
+"""
+客户财务汇总维护
+
+Client.total_contract_amount / total_payment_amount 由合同与回款计划的保存、删除事件
+以 F() 增量维护，客户看板只读客户表即可。queryset.update() 等绕过信号的批量操作
+之后，可执行 rebuild_client_rollups 以一条聚合 UPDATE 全量校准。
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .models import BusinessContract, BusinessPaymentPlan, Client
+
+
+# 计入客户合同额的合同状态（已签订及之后、未终止/取消）
+COUNTED_CONTRACT_STATUSES = ('signed', 'effective', 'executing', 'completed')
+ZERO = Decimal('0')
+
+Contribution = Tuple[Optional[int], Decimal]
+
+
+def contract_contribution(contract: BusinessContract) -> Contribution:
+    """合同对所属客户合同额的贡献"""
+    if not contract.client_id or not contract.is_active or contract.status not in COUNTED_CONTRACT_STATUSES:
+        return contract.client_id, ZERO
+    return contract.client_id, Decimal(contract.contract_amount or 0)
+
+
+def payment_contribution(status: str, actual_amount, client_id: Optional[int]) -> Contribution:
+    """回款计划对所属客户回款额的贡献（已取消的计划不计）"""
+    if status == 'cancelled':
+        return client_id, ZERO
+    return client_id, Decimal(actual_amount or 0)
+
+
+def _apply(field: str, client_id: Optional[int], delta: Decimal) -> None:
+    if client_id and delta:
+        Client.objects.filter(pk=client_id).update(**{field: F(field) + delta})
+
+
+def _move(field: str, before: Contribution, after: Contribution) -> None:
+    """把贡献从变更前的客户/金额调整为变更后的客户/金额"""
+    if before[0] == after[0]:
+        _apply(field, after[0], after[1] - before[1])
+    else:
+        _apply(field, before[0], -before[1])
+        _apply(field, after[0], after[1])
+
+
+def _contract_client(contract_id: int) -> Optional[int]:
+    return BusinessContract.objects.filter(pk=contract_id).values_list('client_id', flat=True).first()
+
+
+def _paid_total(contract_id: int) -> Decimal:
+    return (
+        BusinessPaymentPlan.objects.filter(contract_id=contract_id)
+        .exclude(status='cancelled')
+        .aggregate(total=Sum('actual_amount'))['total']
+    ) or ZERO
+
+
+# ---------------------------------------------------------------------------
+# 信号处理
+# ---------------------------------------------------------------------------
+
+def _remember_contract(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None
+    if instance.pk:
+        previous = (
+            BusinessContract.objects.filter(pk=instance.pk)
+            .only('client_id', 'status', 'is_active', 'contract_amount').first()
+        )
+    instance._rollup_before = contract_contribution(previous) if previous else (None, ZERO)
+
+
+def _contract_saved(sender, instance, raw=False, **kwargs):
+    before = getattr(instance, '_rollup_before', None)
+    if raw or before is None:
+        return
+    after = contract_contribution(instance)
+    _move('total_contract_amount', before, after)
+    # 合同改挂到其他客户时，已回款一并转移
+    if before[0] != after[0] and not kwargs.get('created'):
+        paid = _paid_total(instance.pk)
+        _move('total_payment_amount', (before[0], paid), (after[0], paid))
+
+
+def _contract_deleted(sender, instance, **kwargs):
+    client_id, amount = contract_contribution(instance)
+    _apply('total_contract_amount', client_id, -amount)
+
+
+def _remember_plan(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None
+    if instance.pk:
+        previous = (
+            BusinessPaymentPlan.objects.filter(pk=instance.pk)
+            .values_list('status', 'actual_amount', 'contract__client_id').first()
+        )
+    instance._rollup_before = payment_contribution(*previous) if previous else (None, ZERO)
+
+
+def _plan_saved(sender, instance, raw=False, **kwargs):
+    before = getattr(instance, '_rollup_before', None)
+    if raw or before is None:
+        return
+    after = payment_contribution(instance.status, instance.actual_amount, _contract_client(instance.contract_id))
+    _move('total_payment_amount', before, after)
+
+
+def _plan_deleted(sender, instance, **kwargs):
+    # 级联删除时合同行此时仍在，可以查到所属客户
+    client_id, amount = payment_contribution(
+        instance.status, instance.actual_amount, _contract_client(instance.contract_id),
+    )
+    _apply('total_payment_amount', client_id, -amount)
+
+
+def connect_rollup_signals() -> None:
+    """在应用就绪后挂载合同与回款计划的汇总维护信号"""
+    pre_save.connect(_remember_contract, sender=BusinessContract, dispatch_uid='client_rollup_contract_pre_save')
+    post_save.connect(_contract_saved, sender=BusinessContract, dispatch_uid='client_rollup_contract_save')
+    post_delete.connect(_contract_deleted, sender=BusinessContract, dispatch_uid='client_rollup_contract_delete')
+    pre_save.connect(_remember_plan, sender=BusinessPaymentPlan, dispatch_uid='client_rollup_plan_pre_save')
+    post_save.connect(_plan_saved, sender=BusinessPaymentPlan, dispatch_uid='client_rollup_plan_save')
+    post_delete.connect(_plan_deleted, sender=BusinessPaymentPlan, dispatch_uid='client_rollup_plan_delete')
+
+
+# ---------------------------------------------------------------------------
+# 全量校准
+# ---------------------------------------------------------------------------
+
+def _rollup_expressions() -> Dict[str, Coalesce]:
+    amount_field = DecimalField(max_digits=12, decimal_places=2)
+    contract_totals = (
+        BusinessContract.objects.filter(
+            client=OuterRef('pk'), is_active=True, status__in=COUNTED_CONTRACT_STATUSES,
+        )
+        .order_by().values('client').annotate(total=Sum('contract_amount')).values('total')
+    )
+    payment_totals = (
+        BusinessPaymentPlan.objects.filter(contract__client=OuterRef('pk'))
+        .exclude(status='cancelled')
+        .order_by().values('contract__client').annotate(total=Sum('actual_amount')).values('total')
+    )
+    return {
+        'total_contract_amount': Coalesce(Subquery(contract_totals), ZERO, output_field=amount_field),
+        'total_payment_amount': Coalesce(Subquery(payment_totals), ZERO, output_field=amount_field),
+    }
+
+
+def stale_client_count() -> int:
+    """汇总值与实际合同/回款不一致的客户数"""
+    expected = _rollup_expressions()
+    return (
+        Client.objects.annotate(
+            expected_contract=expected['total_contract_amount'],
+            expected_payment=expected['total_payment_amount'],
+        )
+        .filter(
+            ~Q(total_contract_amount=F('expected_contract'))
+            | ~Q(total_payment_amount=F('expected_payment'))
+        )
+        .count()
+    )
+
+
+def rebuild_client_rollups() -> int:
+    """以一条带分组聚合子查询的 UPDATE 重算全部客户汇总，返回更新的客户数"""
+    return Client.objects.update(**_rollup_expressions())
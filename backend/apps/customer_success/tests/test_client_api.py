@@ -0,0 +1,43 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from backend.apps.customer_success.models import Client, ClientProject
+from backend.apps.project_center.models import Project
+
+
+class ClientApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="client_api_user", password="pass1234")
+        self.client_obj = Client.objects.create(name="接口客户", code="CLI-API", created_by=self.user)
+        for index, status in enumerate(("in_progress", "completed")):
+            project = Project.objects.create(name=f"客户项目{index}", project_number=f"VIH-CAPI-{index}", created_by=self.user)
+            ClientProject.objects.create(
+                client=self.client_obj, project=project, service_type="cost", contract_amount=Decimal("100"),
+                start_date=date.today(), end_date=date.today(), status=status,
+            )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+        self.url = reverse("customer:client-list")
+
+    def test_list_annotates_project_counts(self):
+        response = self.api.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        row = response.data["results"][0]
+        self.assertEqual((row["project_count"], row["active_project_count"]), (2, 1))
+        self.assertNotIn("projects", row)
+        self.assertNotIn("contacts", row)
+
+    def test_expand_and_sparse_fields(self):
+        response = self.api.get(self.url, {"fields": "id", "expand": "projects"})
+        row = response.data["results"][0]
+        self.assertEqual(set(row), {"id", "projects"})
+        self.assertEqual({project["project_number"] for project in row["projects"]}, {"VIH-CAPI-0", "VIH-CAPI-1"})
+
+        detail = self.api.get(reverse("customer:client-detail", args=[self.client_obj.id]))
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(len(detail.data["projects"]), 2)
@@ -0,0 +1,85 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from backend.apps.customer_success.models import BusinessContract, BusinessPaymentPlan, Client
+from backend.apps.customer_success.services_rollups import rebuild_client_rollups
+
+
+class ClientRollupTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="rollup_user", password="pass1234")
+        self.client_a = Client.objects.create(name="甲方A", code="CLI-A", created_by=self.user)
+        self.client_b = Client.objects.create(name="甲方B", code="CLI-B", created_by=self.user)
+
+    def _totals(self, client):
+        client.refresh_from_db()
+        return client.total_contract_amount, client.total_payment_amount
+
+    def _contract(self, amount, status="signed", client=None):
+        return BusinessContract.objects.create(
+            client=client or self.client_a, contract_amount=Decimal(amount), tax_rate=Decimal("6"), status=status,
+            created_by=self.user,
+        )
+
+    def test_contract_events_adjust_contract_total(self):
+        draft = self._contract("1000", status="draft")
+        self.assertEqual(self._totals(self.client_a), (Decimal("0"), Decimal("0")))
+
+        draft.status = "signed"
+        draft.save()
+        self._contract("500")
+        self.assertEqual(self._totals(self.client_a)[0], Decimal("1500"))
+
+        draft.contract_amount = Decimal("1200")
+        draft.save()
+        self.assertEqual(self._totals(self.client_a)[0], Decimal("1700"))
+
+        draft.transition_to("cancelled")
+        self.assertEqual(self._totals(self.client_a)[0], Decimal("500"))
+
+    def test_payment_plan_events_and_client_reassignment(self):
+        contract = self._contract("1000")
+        plan = BusinessPaymentPlan.objects.create(
+            contract=contract, phase_name="首付款", planned_amount=Decimal("400"), planned_date=date(2026, 1, 1),
+        )
+        self.assertEqual(self._totals(self.client_a)[1], Decimal("0"))
+        plan.actual_amount = Decimal("300")
+        plan.status = "partial"
+        plan.save()
+        self.assertEqual(self._totals(self.client_a)[1], Decimal("300"))
+
+        contract.client = self.client_b
+        contract.save()
+        self.assertEqual(self._totals(self.client_a), (Decimal("0"), Decimal("0")))
+        self.assertEqual(self._totals(self.client_b), (Decimal("1000"), Decimal("300")))
+
+        contract.delete()
+        self.assertEqual(self._totals(self.client_b), (Decimal("0"), Decimal("0")))
+
+    def test_client_save_does_not_overwrite_rollups(self):
+        stale = Client.objects.get(pk=self.client_a.pk)
+        self._contract("800")
+        stale.name = "甲方A（更名）"
+        stale.save()
+        self.assertEqual(self._totals(self.client_a)[0], Decimal("800"))
+        self.assertEqual(self.client_a.name, "甲方A（更名）")
+
+    def test_rebuild_command_recomputes_with_one_update(self):
+        self._contract("800")
+        self._contract("200", client=self.client_b)
+        Client.objects.update(total_contract_amount=0, total_payment_amount=Decimal("99"))
+
+        out = StringIO()
+        call_command("rebuild_client_rollups", "--dry-run", stdout=out)
+        self.assertIn("2 client(s) with stale rollups", out.getvalue())
+        self.assertEqual(self._totals(self.client_a)[1], Decimal("99"))
+
+        with self.assertNumQueries(1):
+            rebuild_client_rollups()
+        self.assertEqual(self._totals(self.client_a), (Decimal("800"), Decimal("0")))
+        self.assertEqual(self._totals(self.client_b), (Decimal("200"), Decimal("0")))
@@ -0,0 +1,167 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from backend.apps.customer_success.models import (
+    BusinessOpportunity,
+    Client,
+    OpportunityStageVisit,
+    OpportunityStatusLog,
+    PipelineRefreshState,
+)
+from backend.apps.customer_success.services_pipeline import (
+    refresh_pipeline_funnel,
+    stage_conversion,
+    weighted_pipeline,
+    win_loss_by_client_level,
+)
+
+START = timezone.make_aware(datetime(2026, 1, 5, 9, 0))
+PATH = ("potential", "initial_contact", "requirement_confirmed", "quotation", "negotiation")
+
+
+class PipelineAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.admin = User.objects.create_superuser(username="pipe_admin", password="pass1234", email="p@example.com")
+        self.manager = User.objects.create_user(username="pipe_bm", password="pass1234", first_name="Wang")
+        self.vip = Client.objects.create(name="VIP", code="CLI-PIPE-V", client_level="vip", created_by=self.admin)
+        self.general = Client.objects.create(name="GEN", code="CLI-PIPE-G", client_level="general", created_by=self.admin)
+        self.counter = 0
+
+    def _opportunity(self, client, amount="100", probability=50, expected=None, status="potential"):
+        self.counter += 1
+        return BusinessOpportunity.objects.create(
+            name=f"opp{self.counter}", client=client, business_manager=self.manager, created_by=self.admin,
+            estimated_amount=Decimal(amount), success_probability=probability, expected_sign_date=expected,
+            status=status, created_time=START, health_score=50,
+        )
+
+    def _walk(self, opportunity, stages, step_hours):
+        """按 stages 依次流转，每步间隔 step_hours 小时"""
+        moment = START
+        previous = opportunity.status
+        for stage in stages:
+            moment += timedelta(hours=step_hours)
+            OpportunityStatusLog.objects.create(
+                opportunity=opportunity, from_status=previous, to_status=stage, created_time=moment,
+            )
+            previous = stage
+        BusinessOpportunity.objects.filter(pk=opportunity.pk).update(status=previous)
+
+    def test_refresh_applies_only_new_logs(self):
+        opportunity = self._opportunity(self.vip)
+        self._walk(opportunity, ["initial_contact", "requirement_confirmed"], 10)
+        self.assertEqual(refresh_pipeline_funnel(), 2)
+        visits = list(OpportunityStageVisit.objects.filter(opportunity=opportunity).order_by("entered_time"))
+        self.assertEqual(
+            [(visit.stage, visit.next_stage, visit.duration_hours) for visit in visits],
+            [("potential", "initial_contact", Decimal("10.00")),
+             ("initial_contact", "requirement_confirmed", Decimal("10.00")),
+             ("requirement_confirmed", "", None)],
+        )
+        self.assertEqual(refresh_pipeline_funnel(), 0)
+
+        OpportunityStatusLog.objects.create(
+            opportunity=opportunity, from_status="requirement_confirmed", to_status="quotation",
+            created_time=START + timedelta(hours=50),
+        )
+        self.assertEqual(refresh_pipeline_funnel(), 1)
+        self.assertEqual(OpportunityStageVisit.objects.filter(opportunity=opportunity).count(), 4)
+        closed = OpportunityStageVisit.objects.get(opportunity=opportunity, stage="requirement_confirmed")
+        self.assertEqual(closed.duration_hours, Decimal("30.00"))
+        state = PipelineRefreshState.objects.get()
+        self.assertEqual(state.last_log_id, OpportunityStatusLog.objects.latest("id").id)
+
+    def test_late_committed_log_below_mark_is_picked_up(self):
+        opportunity = self._opportunity(self.vip)
+        base = timezone.now() - timedelta(minutes=20)
+        BusinessOpportunity.objects.filter(pk=opportunity.pk).update(created_time=base)
+
+        def log(log_id, from_status, to_status, minutes):
+            OpportunityStatusLog.objects.create(
+                id=log_id, opportunity=opportunity, from_status=from_status, to_status=to_status,
+                created_time=base + timedelta(minutes=minutes),
+            )
+
+        log(900001, "potential", "initial_contact", 6)
+        log(900003, "requirement_confirmed", "quotation", 12)
+        refresh_pipeline_funnel()
+        # ID 较小的日志在更大的 ID 处理后才提交
+        log(900002, "initial_contact", "requirement_confirmed", 9)
+        self.assertEqual(refresh_pipeline_funnel(), 3)
+        visits = OpportunityStageVisit.objects.filter(opportunity=opportunity).order_by("entered_time")
+        self.assertEqual(
+            [(visit.stage, visit.next_stage, visit.duration_hours) for visit in visits],
+            [("potential", "initial_contact", Decimal("0.10")),
+             ("initial_contact", "requirement_confirmed", Decimal("0.05")),
+             ("requirement_confirmed", "quotation", Decimal("0.05")),
+             ("quotation", "", None)],
+        )
+        self.assertEqual(PipelineRefreshState.objects.get().last_log_id, 900003)
+        self.assertEqual(refresh_pipeline_funnel(), 0)
+
+    def test_small_batches_match_single_pass(self):
+        for index in range(3):
+            self._walk(self._opportunity(self.vip), list(PATH[1:]) + ["won"], 5 + index)
+        out = StringIO()
+        call_command("refresh_pipeline_funnel", "--batch-size", "2", stdout=out)
+        self.assertIn("Applied 15 status log(s)", out.getvalue())
+        batched = sorted(OpportunityStageVisit.objects.values_list("opportunity_id", "stage", "duration_hours"))
+
+        OpportunityStageVisit.objects.all().delete()
+        PipelineRefreshState.objects.all().delete()
+        refresh_pipeline_funnel()
+        self.assertEqual(
+            sorted(OpportunityStageVisit.objects.values_list("opportunity_id", "stage", "duration_hours")), batched,
+        )
+
+    def test_funnel_conversion_and_medians(self):
+        self._walk(self._opportunity(self.vip, amount="300"), list(PATH[1:]) + ["won"], 10)
+        self._walk(self._opportunity(self.general), list(PATH[1:]) + ["lost"], 20)
+        self._walk(self._opportunity(self.general), ["initial_contact"], 30)
+        self._opportunity(self.general)  # 尚无流转日志
+        refresh_pipeline_funnel()
+
+        with self.assertNumQueries(2):
+            funnel = {row["stage"]: row for row in stage_conversion()}
+        self.assertEqual([funnel[stage]["reached"] for stage in PATH + ("won",)], [4, 3, 2, 2, 2, 1])
+        self.assertEqual(funnel["potential"]["conversion_rate"], 75.0)
+        self.assertEqual(funnel["negotiation"]["conversion_rate"], 50.0)
+        self.assertEqual(funnel["negotiation"]["dropped"], 1)
+        self.assertEqual(funnel["potential"]["median_hours"], 20.0)
+        self.assertEqual(funnel["quotation"]["median_hours"], 15.0)
+        self.assertIsNone(funnel["won"]["conversion_rate"])
+
+        levels = {row["client_level"]: row for row in win_loss_by_client_level()}
+        self.assertEqual((levels["vip"]["won"], levels["vip"]["win_rate"]), (1, 100.0))
+        self.assertEqual((levels["general"]["lost"], levels["general"]["win_rate"]), (1, 0.0))
+
+    def test_weighted_pipeline_and_pages(self):
+        self._opportunity(self.vip, amount="200", probability=50, expected=date(2026, 3, 10))
+        self._opportunity(self.general, amount="100", probability=30, expected=date(2026, 3, 20))
+        self._opportunity(self.general, amount="100", probability=90, expected=date(2026, 4, 1), status="won")
+        rows = weighted_pipeline()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]["month"], rows[0]["count"], rows[0]["weighted_amount"]),
+                         (date(2026, 3, 1), 2, Decimal("130.00")))
+        self.assertEqual(rows[0]["business_manager"], "Wang")
+
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("business_pages:opportunity_pipeline"), {"weeks": 0})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "2026-03")
+        data = self.client.get(reverse("business_pages:opportunity_pipeline"), {"format": "json", "weeks": 0}).json()
+        self.assertEqual(data["data"]["funnel"][0]["reached"], 3)
+
+        response = self.client.get(reverse("business_pages:opportunity_management"))
+        cards = {card["label"]: card["value"] for card in response.context["summary_cards"]}
+        self.assertEqual((cards["商机总数"], cards["活跃商机"], cards["赢单数量"]), (3, 2, 1))
@@ -0,0 +1,127 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from backend.apps.customer_success.models import BusinessContract, BusinessPaymentPlan, Client, ReceivableAgingSnapshot
+from backend.apps.customer_success.services_receivables import (
+    aging_by,
+    aging_summary,
+    capture_aging_snapshot,
+    mark_overdue_plans,
+)
+from backend.apps.project_center.models import Project
+
+TODAY = date(2026, 6, 30)
+
+
+class ReceivablesAgingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_superuser(username="aging_admin", password="pass1234", email="ag@example.com")
+        self.manager = User.objects.create_user(username="aging_bm", password="pass1234", first_name="Li")
+        self.client_a = Client.objects.create(name="Client A", code="CLI-AG-A", created_by=self.user)
+        self.client_b = Client.objects.create(name="Client B", code="CLI-AG-B", created_by=self.user)
+        self.project = Project.objects.create(
+            name="aging", project_number="VIH-AG-001", created_by=self.user, business_manager=self.manager,
+        )
+        self.contract_a = self._contract(self.client_a, project=self.project)
+        self.contract_b = self._contract(self.client_b)
+
+    def _contract(self, client, project=None, status="signed"):
+        return BusinessContract.objects.create(
+            client=client, project=project, contract_amount=Decimal("100000"), tax_rate=Decimal("6"),
+            status=status, created_by=self.user,
+        )
+
+    def _plan(self, contract, days_overdue, planned, actual=None, status="pending"):
+        return BusinessPaymentPlan.objects.create(
+            contract=contract, phase_name=f"p{days_overdue}", planned_amount=Decimal(planned),
+            actual_amount=Decimal(actual) if actual is not None else None,
+            planned_date=TODAY - timedelta(days=days_overdue), status=status,
+        )
+
+    def _seed(self):
+        self._plan(self.contract_a, -10, "1000")  # 未到期
+        self._plan(self.contract_a, 0, "500", actual="200", status="partial")  # 今日到期，余 300
+        self._plan(self.contract_a, 10, "250")
+        self._plan(self.contract_a, 45, "700")
+        self._plan(self.contract_b, 75, "400")
+        self._plan(self.contract_b, 120, "900", status="overdue")
+        self._plan(self.contract_b, 200, "800", actual="800", status="completed")
+        self._plan(self.contract_b, 150, "600", status="cancelled")
+        self._plan(self._contract(self.client_b, status="terminated"), 30, "5000")
+
+    def test_buckets_and_groupings_are_computed_in_sql(self):
+        self._seed()
+        with self.assertNumQueries(1):
+            summary = aging_summary(TODAY)
+        self.assertEqual(summary["total_outstanding"], Decimal("3550"))
+        self.assertEqual(
+            [summary[f"{key}_amount"] for key in ("not_due", "days_0_30", "days_31_60", "days_61_90", "days_over_90")],
+            [Decimal("1300"), Decimal("250"), Decimal("700"), Decimal("400"), Decimal("900")],
+        )
+        self.assertEqual((summary["open_plan_count"], summary["overdue_plan_count"]), (6, 4))
+        self.assertEqual(summary["overdue_amount"], Decimal("2250"))
+
+        with self.assertNumQueries(1):
+            clients = aging_by("client", TODAY)
+        self.assertEqual([(row["label"], row["total_outstanding"]) for row in clients],
+                         [("Client A", Decimal("2250")), ("Client B", Decimal("1300"))])
+        managers = aging_by("business_manager", TODAY)
+        self.assertEqual([(row["label"], row["overdue_amount"]) for row in managers],
+                         [("Li", Decimal("950")), ("未指定商务经理", Decimal("1300"))])
+        self.assertEqual(aging_by("project", TODAY, limit=1)[0]["label"], "VIH-AG-001 · aging")
+
+    def test_overdue_status_corrected_in_one_statement(self):
+        self._seed()
+        postponed = self._plan(self.contract_a, -5, "100", actual="50", status="overdue")
+        with self.assertNumQueries(1):
+            changed = mark_overdue_plans(TODAY)
+        self.assertEqual(changed, 4)
+        statuses = dict(BusinessPaymentPlan.objects.values_list("phase_name", "status"))
+        self.assertEqual(statuses["p45"], "overdue")
+        self.assertEqual(statuses["p10"], "overdue")
+        # 已终止合同的计划不参与逾期标记
+        self.assertEqual(statuses["p30"], "pending")
+        self.assertEqual(statuses["p75"], "overdue")
+        self.assertEqual(statuses["p0"], "partial")
+        self.assertEqual(statuses["p-10"], "pending")
+        self.assertEqual(statuses["p200"], "completed")
+        postponed.refresh_from_db()
+        self.assertEqual(postponed.status, "partial")
+        self.assertEqual(mark_overdue_plans(TODAY), 0)
+
+    def test_daily_snapshot_and_command(self):
+        self._seed()
+        snapshot = capture_aging_snapshot(TODAY)
+        self.assertEqual((snapshot.total_outstanding, snapshot.days_over_90_amount), (Decimal("3550"), Decimal("900")))
+        self.assertEqual(snapshot.client_count, 2)
+
+        BusinessPaymentPlan.objects.filter(phase_name="p120").update(actual_amount=Decimal("900"), status="completed")
+        call_command("refresh_receivables", "--date", TODAY.isoformat(), stdout=StringIO())
+        snapshot = ReceivableAgingSnapshot.objects.get(snapshot_date=TODAY)
+        self.assertEqual(snapshot.total_outstanding, Decimal("2650"))
+        self.assertEqual(ReceivableAgingSnapshot.objects.count(), 1)
+        self.assertEqual(BusinessPaymentPlan.objects.get(phase_name="p45").status, "overdue")
+
+    def test_payment_tracking_page_and_json(self):
+        for index in range(12):
+            self._plan(self.contract_a, index * 10, "100")
+        self.client.force_login(self.user)
+        url = reverse("business_pages:payment_tracking")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        cards = {card["label"]: card["value"] for card in response.context["summary_cards"]}
+        # 全部 12 个节点计入，而不是前 8 行样本
+        self.assertEqual(cards["待回款金额"], "¥1,200")
+
+        data = self.client.get(url, {"format": "json"}).json()["data"]
+        self.assertEqual(data["summary"]["open_plan_count"], 12)
+        self.assertEqual(set(data["groups"]), {"client", "project", "business_manager"})
@@ -8,6 +8,7 @@ urlpatterns = [
     path("customers/", views_pages.customer_management, name="customer_management"),
     path("contracts/", views_pages.contract_management, name="contract_management"),
     path("contracts/<int:contract_id>/", views_pages.contract_detail, name="contract_detail"),
+    path("contract-files/<int:file_id>/download/", views_pages.contract_file_download, name="contract_file_download"),
     path("contracts/<int:contract_id>/transition/", views_pages.contract_status_transition, name="contract_status_transition"),
     path("contracts/create/", views_pages.contract_create, name="contract_create"),
     path("contracts/<int:contract_id>/edit/", views_pages.contract_edit, name="contract_edit"),
@@ -17,6 +18,7 @@ urlpatterns = [
     
     # 商机管理
     path("opportunities/", views_pages.opportunity_management, name="opportunity_management"),
+    path("opportunities/pipeline/", views_pages.opportunity_pipeline, name="opportunity_pipeline"),
     path("opportunities/create/", views_pages.opportunity_create, name="opportunity_create"),
     path("opportunities/<int:opportunity_id>/", views_pages.opportunity_detail, name="opportunity_detail"),
     path("opportunities/<int:opportunity_id>/edit/", views_pages.opportunity_edit, name="opportunity_edit"),
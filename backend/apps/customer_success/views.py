@@ -1,23 +1,30 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Count, Sum
+from django.db.models import Count, Sum
 from django_filters.rest_framework import DjangoFilterBackend
+from backend.apps.system_management.services_search import search_filter
+from backend.core.sparse_fields import SparseFieldsViewSetMixin
+
 from .models import Client, ClientContact, ClientProject
 from .serializers import (
-    ClientSerializer, ClientCreateSerializer, 
+    ClientSerializer, ClientListSerializer, ClientCreateSerializer, 
     ClientContactSerializer, ClientProjectSerializer
 )
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
+    """客户接口；列表与详情支持 ?fields= / ?expand=，关联查询按返回字段规划"""
     queryset = Client.objects.all()
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['client_level', 'credit_level', 'is_active']
+    replica_actions = ('statistics',)
     
     def get_serializer_class(self):
         if self.action == 'create':
             return ClientCreateSerializer
+        if self.action == 'list':
+            return ClientListSerializer
         return ClientSerializer
     
     def get_queryset(self):
@@ -26,13 +33,9 @@ class ClientViewSet(viewsets.ModelViewSet):
         # 搜索功能
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(short_name__icontains=search) |
-                Q(code__icontains=search)
-            )
+            queryset = search_filter(queryset, 'client', search, fields=('code', 'title', 'subtitle'))
         
-        return queryset.select_related('created_by').prefetch_related('contacts', 'projects')
+        return queryset
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
@@ -41,14 +44,13 @@ class ClientViewSet(viewsets.ModelViewSet):
         active_clients = Client.objects.filter(is_active=True).count()
         vip_clients = Client.objects.filter(client_level='vip').count()
         
-        # 财务统计
-        total_contract_amount = Client.objects.aggregate(
-            total=Sum('total_contract_amount')
-        )['total'] or 0
-        
-        total_payment_amount = Client.objects.aggregate(
-            total=Sum('total_payment_amount')
-        )['total'] or 0
+        # 财务统计（汇总字段由合同与回款事件维护，单表聚合即可）
+        totals = Client.objects.aggregate(
+            contract=Sum('total_contract_amount'),
+            payment=Sum('total_payment_amount'),
+        )
+        total_contract_amount = totals['contract'] or 0
+        total_payment_amount = totals['payment'] or 0
         
         statistics = {
             'total_clients': total_clients,
@@ -1,8 +1,11 @@
+from datetime import timedelta
 from decimal import Decimal
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Sum, Q
+from django.db.models import Count, Sum
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_http_methods
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
 from django.urls import reverse, NoReverseMatch
@@ -12,6 +15,7 @@ from backend.apps.customer_success.models import (
     BusinessPaymentPlan,
     Client,
     ClientProject,
+    ContractFile,
     BusinessOpportunity,
     OpportunityFollowUp,
     OpportunityQuotation,
@@ -19,7 +23,25 @@ from backend.apps.customer_success.models import (
     OpportunityStatusLog,
     QuotationRule,
 )
+from backend.apps.customer_success.services_pipeline import (
+    opportunity_counters,
+    refresh_state,
+    stage_conversion,
+    weighted_pipeline,
+    win_loss_by_client_level,
+)
+from backend.apps.customer_success.services_receivables import (
+    AGING_BUCKETS,
+    GROUPINGS,
+    aging_by,
+    aging_summary,
+    aging_trend,
+    receivable_plans,
+)
 from backend.apps.system_management.services import get_user_permission_codes
+from backend.apps.system_management.services_search import search_filter
+from backend.core.dashboard_cache import cached_summary
+from backend.core.downloads import serve_protected_file
 from backend.core.views import HOME_NAV_STRUCTURE, _permission_granted
 
 
@@ -329,6 +351,23 @@ def contract_detail(request, contract_id):
     return render(request, "customer_success/contract_detail.html", context)
 
 
+def _user_can_view_contract_files(user, contract):
+    permission_set = get_user_permission_codes(user)
+    if _permission_granted('customer_success.manage', permission_set) or _permission_granted('customer_success.view', permission_set):
+        return True
+    return user.pk in (contract.created_by_id, contract.signed_by_id, contract.approved_by_id)
+
+
+@login_required
+@require_http_methods(["GET", "HEAD"])
+def contract_file_download(request, file_id):
+    """下载合同文件（鉴权后由 Web 服务器发送）"""
+    contract_file = get_object_or_404(ContractFile.objects.select_related('contract'), pk=file_id)
+    if not _user_can_view_contract_files(request.user, contract_file.contract):
+        raise Http404('文件不存在')
+    return serve_protected_file(request, contract_file.file, contract_file.file_name)
+
+
 @login_required
 def contract_create(request):
     """新建合同页面"""
@@ -446,8 +485,7 @@ def contract_status_transition(request, contract_id):
     return redirect('business_pages:contract_detail', contract_id=contract.id)
 
 
-@login_required
-def project_settlement(request):
+def _project_settlement_summary():
     settlements = BusinessPaymentPlan.objects.select_related("contract__project")
     status_counts = settlements.values("status").annotate(total=Count("id"))
     status_map = {row["status"]: row["total"] for row in status_counts}
@@ -457,7 +495,7 @@ def project_settlement(request):
         {"label": "已结算", "value": status_map.get("completed", 0), "hint": "结算完成并归档的节点"},
         {
             "label": "结算项目",
-            "value": settlements.values("project_id").distinct().count(),
+            "value": settlements.values("contract__project_id").distinct().count(),
             "hint": "涉及结算流程的项目数量",
         },
     ]
@@ -471,6 +509,17 @@ def project_settlement(request):
             'url': '#',
             'icon': '💰',
         })
+    return {"summary_cards": summary_cards, "section_items": section_items}
+
+
+@login_required
+def project_settlement(request):
+    summary = cached_summary(
+        "project_settlement",
+        ("customer_success.BusinessPaymentPlan", "customer_success.BusinessContract", "project_center.Project"),
+        _project_settlement_summary,
+    )
+    summary_cards, section_items = summary["summary_cards"], summary["section_items"]
     context = _context(
         "项目结算",
         "🧾",
@@ -495,18 +544,29 @@ def project_settlement(request):
     return render(request, "shared/center_dashboard.html", context)
 
 
-@login_required
-def output_analysis(request):
+def _output_analysis_cards():
     contracts = BusinessContract.objects.select_related('project')
     payments = BusinessPaymentPlan.objects.all()
-    total_contract = contracts.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    total_contract = contracts.aggregate(total=Sum('contract_amount'))['total'] or Decimal('0')
     total_payment = payments.aggregate(total=Sum('actual_amount'))['total'] or Decimal('0')
+    receivables = aging_summary()
     summary_cards = [
         {"label": "合同数量", "value": contracts.count(), "hint": "已录入的商务合同数量"},
         {"label": "合同金额", "value": f"¥{total_contract:,.0f}", "hint": "合同金额汇总"},
         {"label": "已回款", "value": f"¥{total_payment:,.0f}", "hint": "实际到账金额"},
         {"label": "回款进度", "value": _calc_ratio(total_payment, total_contract), "hint": "回款金额占合同金额比例"},
+        {"label": "逾期应收", "value": _money(receivables['overdue_amount']), "hint": f"待回款 {_money(receivables['total_outstanding'])} 中已过计划日期的部分"},
     ]
+    return summary_cards
+
+
+@login_required
+def output_analysis(request):
+    summary_cards = cached_summary(
+        "output_analysis",
+        ("customer_success.BusinessContract", "customer_success.BusinessPaymentPlan"),
+        _output_analysis_cards,
+    )
     context = _context(
         "产值分析",
         "📊",
@@ -528,51 +588,127 @@ def output_analysis(request):
     return render(request, "shared/center_dashboard.html", context)
 
 
-@login_required
-def payment_tracking(request):
-    plans = BusinessPaymentPlan.objects.select_related("contract__project").order_by("planned_date")[:8]
-    outstanding = sum(
-        max((plan.planned_amount or Decimal("0")) - (plan.actual_amount or Decimal("0")), Decimal("0"))
-        for plan in plans
-        if plan.status in {"pending", "partial", "overdue"}
-    )
+# 收款跟踪页各分组列出的条目数
+RECEIVABLE_GROUP_LIMIT = 8
+# 计划日期在该天数内（含已逾期）的回款节点需要提醒
+REMINDER_WINDOW_DAYS = 7
+
+
+def _money(value):
+    return f"¥{(value or Decimal('0')):,.0f}"
+
+
+def _aging_group_items(dimension, today, icon):
+    return [
+        {
+            'label': row['label'],
+            'description': (
+                f"待回款 {_money(row['total_outstanding'])} · 逾期 {_money(row['overdue_amount'])}"
+                f"（90天以上 {_money(row['days_over_90_amount'])}） · {row['open_plan_count']} 个节点"
+            ),
+            'url': '#',
+            'icon': icon,
+        }
+        for row in aging_by(dimension, today, limit=RECEIVABLE_GROUP_LIMIT)
+    ]
+
+
+def _payment_tracking_summary():
+    today = timezone.localdate()
+    summary = aging_summary(today)
+    plans = receivable_plans()
+    reminders = plans.filter(planned_date__lte=today + timedelta(days=REMINDER_WINDOW_DAYS)).count()
     summary_cards = [
-        {"label": "待回款金额", "value": f"¥{outstanding:,.0f}", "hint": "尚未到账的计划金额"},
-        {"label": "提醒节点", "value": plans.filter(status="pending").count(), "hint": "需要提醒的回款节点"},
-        {"label": "已到账节点", "value": plans.filter(status="completed").count(), "hint": "已完成收款的节点数量"},
+        {"label": "待回款金额", "value": _money(summary['total_outstanding']), "hint": f"{summary['open_plan_count']} 个未结清回款节点"},
+        {"label": "逾期金额", "value": _money(summary['overdue_amount']), "hint": f"{summary['overdue_plan_count']} 个节点已过计划日期"},
+        {"label": "逾期90天以上", "value": _money(summary['days_over_90_amount']), "hint": "需重点催收的长账龄应收"},
+        {"label": "提醒节点", "value": reminders, "hint": f"已逾期或 {REMINDER_WINDOW_DAYS} 天内到期的回款节点"},
+    ]
+    total = summary['total_outstanding']
+    aging_items = [
         {
-            "label": "本月到期",
-            "value": plans.filter(planned_date__month=timezone.now().month).count(),
-            "hint": "本月即将到期的回款计划数量",
-        },
+            'label': label,
+            'description': f"{_money(summary[f'{key}_amount'])} · 占比 {_calc_ratio(summary[f'{key}_amount'], total)}",
+            'url': '#',
+            'icon': '📅' if key == 'not_due' else '⏳',
+        }
+        for key, label in AGING_BUCKETS
     ]
-    section_items = []
-    for plan in plans:
-        project = plan.contract.project if plan.contract and plan.contract.project_id else None
-        section_items.append({
+    upcoming = (
+        plans.select_related('contract__project').order_by('planned_date', 'id')[:RECEIVABLE_GROUP_LIMIT]
+    )
+    plan_items = []
+    for plan in upcoming:
+        project = plan.contract.project if plan.contract.project_id else None
+        outstanding = max((plan.planned_amount or Decimal("0")) - (plan.actual_amount or Decimal("0")), Decimal("0"))
+        days = (today - plan.planned_date).days
+        timing = f"逾期 {days} 天" if days > 0 else ("今日到期" if days == 0 else f"{-days} 天后到期")
+        plan_items.append({
             'label': f"{project.project_number if project else '未关联'} · {plan.phase_name}",
-            'description': f"计划金额 ¥{plan.planned_amount:,.0f} · 状态 {plan.get_status_display()}",
+            'description': f"待回款 {_money(outstanding)} · {plan.planned_date:%Y-%m-%d} {timing}",
             'url': '#',
             'icon': '⏰',
         })
+    return {
+        "summary_cards": summary_cards,
+        "aging_items": aging_items,
+        "client_items": _aging_group_items('client', today, '🏢'),
+        "manager_items": _aging_group_items('business_manager', today, '👤'),
+        "project_items": _aging_group_items('project', today, '📁'),
+        "section_items": plan_items,
+    }
+
+
+def _payment_tracking_data():
+    today = timezone.localdate()
+    return {
+        'date': today,
+        'summary': aging_summary(today),
+        'groups': {dimension: aging_by(dimension, today) for dimension in GROUPINGS},
+        'trend': aging_trend(today=today),
+    }
+
+
+@login_required
+def payment_tracking(request):
+    models = ("customer_success.BusinessPaymentPlan", "customer_success.BusinessContract", "project_center.Project")
+    if request.GET.get('format') == 'json':
+        data = cached_summary("payment_tracking_json", models, _payment_tracking_data)
+        return JsonResponse({'success': True, 'data': data})
+
+    summary = cached_summary("payment_tracking", models, _payment_tracking_summary)
+    empty = [{"label": "暂无待回款数据", "description": "当前没有未结清的回款计划。", "url": "#", "icon": "ℹ️"}]
     context = _context(
         "收款跟踪",
         "💵",
         "统一跟踪项目回款节点、提醒通知与实际到账情况。",
-        summary_cards=summary_cards,
+        summary_cards=summary["summary_cards"],
         sections=[
+            {
+                "title": "账龄分布",
+                "description": "按计划日期距今天数划分的待回款金额，含全部未结清回款计划。",
+                "items": summary["aging_items"],
+            },
             {
                 "title": "回款计划",
-                "description": "重点关注即将到期的回款与提醒。",
-                "items": section_items or [
-                    {
-                        "label": "暂无回款计划",
-                        "description": "请在项目中配置回款计划。",
-                        "url": "#",
-                        "icon": "ℹ️",
-                    }
-                ],
-            }
+                "description": "重点关注已逾期和即将到期的回款节点。",
+                "items": summary["section_items"] or empty,
+            },
+            {
+                "title": "客户应收",
+                "description": "待回款金额最高的客户。",
+                "items": summary["client_items"] or empty,
+            },
+            {
+                "title": "商务经理应收",
+                "description": "按项目商务经理汇总的待回款与逾期金额。",
+                "items": summary["manager_items"] or empty,
+            },
+            {
+                "title": "项目应收",
+                "description": "待回款金额最高的项目。",
+                "items": summary["project_items"] or empty,
+            },
         ],
         request=request,
     )
@@ -622,12 +758,7 @@ def opportunity_management(request):
         
         # 应用筛选条件
         if search:
-            opportunities = opportunities.filter(
-                Q(opportunity_number__icontains=search) |
-                Q(name__icontains=search) |
-                Q(project_name__icontains=search) |
-                Q(client__name__icontains=search)
-            )
+            opportunities = search_filter(opportunities, 'opportunity', search)
         if status:
             opportunities = opportunities.filter(status=status)
         if client_id:
@@ -650,20 +781,12 @@ def opportunity_management(request):
     
     # 统计信息
     try:
-        total_opportunities = BusinessOpportunity.objects.count()
-        active_opportunities = BusinessOpportunity.objects.exclude(
-            status__in=['won', 'lost', 'cancelled']
-        ).count()
-        total_weighted_amount = BusinessOpportunity.objects.exclude(
-            status__in=['won', 'lost', 'cancelled']
-        ).aggregate(total=Sum('weighted_amount'))['total'] or Decimal('0')
-        won_count = BusinessOpportunity.objects.filter(status='won').count()
-        
+        counters = opportunity_counters()
         summary_cards = [
-            {"label": "商机总数", "value": total_opportunities, "hint": "系统中维护的商机数量"},
-            {"label": "活跃商机", "value": active_opportunities, "hint": "状态为活跃的商机数量"},
-            {"label": "加权金额", "value": f"¥{total_weighted_amount:,.0f}万", "hint": "按成功概率加权的预计金额"},
-            {"label": "赢单数量", "value": won_count, "hint": "已赢单的商机数量"},
+            {"label": "商机总数", "value": counters["total"], "hint": "系统中维护的商机数量"},
+            {"label": "活跃商机", "value": counters["active"], "hint": "状态为活跃的商机数量"},
+            {"label": "加权金额", "value": f"¥{counters['weighted'] or Decimal('0'):,.0f}万", "hint": "按成功概率加权的预计金额"},
+            {"label": "赢单数量", "value": counters["won"], "hint": "已赢单的商机数量"},
         ]
     except Exception as e:
         import logging
@@ -704,6 +827,125 @@ def opportunity_management(request):
     return render(request, "customer_success/opportunity_list.html", context)
 
 
+# 漏斗分析默认统计最近 52 周创建的商机
+PIPELINE_DEFAULT_WEEKS = 52
+
+
+def _pipeline_scope(request, permission_set):
+    """统计范围：无全量查看权限的商务只看自己负责的商机；weeks=0 表示不限创建时间"""
+    try:
+        weeks = max(int(request.GET.get('weeks', PIPELINE_DEFAULT_WEEKS)), 0)
+    except (TypeError, ValueError):
+        weeks = PIPELINE_DEFAULT_WEEKS
+    manager_id = None
+    if not _permission_granted('customer_success.opportunity.view_all', permission_set):
+        manager_id = request.user.id
+    return weeks, manager_id
+
+
+def _pipeline_data(weeks, manager_id):
+    since = timezone.now() - timedelta(weeks=weeks) if weeks else None
+    state = refresh_state()
+    return {
+        'weeks': weeks,
+        'refreshed_time': state.refreshed_time if state else None,
+        'funnel': stage_conversion(since=since, business_manager_id=manager_id),
+        'weighted_pipeline': weighted_pipeline(business_manager_id=manager_id),
+        'win_loss': win_loss_by_client_level(since=since, business_manager_id=manager_id),
+    }
+
+
+def _percent(value):
+    return "--" if value is None else f"{value}%"
+
+
+@login_required
+def opportunity_pipeline(request):
+    """商机漏斗分析：阶段转化、停留时长、加权金额与按客户等级的赢单率"""
+    permission_set = get_user_permission_codes(request.user)
+    weeks, manager_id = _pipeline_scope(request, permission_set)
+    data = cached_summary(
+        "opportunity_pipeline",
+        ("customer_success.BusinessOpportunity", "customer_success.OpportunityStageVisit"),
+        lambda: _pipeline_data(weeks, manager_id),
+        user=request.user if manager_id else None,
+        params={'weeks': weeks},
+    )
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'success': True, 'data': data})
+
+    funnel = data['funnel']
+    win_loss = data['win_loss']
+    won = sum(row['won'] for row in win_loss)
+    closed = won + sum(row['lost'] for row in win_loss)
+    months, managers = {}, {}
+    for row in data['weighted_pipeline']:
+        month = row['month'].strftime('%Y-%m') if row['month'] else '未定签约月份'
+        months.setdefault(month, [Decimal('0'), 0])
+        months[month][0] += row['weighted_amount']
+        months[month][1] += row['count']
+        managers.setdefault(row['business_manager'], [Decimal('0'), 0])
+        managers[row['business_manager']][0] += row['weighted_amount']
+        managers[row['business_manager']][1] += row['count']
+    total_weighted = sum((amount for amount, _ in managers.values()), Decimal('0'))
+
+    summary_cards = [
+        {"label": "进入漏斗", "value": funnel[0]['reached'], "hint": "统计范围内创建的商机数"},
+        {"label": "整体赢单率", "value": _percent(round(won / closed * 100, 1) if closed else None), "hint": f"已关闭 {closed} 个商机中赢单 {won} 个"},
+        {"label": "加权金额", "value": f"¥{total_weighted:,.0f}万", "hint": "活跃商机按成功概率加权"},
+        {
+            "label": "数据刷新",
+            "value": timezone.localtime(data['refreshed_time']).strftime('%m-%d %H:%M') if data['refreshed_time'] else "--",
+            "hint": "漏斗由状态流转日志增量刷新",
+        },
+    ]
+    stage_items = [
+        {
+            'label': row['label'],
+            'description': (
+                f"到达 {row['reached']} 个 · 转入下一阶段 {_percent(row['conversion_rate'])} · 流失 {row['dropped']} 个"
+                + (f" · 停留中位数 {row['median_hours'] / 24:.1f} 天" if row['median_hours'] is not None else "")
+            ),
+            'url': '#',
+            'icon': '🔻',
+        }
+        for row in funnel
+    ]
+    month_items = [
+        {'label': month, 'description': f"加权 ¥{amount:,.0f}万 · {count} 个商机", 'url': '#', 'icon': '📆'}
+        for month, (amount, count) in months.items()
+    ]
+    manager_items = [
+        {'label': name, 'description': f"加权 ¥{amount:,.0f}万 · {count} 个商机", 'url': '#', 'icon': '👤'}
+        for name, (amount, count) in sorted(managers.items(), key=lambda item: item[1][0], reverse=True)
+    ]
+    level_items = [
+        {
+            'label': row['label'],
+            'description': f"赢单 {row['won']} · 输单 {row['lost']} · 赢单率 {_percent(row['win_rate'])} · 签约 ¥{row['won_amount']:,.0f}万",
+            'url': '#',
+            'icon': '🏆',
+        }
+        for row in win_loss
+    ]
+    empty = [{"label": "暂无数据", "description": "统计范围内没有相关商机。", "url": "#", "icon": "ℹ️"}]
+    period = f"最近 {weeks} 周创建的商机" if weeks else "全部商机"
+    context = _context(
+        "商机漏斗分析",
+        "🔻",
+        f"基于商机状态流转日志的销售漏斗（{period}）。",
+        summary_cards=summary_cards,
+        sections=[
+            {"title": "阶段转化", "description": "各阶段到达商机数、转化率与停留时长中位数。", "items": stage_items},
+            {"title": "加权金额（按预计签约月份）", "description": "活跃商机的加权预计金额。", "items": month_items or empty},
+            {"title": "加权金额（按负责商务）", "description": "活跃商机的加权预计金额。", "items": manager_items or empty},
+            {"title": "赢单/输单（按客户等级）", "description": f"{period}中已赢单或输单的商机。", "items": level_items or empty},
+        ],
+        request=request,
+    )
+    return render(request, "shared/center_dashboard.html", context)
+
+
 @login_required
 def opportunity_detail(request, opportunity_id):
     """商机详情页面"""
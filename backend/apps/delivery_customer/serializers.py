@@ -1,5 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from backend.core.sparse_fields import FieldPlan, SparseFieldsMixin
+
 from .models import DeliveryRecord, DeliveryFile, DeliveryFeedback, DeliveryTracking
 
 User = get_user_model()
@@ -9,21 +13,27 @@ class DeliveryFileSerializer(serializers.ModelSerializer):
     """交付文件序列化器"""
     file_size_display = serializers.SerializerMethodField()
     uploaded_by_name = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
     
     class Meta:
         model = DeliveryFile
         fields = [
             'id', 'file', 'file_name', 'file_type', 'file_size', 
             'file_size_display', 'file_extension', 'description', 
-            'version', 'uploaded_at', 'uploaded_by', 'uploaded_by_name'
+            'version', 'uploaded_at', 'uploaded_by', 'uploaded_by_name',
+            'download_url'
         ]
         read_only_fields = ['file_size', 'file_extension', 'uploaded_at']
+        query_plan = {'uploaded_by_name': FieldPlan(select=('uploaded_by',))}
     
     def get_file_size_display(self, obj):
         return obj.get_file_size_display()
     
     def get_uploaded_by_name(self, obj):
         return obj.uploaded_by.get_full_name() if obj.uploaded_by else ''
+    
+    def get_download_url(self, obj):
+        return reverse('delivery_api:delivery-file-download', args=[obj.pk])
 
 
 class DeliveryTrackingSerializer(serializers.ModelSerializer):
@@ -37,6 +47,7 @@ class DeliveryTrackingSerializer(serializers.ModelSerializer):
             'event_time', 'operator', 'operator_name', 'notes'
         ]
         read_only_fields = ['event_time']
+        query_plan = {'operator_name': FieldPlan(select=('operator',))}
     
     def get_operator_name(self, obj):
         return obj.operator.get_full_name() if obj.operator else ''
@@ -55,7 +66,16 @@ class DeliveryFeedbackSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
-class DeliveryRecordListSerializer(serializers.ModelSerializer):
+# 列表与详情共用的关联名称字段
+RECORD_NAME_PLANS = {
+    'project_name': FieldPlan(select=('project',)),
+    'project_number': FieldPlan(select=('project',)),
+    'client_name': FieldPlan(select=('client',)),
+    'created_by_name': FieldPlan(select=('created_by',)),
+}
+
+
+class DeliveryRecordListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """交付记录列表序列化器"""
     project_name = serializers.SerializerMethodField()
     project_number = serializers.SerializerMethodField()
@@ -78,6 +98,7 @@ class DeliveryRecordListSerializer(serializers.ModelSerializer):
             'risk_level_display', 'overdue_days', 'file_count',
             'total_file_size'
         ]
+        query_plan = RECORD_NAME_PLANS
     
     def get_project_name(self, obj):
         return obj.project.name if obj.project else ''
@@ -92,7 +113,7 @@ class DeliveryRecordListSerializer(serializers.ModelSerializer):
         return obj.created_by.get_full_name() if obj.created_by else ''
 
 
-class DeliveryRecordDetailSerializer(serializers.ModelSerializer):
+class DeliveryRecordDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """交付记录详情序列化器"""
     project_name = serializers.SerializerMethodField()
     project_number = serializers.SerializerMethodField()
@@ -116,6 +137,11 @@ class DeliveryRecordDetailSerializer(serializers.ModelSerializer):
             'delivery_number', 'created_at', 'updated_at',
             'file_count', 'total_file_size'
         ]
+        query_plan = {
+            **RECORD_NAME_PLANS,
+            'sent_by_name': FieldPlan(select=('sent_by',)),
+            'delivery_person_name': FieldPlan(select=('delivery_person',)),
+        }
     
     def get_project_name(self, obj):
         return obj.project.name if obj.project else ''
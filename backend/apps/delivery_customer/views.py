@@ -6,6 +6,9 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.utils import timezone
 
+from backend.core.downloads import serve_protected_file
+from backend.core.sparse_fields import SparseFieldsViewSetMixin
+
 from .models import DeliveryRecord, DeliveryFile, DeliveryFeedback, DeliveryTracking
 from .serializers import (
     DeliveryRecordListSerializer,
@@ -23,34 +26,35 @@ from .services import (
 )
 
 
-class DeliveryRecordViewSet(viewsets.ModelViewSet):
-    """交付记录视图集"""
+def visible_delivery_records(user):
+    """用户可查看的交付记录：无查看全部权限时，只能查看自己创建的或所在项目的"""
+    from backend.apps.system_management.services import get_user_permission_codes
+    from backend.core.views import _permission_granted
+    from django.db.models import Q
+    
+    queryset = DeliveryRecord.objects.all()
+    permission_set = get_user_permission_codes(user)
+    if not _permission_granted('delivery_center.view_all', permission_set):
+        queryset = queryset.filter(
+            Q(created_by=user) | 
+            Q(project__team_members__user=user)
+        ).distinct()
+    return queryset
+
+
+class DeliveryRecordViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
+    """交付记录视图集；列表与详情支持 ?fields= / ?expand=，关联查询按返回字段规划"""
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['delivery_method', 'status', 'priority', 'project', 'client', 'is_overdue', 'risk_level']
     search_fields = ['delivery_number', 'title', 'recipient_name', 'recipient_email']
     ordering_fields = ['created_at', 'deadline', 'sent_at', 'delivered_at']
     ordering = ['-created_at']
+    planned_actions = ('list', 'retrieve', 'warnings')
+    replica_actions = ('statistics',)
     
     def get_queryset(self):
-        from backend.apps.system_management.services import get_user_permission_codes
-        from backend.core.views import _permission_granted
-        from django.db.models import Q
-        
-        queryset = DeliveryRecord.objects.all()
-        
-        # 根据权限过滤
-        user = self.request.user
-        permission_set = get_user_permission_codes(user)
-        
-        # 如果没有查看全部权限，只能查看自己创建的或负责项目的
-        if not _permission_granted('delivery_center.view_all', permission_set):
-            queryset = queryset.filter(
-                Q(created_by=user) | 
-                Q(project__team_members__user=user)
-            ).distinct()
-        
-        return queryset.select_related('project', 'client', 'created_by', 'sent_by', 'delivery_person').prefetch_related('files', 'tracking_records', 'feedbacks')
+        return visible_delivery_records(self.request.user)
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -291,10 +295,20 @@ class DeliveryFileViewSet(viewsets.ModelViewSet):
     serializer_class = DeliveryFileSerializer
     
     def get_queryset(self):
+        queryset = DeliveryFile.objects.filter(
+            is_deleted=False,
+            delivery_record__in=visible_delivery_records(self.request.user).values('pk'),
+        )
         delivery_id = self.request.query_params.get('delivery_id')
         if delivery_id:
-            return DeliveryFile.objects.filter(delivery_record_id=delivery_id, is_deleted=False)
-        return DeliveryFile.objects.filter(is_deleted=False)
+            queryset = queryset.filter(delivery_record_id=delivery_id)
+        return queryset
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """下载交付文件（鉴权后由 Web 服务器发送，支持断点续传）"""
+        delivery_file = self.get_object()
+        return serve_protected_file(request, delivery_file.file, delivery_file.file_name)
     
     def perform_create(self, serializer):
         delivery_id = self.request.data.get('delivery_record')
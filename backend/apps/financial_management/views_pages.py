@@ -9,7 +9,9 @@ from django.forms import inlineformset_factory
 from datetime import timedelta
 from decimal import Decimal
 
+from backend.apps.system_management.models import Department
 from backend.apps.system_management.services import get_user_permission_codes
+from backend.apps.system_management.services_org import in_subtree
 from .models import (
     AccountSubject, Voucher, VoucherEntry,
     Ledger, Budget, Invoice, FundFlow,
@@ -960,6 +962,7 @@ def budget_management(request):
     search = request.GET.get('search', '')
     status = request.GET.get('status', '')
     budget_year = request.GET.get('budget_year', '')
+    department_id = request.GET.get('department_id', '')
     
     # 获取预算列表
     try:
@@ -976,6 +979,9 @@ def budget_management(request):
             budgets = budgets.filter(status=status)
         if budget_year:
             budgets = budgets.filter(budget_year=int(budget_year))
+        if department_id:
+            # 选择上级部门时一并列出其下级部门的预算
+            budgets = budgets.filter(in_subtree(int(department_id)))
         
         # 分页
         paginator = Paginator(budgets, 20)
@@ -1025,6 +1031,8 @@ def budget_management(request):
         'current_search': search,
         'current_status': status,
         'current_budget_year': budget_year,
+        'current_department_id': department_id,
+        'departments': Department.objects.filter(is_active=True).order_by('order', 'name'),
         'years': range(today.year - 2, today.year + 2),
     })
     return render(request, "financial_management/budget_list.html", context)
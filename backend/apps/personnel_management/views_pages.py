@@ -9,6 +9,8 @@ from datetime import timedelta
 from decimal import Decimal
 
 from backend.apps.system_management.services import get_user_permission_codes
+from backend.apps.system_management.services_org import in_subtree
+from backend.apps.system_management.services_search import search_filter
 from backend.apps.system_management.models import Department
 from .models import (
     Employee, Attendance, Leave, Training, TrainingParticipant,
@@ -280,14 +282,10 @@ def employee_management(request):
         
         # 应用筛选条件
         if search:
-            employees = employees.filter(
-                Q(employee_number__icontains=search) |
-                Q(name__icontains=search) |
-                Q(phone__icontains=search) |
-                Q(email__icontains=search)
-            )
+            employees = search_filter(employees, 'employee', search)
         if department_id:
-            employees = employees.filter(department_id=int(department_id))
+            # 选择上级部门时一并列出其下级部门的员工
+            employees = employees.filter(in_subtree(int(department_id)))
         if status:
             employees = employees.filter(status=status)
         
@@ -461,9 +459,8 @@ def attendance_management(request):
         
         # 应用筛选条件
         if search:
-            attendances = attendances.filter(
-                Q(employee__name__icontains=search) |
-                Q(employee__employee_number__icontains=search)
+            attendances = search_filter(
+                attendances, 'employee', search, fields=('code', 'title'), pk_field='employee_id'
             )
         if date_from:
             attendances = attendances.filter(attendance_date__gte=date_from)
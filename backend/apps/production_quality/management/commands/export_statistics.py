@@ -10,6 +10,7 @@ from django.utils import timezone
 from openpyxl import Workbook
 
 from backend.apps.project_center.models import Project
+from backend.core.db_router import read_from_replica
 from ...models import OpinionReview, ProductionStatistic
 
 
@@ -47,6 +48,11 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        # 导出只读，读取副本，月末报表不与交互写入争用主库
+        with read_from_replica():
+            self._export(options)
+
+    def _export(self, options):
         project_id = options.get("project")
         date_from_str = options.get("date_from")
         date_to_str = options.get("date_to")
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('production_quality', '0005_add_production_startup_models'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productionreport',
+            name='status',
+            field=models.CharField(choices=[('draft', '草稿'), ('rendering', '生成中'), ('generated', '已生成'), ('failed', '生成失败'), ('approved', '已发布'), ('archived', '已归档')], default='draft', max_length=20, verbose_name='状态'),
+        ),
+        migrations.CreateModel(
+            name='ReportArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('production_report', '专业报告'), ('risk_case_export', '风险案例导出')], max_length=30, verbose_name='产物类型')),
+                ('fingerprint', models.CharField(max_length=64, unique=True, verbose_name='内容指纹')),
+                ('parameters', models.JSONField(blank=True, default=dict, verbose_name='渲染参数')),
+                ('status', models.CharField(choices=[('pending', '排队中'), ('rendering', '生成中'), ('ready', '已生成'), ('failed', '生成失败')], default='pending', max_length=20, verbose_name='状态')),
+                ('file', models.FileField(blank=True, upload_to='report_artifacts/%Y/%m/', verbose_name='文件')),
+                ('file_size', models.PositiveBigIntegerField(default=0, verbose_name='文件大小')),
+                ('page_count', models.PositiveIntegerField(default=0, verbose_name='页数')),
+                ('error_message', models.TextField(blank=True, verbose_name='错误信息')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_artifacts', to=settings.AUTH_USER_MODEL, verbose_name='请求人')),
+            ],
+            options={
+                'verbose_name': '报告产物',
+                'verbose_name_plural': '报告产物',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='productionreport',
+            name='artifact',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reports', to='production_quality.reportartifact', verbose_name='渲染产物'),
+        ),
+        migrations.AddIndex(
+            model_name='reportartifact',
+            index=models.Index(fields=['kind', 'status'], name='production__kind_1971f1_idx'),
+        ),
+    ]
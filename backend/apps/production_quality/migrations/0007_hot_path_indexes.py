@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production_quality', '0006_report_artifact'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='opinion',
+            index=models.Index(fields=['project', 'status'], name='opinion_project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opinion',
+            index=models.Index(fields=['current_reviewer', 'status'], name='opinion_reviewer_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opinion',
+            index=models.Index(fields=['status', 'reviewed_at'], name='opinion_status_reviewed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opinion',
+            index=models.Index(condition=models.Q(('status__in', ('submitted', 'in_review', 'needs_update'))), fields=['response_deadline'], name='opinion_pending_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opinion',
+            index=models.Index(condition=models.Q(('status__in', ('submitted', 'in_review', 'needs_update'))), fields=['-submitted_at'], name='opinion_pending_submit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opinion',
+            index=models.Index(condition=models.Q(('current_reviewer__isnull', True), ('status__in', ('submitted', 'in_review', 'needs_update'))), fields=['project'], name='opinion_pending_unassigned_idx'),
+        ),
+    ]
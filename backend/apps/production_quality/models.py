@@ -12,6 +12,10 @@ from backend.apps.resource_standard.models import (
 )
 
 
+# 待处理意见状态：统计、质量提醒与审核看板只关注这些意见，部分索引也按此条件建立
+OPINION_PENDING_STATUSES = ("submitted", "in_review", "needs_update")
+
+
 class Opinion(models.Model):
     """核心意见填报数据模型"""
 
@@ -187,6 +191,30 @@ class Opinion(models.Model):
         ordering = ["-created_at"]
         verbose_name = "咨询意见"
         verbose_name_plural = "咨询意见"
+        indexes = [
+            models.Index(fields=["project", "status"], name="opinion_project_status_idx"),
+            models.Index(fields=["current_reviewer", "status"], name="opinion_reviewer_status_idx"),
+            models.Index(fields=["status", "reviewed_at"], name="opinion_status_reviewed_idx"),
+            # 部分索引只收录待处理意见，已结案的历史数据不占索引空间
+            models.Index(
+                fields=["response_deadline"],
+                name="opinion_pending_deadline_idx",
+                condition=models.Q(status__in=OPINION_PENDING_STATUSES),
+            ),
+            models.Index(
+                fields=["-submitted_at"],
+                name="opinion_pending_submit_idx",
+                condition=models.Q(status__in=OPINION_PENDING_STATUSES),
+            ),
+            models.Index(
+                fields=["project"],
+                name="opinion_pending_unassigned_idx",
+                condition=models.Q(
+                    status__in=OPINION_PENDING_STATUSES,
+                    current_reviewer__isnull=True,
+                ),
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.opinion_number
@@ -476,12 +504,63 @@ class OpinionSavingItem(models.Model):
         if self.quantity is not None and self.unit_saving is not None:
             self.total_saving = (self.quantity or 0) * (self.unit_saving or 0)
 
+class ReportArtifact(models.Model):
+    """报告渲染产物，按输入内容指纹缓存"""
+
+    class ArtifactKind(models.TextChoices):
+        PRODUCTION_REPORT = "production_report", "专业报告"
+        RISK_CASE_EXPORT = "risk_case_export", "风险案例导出"
+
+    class ArtifactStatus(models.TextChoices):
+        PENDING = "pending", "排队中"
+        RENDERING = "rendering", "生成中"
+        READY = "ready", "已生成"
+        FAILED = "failed", "生成失败"
+
+    kind = models.CharField("产物类型", max_length=30, choices=ArtifactKind.choices)
+    fingerprint = models.CharField("内容指纹", max_length=64, unique=True)
+    parameters = models.JSONField("渲染参数", default=dict, blank=True)
+    status = models.CharField(
+        "状态",
+        max_length=20,
+        choices=ArtifactStatus.choices,
+        default=ArtifactStatus.PENDING,
+    )
+    file = models.FileField("文件", upload_to="report_artifacts/%Y/%m/", blank=True)
+    file_size = models.PositiveBigIntegerField("文件大小", default=0)
+    page_count = models.PositiveIntegerField("页数", default=0)
+    error_message = models.TextField("错误信息", blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name="请求人",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="report_artifacts",
+    )
+    created_at = models.DateTimeField("创建时间", default=timezone.now)
+    completed_at = models.DateTimeField("完成时间", null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "报告产物"
+        verbose_name_plural = "报告产物"
+        indexes = [
+            models.Index(fields=["kind", "status"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()}-{self.fingerprint[:12]}"
+
+
 class ProductionReport(models.Model):
     """专业报告"""
 
     class ReportStatus(models.TextChoices):
         DRAFT = "draft", "草稿"
+        RENDERING = "rendering", "生成中"
         GENERATED = "generated", "已生成"
+        FAILED = "failed", "生成失败"
         APPROVED = "approved", "已发布"
         ARCHIVED = "archived", "已归档"
 
@@ -522,6 +601,14 @@ class ProductionReport(models.Model):
         choices=ReportStatus.choices,
         default=ReportStatus.DRAFT,
     )
+    artifact = models.ForeignKey(
+        ReportArtifact,
+        verbose_name="渲染产物",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="reports",
+    )
     generated_at = models.DateTimeField("生成时间", null=True, blank=True)
     updated_at = models.DateTimeField("更新时间", auto_now=True)
 
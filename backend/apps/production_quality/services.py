@@ -15,6 +15,7 @@ from backend.apps.project_center.models import Project, ProjectTeamNotification
 from backend.apps.resource_standard.models import ProfessionalCategory
 
 from .models import (
+    OPINION_PENDING_STATUSES,
     Opinion,
     OpinionParticipant,
     OpinionReview,
@@ -205,11 +206,8 @@ def build_opinion_statistics(
         for item in queryset.values("status").annotate(count=Count("id"))
     }
 
-    pending_status = [
-        Opinion.OpinionStatus.SUBMITTED,
-        Opinion.OpinionStatus.IN_REVIEW,
-        Opinion.OpinionStatus.NEEDS_UPDATE,
-    ]
+    # 与部分索引条件一致，便于命中待处理意见索引
+    pending_status = OPINION_PENDING_STATUSES
     pending_qs = queryset.filter(status__in=pending_status)
     pending_total = pending_qs.count()
     pending_unassigned = pending_qs.filter(current_reviewer__isnull=True).count()
@@ -416,11 +414,8 @@ def dispatch_quality_alerts(as_of=None) -> dict:
     """为超期或未指派的意见生成质量提醒"""
     as_of = as_of or timezone.now()
     snapshot_date = timezone.localdate(as_of)
-    pending_status = [
-        Opinion.OpinionStatus.SUBMITTED,
-        Opinion.OpinionStatus.IN_REVIEW,
-        Opinion.OpinionStatus.NEEDS_UPDATE,
-    ]
+    # 与部分索引条件一致，便于命中待处理意见索引
+    pending_status = OPINION_PENDING_STATUSES
     opinions = (
         Opinion.objects.filter(status__in=pending_status)
         .select_related(
@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import tempfile
+import zlib
+from array import array
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from backend.apps.resource_standard.models import RiskCase
+
+from .models import ProductionReport, ReportArtifact
+
+logger = logging.getLogger(__name__)
+
+# 渲染逻辑变化时递增，使旧指纹对应的产物失效
+RENDERER_VERSION = "2"
+# 排队/生成中超过该时长视为任务丢失，允许重新入队
+RENDER_STALE_AFTER = timedelta(minutes=15)
+QUERY_CHUNK_SIZE = 200
+
+
+def _wrap_text(text, max_chars=60):
+    if not text:
+        return []
+    text = str(text).replace("\r", "").strip()
+    lines = []
+    while text:
+        lines.append(text[:max_chars])
+        text = text[max_chars:]
+    return lines
+
+
+class _PdfWriter:
+    """
+    流式写出 PDF：每页内容在翻页时压缩并立即写入文件，内存中只保留当前页的绘制指令。
+    reportlab 的 Canvas 会把所有页面留在内存里直到 save()，这里直接按 PDF 对象结构输出，
+    除交叉引用表的对象偏移量（每页两个整数）外，内存占用与页数无关。
+    字体使用 PDF 标准字体（无需嵌入），WinAnsi 无法编码的字符与 reportlab 一样以 ZapfDingbats 方块代替。
+    """
+
+    PAGE_WIDTH = 595.2756  # A4，单位 pt
+    PAGE_HEIGHT = 841.8898
+    FONTS = {"Helvetica": b"F1", "Helvetica-Bold": b"F2"}
+    FALLBACK_FONT = b"F3"
+    # 固定对象编号：1 Catalog、2 Pages、3-5 字体、6 Info，页面从 7 开始，每页占内容流与页面两个对象
+    CATALOG, PAGES, INFO, FIRST_PAGE_OBJECT = 1, 2, 6, 7
+
+    def __init__(self, fileobj, title: str):
+        self.mm = 72 / 25.4
+        self.width, self.height = self.PAGE_WIDTH, self.PAGE_HEIGHT
+        self.margin_x = 20 * self.mm
+        self.margin_y = 20 * self.mm
+        self.fileobj = fileobj
+        self.position = 0
+        self.offsets = array("Q", [0] * self.FIRST_PAGE_OBJECT)
+        self.operations = []
+        self.y = self.height - self.margin_y
+        self.pages = 1
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        self._object(4, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+        self._object(5, b"<< /Type /Font /Subtype /Type1 /BaseFont /ZapfDingbats >>")
+        self._object(self.INFO, b"<< /Title <" + ("\ufeff" + title).encode("utf-16-be").hex().encode("ascii") + b"> >>")
+
+    def _write(self, data: bytes):
+        self.fileobj.write(data)
+        self.position += len(data)
+
+    def _object(self, number: int, body: bytes):
+        while len(self.offsets) <= number:
+            self.offsets.append(0)
+        self.offsets[number] = self.position
+        self._write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def _flush_page(self):
+        content = zlib.compress(b"\n".join(self.operations))
+        self.operations = []
+        content_number = self.FIRST_PAGE_OBJECT + 2 * (self.pages - 1)
+        self._object(
+            content_number,
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream",
+        )
+        self._object(
+            content_number + 1,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.4f %.4f] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R /F3 5 0 R >> >> /Contents %d 0 R >>"
+            % (self.PAGES, self.width, self.height, content_number),
+        )
+
+    @staticmethod
+    def _escape(data: bytes) -> bytes:
+        return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    def _show_text(self, content: str, font: bytes, size) -> bytes:
+        """按字符能否用 WinAnsi 编码切分成若干段，分别选用正文字体或方块替代字体。"""
+        parts = []
+        run, run_font = [], font
+        for char in content:
+            try:
+                encoded, char_font = char.encode("cp1252"), font
+            except UnicodeEncodeError:
+                encoded, char_font = b"n", self.FALLBACK_FONT
+            if char_font != run_font and run:
+                parts.append(b"/%s %g Tf (%s) Tj" % (run_font, size, self._escape(b"".join(run))))
+                run = []
+            run_font = char_font
+            run.append(encoded)
+        if run:
+            parts.append(b"/%s %g Tf (%s) Tj" % (run_font, size, self._escape(b"".join(run))))
+        return b" ".join(parts)
+
+    def new_page(self):
+        self._flush_page()
+        self.pages += 1
+        self.y = self.height - self.margin_y
+
+    def ensure_space(self, needed):
+        if self.y < self.margin_y + needed:
+            self.new_page()
+
+    def text(self, content, font="Helvetica", size=10, indent=0, step=6):
+        x = self.margin_x + indent * self.mm
+        self.operations.append(
+            b"BT %.2f %.2f Td %s ET" % (x, self.y, self._show_text(str(content), self.FONTS[font], size))
+        )
+        self.y -= step * self.mm
+
+    def paragraph(self, label, content, max_chars=70):
+        lines = _wrap_text(content, max_chars=max_chars)
+        if not lines:
+            self.text(f"{label}：—", font="Helvetica-Bold", size=9, step=5)
+            return
+        self.text(f"{label}：", font="Helvetica-Bold", size=9, step=5)
+        for line in lines:
+            self.ensure_space(20)
+            self.text(line, size=9, indent=8, step=4.5)
+
+    def separator(self):
+        self.y -= 3 * self.mm
+        self.operations.append(
+            b"%.2f %.2f m %.2f %.2f l S" % (self.margin_x, self.y, self.width - self.margin_x, self.y)
+        )
+        self.y -= 6 * self.mm
+
+    def close(self) -> int:
+        self._flush_page()
+        # 页面对象编号是连续的，Kids 按编号逐段写出，无需在内存中保存页面列表
+        self.offsets[self.PAGES] = self.position
+        self._write(b"%d 0 obj\n<< /Type /Pages /Count %d /Kids [" % (self.PAGES, self.pages))
+        for index in range(self.pages):
+            self._write(b" %d 0 R" % (self.FIRST_PAGE_OBJECT + 2 * index + 1))
+        self._write(b" ] >>\nendobj\n")
+        self._object(self.CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES)
+
+        xref_position = self.position
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % len(self.offsets))
+        for offset in self.offsets[1:]:
+            self._write(b"%010d 00000 n \n" % offset)
+        self._write(
+            b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(self.offsets), self.CATALOG, self.INFO, xref_position)
+        )
+        return self.pages
+
+
+def render_risk_case_pdf(fileobj) -> int:
+    """风险案例导出报表，返回页数。"""
+    writer = _PdfWriter(fileobj, "风险案例导出报表")
+    writer.text("风险案例导出报表", font="Helvetica-Bold", size=16, step=10)
+    writer.text(f"导出时间：{timezone.now().strftime('%Y-%m-%d %H:%M')}", step=8)
+
+    cases = RiskCase.objects.select_related("project").order_by("-occurred_on", "case_code")
+    for case in cases.iterator(chunk_size=QUERY_CHUNK_SIZE):
+        writer.ensure_space(40)
+        writer.text(f"[{case.case_code}] {case.title}", font="Helvetica-Bold", size=11)
+        writer.text(
+            f"类型：{case.get_case_type_display()}  项目：{case.project.name if case.project else '—'}  "
+            f"时间：{case.occurred_on or '—'}"
+        )
+        for label, content in (
+            ("风险描述", case.risk_description),
+            ("根本原因", case.root_cause),
+            ("影响评估", case.impact_scope),
+            ("应对措施", case.counter_measure),
+            ("预防措施", case.prevention),
+            ("经验教训", case.lessons),
+        ):
+            writer.paragraph(label, content)
+        writer.separator()
+    return writer.close()
+
+
+def render_production_report_pdf(fileobj, report: ProductionReport) -> int:
+    """专业报告 PDF：封面信息 + 按顺序输出章节，返回页数。"""
+    writer = _PdfWriter(fileobj, report.name)
+    writer.text(report.name, font="Helvetica-Bold", size=16, step=10)
+    writer.text(f"报告编号：{report.report_number}")
+    writer.text(f"项目：{report.project.project_number or '—'} {report.project.name}")
+    writer.text(f"专业：{report.professional_category.name if report.professional_category_id else '—'}")
+    writer.text(f"生成时间：{timezone.now().strftime('%Y-%m-%d %H:%M')}", step=8)
+    if report.summary:
+        writer.paragraph("报告摘要", report.summary)
+    writer.separator()
+
+    for section in report.sections.order_by("order", "id").iterator(chunk_size=QUERY_CHUNK_SIZE):
+        writer.ensure_space(40)
+        writer.text(section.title, font="Helvetica-Bold", size=12, step=7)
+        for line in _wrap_text(section.content, max_chars=70):
+            writer.ensure_space(20)
+            writer.text(line, size=10, step=5)
+        writer.separator()
+    return writer.close()
+
+
+def _fingerprint(kind: str, parts: Iterable) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{kind}:{RENDERER_VERSION}".encode("utf-8"))
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def production_report_fingerprint(report: ProductionReport) -> str:
+    """报告内容指纹：只取影响输出的字段，状态变化不会改变指纹。"""
+    header = {
+        "id": report.id,
+        "number": report.report_number,
+        "name": report.name,
+        "summary": report.summary,
+        "configuration": report.configuration,
+        "project_id": report.project_id,
+        "category_id": report.professional_category_id,
+        "template_id": report.template_id,
+    }
+    sections = report.sections.order_by("order", "id").values_list("id", "title", "order", "content", "metadata")
+    return _fingerprint(
+        ReportArtifact.ArtifactKind.PRODUCTION_REPORT,
+        [header, *sections.iterator(chunk_size=QUERY_CHUNK_SIZE)],
+    )
+
+
+def risk_case_export_fingerprint() -> str:
+    snapshot = RiskCase.objects.aggregate(
+        total=Count("id"),
+        last_id=Max("id"),
+        last_updated=Max("updated_time"),
+    )
+    return _fingerprint(ReportArtifact.ArtifactKind.RISK_CASE_EXPORT, [snapshot])
+
+
+def _claim_artifact(kind: str, fingerprint: str, parameters: Dict, user) -> Tuple[ReportArtifact, bool]:
+    """获取指纹对应的产物，返回 (产物, 是否需要入队渲染)。"""
+    artifact, created = ReportArtifact.objects.get_or_create(
+        fingerprint=fingerprint,
+        defaults={"kind": kind, "parameters": parameters, "requested_by": user},
+    )
+    if created:
+        return artifact, True
+
+    Status = ReportArtifact.ArtifactStatus
+    stale = artifact.created_at < timezone.now() - RENDER_STALE_AFTER
+    file_missing = artifact.status == Status.READY and not (artifact.file and artifact.file.storage.exists(artifact.file.name))
+    if artifact.status == Status.FAILED or file_missing or (artifact.status != Status.READY and stale):
+        artifact.status = Status.PENDING
+        artifact.error_message = ""
+        artifact.parameters = parameters
+        artifact.created_at = timezone.now()
+        artifact.save(update_fields=["status", "error_message", "parameters", "created_at"])
+        return artifact, True
+    return artifact, False
+
+
+def _enqueue(artifact: ReportArtifact) -> None:
+    from .tasks import render_report_artifact
+
+    transaction.on_commit(lambda: render_report_artifact.delay(artifact.id))
+
+
+def request_production_report(report: ProductionReport, user=None) -> ReportArtifact:
+    """请求生成报告 PDF：已有相同内容的产物直接复用，否则后台渲染。"""
+    fingerprint = production_report_fingerprint(report)
+    artifact, needs_render = _claim_artifact(
+        ReportArtifact.ArtifactKind.PRODUCTION_REPORT,
+        fingerprint,
+        {"report_id": report.id},
+        user,
+    )
+    update_fields = ["artifact", "status", "updated_at"]
+    report.artifact = artifact
+    if artifact.status == ReportArtifact.ArtifactStatus.READY:
+        if report.status in (ProductionReport.ReportStatus.RENDERING, ProductionReport.ReportStatus.FAILED,
+                              ProductionReport.ReportStatus.DRAFT):
+            report.status = ProductionReport.ReportStatus.GENERATED
+            report.generated_at = artifact.completed_at
+            update_fields.append("generated_at")
+    else:
+        report.status = ProductionReport.ReportStatus.RENDERING
+    if user is not None and report.generated_by_id is None:
+        report.generated_by = user
+        update_fields.append("generated_by")
+    report.save(update_fields=update_fields)
+
+    if needs_render:
+        _enqueue(artifact)
+        artifact.refresh_from_db()
+    return artifact
+
+
+def request_risk_case_export(user=None) -> ReportArtifact:
+    artifact, needs_render = _claim_artifact(
+        ReportArtifact.ArtifactKind.RISK_CASE_EXPORT,
+        risk_case_export_fingerprint(),
+        {},
+        user,
+    )
+    if needs_render:
+        _enqueue(artifact)
+        artifact.refresh_from_db()
+    return artifact
+
+
+def _render_production_report(fileobj, artifact: ReportArtifact) -> int:
+    report = ProductionReport.objects.select_related("project", "professional_category").get(
+        pk=artifact.parameters["report_id"]
+    )
+    return render_production_report_pdf(fileobj, report)
+
+
+def _render_risk_case_export(fileobj, artifact: ReportArtifact) -> int:
+    return render_risk_case_pdf(fileobj)
+
+
+ARTIFACT_RENDERERS: Dict[str, Callable[[object, ReportArtifact], int]] = {
+    ReportArtifact.ArtifactKind.PRODUCTION_REPORT: _render_production_report,
+    ReportArtifact.ArtifactKind.RISK_CASE_EXPORT: _render_risk_case_export,
+}
+
+
+def artifact_filename(artifact: ReportArtifact) -> str:
+    if artifact.kind == ReportArtifact.ArtifactKind.PRODUCTION_REPORT:
+        return f"report_{artifact.parameters.get('report_id')}_{artifact.fingerprint[:12]}.pdf"
+    return f"risk_cases_{artifact.fingerprint[:12]}.pdf"
+
+
+def render_artifact(artifact_id: int) -> Optional[ReportArtifact]:
+    """后台任务入口：渲染到临时文件后落盘，并同步报告状态。"""
+    Status = ReportArtifact.ArtifactStatus
+    claimed = ReportArtifact.objects.filter(
+        pk=artifact_id, status__in=[Status.PENDING, Status.FAILED]
+    ).update(status=Status.RENDERING)
+    if not claimed:
+        return None
+    artifact = ReportArtifact.objects.get(pk=artifact_id)
+
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            page_count = ARTIFACT_RENDERERS[artifact.kind](tmp, artifact)
+            tmp.seek(0)
+            artifact.file.save(artifact_filename(artifact), File(tmp), save=False)
+        artifact.file_size = artifact.file.size
+        artifact.page_count = page_count
+        artifact.status = Status.READY
+        artifact.completed_at = timezone.now()
+        artifact.error_message = ""
+        artifact.save(update_fields=["file", "file_size", "page_count", "status", "completed_at", "error_message"])
+    except Exception as exc:
+        logger.exception("报告渲染失败: artifact=%s", artifact_id)
+        ReportArtifact.objects.filter(pk=artifact_id).update(status=Status.FAILED, error_message=str(exc)[:2000])
+        ProductionReport.objects.filter(
+            artifact_id=artifact_id, status=ProductionReport.ReportStatus.RENDERING
+        ).update(status=ProductionReport.ReportStatus.FAILED, updated_at=timezone.now())
+        raise
+
+    ProductionReport.objects.filter(
+        artifact_id=artifact_id,
+        status__in=[ProductionReport.ReportStatus.RENDERING, ProductionReport.ReportStatus.FAILED],
+    ).update(
+        status=ProductionReport.ReportStatus.GENERATED,
+        generated_at=artifact.completed_at,
+        updated_at=timezone.now(),
+    )
+    return artifact
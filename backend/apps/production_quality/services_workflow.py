@@ -0,0 +1,214 @@
+"""
+意见批量流转
+
+质量经理每轮审核后要集中处理大量意见，批量指派审核人、通过、驳回或要求修改在一个事务中完成：
+
+- 所选意见用一次 SELECT ... FOR UPDATE 读出并锁定，逐条校验状态流转，不满足条件的记入 skipped 并注明原因；
+- 意见字段一次 bulk_update，审核记录与流程日志各一次 bulk_create；
+- 每个接收人只生成一条汇总通知（指派通知审核人，审核结论通知意见提出人），操作人本人不通知。
+
+状态口径与单条接口（assign、reviews）一致；调用方负责项目权限过滤和入参校验。
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from backend.apps.project_center.models import ProjectTeamNotification
+from backend.apps.project_center.services_notifications import bulk_create_notifications
+
+from .models import OPINION_PENDING_STATUSES, Opinion, OpinionParticipant, OpinionReview, OpinionWorkflowLog
+
+# 审核结论 -> 意见状态
+REVIEW_OUTCOMES = {
+    OpinionReview.ReviewStatus.APPROVED: Opinion.OpinionStatus.APPROVED,
+    OpinionReview.ReviewStatus.REJECTED: Opinion.OpinionStatus.REJECTED,
+    OpinionReview.ReviewStatus.NEEDS_UPDATE: Opinion.OpinionStatus.NEEDS_UPDATE,
+}
+CLOSING_STATUSES = (Opinion.OpinionStatus.APPROVED, Opinion.OpinionStatus.REJECTED)
+# 通知正文中列出的意见编号数量
+NOTIFICATION_PREVIEW = 5
+
+
+@dataclass
+class BulkTransitionResult:
+    processed: List[int] = field(default_factory=list)
+    skipped: Dict[int, str] = field(default_factory=dict)
+    notified: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": len(self.processed),
+            "processed_ids": self.processed,
+            "skipped": [{"id": opinion_id, "reason": reason} for opinion_id, reason in self.skipped.items()],
+            "notified": self.notified,
+        }
+
+
+def _lock(opinions) -> List[Opinion]:
+    return list(
+        opinions.select_for_update(of=("self",))
+        .select_related("project", "created_by")
+        .order_by("id")
+    )
+
+
+def _display(user) -> str:
+    return user.get_full_name() or user.username
+
+
+def _notify(groups: Dict[int, List[Opinion]], recipients: dict, operator, title: str, alert_type: str) -> int:
+    """每个接收人一条汇总通知，一次写入"""
+    notifications = []
+    for recipient_id, opinions in groups.items():
+        recipient = recipients[recipient_id]
+        if recipient_id == operator.id or not recipient.is_active:
+            continue
+        numbers = [opinion.opinion_number for opinion in opinions]
+        preview = "、".join(numbers[:NOTIFICATION_PREVIEW])
+        if len(numbers) > NOTIFICATION_PREVIEW:
+            preview += f" 等 {len(numbers)} 条"
+        if len(opinions) == 1:
+            action_url = reverse("production_quality_pages:opinion_review_detail", args=[opinions[0].id])
+        else:
+            action_url = reverse("production_quality_pages:opinion_review_list")
+        notifications.append(
+            ProjectTeamNotification(
+                project=opinions[0].project,
+                recipient=recipient,
+                operator=operator,
+                title=title.format(count=len(opinions)),
+                message=f"{_display(operator)} 批量处理了意见：{preview}",
+                category="quality_alert",
+                action_url=action_url,
+                context={
+                    "alert_type": alert_type,
+                    "opinion_ids": [opinion.id for opinion in opinions],
+                },
+            )
+        )
+    return len(bulk_create_notifications(notifications))
+
+
+def bulk_assign_opinions(opinions, reviewer, operator) -> BulkTransitionResult:
+    """批量指派审核人：待处理意见改由 reviewer 审核，已提交的进入审核中"""
+    result = BulkTransitionResult()
+    now = timezone.now()
+    with transaction.atomic():
+        changed, logs = [], []
+        for opinion in _lock(opinions):
+            if opinion.status not in OPINION_PENDING_STATUSES:
+                result.skipped[opinion.id] = f"当前状态为{opinion.get_status_display()}，不可指派。"
+                continue
+            previous_status = opinion.status
+            opinion.current_reviewer = reviewer
+            if opinion.status == Opinion.OpinionStatus.SUBMITTED:
+                opinion.status = Opinion.OpinionStatus.IN_REVIEW
+            if not opinion.first_assigned_at:
+                opinion.first_assigned_at = now
+            opinion.updated_at = now
+            changed.append(opinion)
+            logs.append(
+                OpinionWorkflowLog(
+                    opinion=opinion,
+                    action=OpinionWorkflowLog.ActionType.REASSIGNED,
+                    operator=operator,
+                    from_status=previous_status,
+                    to_status=opinion.status,
+                    message=f"批量指派审核人：{_display(reviewer)}",
+                    payload={"reviewer_id": reviewer.id},
+                    operator_role=OpinionParticipant.ParticipantRole.PROJECT_MANAGER
+                    if opinion.project.project_manager_id == operator.id
+                    else None,
+                )
+            )
+        Opinion.objects.bulk_update(changed, ["current_reviewer", "status", "first_assigned_at", "updated_at"])
+        OpinionWorkflowLog.objects.bulk_create(logs)
+        result.processed = [opinion.id for opinion in changed]
+        if changed:
+            result.notified = _notify(
+                {reviewer.id: changed}, {reviewer.id: reviewer}, operator,
+                "您有 {count} 条意见待审核", "review_assigned",
+            )
+    return result
+
+
+def bulk_review_opinions(opinions, review_status: str, operator, role: str, comment: str = "") -> BulkTransitionResult:
+    """批量审核：写入审核记录并按结论流转意见状态；已以同一角色审核过的意见跳过"""
+    result = BulkTransitionResult()
+    target_status = REVIEW_OUTCOMES[review_status]
+    label = OpinionReview.ReviewStatus(review_status).label
+    now = timezone.now()
+    with transaction.atomic():
+        locked = _lock(opinions)
+        reviewed = set(
+            OpinionReview.objects.filter(
+                opinion_id__in=[opinion.id for opinion in locked], reviewer=operator, role=role,
+            ).values_list("opinion_id", flat=True)
+        )
+        changed, reviews, logs = [], [], []
+        for opinion in locked:
+            if opinion.status not in OPINION_PENDING_STATUSES:
+                result.skipped[opinion.id] = f"当前状态为{opinion.get_status_display()}，不可审核。"
+                continue
+            if opinion.id in reviewed:
+                result.skipped[opinion.id] = "已提交过该角色的审核意见，无法重复提交。"
+                continue
+            previous_status = opinion.status
+            opinion.status = target_status
+            if not opinion.first_response_at:
+                opinion.first_response_at = now
+            if target_status in CLOSING_STATUSES:
+                opinion.reviewed_at = now
+                opinion.closed_at = now
+            else:
+                opinion.reviewed_at = None
+                opinion.closed_at = None
+            opinion.current_reviewer = None
+            opinion.updated_at = now
+            opinion.refresh_cycle_metrics()
+            changed.append(opinion)
+            reviews.append(
+                OpinionReview(opinion=opinion, reviewer=operator, role=role, status=review_status, comments=comment)
+            )
+            logs.append(
+                OpinionWorkflowLog(
+                    opinion=opinion,
+                    action=OpinionWorkflowLog.ActionType.REVIEWED,
+                    operator=operator,
+                    from_status=previous_status,
+                    to_status=target_status,
+                    message=f"批量审核：{label}",
+                    payload={"comment": comment, "review_status": review_status, "role": role},
+                    operator_role=role,
+                )
+            )
+        Opinion.objects.bulk_update(
+            changed,
+            [
+                "status",
+                "reviewed_at",
+                "current_reviewer",
+                "updated_at",
+                "first_response_at",
+                "closed_at",
+                "cycle_time_hours",
+            ],
+        )
+        OpinionReview.objects.bulk_create(reviews)
+        OpinionWorkflowLog.objects.bulk_create(logs)
+        result.processed = [opinion.id for opinion in changed]
+
+        groups = defaultdict(list)
+        recipients = {}
+        for opinion in changed:
+            if opinion.created_by_id:
+                groups[opinion.created_by_id].append(opinion)
+                recipients[opinion.created_by_id] = opinion.created_by
+        result.notified = _notify(groups, recipients, operator, f"{{count}} 条意见审核结论：{label}", "review_decided")
+    return result
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .services_report import render_artifact
+
+
+@shared_task(name="production_quality.render_report_artifact")
+def render_report_artifact(artifact_id: int) -> None:
+    """后台渲染报告 PDF 产物"""
+    render_artifact(artifact_id)
@@ -0,0 +1,127 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from backend.apps.production_quality.models import Opinion, OpinionReview, OpinionWorkflowLog
+from backend.apps.project_center.models import Project, ProjectTeam, ProjectTeamNotification
+from backend.apps.resource_standard.models import ProfessionalCategory
+
+
+class OpinionBulkTransitionTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.manager = User.objects.create_user(username="13800003000", password="Test@123456", first_name="QM")
+        self.reviewer = User.objects.create_user(username="13800003001", password="Test@123456", first_name="RV")
+        self.creators = [
+            User.objects.create_user(username=f"1380000301{index}", password="Test@123456") for index in range(2)
+        ]
+        self.category = ProfessionalCategory.objects.create(
+            code="bulk_structure", name="structure", category="structure", service_types=["result_optimization"],
+        )
+        self.project = Project.objects.create(
+            project_number="VIH-BULK-001", name="bulk", created_by=self.manager, project_manager=self.manager,
+        )
+        ProjectTeam.objects.create(project=self.project, user=self.reviewer, role="engineer")
+        self.url = reverse("production_quality:opinion-bulk-transition")
+        self.counter = 0
+        self.client.force_login(self.manager)
+
+    def make_opinions(self, count, status=Opinion.OpinionStatus.SUBMITTED):
+        opinions = []
+        for _ in range(count):
+            self.counter += 1
+            opinions.append(Opinion.objects.create(
+                opinion_number=f"OPIN-BULK-{self.counter:03d}",
+                project=self.project,
+                professional_category=self.category,
+                created_by=self.creators[self.counter % 2],
+                location_name="loc",
+                issue_description="issue",
+                recommendation="fix",
+                issue_category=Opinion.IssueCategory.ERROR,
+                severity_level=Opinion.SeverityLevel.NORMAL,
+                status=status,
+                submitted_at=timezone.now(),
+            ))
+        return opinions
+
+    def post(self, payload):
+        return self.client.post(self.url, payload, content_type="application/json")
+
+    def test_assign_moves_pending_opinions_and_notifies_reviewer_once(self):
+        pending = self.make_opinions(4)
+        closed = self.make_opinions(1, status=Opinion.OpinionStatus.APPROVED)[0]
+        response = self.post({
+            "action": "assign", "reviewer": self.reviewer.id, "ids": [o.id for o in pending] + [closed.id],
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["processed"], 4)
+        self.assertEqual([item["id"] for item in data["skipped"]], [closed.id])
+        self.assertEqual(data["notified"], 1)
+
+        for opinion in pending:
+            opinion.refresh_from_db()
+            self.assertEqual(opinion.status, Opinion.OpinionStatus.IN_REVIEW)
+            self.assertEqual(opinion.current_reviewer, self.reviewer)
+            self.assertIsNotNone(opinion.first_assigned_at)
+        self.assertEqual(
+            OpinionWorkflowLog.objects.filter(action=OpinionWorkflowLog.ActionType.REASSIGNED).count(), 4,
+        )
+        notification = ProjectTeamNotification.objects.get(recipient=self.reviewer)
+        self.assertEqual(sorted(notification.context["opinion_ids"]), sorted(o.id for o in pending))
+
+    def test_queries_do_not_grow_with_selection(self):
+        def measure(count):
+            ids = [o.id for o in self.make_opinions(count)]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post({"action": "approve", "ids": ids})
+            self.assertEqual(response.json()["processed"], count)
+            return len(queries)
+
+        self.assertEqual(measure(3), measure(12))
+
+    def test_review_writes_reviews_and_notifies_each_creator_once(self):
+        opinions = self.make_opinions(5)
+        response = self.post({"action": "reject", "ids": [o.id for o in opinions], "comment": "missing data"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["notified"], 2)
+        self.assertEqual(
+            Opinion.objects.filter(id__in=[o.id for o in opinions], status=Opinion.OpinionStatus.REJECTED).count(), 5,
+        )
+        self.assertEqual(
+            OpinionReview.objects.filter(reviewer=self.manager, role=OpinionReview.ReviewRole.QUALITY_MANAGER).count(), 5,
+        )
+        for creator in self.creators:
+            self.assertEqual(ProjectTeamNotification.objects.filter(recipient=creator).count(), 1)
+
+        # 重复审核：状态已关闭，全部跳过
+        again = self.post({"action": "approve", "ids": [o.id for o in opinions]}).json()
+        self.assertEqual(again["processed"], 0)
+        self.assertEqual(len(again["skipped"]), 5)
+
+    def test_validation_errors(self):
+        opinion = self.make_opinions(1)[0]
+        self.assertEqual(self.post({"action": "reject", "ids": [opinion.id]}).status_code, 400)
+        self.assertEqual(self.post({"action": "archive", "ids": [opinion.id]}).status_code, 400)
+        self.assertEqual(self.post({"action": "approve", "ids": []}).status_code, 400)
+
+        outsider_project = Project.objects.create(project_number="VIH-BULK-002", name="other", created_by=self.reviewer)
+        foreign = Opinion.objects.create(
+            opinion_number="OPIN-BULK-X", project=outsider_project, professional_category=self.category,
+            created_by=self.reviewer, location_name="loc", issue_description="issue", recommendation="fix",
+            issue_category=Opinion.IssueCategory.ERROR, severity_level=Opinion.SeverityLevel.NORMAL,
+            status=Opinion.OpinionStatus.SUBMITTED,
+        )
+        response = self.post({"action": "approve", "ids": [opinion.id, foreign.id]})
+        self.assertEqual(response.status_code, 400)
+        opinion.refresh_from_db()
+        self.assertEqual(opinion.status, Opinion.OpinionStatus.SUBMITTED)
+
+    def test_list_page_offers_team_reviewers(self):
+        response = self.client.get(reverse("production_quality_pages:opinion_review_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'<option value="{self.reviewer.id}">RV</option>', html=True)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from backend.apps.project_center.models import Project
+from backend.apps.production_quality.models import ProductionReport, ProductionReportSection, ReportArtifact
+from backend.apps.production_quality.services_report import (
+    _PdfWriter,
+    request_production_report,
+    request_risk_case_export,
+)
+from backend.apps.resource_standard.models import ProfessionalCategory, RiskCase
+
+User = get_user_model()
+
+
+class ReportRenderingTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.user = User.objects.create_superuser(username="report_admin", password="pass1234")
+        self.project = Project.objects.create(name="报告项目", project_number="RPT-001", created_by=self.user)
+        self.category = ProfessionalCategory.objects.create(code="struct-test", name="结构")
+        self.report = ProductionReport.objects.create(
+            report_number="REP-0001",
+            name="结构优化报告",
+            project=self.project,
+            professional_category=self.category,
+            summary="summary",
+        )
+        for index in range(60):
+            ProductionReportSection.objects.create(
+                report=self.report, title=f"Section {index}", order=index, content="content " * 40
+            )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_report_render_marks_status_and_reuses_artifact(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            artifact = request_production_report(self.report, self.user)
+        artifact.refresh_from_db()
+        self.report.refresh_from_db()
+        self.assertEqual(artifact.status, ReportArtifact.ArtifactStatus.READY)
+        self.assertGreater(artifact.page_count, 1)
+        self.assertGreater(artifact.file_size, 0)
+        self.assertEqual(self.report.status, ProductionReport.ReportStatus.GENERATED)
+        self.assertEqual(self.report.artifact_id, artifact.id)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            again = request_production_report(self.report, self.user)
+        self.assertEqual(again.id, artifact.id)
+        self.assertEqual(callbacks, [])
+
+        self.report.summary = "changed"
+        self.report.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = request_production_report(self.report, self.user)
+        self.assertNotEqual(changed.fingerprint, artifact.fingerprint)
+
+    def test_report_download_page_and_api(self):
+        client = Client()
+        client.force_login(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(reverse("production_quality:production-report-render-pdf", args=[self.report.id]))
+        self.assertIn(response.status_code, (200, 202))
+
+        response = client.get(reverse("production_quality:production-report-download", args=[self.report.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content)[:4], b"%PDF")
+
+        response = client.get(reverse("production_quality_pages:report_download", args=[self.report.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+    def test_risk_case_export_is_cached_by_content(self):
+        RiskCase.objects.create(title="基坑支护风险", case_type="technical", risk_description="desc", counter_measure="fix")
+        with self.captureOnCommitCallbacks(execute=True):
+            first = request_risk_case_export(self.user)
+        first.refresh_from_db()
+        self.assertEqual(first.status, ReportArtifact.ArtifactStatus.READY)
+
+        self.assertEqual(request_risk_case_export(self.user).id, first.id)
+
+        RiskCase.objects.create(title="工期风险", case_type="schedule", risk_description="desc", counter_measure="fix")
+        with self.captureOnCommitCallbacks(execute=True):
+            second = request_risk_case_export(self.user)
+        self.assertNotEqual(second.id, first.id)
+
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse("resource_standard_pages:risk_case_export"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+    def test_pdf_writer_flushes_pages_and_writes_valid_xref(self):
+        buffer = io.BytesIO()
+        writer = _PdfWriter(buffer, "报告")
+        written = []
+        for index in range(400):
+            writer.ensure_space(20)
+            writer.text(f"line {index} (a) 结构", size=9)
+            written.append(buffer.tell())
+        pages = writer.close()
+        data = buffer.getvalue()
+
+        self.assertGreater(pages, 5)
+        # 已完成的页面在翻页时即写入文件，而不是等到 close()
+        self.assertGreater(written[-1], written[0] * 4)
+        xref_at = int(data[data.rindex(b"startxref") + len(b"startxref"):].split()[0])
+        self.assertTrue(data[xref_at:].startswith(b"xref"))
+        rows = data[xref_at:].split(b"\n")
+        size = int(rows[1].split()[1])
+        for number in range(1, size):
+            offset = int(rows[2 + number][:10])
+            self.assertTrue(data[offset:].startswith(b"%d 0 obj" % number))
+        self.assertIn(b"/Count %d" % pages, data)
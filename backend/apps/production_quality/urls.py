@@ -30,6 +30,7 @@ urlpatterns = [
         name="opinion_import_template",
     ),
     path("reports/generate/", views_pages.report_generate, name="report_generate"),
+    path("reports/<int:report_id>/download/", views_pages.report_download, name="report_download"),
     path("statistics/overview/", views_pages.production_stats, name="production_stats"),
     # 生产启动相关路由
     path("startup/", views_startup.production_startup_list, name="production_startup_list"),
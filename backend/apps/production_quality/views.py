@@ -1,5 +1,6 @@
 from django.db import transaction
 from django.db.models import Avg, Count, Sum
+from django.http import FileResponse
 from django.utils import timezone
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
@@ -8,6 +9,7 @@ from rest_framework.response import Response
 
 from backend.apps.project_center.models import Project
 from backend.apps.system_management.models import User
+from backend.apps.system_management.services_search import search_filter
 
 from .models import (
     Opinion,
@@ -16,6 +18,7 @@ from .models import (
     OpinionWorkflowLog,
     ProductionReport,
     ProductionStatistic,
+    ReportArtifact,
 )
 from .serializers import (
     OpinionListSerializer,
@@ -25,6 +28,16 @@ from .serializers import (
     ProductionStatisticSerializer,
 )
 from .services import infer_review_role, record_workflow_log
+from .services_report import artifact_filename, request_production_report
+from .services_workflow import REVIEW_OUTCOMES, bulk_assign_opinions, bulk_review_opinions
+
+# 单次批量流转的意见数上限
+BULK_TRANSITION_LIMIT = 500
+BULK_REVIEW_ACTIONS = {
+    "approve": OpinionReview.ReviewStatus.APPROVED,
+    "reject": OpinionReview.ReviewStatus.REJECTED,
+    "needs_update": OpinionReview.ReviewStatus.NEEDS_UPDATE,
+}
 
 
 def _accessible_project_ids(user):
@@ -74,7 +87,7 @@ class OpinionViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(professional_category_id__in=category_ids)
         keyword = self.request.query_params.get("search")
         if keyword:
-            queryset = queryset.filter(location_name__icontains=keyword)
+            queryset = search_filter(queryset, "opinion", keyword, fields=("title",))
 
         ordering = self.request.query_params.get("ordering", "-created_at")
         return queryset.order_by(ordering)
@@ -178,93 +191,74 @@ class OpinionViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(opinion)
         return Response(serializer.data)
 
-    @action(detail=False, methods=["post"])
-    def bulk_review(self, request):
-        opinion_ids = request.data.get("ids", [])
-        target_status = request.data.get("status")
-        comment = request.data.get("comment", "")
-        role_value = request.data.get("role", OpinionReview.ReviewRole.PROJECT_LEAD)
-
+    def _bulk_queryset(self, opinion_ids):
+        """所选意见（须全部在可访问项目内），不满足时返回错误响应"""
         if not isinstance(opinion_ids, list) or not opinion_ids:
-            return Response({"detail": "请选择至少一条意见。"}, status=status.HTTP_400_BAD_REQUEST)
-
-        valid_status = {
-            OpinionReview.ReviewStatus.APPROVED: Opinion.OpinionStatus.APPROVED,
-            OpinionReview.ReviewStatus.REJECTED: Opinion.OpinionStatus.REJECTED,
-            OpinionReview.ReviewStatus.NEEDS_UPDATE: Opinion.OpinionStatus.NEEDS_UPDATE,
-        }
+            return None, Response({"detail": "请选择至少一条意见。"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(opinion_ids) > BULK_TRANSITION_LIMIT:
+            return None, Response(
+                {"detail": f"单次最多处理 {BULK_TRANSITION_LIMIT} 条意见。"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            opinion_ids = {int(value) for value in opinion_ids}
+        except (TypeError, ValueError):
+            return None, Response({"detail": "意见ID格式不正确。"}, status=status.HTTP_400_BAD_REQUEST)
+        project_ids = _accessible_project_ids(self.request.user)
+        opinions = Opinion.objects.filter(id__in=opinion_ids, project_id__in=project_ids)
+        if opinions.count() != len(opinion_ids):
+            return None, Response({"detail": "存在无权限或不存在的意见记录。"}, status=status.HTTP_400_BAD_REQUEST)
+        return opinions, None
 
-        if target_status not in valid_status:
+    def _bulk_review(self, request, opinion_ids, review_status, comment, role_value):
+        if review_status not in REVIEW_OUTCOMES:
             return Response({"detail": "不支持的审核状态。"}, status=status.HTTP_400_BAD_REQUEST)
-
         if role_value not in dict(OpinionReview.ReviewRole.choices):
             return Response({"detail": "无效的审核角色。"}, status=status.HTTP_400_BAD_REQUEST)
+        comment = (comment or "").strip()
+        if review_status != OpinionReview.ReviewStatus.APPROVED and not comment:
+            return Response({"comments": ["驳回或需修改时必须填写审核意见。"]}, status=status.HTTP_400_BAD_REQUEST)
+        opinions, error = self._bulk_queryset(opinion_ids)
+        if error:
+            return error
+        result = bulk_review_opinions(opinions, review_status, request.user, role_value, comment)
+        return Response(result.as_dict())
 
-        project_ids = _accessible_project_ids(request.user)
-        opinions = (
-            Opinion.objects.filter(id__in=opinion_ids, project_id__in=project_ids)
-            .select_related("project", "professional_category")
-            .order_by("id")
+    @action(detail=False, methods=["post"])
+    def bulk_review(self, request):
+        return self._bulk_review(
+            request,
+            request.data.get("ids", []),
+            request.data.get("status"),
+            request.data.get("comment", ""),
+            request.data.get("role", OpinionReview.ReviewRole.PROJECT_LEAD),
         )
-        if opinions.count() != len(set(opinion_ids)):
-            return Response({"detail": "存在无权限或不存在的意见记录。"}, status=status.HTTP_400_BAD_REQUEST)
 
-        now = timezone.now()
-        changed = 0
-        for opinion in opinions:
-            if opinion.status not in [
-                Opinion.OpinionStatus.SUBMITTED,
-                Opinion.OpinionStatus.IN_REVIEW,
-                Opinion.OpinionStatus.NEEDS_UPDATE,
-            ]:
-                continue
-            previous_status = opinion.status
-            target_opinion_status = valid_status[target_status]
-            opinion.status = target_opinion_status
-            if not opinion.first_response_at:
-                opinion.first_response_at = now
-            if target_opinion_status not in [
-                Opinion.OpinionStatus.APPROVED,
-                Opinion.OpinionStatus.REJECTED,
-            ]:
-                opinion.reviewed_at = None
-                opinion.closed_at = None
+    @action(detail=False, methods=["post"], url_path="bulk-transition")
+    def bulk_transition(self, request):
+        """批量流转：assign 指派审核人（默认本人），approve / reject / needs_update 批量审核"""
+        transition = request.data.get("action")
+        opinion_ids = request.data.get("ids", [])
+        if transition == "assign":
+            reviewer_id = request.data.get("reviewer")
+            if reviewer_id:
+                reviewer = User.objects.filter(pk=reviewer_id, is_active=True).first()
+                if reviewer is None:
+                    return Response({"detail": "指定的审核人不存在或未启用。"}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                opinion.reviewed_at = now
-                opinion.closed_at = now
-            opinion.current_reviewer = None
-            opinion.refresh_cycle_metrics()
-            update_fields = [
-                "status",
-                "reviewed_at",
-                "current_reviewer",
-                "updated_at",
-                "first_response_at",
-                "closed_at",
-                "cycle_time_hours",
-            ]
-            opinion.save(update_fields=update_fields)
-
-            OpinionReview.objects.create(
-                opinion=opinion,
-                reviewer=request.user,
-                role=role_value,
-                status=target_status,
-                comments=comment,
+                reviewer = request.user
+            opinions, error = self._bulk_queryset(opinion_ids)
+            if error:
+                return error
+            return Response(bulk_assign_opinions(opinions, reviewer, request.user).as_dict())
+        if transition in BULK_REVIEW_ACTIONS:
+            return self._bulk_review(
+                request,
+                opinion_ids,
+                BULK_REVIEW_ACTIONS[transition],
+                request.data.get("comment", ""),
+                request.data.get("role", OpinionReview.ReviewRole.QUALITY_MANAGER),
             )
-            record_workflow_log(
-                opinion=opinion,
-                action=OpinionWorkflowLog.ActionType.REVIEWED,
-                operator=request.user,
-                from_status=previous_status,
-                to_status=target_opinion_status,
-                message=f"批量审核：{OpinionReview.ReviewStatus(target_status).label}",
-                payload={"comment": comment},
-                operator_role=role_value,
-            )
-            changed += 1
-
-        return Response({"processed": changed})
+        return Response({"detail": "不支持的批量操作。"}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=["get"])
     def metrics(self, request):
@@ -433,6 +427,42 @@ class ProductionReportViewSet(viewsets.ModelViewSet):
             generated_at=timezone.now(),
         )
 
+    @staticmethod
+    def _artifact_payload(report, artifact):
+        return {
+            "report": report.id,
+            "report_status": report.status,
+            "artifact": artifact.id,
+            "status": artifact.status,
+            "fingerprint": artifact.fingerprint,
+            "page_count": artifact.page_count,
+            "file_size": artifact.file_size,
+            "completed_at": artifact.completed_at,
+            "error_message": artifact.error_message,
+        }
+
+    @action(detail=True, methods=["post"], url_path="render")
+    def render_pdf(self, request, pk=None):
+        report = self.get_object()
+        artifact = request_production_report(report, request.user)
+        report.refresh_from_db(fields=["status", "generated_at"])
+        ready = artifact.status == ReportArtifact.ArtifactStatus.READY
+        return Response(
+            self._artifact_payload(report, artifact),
+            status=status.HTTP_200_OK if ready else status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        report = self.get_object()
+        artifact = report.artifact
+        if not artifact or artifact.status != ReportArtifact.ArtifactStatus.READY:
+            return Response(
+                {"detail": "报告尚未生成，请先提交生成。"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return FileResponse(artifact.file.open("rb"), as_attachment=True, filename=artifact_filename(artifact))
+
 
 class ProductionStatisticViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ProductionStatisticSerializer
@@ -13,8 +13,8 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
 from django.db.models import Count, Sum, Q
-from django.http import HttpResponse, JsonResponse
-from django.shortcuts import redirect, render
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
 
@@ -26,6 +26,8 @@ from backend.apps.project_center.views_pages import (
 from backend.apps.system_management.models import User
 from backend.apps.system_management.services import get_user_permission_codes
 from backend.apps.resource_standard.models import ProfessionalCategory, StandardReviewItem, ReportTemplate
+from backend.core.dashboard_cache import cached_summary
+from backend.core.db_router import replica_reads
 from backend.core.views import _permission_granted
 
 from .forms import OpinionAttachmentFormSet, OpinionBulkImportForm, OpinionForm
@@ -37,7 +39,9 @@ from .models import (
     OpinionWorkflowLog,
     ProductionReport,
     ProductionStatistic,
+    ReportArtifact,
 )
+from .services_report import artifact_filename, request_production_report
 from .services import (
     calculate_saving_amount,
     generate_opinion_number,
@@ -435,13 +439,14 @@ def _project_ids_user_can_access(user):
     return project_ids | team_ids
 
 
+@replica_reads
 @login_required
 def opinion_review_dashboard(request):
     """质量审核总览页面"""
     accessible_ids = _project_ids_user_can_access(request.user)
     opinions = list(
         Opinion.objects.filter(project_id__in=accessible_ids)
-        .select_related("project", "professional_category", "created_by")
+        .select_related("project", "professional_category", "created_by", "current_reviewer")
         .prefetch_related("review_points", "reviews")
         .order_by("-submitted_at", "-created_at")
     )
@@ -923,15 +928,9 @@ def opinion_review_detail(request, opinion_id):
     return render(request, "production_quality/opinion_review_detail.html", context)
 
 
-@login_required
-def report_generate(request):
-    """报告生成页面"""
-    permission_set = get_user_permission_codes(request.user)
-    if not _has_permission(permission_set, "production_quality.generate_report", "production_quality.professional_review"):
-        messages.error(request, "您没有访问报告生成中心的权限。")
-        return redirect("home")
-
-    accessible_ids = _project_ids_user_can_access(request.user)
+def _report_generate_summary(user):
+    """报告生成中心的汇总卡片、模板与最近报告列表（可缓存的纯数据）"""
+    accessible_ids = _project_ids_user_can_access(user)
     reports = (
         ProductionReport.objects.filter(project_id__in=accessible_ids)
         .select_related("project", "professional_category")
@@ -977,11 +976,32 @@ def report_generate(request):
         {
             "label": f"{report.project.project_number if report.project else '未关联'} · {report.name}",
             "description": f"状态：{report.get_status_display()}",
-            "url": "#",
+            "url": reverse("production_quality_pages:report_download", args=[report.id]),
             "icon": "📝",
         }
         for report in reports
     ]
+    return {"summary_cards": summary_cards, "template_items": template_items, "report_items": report_items}
+
+
+@login_required
+def report_generate(request):
+    """报告生成页面"""
+    permission_set = get_user_permission_codes(request.user)
+    if not _has_permission(permission_set, "production_quality.generate_report", "production_quality.professional_review"):
+        messages.error(request, "您没有访问报告生成中心的权限。")
+        return redirect("home")
+
+    summary = cached_summary(
+        "report_generate",
+        ("production_quality.ProductionReport", "resource_standard.ReportTemplate",
+         "project_center.Project", "project_center.ProjectTeam"),
+        lambda: _report_generate_summary(request.user),
+        user=request.user,
+    )
+    summary_cards = summary["summary_cards"]
+    template_items = summary["template_items"]
+    report_items = summary["report_items"]
 
     context = {
         "page_title": "报告生成中心",
@@ -1018,6 +1038,27 @@ def report_generate(request):
     return render(request, "shared/center_dashboard.html", context)
 
 
+@login_required
+def report_download(request, report_id):
+    """下载报告 PDF：内容未变化时直接返回缓存产物，否则提交后台生成"""
+    permission_set = get_user_permission_codes(request.user)
+    if not _has_permission(permission_set, "production_quality.generate_report", "production_quality.professional_review"):
+        messages.error(request, "您没有访问报告生成中心的权限。")
+        return redirect("home")
+
+    report = get_object_or_404(
+        ProductionReport.objects.select_related("project", "professional_category"),
+        pk=report_id,
+        project_id__in=_project_ids_user_can_access(request.user),
+    )
+    artifact = request_production_report(report, request.user)
+    if artifact.status != ReportArtifact.ArtifactStatus.READY:
+        messages.info(request, f"报告《{report.name}》正在后台生成，请稍后刷新下载。")
+        return redirect("production_quality_pages:report_generate")
+    return FileResponse(artifact.file.open("rb"), as_attachment=True, filename=artifact_filename(artifact))
+
+
+@replica_reads
 @login_required
 def production_stats(request):
     """生产统计视图"""
@@ -1763,5 +1804,19 @@ def opinion_drafts(request):
 
 @login_required
 def opinion_review_list(request):
-    return render(request, "production_quality/opinion_review_list.html")
+    # 可指派的审核人：可访问项目中的在岗团队成员
+    reviewers = (
+        User.objects.filter(
+            is_active=True,
+            projectteam__is_active=True,
+            projectteam__project_id__in=_project_ids_user_can_access(request.user),
+        )
+        .distinct()
+        .order_by("first_name", "last_name", "username")
+    )
+    return render(
+        request,
+        "production_quality/opinion_review_list.html",
+        {"reviewer_candidates": [{"id": user.id, "name": user.get_full_name() or user.username} for user in reviewers]},
+    )
 
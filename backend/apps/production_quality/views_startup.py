@@ -12,6 +12,7 @@ from django.http import JsonResponse
 from decimal import Decimal
 
 from backend.apps.project_center.models import Project, ProjectTeam, ServiceProfession
+from backend.apps.project_center.services_team import sync_project_team
 from backend.apps.system_management.models import User
 from backend.apps.system_management.services import get_user_permission_codes
 from backend.apps.production_quality.models_startup import (
@@ -343,32 +344,15 @@ def production_startup_configure_team(request, startup_id):
         roles = request.POST.getlist('roles[]')
         professions = request.POST.getlist('professions[]')
         
+        roster = [
+            (user_id, roles[i] if i < len(roles) else 'engineer', professions[i] if i < len(professions) else None)
+            for i, user_id in enumerate(team_members)
+            if user_id
+        ]
+
         with transaction.atomic():
-            # 添加团队成员
-            for i, user_id in enumerate(team_members):
-                if not user_id:
-                    continue
-                try:
-                    user = User.objects.get(id=user_id)
-                    role = roles[i] if i < len(roles) else 'engineer'
-                    profession_id = professions[i] if i < len(professions) and professions[i] else None
-                    
-                    profession = None
-                    if profession_id:
-                        profession = ServiceProfession.objects.filter(id=profession_id).first()
-                    
-                    ProjectTeam.objects.get_or_create(
-                        project=startup.project,
-                        user=user,
-                        role=role,
-                        service_profession=profession,
-                        defaults={
-                            'unit': ProjectTeam.ROLE_UNIT_MAP.get(role, 'management'),
-                            'is_active': True,
-                        }
-                    )
-                except User.DoesNotExist:
-                    continue
+            # 只追加成员，不移除已有成员
+            sync_project_team(startup.project, roster, operator=request.user)
             
             # 更新团队配置状态
             startup.team_configured = True
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class ProjectCenterConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'backend.apps.project_center'
+    verbose_name = '项目中心'
+
+    def ready(self):
+        from .services_detail import connect_project_version_signals
+        from .services_notifications import connect_notification_signals
+
+        connect_notification_signals()
+        connect_project_version_signals()
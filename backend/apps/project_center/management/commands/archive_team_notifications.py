@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.apps.project_center.services_notifications import archive_read_notifications, rebuild_unread_counters
+
+
+class Command(BaseCommand):
+    help = "Move read team notifications older than the retention period into the archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=180,
+            help="Retention period in days for read notifications (default: 180)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows moved per transaction (default: 1000)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many notifications would be archived",
+        )
+        parser.add_argument(
+            "--rebuild-counters",
+            action="store_true",
+            help="Also recompute every user's unread counters from the notification table",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--days and --batch-size must be positive")
+        count = archive_read_notifications(options["days"], options["batch_size"], dry_run=options["dry_run"])
+        if options["dry_run"]:
+            self.stdout.write(f"{count} read notification(s) older than {options['days']} day(s) would be archived")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Archived {count} read notification(s)."))
+        if options["rebuild_counters"]:
+            users = rebuild_unread_counters()
+            self.stdout.write(self.style.SUCCESS(f"Unread counters rebuilt ({users} user(s) with unread notifications)."))
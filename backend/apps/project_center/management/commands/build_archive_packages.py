@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from backend.apps.project_center.models import ProjectArchive
+from backend.apps.project_center.services_archive import build_archive_package, reset_stale_builds
+
+
+class Command(BaseCommand):
+    help = "Build queued project archive ZIP packages; stale builds are re-queued first"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--archive",
+            action="append",
+            dest="archives",
+            type=int,
+            help="Rebuild the package of this archive ID (repeatable), even if it is already built",
+        )
+
+    def handle(self, *args, **options):
+        archive_ids = options.get("archives") or []
+        if archive_ids:
+            ProjectArchive.objects.filter(pk__in=archive_ids).exclude(package_status="building").update(
+                package_status="pending"
+            )
+        else:
+            reset = reset_stale_builds()
+            if reset:
+                self.stdout.write(self.style.WARNING(f"Re-queued {reset} stale package build(s)."))
+            archive_ids = list(
+                ProjectArchive.objects.filter(package_status="pending").order_by("id").values_list("id", flat=True)
+            )
+
+        built = failed = 0
+        for archive_id in archive_ids:
+            try:
+                archive = build_archive_package(archive_id)
+            except Exception as exc:  # 单个归档失败不影响其余归档
+                failed += 1
+                self.stderr.write(f"Archive {archive_id} failed: {exc}")
+                continue
+            if archive is not None:
+                built += 1
+                self.stdout.write(f"Archive {archive.archive_number}: {archive.package_file_count} file(s), {archive.package_size} bytes")
+        self.stdout.write(self.style.SUCCESS(f"Built {built} package(s), {failed} failed."))
@@ -0,0 +1,88 @@
+import json
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from backend.core.benchmark import HOT_QUERIES, SyntheticScale, generate_dataset, run_query_audit
+
+# 合成数据写入后需要刷新统计信息的表，否则规划器按空表估算
+ANALYZED_TABLES = (
+    "production_quality_opinion",
+    "project_center_milestone",
+    "project_center_task",
+    "project_center_team_notification",
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "对热点查询执行 EXPLAIN (ANALYZE, BUFFERS)，标记大范围顺序扫描与行数估算偏差；发现问题时返回非零退出码"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--query", action="append", dest="queries",
+                            help="仅审计指定查询（可重复）：%s" % ", ".join(q.name for q in HOT_QUERIES))
+        parser.add_argument("--min-rows", type=int, default=1000, help="顺序扫描行数达到该值才标记（默认 1000）")
+        parser.add_argument("--misestimate-ratio", type=float, default=10.0,
+                            help="预估与实际行数相差该倍数以上时标记（默认 10）")
+        parser.add_argument("--generate", action="store_true",
+                            help="先生成合成数据并 ANALYZE，审计结束后回滚（规模参数同 run_benchmarks）")
+        defaults = SyntheticScale()
+        for scale_field in fields(SyntheticScale):
+            parser.add_argument(
+                f"--{scale_field.name.replace('_', '-')}",
+                type=int,
+                default=getattr(defaults, scale_field.name),
+                dest=scale_field.name,
+                help=f"合成数据规模：{scale_field.name}（默认 {getattr(defaults, scale_field.name)}）",
+            )
+        parser.add_argument("--seed", type=int, default=20240101, help="随机种子")
+        parser.add_argument("--output", help="JSON 报告输出路径；不传则打印到标准输出")
+        parser.add_argument("--no-fail", action="store_true", help="发现问题时不返回错误码")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("query_audit 需要 PostgreSQL 数据库")
+        known = {query.name for query in HOT_QUERIES}
+        unknown = [name for name in options.get("queries") or () if name not in known]
+        if unknown:
+            raise CommandError(f"未知的热点查询：{', '.join(unknown)}")
+
+        report = {}
+        try:
+            with transaction.atomic():
+                if options["generate"]:
+                    scale = SyntheticScale(**{f.name: options[f.name] for f in fields(SyntheticScale)})
+                    generate_dataset(scale, seed=options["seed"])
+                    with connection.cursor() as cursor:
+                        for table in ANALYZED_TABLES:
+                            cursor.execute(f"ANALYZE {connection.ops.quote_name(table)}")
+                report = run_query_audit(
+                    options.get("queries"),
+                    min_rows=options["min_rows"],
+                    misestimate_ratio=options["misestimate_ratio"],
+                )
+                # 审计只读；合成数据一律回滚
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        payload = json.dumps(report, ensure_ascii=False, indent=2, default=str)
+        if options.get("output"):
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(payload)
+        else:
+            self.stdout.write(payload)
+
+        for result in report["results"]:
+            kinds = ", ".join(
+                f"{finding['kind']}:{finding['relation'] or finding.get('node', '')}" for finding in result["findings"]
+            )
+            line = f"{result['name']:<30} {result['execution_ms']:>9.2f}ms  {result['root_node']:<18} {kinds or 'ok'}"
+            style = self.style.SUCCESS if result["passed"] else self.style.WARNING
+            self.stderr.write(style(line))
+        if not report["passed"] and not options["no_fail"]:
+            raise CommandError("存在顺序扫描或行数估算偏差的热点查询")
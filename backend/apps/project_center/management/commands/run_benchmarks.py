@@ -0,0 +1,94 @@
+import json
+import uuid
+from dataclasses import fields
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from backend.core.benchmark import BENCHMARK_TARGETS, SyntheticScale, generate_dataset, run_benchmarks
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "生成合成数据并对关键页面/接口做性能基准，输出 JSON 报告；超出查询预算时返回非零退出码"
+
+    def add_arguments(self, parser):
+        defaults = SyntheticScale()
+        for scale_field in fields(SyntheticScale):
+            parser.add_argument(
+                f"--{scale_field.name.replace('_', '-')}",
+                type=int,
+                default=getattr(defaults, scale_field.name),
+                dest=scale_field.name,
+                help=f"合成数据规模：{scale_field.name}（默认 {getattr(defaults, scale_field.name)}）",
+            )
+        parser.add_argument("--seed", type=int, default=20240101, help="随机种子")
+        parser.add_argument("--repeat", type=int, default=3, help="每个目标的重复请求次数")
+        parser.add_argument("--target", action="append", dest="targets",
+                            help="仅运行指定目标（可重复）：%s" % ", ".join(t.name for t in BENCHMARK_TARGETS))
+        parser.add_argument("--output", help="JSON 报告输出路径；不传则打印到标准输出")
+        parser.add_argument("--skip-generate", action="store_true", help="不生成合成数据，直接使用现有数据")
+        parser.add_argument("--keep-data", action="store_true", help="保留生成的数据（默认运行结束后回滚）")
+        parser.add_argument("--no-fail", action="store_true", help="超出预算时不返回错误码")
+
+    def handle(self, *args, **options):
+        targets = BENCHMARK_TARGETS
+        if options.get("targets"):
+            known = {target.name: target for target in BENCHMARK_TARGETS}
+            unknown = [name for name in options["targets"] if name not in known]
+            if unknown:
+                raise CommandError(f"未知的基准目标：{', '.join(unknown)}")
+            targets = [known[name] for name in options["targets"]]
+
+        scale = SyntheticScale(**{f.name: options[f.name] for f in fields(SyntheticScale)})
+        # 测试环境下邮件走内存后端，允许 testserver 主机名；在测试中调用时环境已就绪
+        owns_environment = not hasattr(mail, "outbox")
+        if owns_environment:
+            setup_test_environment()
+        try:
+            report = self._run(scale, targets, options)
+        finally:
+            if owns_environment:
+                teardown_test_environment()
+
+        payload = json.dumps(report, ensure_ascii=False, indent=2, default=str)
+        if options.get("output"):
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(payload)
+        else:
+            self.stdout.write(payload)
+
+        for result in report["results"]:
+            line = (f"{result['name']:<26} {result['median_ms']:>9.1f}ms  "
+                    f"queries {result['queries']:>3}/{result['query_budget']:<3} HTTP {result['status_code']}")
+            style = self.style.SUCCESS if result["passed"] else self.style.ERROR
+            self.stderr.write(style(line))
+        if not report["passed"] and not options["no_fail"]:
+            raise CommandError("存在超出预算或请求失败的基准目标")
+
+    def _run(self, scale, targets, options):
+        report = {}
+        try:
+            with transaction.atomic():
+                dataset = {} if options["skip_generate"] else generate_dataset(scale, seed=options["seed"])
+                user = get_user_model().objects.create_superuser(
+                    username=f"benchmark_{uuid.uuid4().hex[:8]}", password=None, email=""
+                )
+                report = run_benchmarks(
+                    user,
+                    targets=targets,
+                    repeat=options["repeat"],
+                    context={"scale": scale.as_dict(), "dataset": dataset},
+                )
+                if not options["keep_data"]:
+                    raise _Rollback
+                user.delete()
+        except _Rollback:
+            pass
+        return report
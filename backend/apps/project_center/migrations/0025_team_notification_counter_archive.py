@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('project_center', '0024_allow_null_structure_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectNotificationUnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='team_notification_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+                ('team_change_count', models.PositiveIntegerField(default=0, verbose_name='团队变更未读数')),
+                ('quality_alert_count', models.PositiveIntegerField(default=0, verbose_name='质量提醒未读数')),
+                ('updated_time', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '项目通知未读计数',
+                'verbose_name_plural': '项目通知未读计数',
+                'db_table': 'project_center_team_notification_counter',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectTeamNotificationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='原通知ID')),
+                ('title', models.CharField(max_length=200, verbose_name='标题')),
+                ('message', models.TextField(verbose_name='内容')),
+                ('category', models.CharField(choices=[('team_change', '团队变更'), ('quality_alert', '质量提醒')], default='team_change', max_length=50, verbose_name='通知分类')),
+                ('action_url', models.CharField(blank=True, max_length=300, verbose_name='跳转链接')),
+                ('created_time', models.DateTimeField(verbose_name='创建时间')),
+                ('read_time', models.DateTimeField(blank=True, null=True, verbose_name='读取时间')),
+                ('context', models.JSONField(blank=True, default=dict, verbose_name='上下文信息')),
+                ('archived_time', models.DateTimeField(default=django.utils.timezone.now, verbose_name='归档时间')),
+            ],
+            options={
+                'verbose_name': '项目团队通知归档',
+                'verbose_name_plural': '项目团队通知归档',
+                'db_table': 'project_center_team_notification_archive',
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='projectteamnotification',
+            index=models.Index(fields=['recipient', '-id'], name='project_cen_recipie_219294_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectteamnotification',
+            index=models.Index(fields=['recipient', 'is_read', 'category'], name='project_cen_recipie_9bd7a1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectteamnotification',
+            index=models.Index(fields=['is_read', 'created_time'], name='project_cen_is_read_0a265c_idx'),
+        ),
+        migrations.AddField(
+            model_name='projectteamnotificationarchive',
+            name='operator',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='操作人'),
+        ),
+        migrations.AddField(
+            model_name='projectteamnotificationarchive',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_team_notifications', to='project_center.project', verbose_name='项目'),
+        ),
+        migrations.AddField(
+            model_name='projectteamnotificationarchive',
+            name='recipient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_team_notifications', to=settings.AUTH_USER_MODEL, verbose_name='接收人'),
+        ),
+        migrations.AddIndex(
+            model_name='projectteamnotificationarchive',
+            index=models.Index(fields=['recipient', '-id'], name='project_cen_recipie_6a888c_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_center', '0025_team_notification_counter_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectmilestone',
+            index=models.Index(fields=['is_completed', 'planned_date'], name='milestone_done_planned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectmilestone',
+            index=models.Index(fields=['project', 'planned_date'], name='milestone_project_planned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projecttask',
+            index=models.Index(fields=['project', 'assigned_role', 'status'], name='project_task_role_status_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_center', '0026_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectarchive',
+            name='package_checksum',
+            field=models.CharField(blank=True, max_length=64, verbose_name='归档包SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='projectarchive',
+            name='package_completed_time',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='打包完成时间'),
+        ),
+        migrations.AddField(
+            model_name='projectarchive',
+            name='package_error',
+            field=models.TextField(blank=True, verbose_name='打包错误信息'),
+        ),
+        migrations.AddField(
+            model_name='projectarchive',
+            name='package_file',
+            field=models.FileField(blank=True, max_length=500, upload_to='project_archives/%Y/%m/', verbose_name='归档包文件'),
+        ),
+        migrations.AddField(
+            model_name='projectarchive',
+            name='package_file_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='归档包文件数'),
+        ),
+        migrations.AddField(
+            model_name='projectarchive',
+            name='package_requested_time',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='打包请求时间'),
+        ),
+        migrations.AddField(
+            model_name='projectarchive',
+            name='package_size',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='归档包大小'),
+        ),
+        migrations.AddField(
+            model_name='projectarchive',
+            name='package_status',
+            field=models.CharField(choices=[('none', '未打包'), ('pending', '排队中'), ('building', '打包中'), ('ready', '已生成'), ('failed', '打包失败')], default='none', max_length=20, verbose_name='归档包状态'),
+        ),
+    ]
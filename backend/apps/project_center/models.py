@@ -746,11 +746,62 @@ class ProjectTeamNotification(models.Model):
         verbose_name = '项目团队通知'
         verbose_name_plural = verbose_name
         ordering = ['-created_time']
+        indexes = [
+            # 通知列表按主键倒序分页、未读统计
+            models.Index(fields=['recipient', '-id']),
+            models.Index(fields=['recipient', 'is_read', 'category']),
+            # 归档任务按创建时间扫描已读通知
+            models.Index(fields=['is_read', 'created_time']),
+        ]
 
     def __str__(self):
         return f"{self.project.project_number if self.project_id else '未知项目'} - {self.title}"
 
 
+class ProjectTeamNotificationArchive(models.Model):
+    """已归档的项目团队通知（保留期外的已读通知，主键沿用原通知）"""
+    id = models.BigIntegerField(primary_key=True, verbose_name='原通知ID')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='archived_team_notifications', verbose_name='项目')
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_team_notifications', verbose_name='接收人')
+    operator = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='操作人')
+    title = models.CharField(max_length=200, verbose_name='标题')
+    message = models.TextField(verbose_name='内容')
+    category = models.CharField(max_length=50, choices=ProjectTeamNotification.CATEGORY_CHOICES, default='team_change', verbose_name='通知分类')
+    action_url = models.CharField(max_length=300, blank=True, verbose_name='跳转链接')
+    created_time = models.DateTimeField(verbose_name='创建时间')
+    read_time = models.DateTimeField(null=True, blank=True, verbose_name='读取时间')
+    context = models.JSONField(default=dict, blank=True, verbose_name='上下文信息')
+    archived_time = models.DateTimeField(default=timezone.now, verbose_name='归档时间')
+
+    class Meta:
+        db_table = 'project_center_team_notification_archive'
+        verbose_name = '项目团队通知归档'
+        verbose_name_plural = verbose_name
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['recipient', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.project.project_number if self.project_id else '未知项目'} - {self.title}"
+
+
+class ProjectNotificationUnreadCounter(models.Model):
+    """用户项目通知未读计数（通知新建、已读、删除时增量维护，缺失时按需重算）"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='team_notification_counter', verbose_name='用户')
+    team_change_count = models.PositiveIntegerField(default=0, verbose_name='团队变更未读数')
+    quality_alert_count = models.PositiveIntegerField(default=0, verbose_name='质量提醒未读数')
+    updated_time = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        db_table = 'project_center_team_notification_counter'
+        verbose_name = '项目通知未读计数'
+        verbose_name_plural = verbose_name
+
+    def __str__(self):
+        return f"{self.user.username} - {self.team_change_count + self.quality_alert_count}"
+
+
 class ProjectTask(models.Model):
     """项目阶段任务 / 待办"""
 
@@ -826,6 +877,7 @@ class ProjectTask(models.Model):
         indexes = [
             models.Index(fields=['project', 'task_type']),
             models.Index(fields=['project', 'status']),
+            models.Index(fields=['project', 'assigned_role', 'status'], name='project_task_role_status_idx'),
         ]
 
     def __str__(self):
@@ -924,6 +976,10 @@ class ProjectMilestone(models.Model):
         verbose_name = '项目里程碑'
         verbose_name_plural = verbose_name
         ordering = ['planned_date']
+        indexes = [
+            models.Index(fields=['is_completed', 'planned_date'], name='milestone_done_planned_idx'),
+            models.Index(fields=['project', 'planned_date'], name='milestone_project_planned_idx'),
+        ]
 
 
 class ProjectDrawingSubmission(models.Model):
@@ -1091,6 +1147,14 @@ class ProjectDocument(models.Model):
 
 class ProjectArchive(models.Model):
     """项目归档"""
+    PACKAGE_STATUS_CHOICES = [
+        ('none', '未打包'),
+        ('pending', '排队中'),
+        ('building', '打包中'),
+        ('ready', '已生成'),
+        ('failed', '打包失败'),
+    ]
+
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='archives', verbose_name='项目')
     archive_number = models.CharField(max_length=50, unique=True, verbose_name='归档编号')
     archive_time = models.DateTimeField(default=timezone.now, verbose_name='归档时间')
@@ -1101,6 +1165,14 @@ class ProjectArchive(models.Model):
     download_permissions = models.JSONField(default=list, blank=True, verbose_name='下载权限')
     modify_permissions = models.JSONField(default=list, blank=True, verbose_name='修改权限')
     notes = models.TextField(blank=True, verbose_name='备注')
+    package_status = models.CharField(max_length=20, choices=PACKAGE_STATUS_CHOICES, default='none', verbose_name='归档包状态')
+    package_file = models.FileField(upload_to='project_archives/%Y/%m/', max_length=500, blank=True, verbose_name='归档包文件')
+    package_size = models.PositiveBigIntegerField(default=0, verbose_name='归档包大小')
+    package_checksum = models.CharField(max_length=64, blank=True, verbose_name='归档包SHA-256')
+    package_file_count = models.PositiveIntegerField(default=0, verbose_name='归档包文件数')
+    package_error = models.TextField(blank=True, verbose_name='打包错误信息')
+    package_requested_time = models.DateTimeField(null=True, blank=True, verbose_name='打包请求时间')
+    package_completed_time = models.DateTimeField(null=True, blank=True, verbose_name='打包完成时间')
     created_time = models.DateTimeField(default=timezone.now, verbose_name='创建时间')
     
     class Meta:
@@ -1,4 +1,9 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.urls import reverse
 from rest_framework import serializers
+
+from backend.core.sparse_fields import FieldPlan, SparseFieldsMixin
 from .models import (
     Project,
     ProjectTeam,
@@ -28,19 +33,27 @@ class ProjectMilestoneSerializer(serializers.ModelSerializer):
 
 class ProjectDocumentSerializer(serializers.ModelSerializer):
     uploaded_by_name = serializers.CharField(source='uploaded_by.get_full_name', read_only=True)
+    download_url = serializers.SerializerMethodField()
     
     class Meta:
         model = ProjectDocument
         fields = '__all__'
+    
+    def get_download_url(self, obj):
+        return reverse('project_pages:project_document_download', args=[obj.pk]) if obj.file else ''
 
 class ProjectDrawingFileSerializer(serializers.ModelSerializer):
     uploaded_by_name = serializers.CharField(source='uploaded_by.get_full_name', read_only=True)
+    download_url = serializers.SerializerMethodField()
 
     class Meta:
         model = ProjectDrawingFile
         fields = '__all__'
         read_only_fields = ['uploaded_time', 'uploaded_by']
 
+    def get_download_url(self, obj):
+        return reverse('project_pages:drawing_file_download', args=[obj.pk]) if obj.file else ''
+
 
 class ProjectDrawingReviewSerializer(serializers.ModelSerializer):
     reviewer_name = serializers.CharField(source='reviewer.get_full_name', read_only=True)
@@ -90,7 +103,39 @@ class ProjectStartNoticeSerializer(serializers.ModelSerializer):
         ]
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+def _project_count(model, **filters):
+    """按项目统计子表行数的相关子查询；多个计数互不 JOIN，不会放大结果行"""
+    rows = (
+        model.objects.filter(project=OuterRef('pk'), **filters)
+        .order_by().values('project').annotate(total=Count('pk')).values('total')[:1]
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+# 进度按里程碑完成比例计算；以注解一次算出，避免每个项目两次 count 查询
+PROGRESS_PLAN = FieldPlan(annotate={
+    'milestone_total': _project_count(ProjectMilestone),
+    'milestone_completed': _project_count(ProjectMilestone, is_completed=True),
+})
+PROFESSION_PLAN = FieldPlan(prefetch=('service_professions',))
+
+
+class ProjectProgressMixin:
+    def get_progress_rate(self, obj):
+        total = getattr(obj, 'milestone_total', None)
+        if total is None:
+            total = obj.milestones.count()
+            completed = obj.milestones.filter(is_completed=True).count()
+        else:
+            completed = obj.milestone_completed
+        return int((completed / total * 100) if total > 0 else 0)
+
+    def get_service_profession_names(self, obj):
+        # 使用预取结果，不再逐个项目查询
+        return [profession.name for profession in obj.service_professions.all()]
+
+
+class ProjectSerializer(ProjectProgressMixin, SparseFieldsMixin, serializers.ModelSerializer):
     project_manager_name = serializers.CharField(source='project_manager.get_full_name', read_only=True)
     business_manager_name = serializers.CharField(source='business_manager.get_full_name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
@@ -111,14 +156,44 @@ class ProjectSerializer(serializers.ModelSerializer):
         model = Project
         fields = '__all__'
         read_only_fields = ['project_number', 'created_time', 'updated_time']
-    
-    def get_progress_rate(self, obj):
-        completed_milestones = obj.milestones.filter(is_completed=True).count()
-        total_milestones = obj.milestones.count()
-        return int((completed_milestones / total_milestones * 100) if total_milestones > 0 else 0)
+        query_plan = {
+            'progress_rate': PROGRESS_PLAN,
+            'service_profession_names': PROFESSION_PLAN,
+        }
+
+
+class ProjectListSerializer(ProjectProgressMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    """项目列表：只含列表展示所需字段，团队成员、里程碑通过 ?expand= 按需展开"""
+    project_manager_name = serializers.CharField(source='project_manager.get_full_name', read_only=True)
+    business_manager_name = serializers.CharField(source='business_manager.get_full_name', read_only=True)
+    client_name = serializers.CharField(source='client.name', read_only=True)
+    service_type_name = serializers.CharField(source='service_type.name', read_only=True)
+    service_profession_names = serializers.SerializerMethodField()
+    progress_rate = serializers.SerializerMethodField()
+    team_member_count = serializers.IntegerField(read_only=True)
+
+    team_members = ProjectTeamSerializer(many=True, read_only=True)
+    milestones = ProjectMilestoneSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Project
+        fields = [
+            'id', 'project_number', 'name', 'alias', 'subsidiary', 'status', 'launch_status', 'flow_step',
+            'service_type', 'service_type_name', 'business_type', 'design_stage', 'service_profession_names',
+            'client', 'client_name', 'client_company_name',
+            'project_manager', 'project_manager_name', 'business_manager', 'business_manager_name',
+            'contract_amount', 'start_date', 'end_date', 'progress_rate', 'team_member_count',
+            'created_time', 'updated_time',
+            'team_members', 'milestones',
+        ]
+        read_only_fields = fields
+        expandable_fields = ('team_members', 'milestones')
+        query_plan = {
+            'progress_rate': PROGRESS_PLAN,
+            'service_profession_names': PROFESSION_PLAN,
+            'team_member_count': FieldPlan(annotate={'team_member_count': _project_count(ProjectTeam)}),
+        }
 
-    def get_service_profession_names(self, obj):
-        return list(obj.service_professions.values_list('name', flat=True))
 
 class ProjectCreateSerializer(serializers.ModelSerializer):
     service_professions = serializers.PrimaryKeyRelatedField(
@@ -155,7 +230,11 @@ class ProjectArchiveSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProjectArchive
         fields = '__all__'
-        read_only_fields = ['archive_number', 'archive_time', 'created_time']
+        read_only_fields = [
+            'archive_number', 'archive_time', 'created_time',
+            'package_status', 'package_file', 'package_size', 'package_checksum', 'package_file_count',
+            'package_error', 'package_requested_time', 'package_completed_time',
+        ]
 
 
 class ProjectTeamNotificationSerializer(serializers.ModelSerializer):
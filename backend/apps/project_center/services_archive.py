@@ -0,0 +1,258 @@
+"""
+项目归档包
+
+归档时把项目的文档、图纸提交文件、交付文件和意见附件打成一个 ZIP，供一次性下载：
+
+- 后台任务逐个文件以固定大小的块读入 ZipFile.open(..., 'w') 写出，同时计算 SHA-256，
+  内存占用与文件数量、大小无关；已压缩格式（pdf、dwg、图片、压缩包）直接存储，不再二次压缩；
+- 包内最后写入 manifest.json，列出每个文件的包内路径、来源记录、大小和 SHA-256，
+  存储中缺失的文件记入 missing 而不中断打包；
+- 成品先写临时文件再存入 package_file，并记录整包 SHA-256；之后的下载直接发送已存储的文件。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import posixpath
+import re
+import secrets
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Iterator, Optional
+
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from backend.apps.delivery_customer.models import DeliveryFile
+from backend.apps.production_quality.models import OpinionAttachment
+from backend.core.downloads import CHUNK_SIZE
+
+from .models import ProjectArchive, ProjectDocument, ProjectDrawingFile
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+QUERY_CHUNK_SIZE = 200
+# 排队或打包超过该时长仍未完成，视为任务丢失，允许重新入队
+BUILD_STALE_AFTER = timedelta(hours=2)
+# 本身已压缩的格式直接存储
+STORED_EXTENSIONS = frozenset({
+    '.pdf', '.dwg', '.jpg', '.jpeg', '.png', '.gif', '.zip', '.rar', '.7z', '.gz',
+    '.docx', '.xlsx', '.pptx', '.mp4',
+})
+_UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+@dataclass
+class ArchiveEntry:
+    arcname: str
+    field_file: object
+    source: str
+    source_id: int
+
+
+def _safe_name(value, fallback: str = 'file') -> str:
+    cleaned = _UNSAFE_CHARS.sub('_', str(value or '')).strip(' .')
+    return cleaned[:120] or fallback
+
+
+def _basename(field_file) -> str:
+    return _safe_name(posixpath.basename(field_file.name))
+
+
+def iter_archive_entries(project) -> Iterator[ArchiveEntry]:
+    """按来源依次产出项目的全部文件；包内路径以记录 ID 前缀保证唯一"""
+    documents = (
+        ProjectDocument.objects.filter(project=project).exclude(file='')
+        .only('id', 'document_type', 'file').order_by('id')
+    )
+    for document in documents.iterator(chunk_size=QUERY_CHUNK_SIZE):
+        yield ArchiveEntry(
+            f'documents/{document.document_type}/{document.id}_{_basename(document.file)}',
+            document.file, 'project_document', document.id,
+        )
+
+    drawings = (
+        ProjectDrawingFile.objects.filter(submission__project=project).exclude(file='')
+        .select_related('submission').only('id', 'file', 'submission__id', 'submission__title')
+        .order_by('submission_id', 'id')
+    )
+    for drawing in drawings.iterator(chunk_size=QUERY_CHUNK_SIZE):
+        folder = f'{drawing.submission.id}_{_safe_name(drawing.submission.title, "submission")}'
+        yield ArchiveEntry(
+            f'drawings/{folder}/{drawing.id}_{_basename(drawing.file)}',
+            drawing.file, 'drawing_file', drawing.id,
+        )
+
+    deliveries = (
+        DeliveryFile.objects.filter(delivery_record__project=project, is_deleted=False).exclude(file='')
+        .select_related('delivery_record').only('id', 'file', 'file_name', 'delivery_record__delivery_number')
+        .order_by('delivery_record_id', 'id')
+    )
+    for delivery in deliveries.iterator(chunk_size=QUERY_CHUNK_SIZE):
+        folder = _safe_name(delivery.delivery_record.delivery_number, 'delivery')
+        name = _safe_name(delivery.file_name) if delivery.file_name else _basename(delivery.file)
+        yield ArchiveEntry(f'deliveries/{folder}/{delivery.id}_{name}', delivery.file, 'delivery_file', delivery.id)
+
+    attachments = (
+        OpinionAttachment.objects.filter(opinion__project=project).exclude(file='')
+        .select_related('opinion').only('id', 'file', 'opinion__opinion_number')
+        .order_by('opinion_id', 'id')
+    )
+    for attachment in attachments.iterator(chunk_size=QUERY_CHUNK_SIZE):
+        folder = _safe_name(attachment.opinion.opinion_number, 'opinion')
+        yield ArchiveEntry(
+            f'opinions/{folder}/{attachment.id}_{_basename(attachment.file)}',
+            attachment.file, 'opinion_attachment', attachment.id,
+        )
+
+
+def _zip_info(arcname: str, size: int, modified) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(arcname, date_time=timezone.localtime(modified).timetuple()[:6])
+    info.file_size = size  # 预先告知大小，超过 4GB 的文件自动使用 ZIP64 头
+    extension = posixpath.splitext(arcname)[1].lower()
+    info.compress_type = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    return info
+
+
+def _write_entry(zf: zipfile.ZipFile, entry: ArchiveEntry) -> dict:
+    storage, name = entry.field_file.storage, entry.field_file.name
+    size = storage.size(name)
+    try:
+        modified = storage.get_modified_time(name)
+    except NotImplementedError:
+        modified = timezone.now()
+    digest = hashlib.sha256()
+    with storage.open(name, 'rb') as source, zf.open(_zip_info(entry.arcname, size, modified), 'w') as target:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            target.write(chunk)
+    return {
+        'path': entry.arcname,
+        'source': entry.source,
+        'source_id': entry.source_id,
+        'size': size,
+        'sha256': digest.hexdigest(),
+    }
+
+
+def write_archive_package(fileobj, archive: ProjectArchive) -> dict:
+    """把归档项目的文件流式写入 fileobj，返回 manifest"""
+    project = archive.project
+    files, missing = [], []
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        for entry in iter_archive_entries(project):
+            try:
+                files.append(_write_entry(zf, entry))
+            except (FileNotFoundError, OSError) as exc:
+                logger.warning('归档包跳过缺失文件: archive=%s path=%s (%s)', archive.id, entry.field_file.name, exc)
+                missing.append({'path': entry.arcname, 'source': entry.source, 'source_id': entry.source_id})
+        manifest = {
+            'archive_number': archive.archive_number,
+            'archive_version': archive.archive_version,
+            'project': {'id': project.id, 'project_number': project.project_number, 'name': project.name},
+            'generated_at': timezone.now().isoformat(),
+            'algorithm': 'sha256',
+            'file_count': len(files),
+            'total_size': sum(item['size'] for item in files),
+            'files': files,
+            'missing': missing,
+        }
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+    return manifest
+
+
+def _file_checksum(fileobj) -> str:
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def package_filename(archive: ProjectArchive) -> str:
+    """下载时使用的文件名"""
+    return f'{_safe_name(archive.project.project_number, "project")}_{archive.archive_number}_v{archive.archive_version}.zip'
+
+
+def _storage_name(archive: ProjectArchive) -> str:
+    """存储文件名带随机后缀，即使绕过鉴权直接访问媒体目录也无法按项目编号猜出路径"""
+    return f'{package_filename(archive)[:-len(".zip")]}_{secrets.token_hex(16)}.zip'
+
+
+def package_available(archive: ProjectArchive) -> bool:
+    return archive.package_status == 'ready' and bool(archive.package_file) and \
+        archive.package_file.storage.exists(archive.package_file.name)
+
+
+def _enqueue(archive: ProjectArchive) -> None:
+    from .tasks import build_project_archive_package
+
+    transaction.on_commit(lambda: build_project_archive_package.delay(archive.id))
+
+
+def request_archive_package(archive: ProjectArchive, force: bool = False) -> bool:
+    """请求生成归档包，返回是否入队；已生成或正在打包的不重复入队"""
+    if not force:
+        if package_available(archive):
+            return False
+        in_flight = archive.package_status in ('pending', 'building')
+        fresh = archive.package_requested_time and archive.package_requested_time > timezone.now() - BUILD_STALE_AFTER
+        if in_flight and fresh:
+            return False
+    archive.package_status = 'pending'
+    archive.package_error = ''
+    archive.package_requested_time = timezone.now()
+    archive.save(update_fields=['package_status', 'package_error', 'package_requested_time'])
+    _enqueue(archive)
+    return True
+
+
+def build_archive_package(archive_id: int) -> Optional[ProjectArchive]:
+    """后台任务入口：写临时文件后存储，记录整包校验和"""
+    claimed = ProjectArchive.objects.filter(pk=archive_id, package_status__in=['pending', 'failed']).update(
+        package_status='building'
+    )
+    if not claimed:
+        return None
+    archive = ProjectArchive.objects.select_related('project').get(pk=archive_id)
+    previous = archive.package_file.name if archive.package_file else ''
+
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            manifest = write_archive_package(tmp, archive)
+            archive.package_checksum = _file_checksum(tmp)
+            archive.package_file.save(_storage_name(archive), File(tmp), save=False)
+        archive.package_size = archive.package_file.size
+        archive.package_file_count = manifest['file_count']
+        archive.package_status = 'ready'
+        archive.package_error = ''
+        archive.package_completed_time = timezone.now()
+        archive.save(update_fields=[
+            'package_file', 'package_size', 'package_checksum', 'package_file_count',
+            'package_status', 'package_error', 'package_completed_time',
+        ])
+    except Exception as exc:
+        logger.exception('归档包生成失败: archive=%s', archive_id)
+        ProjectArchive.objects.filter(pk=archive_id).update(package_status='failed', package_error=str(exc)[:2000])
+        raise
+
+    if previous and previous != archive.package_file.name:
+        archive.package_file.storage.delete(previous)
+    return archive
+
+
+def reset_stale_builds() -> int:
+    """排队或打包已超时的归档包（任务丢失、worker 中断）重置为排队中，返回条数"""
+    cutoff = timezone.now() - BUILD_STALE_AFTER
+    return ProjectArchive.objects.filter(
+        package_status__in=['pending', 'building'], package_requested_time__lt=cutoff,
+    ).update(package_status='pending', package_requested_time=timezone.now())
@@ -0,0 +1,85 @@
+"""
+项目详情页签缓存
+
+项目详情页只渲染外壳（头部、流程进度、待办侧栏），其余页签进入视口或被点开时再按需请求。
+与用户无关的页签数据按（页签, 项目, 项目数据版本, 当天日期）缓存：
+
+- 每个项目一个数据版本号，项目本身以及 PROJECT_VERSION_MODELS 中按 project_id 归属的记录保存、删除时换新值；
+- 批量写入（bulk_create / queryset.update）不触发信号，需显式调用 bump_project_version；
+- 用户姓名等跨项目数据的变化不会换版本，由缓存过期时间兜底。
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from backend.core.db_router import use_primary
+
+KEY_PREFIX = 'project_detail:v1'
+
+# 影响可缓存页签的、直接归属项目的模型
+PROJECT_VERSION_MODELS = (
+    'project_center.ProjectMilestone',
+    'project_center.ProjectTeam',
+    'project_center.ProjectDocument',
+)
+
+
+def _version_key(project_id: int) -> str:
+    return f'{KEY_PREFIX}:version:{project_id}'
+
+
+def project_version(project_id: int) -> int:
+    key = _version_key(project_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_project_version(project_id: int) -> None:
+    """项目数据已变化，使该项目的页签缓存失效"""
+    cache.set(_version_key(project_id), time.time_ns(), None)
+
+
+def cached_tab(project_id: int, tab: str, compute: Callable[[], Any]) -> Any:
+    """读取或计算页签数据；compute 的结果不得依赖当前用户
+
+    写入在主库上更新版本号，此时副本可能尚未追上；结果要按新版本号共享缓存，
+    因此 compute 固定从主库读取，避免把滞后的数据缓存到下一次写入为止。
+    """
+    key = f'{KEY_PREFIX}:{tab}:{project_id}:{project_version(project_id)}:{timezone.localdate().isoformat()}'
+    value = cache.get(key)
+    if value is None:
+        with use_primary():
+            value = compute()
+        cache.set(key, value, getattr(settings, 'PROJECT_DETAIL_CACHE_TIMEOUT', 300))
+    return value
+
+
+def _project_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_project_version(instance.pk)
+
+
+def _related_saved(sender, instance, raw=False, **kwargs):
+    if not raw and instance.project_id:
+        bump_project_version(instance.project_id)
+
+
+def connect_project_version_signals() -> None:
+    project_model = apps.get_model('project_center.Project')
+    post_save.connect(_project_saved, sender=project_model, dispatch_uid='project_detail_version_save_project')
+    post_delete.connect(_project_saved, sender=project_model, dispatch_uid='project_detail_version_delete_project')
+    for label in PROJECT_VERSION_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_related_saved, sender=model, dispatch_uid=f'project_detail_version_save_{label}')
+        post_delete.connect(_related_saved, sender=model, dispatch_uid=f'project_detail_version_delete_{label}')
@@ -0,0 +1,509 @@
+"""
+团队 / 质量通知推送
+
+通知创建、已读状态变化后（事务提交时）向接收人的频道发布事件，
+首页通过 SSE（/project/notifications/stream/）增量更新通知面板和未读数，不再整页刷新。
+
+每个 SSE 连接在同步（gthread）worker 中占用一个线程直到断开，因此每个进程同时保持的连接数受
+NOTIFICATION_STREAM_MAX_PER_PROCESS 限制，超出的浏览器改为定期请求 /project/notifications/poll/，
+过一段时间再尝试建立连接；部署时须使用多线程 worker（gunicorn --worker-class gthread），
+并让线程数明显大于该上限。
+
+频道实现按配置选择：配置 REDIS_URL 时使用 Redis pub/sub，数据库为 PostgreSQL 时使用
+LISTEN/NOTIFY，二者都不可用时（如 SQLite 开发环境）退化为定期查询新通知。
+
+未读数保存在 ProjectNotificationUnreadCounter 中，由同一组信号增量维护；批量标记已读须走
+mark_notifications_read。保留期外的已读通知由 archive_team_notifications 移入归档表。
+"""
+from __future__ import annotations
+
+import functools
+from collections import Counter, defaultdict
+import json
+import logging
+import select
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ProjectNotificationUnreadCounter, ProjectTeamNotification, ProjectTeamNotificationArchive
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_CATEGORIES = ('team_change', 'quality_alert')
+# 分类 -> 未读计数字段
+COUNTER_FIELDS = {
+    'team_change': 'team_change_count',
+    'quality_alert': 'quality_alert_count',
+}
+ARCHIVE_FIELDS = (
+    'id', 'project_id', 'recipient_id', 'operator_id', 'title', 'message', 'category',
+    'action_url', 'created_time', 'read_time', 'context',
+)
+# NOTIFY 负载上限约 8000 字节，推送内容中的正文做截断
+MAX_DETAIL_LENGTH = 500
+STREAM_HEARTBEAT_SECONDS = 20
+# 单个连接的最长保持时间，到期后由浏览器 EventSource 自动重连
+STREAM_MAX_SECONDS = 300
+STREAM_RETRY_MS = 5000
+# 未配置时每个进程最多保持的 SSE 连接数
+DEFAULT_STREAM_MAX_PER_PROCESS = 4
+
+
+def channel_name(user_id: int) -> str:
+    return f'notifications_user_{int(user_id)}'
+
+
+def _with_total(counts: Dict[str, int]) -> Dict[str, int]:
+    counts['total'] = sum(counts[category] for category in NOTIFICATION_CATEGORIES)
+    return counts
+
+
+def recount_unread(user_id: int) -> Dict[str, int]:
+    """按实际数据重算单个用户的未读数并写回计数表"""
+    rows = dict(
+        ProjectTeamNotification.objects.filter(recipient_id=user_id, is_read=False)
+        .order_by().values_list('category').annotate(total=Count('pk'))
+    )
+    counts = {category: rows.get(category, 0) for category in NOTIFICATION_CATEGORIES}
+    ProjectNotificationUnreadCounter.objects.update_or_create(
+        user_id=user_id, defaults={COUNTER_FIELDS[category]: counts[category] for category in NOTIFICATION_CATEGORIES},
+    )
+    return _with_total(counts)
+
+
+def unread_counts(user_id: int) -> Dict[str, int]:
+    """按分类的未读通知数；计数行存在时只读一行，不存在时重算并建行"""
+    row = ProjectNotificationUnreadCounter.objects.filter(user_id=user_id).values(*COUNTER_FIELDS.values()).first()
+    if row is None:
+        return recount_unread(user_id)
+    return _with_total({category: row[field] for category, field in COUNTER_FIELDS.items()})
+
+
+def _adjust_counter(user_id: Optional[int], category: str, delta: int) -> None:
+    """增减未读计数；计数行尚未建立时跳过，首次读取时会整体重算"""
+    field = COUNTER_FIELDS.get(category)
+    if not user_id or not field or not delta:
+        return
+    ProjectNotificationUnreadCounter.objects.filter(user_id=user_id).update(
+        **{field: Greatest(F(field) + delta, Value(0))}, updated_time=timezone.now(),
+    )
+
+
+def mark_notifications_read(queryset) -> int:
+    """批量标记已读并同步未读计数、推送最新未读数，返回新标记数量"""
+    with transaction.atomic():
+        # 先锁定待更新的行，并发的重复标记会在锁释放后被 is_read 条件排除，计数不会重复扣减
+        rows = list(
+            ProjectTeamNotification.objects.filter(pk__in=queryset.values('pk'), is_read=False)
+            .select_for_update().values_list('pk', 'recipient_id', 'category')
+        )
+        if not rows:
+            return 0
+        ProjectTeamNotification.objects.filter(pk__in=[row[0] for row in rows]).update(
+            is_read=True, read_time=timezone.now(),
+        )
+        decrements = Counter((recipient_id, category) for _, recipient_id, category in rows)
+        for (recipient_id, category), count in decrements.items():
+            _adjust_counter(recipient_id, category, -count)
+        for recipient_id in {recipient_id for recipient_id, _ in decrements}:
+            publish_unread_counts(recipient_id)
+    return len(rows)
+
+
+def notification_entry(notification: ProjectTeamNotification) -> Dict:
+    """通知在首页通知中心的展示数据"""
+    project = notification.project
+    context_data = notification.context or {}
+    base_url = '#'
+    if project:
+        # 项目立项相关通知，使用立项详情页
+        if context_data.get('action') in {'pending_receive', 'received', 'rejected'} or '项目立项' in notification.title:
+            base_url = reverse('project_pages:project_initiation_detail', args=[project.id])
+        elif (
+            context_data.get('action') in {'project_received', 'assigned_project_manager'}
+            and project.status in {'waiting_receive', 'configuring'}
+            and notification.recipient.roles.filter(code='project_manager').exists()
+        ):
+            base_url = reverse('project_pages:project_complete', args=[project.id])
+        else:
+            base_url = reverse('project_pages:project_detail', args=[project.id])
+    return {
+        'id': notification.id,
+        'category': notification.category,
+        'title': notification.title,
+        'subtitle': project.project_number if project else '',
+        'detail': notification.message,
+        'is_unread': not notification.is_read,
+        'url': notification.action_url or base_url,
+    }
+
+
+# ---------------------------------------------------------------------------
+# 频道
+# ---------------------------------------------------------------------------
+
+class RedisChannel:
+    def __init__(self, url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel: str, message: str) -> None:
+        self.client.publish(channel, message)
+
+    def listen(self, channel: str, timeout: float) -> Iterator[Optional[str]]:
+        """订阅成功后先产出一次 None，之后逐条产出消息；timeout 秒内无消息时产出 None（用于心跳）"""
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+        try:
+            yield None
+            while True:
+                message = pubsub.get_message(timeout=timeout)
+                yield message['data'].decode() if message else None
+        finally:
+            pubsub.close()
+
+
+class PostgresChannel:
+    def publish(self, channel: str, message: str) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [channel, message])
+
+    def listen(self, channel: str, timeout: float) -> Iterator[Optional[str]]:
+        # LISTEN 需要独占连接，不能占用请求的数据库连接
+        listener = connection.get_new_connection(connection.get_connection_params())
+        listener.autocommit = True
+        try:
+            with listener.cursor() as cursor:
+                cursor.execute(f'LISTEN "{channel}"')
+            yield None
+            while True:
+                if select.select([listener], [], [], timeout) == ([], [], []):
+                    yield None
+                    continue
+                listener.poll()
+                while listener.notifies:
+                    yield listener.notifies.pop(0).payload
+        finally:
+            listener.close()
+
+
+class PollingChannel:
+    """无发布订阅能力时的退化实现：不发布，监听端每个周期唤醒一次自行查询"""
+
+    def publish(self, channel: str, message: str) -> None:
+        pass
+
+    def listen(self, channel: str, timeout: float) -> Iterator[Optional[str]]:
+        while True:
+            yield None
+
+
+@functools.lru_cache(maxsize=1)
+def get_channel():
+    redis_url = getattr(settings, 'NOTIFICATION_STREAM_REDIS_URL', None) or getattr(settings, 'REDIS_URL', None)
+    if redis_url:
+        return RedisChannel(redis_url)
+    if connection.vendor == 'postgresql':
+        return PostgresChannel()
+    return PollingChannel()
+
+
+def _publish(user_id: int, event: str, data: Dict, event_id: Optional[int] = None) -> None:
+    message = {'event': event, 'data': data}
+    if event_id is not None:
+        message['id'] = event_id
+    try:
+        get_channel().publish(channel_name(user_id), json.dumps(message, ensure_ascii=False, default=str))
+    except Exception:
+        # 推送失败不影响业务操作，客户端重连时会补齐
+        logger.warning('通知推送失败 user=%s event=%s', user_id, event, exc_info=True)
+
+
+def publish_unread_counts(user_id: int) -> None:
+    """事务提交后推送最新未读数"""
+    transaction.on_commit(lambda: _publish(user_id, 'counts', unread_counts(user_id)))
+
+
+def _publish_entry(notification: ProjectTeamNotification) -> None:
+    entry = notification_entry(notification)
+    entry['detail'] = entry['detail'][:MAX_DETAIL_LENGTH]
+    _publish(notification.recipient_id, 'notification', entry, event_id=notification.id)
+
+
+def publish_notification(notification: ProjectTeamNotification) -> None:
+    """事务提交后推送新通知及最新未读数"""
+    def send():
+        _publish_entry(notification)
+        _publish(notification.recipient_id, 'counts', unread_counts(notification.recipient_id))
+
+    transaction.on_commit(send)
+
+
+def bulk_create_notifications(notifications: List[ProjectTeamNotification]) -> List[ProjectTeamNotification]:
+    """批量创建通知：一条 INSERT 写入，按接收人和分类合并未读计数更新，事务提交后推送
+
+    bulk_create 不触发信号，未读计数与推送须在此显式完成。
+    """
+    if not notifications:
+        return []
+    with transaction.atomic():
+        created = ProjectTeamNotification.objects.bulk_create(notifications)
+        increments = Counter(
+            (notification.recipient_id, notification.category)
+            for notification in created if not notification.is_read
+        )
+        for (recipient_id, category), count in increments.items():
+            _adjust_counter(recipient_id, category, count)
+
+        def send():
+            for notification in created:
+                _publish_entry(notification)
+            # 每个接收人只推送一次最新未读数
+            for recipient_id in dict.fromkeys(notification.recipient_id for notification in created):
+                _publish(recipient_id, 'counts', unread_counts(recipient_id))
+
+        transaction.on_commit(send)
+    return created
+
+
+def notifications_since(user_id: int, last_id: int, limit: int = 20) -> List[Dict]:
+    """重连或轮询时补发 last_id 之后的新通知（按主键递增）"""
+    notifications = (
+        ProjectTeamNotification.objects.filter(recipient_id=user_id, pk__gt=last_id)
+        .select_related('project', 'recipient')
+        .order_by('pk')[:limit]
+    )
+    return [notification_entry(notification) for notification in notifications]
+
+
+def latest_notification_id(user_id: int) -> int:
+    return (
+        ProjectTeamNotification.objects.filter(recipient_id=user_id)
+        .order_by('-pk').values_list('pk', flat=True).first()
+    ) or 0
+
+
+def _sse(event: str, data, event_id: Optional[int] = None) -> str:
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(data, ensure_ascii=False, default=str))
+    return '\n'.join(lines) + '\n\n'
+
+
+def notification_event_stream(user_id: int, last_event_id: Optional[int] = None,
+                              heartbeat: float = STREAM_HEARTBEAT_SECONDS,
+                              lifetime: float = STREAM_MAX_SECONDS) -> Iterator[str]:
+    """SSE 事件流：先订阅频道，再补发断线期间的通知和当前未读数，之后转发频道消息"""
+    channel = get_channel()
+    polling = isinstance(channel, PollingChannel)
+    deadline = time.monotonic() + lifetime
+    messages = channel.listen(channel_name(user_id), heartbeat)
+    try:
+        next(messages)
+        yield f'retry: {STREAM_RETRY_MS}\n\n'
+        last_id = latest_notification_id(user_id) if last_event_id is None else last_event_id
+        for entry in notifications_since(user_id, last_id):
+            last_id = entry['id']
+            yield _sse('notification', entry, entry['id'])
+        yield _sse('counts', unread_counts(user_id))
+        if not polling and not connection.in_atomic_block:
+            # 之后只转发频道消息，不再占用请求的数据库连接
+            connection.close()
+
+        for message in messages:
+            if time.monotonic() >= deadline:
+                break
+            if message is None:
+                if polling:
+                    entries = notifications_since(user_id, last_id)
+                    for entry in entries:
+                        last_id = entry['id']
+                        yield _sse('notification', entry, entry['id'])
+                    yield _sse('counts', unread_counts(user_id))
+                yield ': keepalive\n\n'
+                continue
+            payload = json.loads(message)
+            event_id = payload.get('id')
+            if event_id is not None:
+                # 订阅后、补发前提交的通知可能重复，按主键去重
+                if event_id <= last_id:
+                    continue
+                last_id = event_id
+            yield _sse(payload['event'], payload['data'], event_id)
+    finally:
+        messages.close()
+
+
+class StreamSlots:
+    """进程内 SSE 连接计数：连接数达到上限后拒绝新连接，避免长连接占满 worker 线程"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def acquire(self) -> bool:
+        limit = getattr(settings, 'NOTIFICATION_STREAM_MAX_PER_PROCESS', DEFAULT_STREAM_MAX_PER_PROCESS)
+        with self._lock:
+            if self.active >= limit:
+                return False
+            self.active += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.active = max(self.active - 1, 0)
+
+
+stream_slots = StreamSlots()
+
+
+class _SlotStream:
+    """包装事件流：响应关闭时归还连接名额（即使生成器从未开始迭代）"""
+
+    def __init__(self, stream: Iterator[str]):
+        self._stream = stream
+        self._released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return next(self._stream)
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._released:
+                self._released = True
+                stream_slots.release()
+
+
+def open_notification_stream(user_id: int, last_event_id: Optional[int] = None) -> Optional[Iterator[str]]:
+    """占用一个连接名额并返回事件流；名额已满时返回 None，由调用方通知浏览器改为轮询"""
+    if not stream_slots.acquire():
+        return None
+    return _SlotStream(notification_event_stream(user_id, last_event_id))
+
+
+# ---------------------------------------------------------------------------
+# 信号处理
+# ---------------------------------------------------------------------------
+
+def _unread_key(recipient_id, category, is_read):
+    """通知对未读计数的贡献：未读时为 (接收人, 分类)，已读时为 None"""
+    return None if is_read else (recipient_id, category)
+
+
+def _remember_notification(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None
+    if instance.pk:
+        previous = (
+            ProjectTeamNotification.objects.filter(pk=instance.pk)
+            .values_list('recipient_id', 'category', 'is_read').first()
+        )
+    instance._counter_before = _unread_key(*previous) if previous else None
+
+
+def _notification_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_counter_before', None)
+    after = _unread_key(instance.recipient_id, instance.category, instance.is_read)
+    if before != after:
+        if before:
+            _adjust_counter(*before, -1)
+        if after:
+            _adjust_counter(*after, 1)
+    if created:
+        publish_notification(instance)
+    else:
+        publish_unread_counts(instance.recipient_id)
+        if before and before[0] != instance.recipient_id:
+            publish_unread_counts(before[0])
+
+
+def _notification_deleted(sender, instance, **kwargs):
+    # 已读通知（包括归档时删除的）不影响未读数
+    if not instance.is_read:
+        _adjust_counter(instance.recipient_id, instance.category, -1)
+        publish_unread_counts(instance.recipient_id)
+
+
+def connect_notification_signals() -> None:
+    """在应用就绪后挂载未读计数与推送信号；批量标记已读需调用 mark_notifications_read"""
+    pre_save.connect(_remember_notification, sender=ProjectTeamNotification, dispatch_uid='team_notification_counter_pre_save')
+    post_save.connect(_notification_saved, sender=ProjectTeamNotification, dispatch_uid='team_notification_push_save')
+    post_delete.connect(_notification_deleted, sender=ProjectTeamNotification, dispatch_uid='team_notification_push_delete')
+
+
+# ---------------------------------------------------------------------------
+# 全量校准与归档
+# ---------------------------------------------------------------------------
+
+def rebuild_unread_counters() -> int:
+    """按通知表重算全部计数行（已有行一条 UPDATE，缺失行批量补建），返回有未读通知的用户数"""
+    unread = ProjectTeamNotification.objects.filter(is_read=False).order_by()
+    ProjectNotificationUnreadCounter.objects.update(
+        **{
+            field: Coalesce(
+                Subquery(
+                    unread.filter(recipient=OuterRef('user'), category=category)
+                    .values('recipient').annotate(total=Count('pk')).values('total')
+                ),
+                Value(0),
+            )
+            for category, field in COUNTER_FIELDS.items()
+        },
+        updated_time=timezone.now(),
+    )
+    missing = defaultdict(dict)
+    rows = (
+        unread.filter(recipient__team_notification_counter__isnull=True, category__in=COUNTER_FIELDS)
+        .values_list('recipient_id', 'category').annotate(total=Count('pk'))
+    )
+    for recipient_id, category, total in rows:
+        missing[recipient_id][COUNTER_FIELDS[category]] = total
+    ProjectNotificationUnreadCounter.objects.bulk_create(
+        [ProjectNotificationUnreadCounter(user_id=user_id, **counts) for user_id, counts in missing.items()],
+        ignore_conflicts=True,
+    )
+    return unread.values('recipient').distinct().count()
+
+
+def archive_read_notifications(days: int, batch_size: int = 1000, dry_run: bool = False) -> int:
+    """把创建早于 days 天的已读通知分批移入归档表，返回移动（或 dry_run 时待移动）的条数
+
+    未读通知不归档，因此不影响未读计数；每批在独立事务中复制后删除，中途失败可直接重跑。
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    candidates = ProjectTeamNotification.objects.filter(is_read=True, created_time__lt=cutoff).order_by('pk')
+    if dry_run:
+        return candidates.count()
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(candidates.select_for_update().values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                break
+            ProjectTeamNotificationArchive.objects.bulk_create(
+                [ProjectTeamNotificationArchive(**row) for row in rows], ignore_conflicts=True,
+            )
+            ProjectTeamNotification.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+        if len(rows) < batch_size:
+            break
+    return moved
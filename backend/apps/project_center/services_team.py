@@ -0,0 +1,270 @@
+"""
+项目团队同步
+
+sync_project_team 接收目标名单 [(user_id, role, service_profession_id), ...]，
+与一次查询得到的现有团队快照做差异：
+
+- 新增成员一次 bulk_create（此前停用的同一行直接恢复为有效）；
+- 移除成员一条 DELETE；
+- 变更日志和团队通知各一次 bulk_create；
+- 涉及的用户和专业各用一次 IN 查询预取。
+
+以上都在同一事务中完成，并返回结构化的变更结果。
+scopes 指定名单覆盖的（角色, 专业）范围，只有范围内名单未包含的现有成员才会被移除。
+不传 scopes 时只新增、不移除。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from backend.apps.system_management.models import User
+from backend.core.dashboard_cache import bump_data_version
+
+from .models import Project, ProjectTeam, ProjectTeamChangeLog, ProjectTeamNotification, ServiceProfession
+from .services_detail import bump_project_version
+from .services_notifications import bulk_create_notifications
+
+ROLE_LABELS = dict(ProjectTeam.ROLE_CHOICES)
+UNIT_LABELS = dict(ProjectTeam.UNIT_CHOICES)
+EXTERNAL_UNITS = {'external_tech', 'external_cost', 'client_side', 'design_side'}
+
+# (user_id, role, service_profession_id)
+RosterEntry = Tuple[int, str, Optional[int]]
+# (role, service_profession_id)
+TeamScope = Tuple[str, Optional[int]]
+
+
+def role_unit(role: str) -> Tuple[str, bool]:
+    """角色所属团队及是否外部成员（与 ProjectTeam.save 的规则一致）"""
+    unit = ProjectTeam.ROLE_UNIT_MAP.get(role, 'management')
+    return unit, unit in EXTERNAL_UNITS
+
+
+@dataclass
+class TeamChange:
+    member: Optional[User]
+    role: str
+    unit: str
+    is_external: bool
+    profession: Optional[ServiceProfession]
+
+    @property
+    def role_label(self) -> str:
+        return ROLE_LABELS.get(self.role, self.role)
+
+    @property
+    def unit_label(self) -> str:
+        return UNIT_LABELS.get(self.unit, '')
+
+    def as_dict(self) -> Dict:
+        return {
+            'member_id': self.member.id if self.member else None,
+            'member': self.member.username if self.member else None,
+            'role': self.role,
+            'role_label': self.role_label,
+            'unit': self.unit,
+            'is_external': self.is_external,
+            'profession': self.profession.name if self.profession else None,
+        }
+
+
+@dataclass
+class TeamSyncResult:
+    added: List[TeamChange] = field(default_factory=list)
+    removed: List[TeamChange] = field(default_factory=list)
+    unchanged: int = 0
+    summary: str = ''
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed)
+
+    def as_dict(self) -> Dict:
+        return {
+            'added': [change.as_dict() for change in self.added],
+            'removed': [change.as_dict() for change in self.removed],
+            'unchanged': self.unchanged,
+            'summary': self.summary,
+        }
+
+
+def _display_name(user: User) -> str:
+    return user.get_full_name() or user.username
+
+
+def _summarize(changes: List[TeamChange], verb: str) -> str:
+    names, seen, anonymous = [], set(), 0
+    for change in changes:
+        if change.member is None:
+            anonymous += 1
+        elif change.member.id not in seen:
+            seen.add(change.member.id)
+            names.append(_display_name(change.member))
+    text = f"{verb} {len(seen) + anonymous} 人"
+    if names:
+        text += f"：{'、'.join(names[:3])}{'…' if len(names) > 3 else ''}"
+    return text
+
+
+def summarize_changes(result: TeamSyncResult) -> str:
+    parts = []
+    if result.added:
+        parts.append(_summarize(result.added, '新增'))
+    if result.removed:
+        parts.append(_summarize(result.removed, '移除'))
+    return '；'.join(parts)
+
+
+def _member_notification(project, operator, operator_name, change: TeamChange, action: str, action_url: str):
+    profession_label = f"（{change.profession.name}）" if change.profession else ''
+    if action == 'added':
+        title = '团队新增成员'
+        message = f"您被指派为《{project.name}》({project.project_number}){change.unit_label}的{change.role_label}{profession_label}。"
+    else:
+        title = '团队成员调整'
+        message = f"您已从《{project.name}》({project.project_number}){change.unit_label}的{change.role_label}{profession_label}角色中移除。"
+    if operator_name:
+        message += f" 操作人：{operator_name}"
+    return ProjectTeamNotification(
+        project=project,
+        recipient=change.member,
+        operator=operator,
+        title=title,
+        message=message,
+        action_url=action_url,
+        context={
+            'action': action,
+            'role': change.role_label,
+            'profession': change.profession.name if change.profession else None,
+            'unit': change.unit_label,
+        },
+    )
+
+
+def build_team_notifications(project: Project, operator: Optional[User], result: TeamSyncResult) -> List[ProjectTeamNotification]:
+    """团队变更通知（未保存）：成员本人各一条，项目经理、商务经理、创建人及操作人各一条汇总"""
+    if not result.has_changes:
+        return []
+    operator_name = _display_name(operator) if operator else ''
+    action_url = reverse('project_pages:project_detail', args=[project.id])
+    notifications = [
+        _member_notification(project, operator, operator_name, change, action, action_url)
+        for action, changes in (('added', result.added), ('removed', result.removed))
+        for change in changes
+        if change.member is not None
+    ]
+
+    stakeholders = {project.project_manager, project.business_manager, project.created_by, operator}
+    stakeholders.discard(None)
+    message = f"{project.project_number} {project.name} 团队更新：{result.summary}"
+    if operator_name:
+        message += f"（操作人：{operator_name}）"
+    changed_roles = [
+        {
+            'member': change.member.username if change.member else None,
+            'role': change.role_label,
+            'unit': UNIT_LABELS.get(change.unit, change.unit),
+            'action': action,
+        }
+        for action, changes in (('added', result.added), ('removed', result.removed))
+        for change in changes
+    ]
+    for stakeholder in stakeholders:
+        notifications.append(ProjectTeamNotification(
+            project=project,
+            recipient=stakeholder,
+            operator=operator,
+            title='团队变更提醒',
+            message=message,
+            action_url=action_url,
+            context={'action': 'summary', 'summary': result.summary, 'changed_roles': changed_roles},
+        ))
+    return notifications
+
+
+def sync_project_team(
+    project: Project,
+    roster: Iterable[RosterEntry],
+    operator: Optional[User] = None,
+    scopes: Optional[Iterable[TeamScope]] = None,
+    notify: bool = True,
+) -> TeamSyncResult:
+    """按目标名单同步项目团队，返回变更结果"""
+    desired: Dict[Tuple[int, str, Optional[int]], None] = {}
+    for user_id, role, profession_id in roster:
+        if user_id:
+            desired[(int(user_id), role, int(profession_id) if profession_id else None)] = None
+    scope_set: Set[TeamScope] = {(role, profession_id or None) for role, profession_id in (scopes or ())}
+
+    with transaction.atomic():
+        # 唯一约束为 (project, user, role, service_profession)，快照包含已停用的行
+        rows = {
+            (row['user_id'], row['role'], row['service_profession_id']): row
+            for row in ProjectTeam.objects.filter(project=project).values(
+                'id', 'user_id', 'role', 'service_profession_id', 'unit', 'is_external', 'is_active',
+            )
+        }
+        to_add = [key for key in desired if key not in rows or not rows[key]['is_active']]
+        to_remove = [
+            row for key, row in rows.items()
+            if row['is_active'] and key not in desired and (row['role'], row['service_profession_id']) in scope_set
+        ]
+
+        users = User.objects.in_bulk({key[0] for key in to_add} | {row['user_id'] for row in to_remove})
+        professions = ServiceProfession.objects.in_bulk(
+            {key[2] for key in to_add if key[2]} | {row['service_profession_id'] for row in to_remove if row['service_profession_id']}
+        )
+        # 不存在的用户或专业直接忽略
+        to_add = [key for key in to_add if key[0] in users and (key[2] is None or key[2] in professions)]
+
+        result = TeamSyncResult(unchanged=sum(1 for key in desired if key in rows and rows[key]['is_active']))
+        today = timezone.localdate()
+        new_members, reactivated = [], []
+        for user_id, role, profession_id in to_add:
+            unit, is_external = role_unit(role)
+            existing = rows.get((user_id, role, profession_id))
+            if existing:
+                reactivated.append(ProjectTeam(
+                    id=existing['id'], unit=unit, is_external=is_external, is_active=True, join_date=today, leave_date=None,
+                ))
+            else:
+                new_members.append(ProjectTeam(
+                    project=project, user_id=user_id, role=role, service_profession_id=profession_id,
+                    unit=unit, is_external=is_external, join_date=today,
+                ))
+            result.added.append(TeamChange(users[user_id], role, unit, is_external, professions.get(profession_id)))
+        for row in to_remove:
+            result.removed.append(TeamChange(
+                users.get(row['user_id']), row['role'], row['unit'], row['is_external'],
+                professions.get(row['service_profession_id']),
+            ))
+
+        if not result.has_changes:
+            return result
+
+        ProjectTeam.objects.bulk_create(new_members)
+        ProjectTeam.objects.bulk_update(reactivated, ['unit', 'is_external', 'is_active', 'join_date', 'leave_date'])
+        if to_remove:
+            ProjectTeam.objects.filter(id__in=[row['id'] for row in to_remove]).delete()
+
+        ProjectTeamChangeLog.objects.bulk_create([
+            ProjectTeamChangeLog(
+                project=project, member=change.member, role=change.role, unit=change.unit,
+                is_external=change.is_external, service_profession=change.profession,
+                action=action, operator=operator,
+            )
+            for action, changes in (('added', result.added), ('removed', result.removed))
+            for change in changes
+        ])
+        result.summary = summarize_changes(result)
+        if notify:
+            bulk_create_notifications(build_team_notifications(project, operator, result))
+        # bulk_create / bulk_update 不触发信号，手动使看板与项目详情缓存失效
+        bump_data_version(ProjectTeam)
+        bump_project_version(project.id)
+    return result
@@ -0,0 +1,399 @@
+"""
+项目时间轴引擎
+
+服务阶段、里程碑甘特、延期与到期提醒由详情页、项目驾驶舱、任务看板和组合甘特共用。
+多个项目的里程碑用一次 values_list 读成列（日期换算为整数日序号），
+派生量按列整体计算，再按项目切片返回：
+
+- load_milestone_columns：一次查询，按 (project_id, planned_date, id) 排列，每个项目占连续一段；
+- build_timelines：计划起止、延期天数、状态、甘特偏移与宽度各一次整列运算，服务阶段按项目映射；
+- rank_delayed / bucket_due：跨项目的延期排序与到期分组，只返回行号，不实例化模型；
+- portfolio_axis / portfolio_rows / axis_position：把多个项目放到同一根时间轴上，供组合甘特使用。
+
+延期口径统一为：已完成且实际日期晚于计划日期，按实际日期计；未完成且计划日期已过，按今天计。
+"""
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .models import ProjectMilestone
+
+SERVICE_TIMELINE_TEMPLATES = {
+    "result_optimization": [
+        "优化前图纸",
+        "咨询意见书",
+        "三方沟通成果",
+        "核图意见书",
+        "优化后图纸",
+        "完工确认函",
+    ],
+    "detailed_review": [
+        "优化前图纸",
+        "咨询意见书",
+        "三方沟通成果",
+        "核图意见书",
+        "优化后图纸",
+        "完工确认函",
+    ],
+    "process_optimization": [
+        "优化前图纸",
+        "过程优化报告",
+        "核图意见书",
+        "优化后图纸",
+        "完工确认函",
+    ],
+    "full_process_consulting": [
+        "咨询意见周报",
+        "过程咨询报告",
+        "核图意见书",
+        "完工确认函",
+    ],
+}
+
+STATUS_LABELS = {
+    'completed': '已完成',
+    'in_progress': '进行中',
+    'delayed': '已延迟',
+}
+STATUS_BADGE_CLASSES = {
+    'completed': 'success',
+    'in_progress': 'primary',
+    'delayed': 'danger',
+}
+
+# 未设置项目周期且没有里程碑时的默认跨度；甘特条的最小显示宽度（百分比）
+DEFAULT_SPAN_DAYS = 30
+MIN_BAR_WIDTH = 4
+# 没有项目开始日期时，第一个里程碑的计划开始日期往前推的天数
+LEAD_IN_DAYS = 7
+
+_COLUMN_FIELDS = ('project_id', 'id', 'name', 'planned_date', 'actual_date', 'is_completed', 'completion_rate')
+
+
+@dataclass
+class MilestoneColumns:
+    """多个项目的里程碑列；日期为 date.toordinal() 的整数"""
+
+    project_id: List[int] = field(default_factory=list)
+    id: List[int] = field(default_factory=list)
+    name: List[str] = field(default_factory=list)
+    planned: List[int] = field(default_factory=list)
+    actual: List[Optional[int]] = field(default_factory=list)
+    completed: List[bool] = field(default_factory=list)
+    completion_rate: List[int] = field(default_factory=list)
+    # project_id -> (起始行, 结束行)，左闭右开
+    segments: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def rows(self, project_id: int) -> range:
+        return range(*self.segments.get(project_id, (0, 0)))
+
+
+@dataclass
+class ProjectTimeline:
+    project_id: int
+    rows: range
+    base_start: date
+    base_end: date
+    percent: int
+    completed: int
+    total: int
+    stages: List[dict]
+    stage_completion: int
+    current_stage: Optional[str]
+    tasks: List[dict]
+    summary: Dict[str, float]
+    delayed: List[dict]
+    overdue: List[dict]
+    upcoming: List[dict]
+
+
+def load_milestone_columns(project_ids: Iterable[int]) -> MilestoneColumns:
+    """一次查询读取若干项目的里程碑列"""
+    columns = MilestoneColumns()
+    project_ids = list(project_ids)
+    if not project_ids:
+        return columns
+    rows = list(
+        ProjectMilestone.objects.filter(project_id__in=project_ids)
+        .order_by('project_id', 'planned_date', 'id')
+        .values_list(*_COLUMN_FIELDS)
+    )
+    if not rows:
+        return columns
+    project_col, id_col, name_col, planned_col, actual_col, completed_col, rate_col = map(list, zip(*rows))
+    columns.project_id = project_col
+    columns.id = id_col
+    columns.name = name_col
+    columns.planned = [value.toordinal() for value in planned_col]
+    columns.actual = [value.toordinal() if value else None for value in actual_col]
+    columns.completed = completed_col
+    columns.completion_rate = rate_col
+    start = 0
+    for index in range(1, len(project_col) + 1):
+        if index == len(project_col) or project_col[index] != project_col[start]:
+            columns.segments[project_col[start]] = (start, index)
+            start = index
+    return columns
+
+
+def delay_column(columns: MilestoneColumns, today: date) -> List[int]:
+    """每个里程碑的延期天数，未延期为 0"""
+    today_ord = today.toordinal()
+    return [
+        (actual - planned if actual is not None and actual > planned else 0) if done
+        else max(today_ord - planned, 0)
+        for planned, actual, done in zip(columns.planned, columns.actual, columns.completed)
+    ]
+
+
+def _service_stages(template: Sequence[str], columns: MilestoneColumns, rows: range):
+    names = columns.name
+    if not template:
+        template = [names[index] for index in rows]
+    # 同名里程碑取计划日期最晚的一条
+    lookup = {names[index]: index for index in rows}
+    stages = []
+    completed = 0
+    current_index = None
+    for position, name in enumerate(template):
+        index = lookup.get(name)
+        done = index is not None and columns.completed[index]
+        if done:
+            completed += 1
+        elif current_index is None:
+            current_index = position
+        stages.append({
+            'name': name,
+            'status': 'completed' if done else 'pending',
+            'planned_start': date.fromordinal(columns.planned[index]) if index is not None else None,
+            'planned_end': date.fromordinal(columns.planned[index]) if index is not None else None,
+            'actual_start': None,
+            'actual_end': date.fromordinal(columns.actual[index]) if index is not None and columns.actual[index] else None,
+        })
+    current_stage = None
+    if current_index is not None:
+        stages[current_index]['status'] = 'current'
+        current_stage = stages[current_index]['name']
+    completion = int(round(completed / len(stages) * 100)) if stages else 0
+    return stages, completion, completed, current_stage
+
+
+def build_timelines(
+    projects: Sequence,
+    today: date,
+    columns: Optional[MilestoneColumns] = None,
+) -> Dict[int, ProjectTimeline]:
+    """按项目返回时间轴结果；projects 需带 start_date、end_date 与（已预取的）service_type"""
+    if columns is None:
+        columns = load_milestone_columns(project.id for project in projects)
+    today_ord = today.toordinal()
+    size = len(columns)
+    planned = columns.planned
+
+    # 项目级标量：时间轴基准起止与第一个里程碑的计划开始
+    bases = {}
+    base_start_col = [0] * size
+    span_col = [1] * size
+    head_col = [0] * size
+    for project in projects:
+        rows = columns.rows(project.id)
+        first = planned[rows.start] if rows else None
+        last = planned[rows.stop - 1] if rows else None
+        start = project.start_date.toordinal() if project.start_date else (first if first is not None else today_ord)
+        end = project.end_date.toordinal() if project.end_date else (last if last is not None else start)
+        if end <= start:
+            end = start + DEFAULT_SPAN_DAYS
+        if project.start_date:
+            head = project.start_date.toordinal()
+        elif first is not None:
+            head = first - LEAD_IN_DAYS
+        else:
+            head = today_ord
+        bases[project.id] = (start, end)
+        span = max(end - start, 1)
+        base_start_col[rows.start:rows.stop] = [start] * len(rows)
+        span_col[rows.start:rows.stop] = [span] * len(rows)
+        if rows:
+            head_col[rows.start] = head
+
+    # 整列运算：上一个里程碑的计划日期即本里程碑的计划开始（段首取项目级 head）
+    is_head = [False] * size
+    for start, _ in columns.segments.values():
+        is_head[start] = True
+    previous = [head_col[i] if is_head[i] else planned[i - 1] for i in range(size)]
+    start_col = [min(prev, end) for prev, end in zip(previous, planned)]
+    delay_col = delay_column(columns, today)
+    status_col = [
+        'delayed' if delay > 0 else ('completed' if done else 'in_progress')
+        for delay, done in zip(delay_col, columns.completed)
+    ]
+    offset_col = [
+        round(max(0, start - base) / span * 100, 2)
+        for start, base, span in zip(start_col, base_start_col, span_col)
+    ]
+    width_col = [
+        round(min(100, max(max(end - start, 1) / span * 100, MIN_BAR_WIDTH)), 2)
+        for start, end, span in zip(start_col, planned, span_col)
+    ]
+
+    timelines = {}
+    for project in projects:
+        rows = columns.rows(project.id)
+        service_code = getattr(project.service_type, 'code', '') if project.service_type_id else ''
+        stages, stage_completion, stages_done, current_stage = _service_stages(
+            SERVICE_TIMELINE_TEMPLATES.get(service_code, []), columns, rows,
+        )
+        done_count = sum(columns.completed[rows.start:rows.stop])
+        if stages:
+            percent, completed, total = stage_completion, stages_done, len(stages)
+        else:
+            completed, total = done_count, len(rows)
+            percent = int(completed / total * 100) if total else 0
+            stage_completion = percent
+
+        tasks = []
+        for index in rows:
+            status = status_col[index]
+            tasks.append({
+                'milestone_id': columns.id[index],
+                'name': columns.name[index],
+                'planned_start': date.fromordinal(start_col[index]),
+                'planned_end': date.fromordinal(planned[index]),
+                'actual_end': date.fromordinal(columns.actual[index]) if columns.actual[index] else None,
+                'status': status,
+                'status_label': STATUS_LABELS[status],
+                'status_badge_class': STATUS_BADGE_CLASSES[status],
+                'delay_days': delay_col[index],
+                'timeline_offset': offset_col[index],
+                'timeline_width': width_col[index],
+            })
+        counts = {key: 0 for key in STATUS_LABELS}
+        for task in tasks:
+            counts[task['status']] += 1
+        counts['completion_rate'] = round(counts['completed'] / (len(tasks) or 1) * 100, 1)
+
+        base_start, base_end = bases[project.id]
+        timelines[project.id] = ProjectTimeline(
+            project_id=project.id,
+            rows=rows,
+            base_start=date.fromordinal(base_start),
+            base_end=date.fromordinal(base_end),
+            percent=percent,
+            completed=completed,
+            total=total,
+            stages=stages,
+            stage_completion=stage_completion,
+            current_stage=current_stage,
+            tasks=tasks,
+            summary=counts,
+            delayed=sorted(
+                (task for task in tasks if task['delay_days'] > 0),
+                key=lambda task: task['delay_days'],
+                reverse=True,
+            ),
+            overdue=[
+                {'milestone_id': columns.id[index], 'name': columns.name[index], 'days': delay_col[index]}
+                for index in rows
+                if not columns.completed[index] and delay_col[index] > 0
+            ],
+            upcoming=[
+                {
+                    'name': columns.name[index],
+                    'date': date.fromordinal(planned[index]),
+                    'days_remaining': planned[index] - today_ord,
+                }
+                for index in rows
+                if not columns.completed[index] and planned[index] >= today_ord
+            ],
+        )
+    return timelines
+
+
+def rank_delayed(timelines: Iterable[ProjectTimeline], limit: int) -> List[Tuple[int, dict]]:
+    """跨项目按延期天数降序取前 limit 个里程碑，返回 (project_id, task)；同天数保持原顺序"""
+    candidates = (
+        (timeline.project_id, task)
+        for timeline in timelines
+        for task in timeline.delayed
+    )
+    return heapq.nlargest(limit, candidates, key=lambda item: item[1]['delay_days'])
+
+
+def bucket_due(columns: MilestoneColumns, today: date, recent_days: int = 7) -> Dict[str, List[int]]:
+    """按到期情况分组的行号：overdue / due_today / upcoming / recent_completed，组内按计划日期排序"""
+    today_ord = today.toordinal()
+    recent_floor = today_ord - recent_days
+    buckets = {'overdue': [], 'due_today': [], 'upcoming': [], 'recent_completed': []}
+    for index in sorted(range(len(columns)), key=lambda row: (columns.planned[row], columns.id[row])):
+        planned, actual = columns.planned[index], columns.actual[index]
+        if columns.completed[index]:
+            if actual is not None and actual >= recent_floor:
+                buckets['recent_completed'].append(index)
+        elif planned < today_ord:
+            buckets['overdue'].append(index)
+        elif planned == today_ord:
+            buckets['due_today'].append(index)
+        else:
+            buckets['upcoming'].append(index)
+    return buckets
+
+
+def portfolio_axis(timelines: Iterable[ProjectTimeline]) -> Tuple[date, date]:
+    """所有项目共用的时间轴起止"""
+    timelines = list(timelines)
+    if not timelines:
+        today = date.today()
+        return today, today + timedelta(days=DEFAULT_SPAN_DAYS)
+    start = min(timeline.base_start for timeline in timelines)
+    end = max(timeline.base_end for timeline in timelines)
+    return start, end
+
+
+def axis_position(value: date, axis: Tuple[date, date]) -> float:
+    """日期在共用时间轴上的位置（百分比，截断到 0-100）"""
+    axis_start = axis[0].toordinal()
+    span = max(axis[1].toordinal() - axis_start, 1)
+    return round(min(max((value.toordinal() - axis_start) / span * 100, 0), 100), 2)
+
+
+def portfolio_rows(
+    projects: Sequence,
+    timelines: Dict[int, ProjectTimeline],
+    axis: Tuple[date, date],
+) -> List[dict]:
+    """组合甘特的每个项目一行：项目周期条、里程碑标记（位置为共用时间轴上的百分比）与延期汇总"""
+    rows = []
+    for project in projects:
+        timeline = timelines[project.id]
+        offset = axis_position(timeline.base_start, axis)
+        rows.append({
+            'project_id': project.id,
+            'project_number': project.project_number,
+            'project_name': project.name,
+            'start': timeline.base_start,
+            'end': timeline.base_end,
+            'bar_offset': offset,
+            'bar_width': max(round(axis_position(timeline.base_end, axis) - offset, 2), 1),
+            'percent': timeline.percent,
+            'current_stage': timeline.current_stage,
+            'delayed_count': len(timeline.delayed),
+            'max_delay_days': timeline.delayed[0]['delay_days'] if timeline.delayed else 0,
+            'markers': [
+                {
+                    'milestone_id': task['milestone_id'],
+                    'name': task['name'],
+                    'date': task['planned_end'],
+                    'status': task['status'],
+                    'status_badge_class': task['status_badge_class'],
+                    'position': axis_position(task['planned_end'], axis),
+                }
+                for task in timeline.tasks
+            ],
+        })
+    return rows
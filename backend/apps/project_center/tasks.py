@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .services_archive import build_archive_package
+
+
+@shared_task(name="project_center.build_project_archive_package")
+def build_project_archive_package(archive_id: int) -> None:
+    """后台生成项目归档 ZIP 包"""
+    build_archive_package(archive_id)
@@ -0,0 +1,163 @@
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from backend.apps.delivery_customer.models import DeliveryFile, DeliveryRecord
+from backend.apps.production_quality.models import Opinion, OpinionAttachment
+from backend.apps.project_center.models import (
+    Project,
+    ProjectArchive,
+    ProjectDocument,
+    ProjectDrawingFile,
+    ProjectDrawingSubmission,
+    ProjectTeam,
+)
+from backend.apps.project_center.services_archive import (
+    MANIFEST_NAME,
+    build_archive_package,
+    package_filename,
+    request_archive_package,
+)
+from backend.apps.resource_standard.models import ProfessionalCategory
+
+MEDIA_ROOT = tempfile.mkdtemp()
+DRAWING = b"dwg-bytes" * 20000
+DOCUMENT = b"plain text document\n" * 500
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PROTECTED_MEDIA_BACKEND="django")
+class ArchivePackageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_superuser(username="archive_admin", password="pass1234", email="a@example.com")
+        self.outsider = User.objects.create_user(username="archive_outsider", password="pass1234")
+        self.project = Project.objects.create(
+            name="archive", project_number="VIH-ARC-001", created_by=self.admin, project_manager=self.admin,
+        )
+        document = ProjectDocument(project=self.project, name="contract", document_type="contract", uploaded_by=self.admin)
+        document.file.save("contract.txt", ContentFile(DOCUMENT))
+        self.lost = ProjectDocument(project=self.project, name="lost", document_type="other", uploaded_by=self.admin)
+        self.lost.file.save("lost.txt", ContentFile(b"gone"))
+        self.lost.file.storage.delete(self.lost.file.name)
+
+        submission = ProjectDrawingSubmission.objects.create(project=self.project, title="structure/A", submitter=self.admin)
+        drawing = ProjectDrawingFile(submission=submission, name="A", uploaded_by=self.admin)
+        drawing.file.save("structure.dwg", ContentFile(DRAWING))
+
+        record = DeliveryRecord.objects.create(
+            title="delivery", project=self.project, recipient_name="client", created_by=self.admin,
+        )
+        delivery = DeliveryFile(delivery_record=record, file_name="final.pdf", uploaded_by=self.admin)
+        delivery.file.save("final.pdf", ContentFile(b"%PDF-final"), save=False)
+        delivery.save()
+
+        category = ProfessionalCategory.objects.create(
+            code="arc_structure", name="structure", category="structure", service_types=["result_optimization"],
+        )
+        opinion = Opinion.objects.create(
+            opinion_number="OPIN-ARC-001", project=self.project, professional_category=category,
+            created_by=self.admin, location_name="loc", issue_description="issue", recommendation="fix",
+            issue_category=Opinion.IssueCategory.ERROR, severity_level=Opinion.SeverityLevel.NORMAL,
+        )
+        attachment = OpinionAttachment(opinion=opinion, uploaded_by=self.admin)
+        attachment.file.save("calc.xls", ContentFile(b"calc"))
+        self.client.force_login(self.admin)
+
+    def _archive(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("project_pages:project_archive", args=[self.project.id]), {"notes": "n"})
+        self.assertEqual(response.status_code, 302)
+        return ProjectArchive.objects.get(project=self.project)
+
+    def test_archiving_builds_zip_with_manifest(self):
+        archive = self._archive()
+        self.assertEqual(archive.package_status, "ready")
+        self.assertEqual(archive.package_file_count, 4)
+        with archive.package_file.open("rb") as handle:
+            payload = handle.read()
+        self.assertEqual(archive.package_size, len(payload))
+        self.assertEqual(archive.package_checksum, hashlib.sha256(payload).hexdigest())
+
+        with zipfile.ZipFile(io.BytesIO(payload)) as zf:
+            manifest = json.loads(zf.read(MANIFEST_NAME))
+            self.assertEqual(zf.namelist()[-1], MANIFEST_NAME)
+            for item in manifest["files"]:
+                self.assertEqual(hashlib.sha256(zf.read(item["path"])).hexdigest(), item["sha256"])
+            drawing_entry = next(info for info in zf.infolist() if info.filename.endswith(".dwg"))
+            self.assertEqual(drawing_entry.compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.read(drawing_entry), DRAWING)
+
+        sources = sorted(item["source"] for item in manifest["files"])
+        self.assertEqual(sources, ["delivery_file", "drawing_file", "opinion_attachment", "project_document"])
+        self.assertEqual(manifest["missing"], [
+            {"path": f"documents/other/{self.lost.id}_{self.lost.file.name.rsplit('/', 1)[-1]}",
+             "source": "project_document", "source_id": self.lost.id},
+        ])
+        self.assertTrue(any(path.startswith("drawings/") and "structure_A/" in path for path in zf.namelist()))
+
+    def test_download_serves_stored_package(self):
+        archive = self._archive()
+        url = reverse("project_pages:project_archive_package", args=[self.project.id, archive.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        with archive.package_file.open("rb") as handle:
+            self.assertEqual(b"".join(response.streaming_content), handle.read())
+        self.assertIn(".zip", response["Content-Disposition"])
+        # 存储路径带随机后缀，下载文件名不含该后缀
+        stored = archive.package_file.name.rsplit("/", 1)[-1]
+        self.assertNotEqual(stored, package_filename(archive))
+        self.assertRegex(stored, r"^VIH-ARC-001_.+_v\d+_[0-9a-f]{32}\.zip$")
+        self.assertIn(package_filename(archive), response["Content-Disposition"])
+        # 已生成的包不再重复入队
+        self.assertFalse(request_archive_package(archive))
+
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(archive.package_file.url).status_code, 404)
+
+    def test_download_respects_archive_download_permissions(self):
+        archive = self._archive()
+        url = reverse("project_pages:project_archive_package", args=[self.project.id, archive.id])
+        member = get_user_model().objects.create_user(username="archive_member", password="pass1234")
+        ProjectTeam.objects.create(project=self.project, user=member, role="engineer")
+        self.client.force_login(member)
+
+        ProjectArchive.objects.filter(pk=archive.pk).update(download_permissions=["project_manager"])
+        response = self.client.get(url)
+        self.assertRedirects(response, reverse("project_pages:project_archive", args=[self.project.id]),
+                             fetch_redirect_response=False)
+
+        ProjectArchive.objects.filter(pk=archive.pk).update(download_permissions=["team_member"])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_rebuild_replaces_file_and_command_picks_up_queue(self):
+        archive = self._archive()
+        first_name = archive.package_file.name
+        url = reverse("project_pages:project_archive_package", args=[self.project.id, archive.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url)
+        archive.refresh_from_db()
+        self.assertEqual(archive.package_status, "ready")
+        self.assertNotEqual(archive.package_file.name, first_name)
+        self.assertFalse(archive.package_file.storage.exists(first_name))
+
+        ProjectArchive.objects.filter(pk=archive.pk).update(package_status="pending")
+        call_command("build_archive_packages", stdout=io.StringIO())
+        archive.refresh_from_db()
+        self.assertEqual(archive.package_status, "ready")
+        # 已被其它任务领取的归档不会重复打包
+        self.assertIsNone(build_archive_package(archive.id))
@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from backend.core.benchmark import BENCHMARK_TARGETS, SyntheticScale, generate_dataset, run_benchmarks
+from backend.apps.project_center.models import Project, ProjectTeam
+
+
+class BenchmarkBudgetTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            username="bench_admin", password="pass1234", email="bench@example.com"
+        )
+
+    def test_generator_bulk_inserts_requested_scale(self):
+        scale = SyntheticScale(projects=5, users=4, team_members=3, opinions=2)
+        counts = generate_dataset(scale)
+        self.assertEqual(counts["projects"], 5)
+        self.assertEqual(counts["opinions"], 10)
+        self.assertEqual(Project.objects.count(), 5)
+        self.assertEqual(ProjectTeam.objects.count(), 15)
+
+    def test_query_counts_stay_within_budget_as_data_grows(self):
+        generate_dataset(SyntheticScale.small())
+        small = run_benchmarks(self.admin, repeat=1)
+        generate_dataset(SyntheticScale(projects=40, users=15))
+        large = run_benchmarks(self.admin, repeat=1)
+
+        self.assertTrue(large["passed"], [r["problems"] for r in large["results"] if not r["passed"]])
+        self.assertEqual([r["name"] for r in large["results"]], [t.name for t in BENCHMARK_TARGETS])
+        # 查询数不随数据量增长，说明没有 N+1
+        for before, after in zip(small["results"], large["results"]):
+            self.assertEqual(before["queries"], after["queries"], before["name"])
+
+    def test_command_writes_json_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "report.json")
+            call_command(
+                "run_benchmarks", "--projects", "3", "--users", "3", "--repeat", "1",
+                "--target", "project_list", "--output", output, stderr=open(os.devnull, "w"),
+            )
+            with open(output, encoding="utf-8") as handle:
+                report = json.load(handle)
+        self.assertTrue(report["passed"])
+        self.assertEqual(report["dataset"]["projects"], 3)
+        self.assertEqual([r["name"] for r in report["results"]], ["project_list"])
+        # 默认回滚生成的数据
+        self.assertFalse(Project.objects.exists())
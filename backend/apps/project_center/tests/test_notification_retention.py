@@ -0,0 +1,107 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.apps.project_center.models import (
+    Project,
+    ProjectNotificationUnreadCounter,
+    ProjectTeamNotification,
+    ProjectTeamNotificationArchive,
+)
+from backend.apps.project_center.services_notifications import (
+    PollingChannel,
+    rebuild_unread_counters,
+    unread_counts,
+)
+
+
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username="notify_owner", password="pass1234")
+        self.other = User.objects.create_user(username="notify_other", password="pass1234")
+        self.project = Project.objects.create(name="通知项目", project_number="VIH-NTF-001", created_by=self.user)
+        patcher = mock.patch(
+            "backend.apps.project_center.services_notifications.get_channel", return_value=PollingChannel(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def _notify(self, recipient=None, category="team_change", **kwargs):
+        return ProjectTeamNotification.objects.create(
+            project=self.project, recipient=recipient or self.user, title="通知", message="详情",
+            category=category, **kwargs,
+        )
+
+    def test_counter_follows_create_read_and_delete(self):
+        self.assertEqual(unread_counts(self.user.id)["total"], 0)
+        first = self._notify()
+        self._notify(category="quality_alert")
+        self._notify(recipient=self.other)
+        self.assertEqual(unread_counts(self.user.id), {"team_change": 1, "quality_alert": 1, "total": 2})
+
+        self.api.post(reverse("project:notification-mark-read", args=[first.id]))
+        self.assertEqual(unread_counts(self.user.id), {"team_change": 0, "quality_alert": 1, "total": 1})
+
+        ProjectTeamNotification.objects.filter(recipient=self.user, is_read=False).get().delete()
+        self.assertEqual(unread_counts(self.user.id)["total"], 0)
+
+    def test_bulk_mark_read_decrements_once(self):
+        notifications = [self._notify() for _ in range(3)]
+        unread_counts(self.user.id)
+        url = reverse("project:notification-bulk-mark-read")
+        response = self.api.post(url, {"ids": [n.id for n in notifications[:2]]}, format="json")
+        self.assertEqual(response.json(), {"updated": 2})
+        response = self.api.post(url, {"ids": [n.id for n in notifications[:2]]}, format="json")
+        self.assertEqual(response.json(), {"updated": 0})
+        self.assertEqual(unread_counts(self.user.id)["team_change"], 1)
+
+        self.api.post(reverse("project:notification-mark-all-read"))
+        counter = ProjectNotificationUnreadCounter.objects.get(user=self.user)
+        self.assertEqual((counter.team_change_count, counter.quality_alert_count), (0, 0))
+
+    def test_list_uses_keyset_pagination(self):
+        created = [self._notify() for _ in range(3)]
+        url = reverse("project:notification-list")
+        page = self.api.get(url, {"page_size": 2}).json()
+        self.assertEqual([item["id"] for item in page["results"]], [created[2].id, created[1].id])
+        self.assertIn("cursor=", page["next"])
+        page = self.api.get(page["next"]).json()
+        self.assertEqual([item["id"] for item in page["results"]], [created[0].id])
+        self.assertIsNone(page["next"])
+
+    def test_archive_moves_only_old_read_notifications(self):
+        old = timezone.now() - timedelta(days=200)
+        archived = self._notify(is_read=True, read_time=old, created_time=old)
+        self._notify(created_time=old)
+        self._notify(is_read=True, read_time=timezone.now())
+
+        out = StringIO()
+        call_command("archive_team_notifications", "--days", "180", "--batch-size", "1", stdout=out)
+
+        self.assertIn("Archived 1", out.getvalue())
+        self.assertFalse(ProjectTeamNotification.objects.filter(pk=archived.pk).exists())
+        self.assertEqual(ProjectTeamNotificationArchive.objects.get().pk, archived.pk)
+        self.assertEqual(ProjectTeamNotification.objects.count(), 2)
+        self.assertEqual(unread_counts(self.user.id)["total"], 1)
+
+    def test_rebuild_counters_after_bulk_insert(self):
+        unread_counts(self.user.id)
+        ProjectTeamNotification.objects.bulk_create([
+            ProjectTeamNotification(project=self.project, recipient=recipient, title="批量", message="详情")
+            for recipient in (self.user, self.user, self.other)
+        ])
+        self.assertEqual(unread_counts(self.user.id)["total"], 0)
+
+        self.assertEqual(rebuild_unread_counters(), 2)
+        self.assertEqual(unread_counts(self.user.id)["total"], 2)
+        self.assertEqual(ProjectNotificationUnreadCounter.objects.get(user=self.other).team_change_count, 1)
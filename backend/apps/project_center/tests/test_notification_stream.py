@@ -0,0 +1,116 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from backend.apps.project_center.models import Project, ProjectTeamNotification
+from backend.apps.project_center.services_notifications import (
+    PollingChannel,
+    channel_name,
+    notification_event_stream,
+    open_notification_stream,
+    stream_slots,
+)
+
+
+class RecordingChannel(PollingChannel):
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+def _events(chunks):
+    """把 SSE 文本块解析为 (event, data, id) 列表，忽略 retry 与心跳"""
+    events = []
+    for chunk in chunks:
+        fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines() if not line.startswith((':', 'retry')))
+        if fields:
+            events.append((fields['event'], json.loads(fields['data']), fields.get('id')))
+    return events
+
+
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username="stream_user", password="pass1234")
+        self.project = Project.objects.create(name="推送项目", project_number="VIH-SSE-001", created_by=self.user)
+        self.channel = RecordingChannel()
+        patcher = mock.patch(
+            "backend.apps.project_center.services_notifications.get_channel", return_value=self.channel,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # 测试客户端不会关闭未读完的流式响应，每个用例的连接计数从零开始
+        stream_slots.active = 0
+
+    def _notify(self, title, category="team_change"):
+        return ProjectTeamNotification.objects.create(
+            project=self.project, recipient=self.user, title=title, message="详情", category=category,
+        )
+
+    def test_create_and_mark_read_publish_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self._notify("成员变更")
+            self._notify("质量提醒", category="quality_alert")
+        events = [message for channel, message in self.channel.published if channel == channel_name(self.user.id)]
+        self.assertEqual([message["event"] for message in events], ["notification", "counts", "notification", "counts"])
+        self.assertEqual(events[0]["id"], first.id)
+        self.assertEqual(events[-1]["data"], {"team_change": 1, "quality_alert": 1, "total": 2})
+
+        self.channel.published.clear()
+        api = APIClient()
+        api.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            api.post(reverse("project:notification-mark-all-read"))
+        self.assertEqual(self.channel.published[-1][1]["data"]["total"], 0)
+
+    def test_stream_replays_missed_notifications_then_counts(self):
+        seen = self._notify("旧通知")
+        missed = self._notify("断线期间的通知")
+        stream = notification_event_stream(self.user.id, last_event_id=seen.id, heartbeat=0, lifetime=60)
+        events = _events([next(stream) for _ in range(3)])
+        stream.close()
+        self.assertEqual(events[0][0], "notification")
+        self.assertEqual(events[0][2], str(missed.id))
+        self.assertEqual(events[0][1]["title"], "断线期间的通知")
+        self.assertEqual(events[1], ("counts", {"team_change": 2, "quality_alert": 0, "total": 2}, None))
+
+    def test_stream_endpoint_requires_login_and_sends_event_stream(self):
+        url = reverse("project_pages:notification_stream")
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(response["X-Accel-Buffering"], "no")
+        chunks = iter(response.streaming_content)
+        self.assertTrue(next(chunks).startswith(b"retry:"))
+        self.assertIn(b"event: counts", next(chunks))
+
+    @override_settings(NOTIFICATION_STREAM_MAX_PER_PROCESS=1)
+    def test_streams_are_capped_per_process_with_polling_fallback(self):
+        first = open_notification_stream(self.user.id)
+        self.assertIsNone(open_notification_stream(self.user.id))
+        self.client.force_login(self.user)
+        rejected = self.client.get(reverse("project_pages:notification_stream"))
+        self.assertEqual(rejected.status_code, 503)
+        self.assertEqual(rejected.json()["fallback"], "poll")
+
+        # 未开始迭代的流关闭后同样归还名额
+        first.close()
+        self.assertEqual(stream_slots.active, 0)
+        second = open_notification_stream(self.user.id)
+        self.assertTrue(next(second).startswith("retry:"))
+        second.close()
+        second.close()
+        self.assertEqual(stream_slots.active, 0)
+
+        seen = self._notify("already shown")
+        missed = self._notify("missed")
+        data = self.client.get(reverse("project_pages:notification_poll"), {"after": seen.id}).json()
+        self.assertEqual([entry["id"] for entry in data["notifications"]], [missed.id])
+        self.assertEqual((data["last_id"], data["counts"]["total"]), (missed.id, 2))
@@ -0,0 +1,82 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from backend.apps.project_center.models import (
+    Project,
+    ProjectMilestone,
+    ProjectTeam,
+    ServiceProfession,
+    ServiceType,
+)
+
+
+class ProjectApiFieldsTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_superuser(username="api_admin", password="pass1234", email="api@example.com")
+        service_type = ServiceType.objects.create(code="api_fields", name="api fields")
+        self.profession = ServiceProfession.objects.create(service_type=service_type, code="api_arch", name="arch")
+        self.service_type = service_type
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+        self.url = reverse("project:project-list")
+
+    def _project(self, index):
+        manager = get_user_model().objects.create_user(username=f"api_pm_{index}", password="pass1234")
+        project = Project.objects.create(
+            name=f"接口项目{index}", project_number=f"VIH-API-{index:03d}", created_by=self.admin,
+            project_manager=manager, service_type=self.service_type,
+        )
+        project.service_professions.add(self.profession)
+        ProjectTeam.objects.create(project=project, user=manager, role="project_manager")
+        ProjectMilestone.objects.create(project=project, name="m1", planned_date=date.today(), is_completed=True)
+        ProjectMilestone.objects.create(project=project, name="m2", planned_date=date.today())
+        return project
+
+    def _list(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"], len(queries)
+
+    def test_list_query_count_independent_of_page_size(self):
+        self._project(1)
+        _, small = self._list()
+        for index in range(2, 8):
+            self._project(index)
+        results, large = self._list()
+        self.assertEqual(len(results), 7)
+        self.assertEqual(large, small)
+
+        row = results[0]
+        self.assertEqual(row["progress_rate"], 50)
+        self.assertEqual(row["team_member_count"], 1)
+        self.assertEqual(row["service_profession_names"], ["arch"])
+        self.assertTrue(row["project_manager_name"] is not None)
+        self.assertNotIn("team_members", row)
+        self.assertNotIn("documents", row)
+
+    def test_sparse_fields_and_expand(self):
+        project = self._project(1)
+        results, _ = self._list({"fields": "id,name"})
+        self.assertEqual(set(results[0]), {"id", "name"})
+
+        results, _ = self._list({"fields": "id", "expand": "team_members"})
+        self.assertEqual(set(results[0]), {"id", "team_members"})
+        self.assertEqual(results[0]["team_members"][0]["user_username"], "api_pm_1")
+
+        detail = self.api.get(reverse("project:project-detail", args=[project.id]), {"fields": "id,progress_rate"})
+        self.assertEqual(detail.data, {"id": project.id, "progress_rate": 50})
+
+    def test_detail_keeps_nested_collections(self):
+        project = self._project(1)
+        response = self.api.get(reverse("project:project-detail", args=[project.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["milestones"]), 2)
+        self.assertEqual(response.data["team_members"][0]["user_username"], "api_pm_1")
@@ -0,0 +1,108 @@
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from backend.apps.project_center.models import (
+    Project,
+    ProjectDocument,
+    ProjectDrawingSubmission,
+    ProjectMilestone,
+    ProjectTeam,
+)
+from backend.apps.project_center.views_pages import PROJECT_DETAIL_TABS
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ProjectDetailTabsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.admin = User.objects.create_superuser(username="detail_admin", password="pass1234", email="d@example.com")
+        self.manager = User.objects.create_user(username="detail_pm", password="pass1234", first_name="PM")
+        self.project = Project.objects.create(
+            name="详情项目", project_number="VIH-DETAIL-001", created_by=self.admin, project_manager=self.manager,
+        )
+        ProjectTeam.objects.create(project=self.project, user=self.manager, role="professional_leader")
+        self.client.force_login(self.admin)
+
+    def _tab_url(self, tab):
+        return reverse("project_pages:project_detail_tab", args=[self.project.id, tab])
+
+    def _grow(self, count):
+        today = date.today()
+        for index in range(count):
+            ProjectMilestone.objects.create(
+                project=self.project, name=f"m{index}", planned_date=today - timedelta(days=index + 1),
+            )
+            ProjectDocument.objects.create(
+                project=self.project, name=f"doc{index}", document_type="report", uploaded_by=self.admin,
+                file=ContentFile(b"x", name=f"doc{index}.txt"),
+            )
+            ProjectDrawingSubmission.objects.create(project=self.project, title=f"drawing{index}", submitter=self.admin)
+
+    def _shell_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("project_pages:project_detail", args=[self.project.id]))
+        self.assertEqual(response.status_code, 200)
+        return response, queries
+
+    def test_shell_defers_tabs_and_stays_flat(self):
+        self._grow(1)
+        response, small = self._shell_queries()
+        for tab in PROJECT_DETAIL_TABS:
+            self.assertContains(response, self._tab_url(tab))
+        self.assertFalse(any("project_center_drawing_submission" in q["sql"] for q in small.captured_queries))
+
+        self._grow(6)
+        _, large = self._shell_queries()
+        self.assertEqual(len(large), len(small))
+
+    def test_every_tab_renders_html_and_json(self):
+        self._grow(2)
+        for tab in PROJECT_DETAIL_TABS:
+            response = self.client.get(self._tab_url(tab))
+            self.assertEqual(response.status_code, 200, tab)
+            self.assertContains(response, "data-section=")
+
+            response = self.client.get(self._tab_url(tab), {"format": "json"})
+            self.assertEqual(response.status_code, 200, tab)
+            self.assertEqual(response.json()["tab"], tab)
+
+        data = self.client.get(self._tab_url("overview"), {"format": "json"}).json()["data"]
+        self.assertEqual(data["professional_leaders"], ["PM"])
+        self.assertEqual(data["risk_level_label"], "中")
+        drawings = self.client.get(self._tab_url("drawings"), {"format": "json"}).json()["data"]
+        self.assertEqual(len(drawings["drawing_submissions"]), 2)
+        self.assertEqual(self.client.get(self._tab_url("unknown")).status_code, 404)
+
+    def test_cached_tab_refreshes_when_project_data_changes(self):
+        self._grow(1)
+        first = self.client.get(self._tab_url("progress"), {"format": "json"}).json()["data"]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self._tab_url("progress"), {"format": "json"})
+        self.assertFalse(any("project_center_milestone" in q["sql"] for q in queries.captured_queries))
+
+        ProjectMilestone.objects.create(project=self.project, name="new", planned_date=date.today())
+        second = self.client.get(self._tab_url("progress"), {"format": "json"}).json()["data"]
+        self.assertEqual(len(second["tasks"]), len(first["tasks"]) + 1)
+
+    def test_tabs_require_project_access(self):
+        outsider = get_user_model().objects.create_user(username="detail_outsider", password="pass1234")
+        self.client.force_login(outsider)
+        response = self.client.get(self._tab_url("overview"))
+        self.assertEqual(response.status_code, 403)
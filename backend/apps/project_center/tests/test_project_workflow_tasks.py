@@ -1,6 +1,9 @@
+import shutil
+import tempfile
+
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
@@ -14,8 +17,16 @@ from backend.apps.project_center.models import (
     ServiceType,
 )
 
+MEDIA_ROOT = tempfile.mkdtemp()
+
 
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
 class ProjectWorkflowTaskTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
     def setUp(self):
         self.User = get_user_model()
         self.client = Client()
@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from backend.apps.project_center.models import Project, ProjectDrawingFile, ProjectDrawingSubmission
+from backend.core.downloads import nginx_protected_location
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = b"0123456789" * 1000
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PROTECTED_MEDIA_BACKEND="django")
+class ProtectedDrawingDownloadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        User = get_user_model()
+        self.manager = User.objects.create_user(username="drawing_pm", password="pass1234")
+        self.outsider = User.objects.create_user(username="drawing_outsider", password="pass1234")
+        project = Project.objects.create(
+            name="图纸下载项目", project_number="VIH-DL-001",
+            project_manager=self.manager, created_by=self.manager,
+        )
+        submission = ProjectDrawingSubmission.objects.create(project=project, title="结构图", submitter=self.manager)
+        self.drawing = ProjectDrawingFile(submission=submission, name="结构图A版", uploaded_by=self.manager)
+        self.drawing.file.save("structure.dwg", ContentFile(CONTENT))
+        self.url = reverse("project_pages:drawing_file_download", args=[self.drawing.pk])
+
+    def _content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_member_downloads_full_file(self):
+        self.client.force_login(self.manager)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._content(response), CONTENT)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertIn(".dwg", response["Content-Disposition"])
+
+    def test_outsider_and_public_media_url_are_denied(self):
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get(self.drawing.file.url).status_code, 404)
+
+    def test_public_media_is_served_without_debug(self):
+        avatar = Path(MEDIA_ROOT) / "avatars" / "pm.png"
+        avatar.parent.mkdir(parents=True, exist_ok=True)
+        avatar.write_bytes(b"avatar")
+        response = self.client.get("/media/avatars/pm.png")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"avatar")
+
+    def test_range_and_conditional_requests(self):
+        self.client.force_login(self.manager)
+        response = self.client.get(self.url, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(CONTENT)}")
+        self.assertEqual(self._content(response), CONTENT[10:20])
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-5")
+        self.assertEqual(self._content(response), CONTENT[-5:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(CONTENT)}-")
+        self.assertEqual(response.status_code, 416)
+
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # If-Range 不匹配时返回整文件
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(PROTECTED_MEDIA_BACKEND="x-accel", PROTECTED_MEDIA_ACCEL_PREFIX="/protected-media/")
+    def test_x_accel_redirect_hands_off_to_nginx(self):
+        self.client.force_login(self.manager)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/" + self.drawing.file.name)
+        self.assertEqual(response.content, b"")
+
+
+class NginxProtectedMediaConfigTests(SimpleTestCase):
+    def test_nginx_denies_every_protected_prefix(self):
+        conf = Path(__file__).resolve().parents[4] / "deployment" / "config" / "nginx-media.conf"
+        self.assertIn(nginx_protected_location(), conf.read_text(encoding="utf-8"))
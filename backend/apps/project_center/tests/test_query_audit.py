@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from backend.apps.production_quality.models import Opinion
+from backend.core.benchmark import HOT_QUERIES, SyntheticScale, analyze_plan, generate_dataset, run_query_audit
+
+
+class QueryAuditTests(TestCase):
+    def test_analyze_plan_flags_large_seq_scans_and_misestimates(self):
+        plan = {
+            "Node Type": "Nested Loop",
+            "Plan Rows": 5,
+            "Actual Rows": 4000,
+            "Actual Loops": 1,
+            "Plans": [
+                {
+                    "Node Type": "Seq Scan",
+                    "Relation Name": "production_quality_opinion",
+                    "Plan Rows": 40,
+                    "Actual Rows": 50,
+                    "Actual Loops": 1,
+                    "Rows Removed by Filter": 9950,
+                    "Filter": "(status = 'submitted')",
+                },
+                {
+                    "Node Type": "Seq Scan",
+                    "Relation Name": "project_center_project",
+                    "Plan Rows": 10,
+                    "Actual Rows": 12,
+                    "Actual Loops": 1,
+                },
+            ],
+        }
+        findings = analyze_plan(plan, min_rows=1000, misestimate_ratio=10)
+        self.assertEqual(
+            [(finding["kind"], finding["relation"]) for finding in findings],
+            [("misestimate", ""), ("seq_scan", "production_quality_opinion")],
+        )
+        self.assertEqual(findings[1]["rows_scanned"], 10000)
+
+    def test_every_hot_query_explains(self):
+        generate_dataset(SyntheticScale(projects=5, users=4, opinions=4))
+        report = run_query_audit(min_rows=10 ** 9, misestimate_ratio=10 ** 9)
+        self.assertEqual([result["name"] for result in report["results"]], [query.name for query in HOT_QUERIES])
+        self.assertTrue(report["passed"])
+        self.assertTrue(all(result["root_node"] for result in report["results"]))
+
+    def test_command_generates_data_and_rolls_back(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "audit.json")
+            call_command(
+                "query_audit", "--generate", "--projects", "3", "--users", "3", "--query", "opinion_pending_overdue",
+                "--output", output, "--no-fail", stderr=StringIO(),
+            )
+            with open(output, encoding="utf-8") as handle:
+                report = json.load(handle)
+        self.assertEqual([result["name"] for result in report["results"]], ["opinion_pending_overdue"])
+        self.assertFalse(Opinion.objects.exists())
@@ -137,8 +137,8 @@ class TeamNotificationApiTests(TestCase):
         url = reverse('project:notification-list')
         response = self.api_client.get(url, {'status': 'unread'})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], '未读通知')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['title'], '未读通知')
 
     def test_mark_notification_as_read(self):
         self.api_client.force_authenticate(self.user)
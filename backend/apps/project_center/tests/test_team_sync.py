@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from backend.apps.project_center.models import (
+    Project,
+    ProjectTeam,
+    ProjectTeamChangeLog,
+    ProjectTeamNotification,
+    ServiceProfession,
+    ServiceType,
+)
+from backend.apps.project_center.services_notifications import (
+    PollingChannel,
+    bulk_create_notifications,
+    unread_counts,
+)
+from backend.apps.project_center.services_team import build_team_notifications, sync_project_team
+
+
+class TeamSyncTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.operator = User.objects.create_user(username="sync_operator", password="pass1234")
+        self.users = [User.objects.create_user(username=f"sync_member_{i}", password="pass1234") for i in range(30)]
+        service_type = ServiceType.objects.create(code="sync_type", name="sync type")
+        self.profession = ServiceProfession.objects.create(service_type=service_type, code="sync_arch", name="arch")
+        self.project = Project.objects.create(
+            name="团队同步项目", project_number="VIH-SYNC-001", created_by=self.operator, service_type=service_type,
+        )
+        patcher = mock.patch(
+            "backend.apps.project_center.services_notifications.get_channel", return_value=PollingChannel(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _engineers(self, users):
+        return [(user.id, "engineer", self.profession.id) for user in users]
+
+    def test_bulk_add_uses_bounded_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = sync_project_team(
+                self.project, self._engineers(self.users), operator=self.operator,
+                scopes=[("engineer", self.profession.id)], notify=False,
+            )
+        self.assertEqual(len(result.added), 30)
+        self.assertLess(len(queries), 15)
+        self.assertEqual(ProjectTeam.objects.filter(project=self.project, is_active=True).count(), 30)
+        self.assertEqual(ProjectTeamChangeLog.objects.filter(project=self.project, action="added").count(), 30)
+        member = ProjectTeam.objects.get(project=self.project, user=self.users[0])
+        self.assertEqual(member.unit, "internal_tech")
+        self.assertFalse(member.is_external)
+
+    def test_removals_are_logged_and_summarized(self):
+        scopes = [("engineer", self.profession.id)]
+        sync_project_team(self.project, self._engineers(self.users[:3]), scopes=scopes, notify=False)
+        result = sync_project_team(
+            self.project, self._engineers(self.users[1:4]), operator=self.operator, scopes=scopes, notify=False,
+        )
+        self.assertEqual([change.member for change in result.added], [self.users[3]])
+        self.assertEqual([change.member for change in result.removed], [self.users[0]])
+        self.assertEqual(result.unchanged, 2)
+        self.assertIn("sync_member_3", result.summary)
+        self.assertIn("sync_member_0", result.summary)
+        self.assertFalse(ProjectTeam.objects.filter(project=self.project, user=self.users[0]).exists())
+        self.assertTrue(ProjectTeamChangeLog.objects.filter(member=self.users[0], action="removed").exists())
+
+        notifications = build_team_notifications(self.project, self.operator, result)
+        by_recipient = {(notice.recipient, notice.context["action"]) for notice in notifications}
+        self.assertEqual(
+            by_recipient,
+            {(self.users[3], "added"), (self.users[0], "removed"), (self.operator, "summary")},
+        )
+
+    def test_bulk_notifications_update_unread_counters(self):
+        for user in self.users[:2]:
+            self.assertEqual(unread_counts(user.id)["team_change"], 0)
+        bulk_create_notifications([
+            ProjectTeamNotification(project=self.project, recipient=user, title="team", message="changed")
+            for user in (self.users[0], self.users[0], self.users[1])
+        ])
+        self.assertEqual(unread_counts(self.users[0].id)["team_change"], 2)
+        self.assertEqual(unread_counts(self.users[1].id)["team_change"], 1)
+
+    def test_without_scopes_only_adds(self):
+        sync_project_team(self.project, self._engineers(self.users[:2]), notify=False)
+        result = sync_project_team(
+            self.project, self._engineers(self.users[2:3]) + [(999999, "engineer", None)], notify=False,
+        )
+        self.assertEqual(len(result.added), 1)
+        self.assertFalse(result.removed)
+        self.assertEqual(ProjectTeam.objects.filter(project=self.project).count(), 3)
+
+    def test_inactive_member_is_reactivated(self):
+        ProjectTeam.objects.create(
+            project=self.project, user=self.users[0], role="engineer", service_profession=self.profession, is_active=False,
+        )
+        result = sync_project_team(self.project, self._engineers(self.users[:1]), notify=False)
+        self.assertEqual(len(result.added), 1)
+        self.assertTrue(ProjectTeam.objects.get(project=self.project, user=self.users[0]).is_active)
@@ -0,0 +1,147 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from backend.apps.project_center.models import Project, ProjectMilestone, ServiceType
+from backend.apps.project_center.services_timeline import (
+    bucket_due,
+    build_timelines,
+    load_milestone_columns,
+    portfolio_axis,
+    portfolio_rows,
+    rank_delayed,
+)
+from backend.apps.project_center.views_pages import build_project_dashboard_payload
+
+TODAY = date(2025, 3, 1)
+
+
+class TimelineEngineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = get_user_model().objects.create_superuser(
+            username="timeline_admin", password="pass1234", email="t@example.com"
+        )
+        self.service_type, _ = ServiceType.objects.get_or_create(
+            code="full_process_consulting", defaults={"name": "full process"}
+        )
+        self.templated = Project.objects.create(
+            name="templated", project_number="VIH-TL-001", created_by=self.admin,
+            service_type=self.service_type, start_date=date(2025, 1, 1), end_date=date(2025, 4, 11),
+        )
+        self.plain = Project.objects.create(name="plain", project_number="VIH-TL-002", created_by=self.admin)
+        self._milestone(self.templated, "咨询意见周报", date(2025, 1, 10), actual=date(2025, 1, 15), done=True)
+        self._milestone(self.templated, "过程咨询报告", date(2025, 2, 1))
+        self._milestone(self.templated, "核图意见书", date(2025, 3, 20))
+        self._milestone(self.plain, "a", date(2025, 2, 19))
+        self._milestone(self.plain, "b", date(2025, 3, 1))
+
+    def _milestone(self, project, name, planned, actual=None, done=False):
+        return ProjectMilestone.objects.create(
+            project=project, name=name, planned_date=planned, actual_date=actual, is_completed=done,
+        )
+
+    def _timelines(self):
+        projects = list(Project.objects.select_related("service_type").order_by("id"))
+        return projects, build_timelines(projects, TODAY)
+
+    def test_many_projects_load_in_one_query(self):
+        projects = list(Project.objects.select_related("service_type"))
+        with self.assertNumQueries(1):
+            build_timelines(projects, TODAY)
+
+    def test_stages_progress_and_gantt_geometry(self):
+        _, timelines = self._timelines()
+        templated = timelines[self.templated.id]
+        self.assertEqual([stage["status"] for stage in templated.stages], ["completed", "current", "pending", "pending"])
+        self.assertEqual((templated.percent, templated.completed, templated.total), (25, 1, 4))
+        self.assertEqual(templated.current_stage, "过程咨询报告")
+
+        first, second, third = templated.tasks
+        self.assertEqual((first["status"], first["delay_days"]), ("delayed", 5))
+        self.assertEqual(first["planned_start"], date(2025, 1, 1))
+        self.assertEqual((first["timeline_offset"], first["timeline_width"]), (0, 9.0))
+        self.assertEqual(second["planned_start"], date(2025, 1, 10))
+        self.assertEqual((second["status"], second["delay_days"]), ("delayed", 28))
+        self.assertEqual(third["status"], "in_progress")
+        self.assertEqual(templated.overdue, [{"milestone_id": second["milestone_id"], "name": "过程咨询报告", "days": 28}])
+        self.assertEqual([item["days_remaining"] for item in templated.upcoming], [19])
+
+        plain = timelines[self.plain.id]
+        # 无服务模板时以里程碑本身为阶段，基准周期取首末里程碑
+        self.assertEqual([stage["name"] for stage in plain.stages], ["a", "b"])
+        self.assertEqual((plain.base_start, plain.base_end), (date(2025, 2, 19), date(2025, 3, 1)))
+        self.assertEqual(plain.tasks[0]["planned_start"], date(2025, 2, 12))
+        self.assertEqual(plain.tasks[1]["status"], "in_progress")
+
+    def test_delays_ranked_and_due_buckets(self):
+        _, timelines = self._timelines()
+        ranked = rank_delayed(timelines.values(), 2)
+        self.assertEqual(
+            [(project_id, task["delay_days"]) for project_id, task in ranked],
+            [(self.templated.id, 28), (self.plain.id, 10)],
+        )
+
+        columns = load_milestone_columns([self.templated.id, self.plain.id])
+        buckets = bucket_due(columns, date(2025, 1, 20))
+        names = {key: [columns.name[index] for index in rows] for key, rows in buckets.items()}
+        self.assertEqual(names["recent_completed"], ["咨询意见周报"])
+        self.assertEqual(names["overdue"], [])
+        self.assertEqual(names["upcoming"], ["过程咨询报告", "a", "b", "核图意见书"])
+
+    def test_portfolio_rows_share_one_axis(self):
+        projects, timelines = self._timelines()
+        axis = portfolio_axis(timelines.values())
+        self.assertEqual(axis, (date(2025, 1, 1), date(2025, 4, 11)))
+        rows = {row["project_id"]: row for row in portfolio_rows(projects, timelines, axis)}
+        self.assertEqual((rows[self.templated.id]["bar_offset"], rows[self.templated.id]["bar_width"]), (0, 100))
+        self.assertEqual(rows[self.plain.id]["bar_offset"], 49.0)
+        self.assertEqual(rows[self.templated.id]["max_delay_days"], 28)
+        self.assertEqual([marker["position"] for marker in rows[self.plain.id]["markers"]], [49.0, 59.0])
+
+    def test_dashboard_reminders_come_from_engine(self):
+        payload = build_project_dashboard_payload(self.admin, set(), QueryDict())
+        reminders = payload["delayed_task_reminders"]
+        self.assertTrue(reminders)
+        delays = [item["delay_days"] for item in reminders]
+        self.assertEqual(delays, sorted(delays, reverse=True))
+        metric = next(m for m in payload["project_metrics"] if m["project_id"] == self.templated.id)
+        self.assertEqual((metric["milestone_total"], metric["milestone_completed"]), (4, 1))
+
+    def test_task_board_backfills_presets_and_buckets(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("collaboration_pages:task_board"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "VIH-TL-002 · a")
+        # full_process_consulting 预设中缺失的里程碑一次补齐
+        self.assertTrue(ProjectMilestone.objects.filter(project=self.templated, name="完工确认函").exists())
+
+    def test_portfolio_gantt_page_queries_do_not_grow(self):
+        self.client.force_login(self.admin)
+        url = reverse("project_pages:project_portfolio_gantt")
+
+        def measure():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        small = measure()
+        for index in range(5):
+            project = Project.objects.create(
+                name=f"extra{index}", project_number=f"VIH-TL-1{index:02d}", created_by=self.admin,
+            )
+            self._milestone(project, "m", date.today() - timedelta(days=index + 1))
+        self.assertEqual(measure(), small)
+
+        data = self.client.get(url, {"format": "json"}).json()["data"]
+        self.assertEqual(data["summary"]["project_count"], 7)
+        self.assertEqual(len(data["rows"]), 7)
+        self.assertContains(self.client.get(url), "VIH-TL-001")
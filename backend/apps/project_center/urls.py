@@ -33,6 +33,10 @@ urlpatterns = [
     path('<int:project_id>/drawings/submit/', views_pages.project_drawing_submit, name='project_drawing_submit'),
     path('<int:project_id>/drawings/<int:submission_id>/action/', views_pages.project_drawing_action, name='project_drawing_action'),
     path('<int:project_id>/drawings/<int:submission_id>/review/', views_pages.project_drawing_review, name='project_drawing_review'),
+    path('notifications/stream/', views_pages.notification_stream, name='notification_stream'),
+    path('notifications/poll/', views_pages.notification_poll, name='notification_poll'),
+    path('drawing-files/<int:file_id>/download/', views_pages.drawing_file_download, name='drawing_file_download'),
+    path('documents/<int:document_id>/download/', views_pages.project_document_download, name='project_document_download'),
     path('<int:project_id>/flow/action/', views_pages.project_flow_action, name='project_flow_action'),
     path('<int:project_id>/tasks/<int:task_id>/action/', views_pages.project_task_action, name='project_task_action'),
     path('<int:project_id>/start-notices/create/', views_pages.project_start_notice_create, name='project_start_notice_create'),
@@ -42,7 +46,9 @@ urlpatterns = [
     # 兼容旧的项目查询URL，重定向到项目总览
     path('query/', lambda request: redirect('project_pages:project_list', permanent=False)),
     path('<int:project_id>/detail/', views_pages.project_detail, name='project_detail'),
+    path('<int:project_id>/detail/tabs/<slug:tab>/', views_pages.project_detail_tab, name='project_detail_tab'),
     path('tasks/dashboard/', views_pages.project_task_dashboard, name='project_task_dashboard'),
+    path('portfolio/gantt/', views_pages.project_portfolio_gantt, name='project_portfolio_gantt'),
     path('<int:project_id>/client-pre-docs/', views_pages.project_client_pre_docs, name='project_client_pre_docs'),
     path('<int:project_id>/design-reply/', views_pages.project_design_reply, name='project_design_reply'),
     path('<int:project_id>/meeting-log/', views_pages.project_meeting_log, name='project_meeting_log'),
@@ -50,6 +56,7 @@ urlpatterns = [
     path('<int:project_id>/internal-verify/', views_pages.project_internal_verify, name='project_internal_verify'),
     path('<int:project_id>/client-confirm/', views_pages.project_client_confirm_outcome, name='project_client_confirm_outcome'),
     path('<int:project_id>/archive/', views_pages.project_archive, name='project_archive'),
+    path('<int:project_id>/archive/<int:archive_id>/package/', views_pages.project_archive_package, name='project_archive_package'),
     path('monitor/', views_pages.project_monitor, name='project_monitor'),
     
     # 项目立项路由
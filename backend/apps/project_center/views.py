@@ -3,10 +3,13 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Q, Count, Sum
+from django.db.models import Count, Sum
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from backend.apps.system_management.services import get_user_permission_codes
+from backend.apps.system_management.services_search import search_filter
+from backend.core.pagination import KeysetPagination
+from backend.core.sparse_fields import SparseFieldsViewSetMixin
 from django.db import transaction
 from .views_pages import (
     build_project_dashboard_payload,
@@ -27,22 +30,28 @@ from .models import (
     ProjectStartNotice,
 )
 from .serializers import (
-    ProjectSerializer, ProjectCreateSerializer, ProjectTeamSerializer,
+    ProjectSerializer, ProjectListSerializer, ProjectCreateSerializer, ProjectTeamSerializer,
     ProjectMilestoneSerializer, ProjectDocumentSerializer,
     ProjectArchiveSerializer, ProjectTeamNotificationSerializer,
     ProjectDrawingSubmissionSerializer, ProjectDrawingReviewSerializer,
     ProjectDrawingFileSerializer, ProjectStartNoticeSerializer,
 )
+from .services_notifications import mark_notifications_read
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
+    """项目接口；列表与详情支持 ?fields= / ?expand=，关联查询按返回字段规划"""
     queryset = Project.objects.all()
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'service_type', 'project_manager', 'client']
+    # 只读统计动作读取副本（见 backend/core/db_router.py）
+    replica_actions = ('statistics', 'dashboard', 'dashboard_charts')
     
     def get_serializer_class(self):
         if self.action == 'create':
             return ProjectCreateSerializer
+        if self.action == 'list':
+            return ProjectListSerializer
         return ProjectSerializer
     
     def get_queryset(self):
@@ -54,11 +63,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         # 搜索功能
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(project_number__icontains=search) |
-                Q(name__icontains=search) |
-                Q(client__name__icontains=search)
-            )
+            queryset = search_filter(queryset, 'project', search, fields=('code', 'title', 'subtitle'))
         
         # 时间范围过滤
         start_date_from = self.request.query_params.get('start_date_from')
@@ -68,11 +73,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         if start_date_to:
             queryset = queryset.filter(start_date__lte=start_date_to)
         
-        return queryset.select_related(
-            'project_manager', 'created_by', 'client', 'service_type'
-        ).prefetch_related(
-            'team_members', 'milestones', 'documents', 'service_professions'
-        )
+        return queryset
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -222,7 +223,7 @@ class ProjectTeamNotificationViewSet(mixins.ListModelMixin,
                                      viewsets.GenericViewSet):
     serializer_class = ProjectTeamNotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         queryset = ProjectTeamNotification.objects.filter(
@@ -235,7 +236,7 @@ class ProjectTeamNotificationViewSet(mixins.ListModelMixin,
         elif status_filter == 'read':
             queryset = queryset.filter(is_read=True)
 
-        return queryset.order_by('-created_time')
+        return queryset.order_by('-id')
 
     def perform_update(self, serializer):
         notification = serializer.instance
@@ -264,14 +265,12 @@ class ProjectTeamNotificationViewSet(mixins.ListModelMixin,
         ids = request.data.get('ids', [])
         if not isinstance(ids, list):
             return Response({'detail': 'ids 必须为列表'}, status=status.HTTP_400_BAD_REQUEST)
-        queryset = self.get_queryset().filter(id__in=ids, is_read=False)
-        updated = queryset.update(is_read=True, read_time=timezone.now())
+        updated = mark_notifications_read(self.get_queryset().filter(id__in=ids))
         return Response({'updated': updated})
 
     @action(detail=False, methods=['post'], url_path='mark-all-read')
     def mark_all_read(self, request):
-        queryset = self.get_queryset().filter(is_read=False)
-        updated = queryset.update(is_read=True, read_time=timezone.now())
+        updated = mark_notifications_read(self.get_queryset())
         return Response({'updated': updated})
 
 
@@ -9,14 +9,15 @@ import logging
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.db import transaction
-from django.db.models import Q, F, Sum, Count
+from django.db.models import Q, F, Sum, Count, Exists, OuterRef
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.urls import reverse
 from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
 from django.utils.translation import gettext as _
 from django.forms import inlineformset_factory
 from django.conf import settings
@@ -26,7 +27,6 @@ from django.utils.html import format_html, format_html_join
 from .models import (
     Project,
     ProjectTeam,
-    ProjectTeamChangeLog,
     ProjectTeamNotification,
     ProjectTask,
     ProjectMilestone,
@@ -43,9 +43,31 @@ from .models import (
     ServiceProfession,
 )
 from .serializers import ProjectSerializer, ProjectCreateSerializer
+from .services_archive import package_available, package_filename, request_archive_package
+from .services_detail import cached_tab
+from .services_timeline import (
+    axis_position,
+    build_timelines,
+    portfolio_axis,
+    portfolio_rows,
+    rank_delayed,
+)
+from .services_notifications import (
+    STREAM_MAX_SECONDS,
+    latest_notification_id,
+    notifications_since,
+    open_notification_stream,
+    unread_counts,
+)
+from .services_team import sync_project_team
 
 from backend.apps.system_management.models import User, Department
 from backend.apps.system_management.services import get_user_permission_codes
+from backend.apps.system_management.services_org import subtree_ids
+from backend.apps.system_management.services_search import search_filter
+from backend.core.dashboard_cache import cached_summary
+from backend.core.db_router import replica_reads
+from backend.core.downloads import serve_protected_file
 # calculate_output_value 改为延迟导入，避免在数据库表不存在时导致模块加载失败
 
 # 延迟导入 production_quality 模块，避免循环依赖
@@ -119,6 +141,12 @@ PROJECT_CENTER_NAV_ITEMS = [
         'url_name': 'project_pages:project_monitor',
         'permissions': ('project_center.monitor',),
     },
+    {
+        'id': 'project_portfolio_gantt',
+        'label': '组合甘特',
+        'url_name': 'project_pages:project_portfolio_gantt',
+        'permissions': ('project_center.view_all', 'project_center.view_assigned'),
+    },
     {
         'id': 'project_import_admin',
         'label': '批量导入',
@@ -352,37 +380,6 @@ TIMELINE_STAGE_PRESETS = {
 
 DEFAULT_TIMELINE_STAGES = ["立项", "设计", "执行", "收尾"]
 
-SERVICE_TIMELINE_TEMPLATES = {
-    "result_optimization": [
-        "优化前图纸",
-        "咨询意见书",
-        "三方沟通成果",
-        "核图意见书",
-        "优化后图纸",
-        "完工确认函",
-    ],
-    "detailed_review": [
-        "优化前图纸",
-        "咨询意见书",
-        "三方沟通成果",
-        "核图意见书",
-        "优化后图纸",
-        "完工确认函",
-    ],
-    "process_optimization": [
-        "优化前图纸",
-        "过程优化报告",
-        "核图意见书",
-        "优化后图纸",
-        "完工确认函",
-    ],
-    "full_process_consulting": [
-        "咨询意见周报",
-        "过程咨询报告",
-        "核图意见书",
-        "完工确认函",
-    ],
-}
 
 
 def build_project_create_context(form_data=None, selected_profession_ids=None):
@@ -566,28 +563,44 @@ def _filter_projects_for_user(projects, user, permission_set):
     if not user or not getattr(user, 'is_authenticated', False):
         return projects.none()
 
-    scoped_projects = projects.filter(_project_visibility_filter(user))
+    visibility = _project_visibility_filter(user)
 
     if (
         getattr(user, 'user_type', 'internal') == 'internal'
         and user.department_id
         and _has_permission(permission_set, 'task_collaboration.view_all')
     ):
-        department_users = User.objects.filter(department_id=user.department_id, is_active=True)
-        department_scope = (
+        # 本部门及全部下级部门的成员参与的项目
+        department_users = User.objects.filter(
+            department_id__in=subtree_ids(user.department_id), is_active=True,
+        ).values('pk')
+        visibility |= (
             Q(project_manager__in=department_users) |
             Q(team_members__user__in=department_users) |
             Q(business_manager__in=department_users)
         )
-        scoped_projects = scoped_projects.union(projects.filter(department_scope))
 
-    return scoped_projects.distinct()
+    return projects.filter(visibility).distinct()
 
 
-def _task_visible_to_user(task, user, project):
-    if task.assigned_to_id == getattr(user, 'id', None):
-        return True
-    return _user_matches_role(user, project, task.assigned_role)
+# 由项目字段直接确定负责人的角色，其余角色按团队成员判断（与 _user_matches_role 一致）
+PROJECT_FIELD_ROLES = {
+    'client_lead': 'project__client_leader',
+    'design_lead': 'project__design_leader',
+    'project_manager': 'project__project_manager',
+    'business_manager': 'project__business_manager',
+}
+
+
+def _tasks_visible_to_user_q(user):
+    """用户可处理的任务：指派给本人，或本人担任任务的指派角色；在 SQL 中按 assigned_role 判断"""
+    condition = Q(assigned_to=user)
+    for role, field in PROJECT_FIELD_ROLES.items():
+        condition |= Q(assigned_role=role, **{field: user})
+    team_role = ProjectTeam.objects.filter(
+        project=OuterRef('project'), user=user, role=OuterRef('assigned_role'), is_active=True,
+    )
+    return condition | (~Q(assigned_role__in=list(PROJECT_FIELD_ROLES)) & Exists(team_role))
 
 
 def _resolve_task_assignee(project, role):
@@ -978,99 +991,6 @@ def _validate_team_configuration(project):
         raise ValidationError(errors)
 
 
-def _log_team_changes(project, operator, previous_snapshot, current_snapshot):
-    previous = set(previous_snapshot)
-    current = set(current_snapshot)
-    added = current - previous
-    removed = previous - current
-    change_details = {'added': [], 'removed': []}
-
-    for user_id, role, unit, is_external, profession_id in added:
-        member = User.objects.filter(id=user_id).first()
-        profession = ServiceProfession.objects.filter(id=profession_id).first() if profession_id else None
-        ProjectTeamChangeLog.objects.create(
-            project=project,
-            member=member,
-            role=role,
-            unit=unit,
-            is_external=is_external,
-            service_profession=profession,
-            action='added',
-            operator=operator,
-        )
-        change_details['added'].append({
-            'member': member,
-            'role': role,
-            'unit': unit,
-            'profession': profession,
-            'is_external': is_external,
-        })
-
-    for user_id, role, unit, is_external, profession_id in removed:
-        member = User.objects.filter(id=user_id).first()
-        profession = ServiceProfession.objects.filter(id=profession_id).first() if profession_id else None
-        ProjectTeamChangeLog.objects.create(
-            project=project,
-            member=member,
-            role=role,
-            unit=unit,
-            is_external=is_external,
-            service_profession=profession,
-            action='removed',
-            operator=operator,
-        )
-        change_details['removed'].append({
-            'member': member,
-            'role': role,
-            'unit': unit,
-            'profession': profession,
-            'is_external': is_external,
-        })
-
-    return change_details
-
-
-def _summarize_changes(change_details):
-    parts = []
-    if change_details['added']:
-        seen_members = set()
-        names = []
-        anonymous_count = 0
-        for entry in change_details['added']:
-            member = entry.get('member')
-            if member and member.id:
-                if member.id in seen_members:
-                    continue
-                seen_members.add(member.id)
-                names.append(member.get_full_name() or member.username)
-            else:
-                anonymous_count += 1
-        total_added = len(seen_members) + anonymous_count
-        parts.append(
-            f"新增 {total_added} 人"
-            + (f"：{'、'.join(names[:3])}{'…' if len(names) > 3 else ''}" if names else '')
-        )
-    if change_details['removed']:
-        seen_members = set()
-        names = []
-        anonymous_count = 0
-        for entry in change_details['removed']:
-            member = entry.get('member')
-            if member and member.id:
-                if member.id in seen_members:
-                    continue
-                seen_members.add(member.id)
-                names.append(member.get_full_name() or member.username)
-            else:
-                anonymous_count += 1
-        total_removed = len(seen_members) + anonymous_count
-        parts.append(
-            f"移除 {total_removed} 人"
-            + (f"：{'、'.join(names[:3])}{'…' if len(names) > 3 else ''}" if names else '')
-        )
-    return '；'.join(parts)
-
-
 def _create_team_notification(project, recipient, title, message, action_url=None, operator=None, context=None):
     if not recipient:
         return
@@ -1087,128 +1007,10 @@ def _create_team_notification(project, recipient, title, message, action_url=Non
     )
 
 
-def _notify_team_change(project, operator, change_details):
-    if not change_details['added'] and not change_details['removed']:
-        return ''
-    summary = _summarize_changes(change_details)
-    operator_name = ''
-    if operator:
-        operator_name = operator.get_full_name() or operator.username
-    action_url = reverse('project_pages:project_detail', args=[project.id])
-
-    for entry in change_details['added']:
-        member = entry.get('member')
-        if not member:
-            continue
-        role_label = ROLE_LABELS.get(entry.get('role'), entry.get('role'))
-        unit_label = UNIT_LABELS.get(entry.get('unit'), '')
-        profession = entry.get('profession')
-        profession_label = f"（{profession.name}）" if profession else ''
-        message = f"您被指派为《{project.name}》({project.project_number}){unit_label}的{role_label}{profession_label}。"
-        if operator_name:
-            message += f" 操作人：{operator_name}"
-        _create_team_notification(
-            project,
-            member,
-            '团队新增成员',
-            message,
-            action_url,
-            operator=operator,
-            context={
-                'action': 'added',
-                'role': role_label,
-                'profession': profession.name if profession else None,
-                'unit': unit_label,
-            }
-        )
-
-    for entry in change_details['removed']:
-        member = entry.get('member')
-        if not member:
-            continue
-        role_label = ROLE_LABELS.get(entry.get('role'), entry.get('role'))
-        unit_label = UNIT_LABELS.get(entry.get('unit'), '')
-        profession = entry.get('profession')
-        profession_label = f"（{profession.name}）" if profession else ''
-        message = f"您已从《{project.name}》({project.project_number}){unit_label}的{role_label}{profession_label}角色中移除。"
-        if operator_name:
-            message += f" 操作人：{operator_name}"
-        _create_team_notification(
-            project,
-            member,
-            '团队成员调整',
-            message,
-            action_url,
-            operator=operator,
-            context={
-                'action': 'removed',
-                'role': role_label,
-                'profession': profession.name if profession else None,
-                'unit': unit_label,
-            }
-        )
-
-    stakeholder_candidates = {
-        project.project_manager,
-        project.business_manager,
-        project.created_by,
-    }
-    if operator:
-        stakeholder_candidates.add(operator)
-    stakeholder_candidates.discard(None)
-    stakeholder_message = f"{project.project_number} {project.name} 团队更新：{summary}" if summary else ''
-    if operator_name:
-        stakeholder_message += f"（操作人：{operator_name}）"
-    for stakeholder in stakeholder_candidates:
-        if not stakeholder_message:
-            continue
-        _create_team_notification(
-            project,
-            stakeholder,
-            '团队变更提醒',
-            stakeholder_message,
-            action_url,
-            operator=operator,
-            context={
-                'action': 'summary',
-                'summary': summary,
-                'changed_roles': [
-                    {
-                        'member': entry.get('member').username if entry.get('member') else None,
-                        'role': ROLE_LABELS.get(entry.get('role'), entry.get('role')),
-                        'unit': UNIT_LABELS.get(entry.get('unit'), entry.get('unit')),
-                        'action': 'added',
-                    }
-                    for entry in change_details['added']
-                ] + [
-                    {
-                        'member': entry.get('member').username if entry.get('member') else None,
-                        'role': ROLE_LABELS.get(entry.get('role'), entry.get('role')),
-                        'unit': UNIT_LABELS.get(entry.get('unit'), entry.get('unit')),
-                        'action': 'removed',
-                    }
-                    for entry in change_details['removed']
-                ]
-            }
-        )
-
-    logger.info('项目[%s]团队变更 by %s: %s', project.project_number, operator.username if operator else '系统', summary)
-    return summary
-
-
-def _compute_project_metric(project):
-    milestones = list(project.milestones.all())
-
-    service_timeline, service_completion = _build_service_timeline(project, milestones)
-    if service_timeline:
-        total_milestones = len(service_timeline)
-        completed_milestones = len([stage for stage in service_timeline if stage["status"] == "completed"])
-        progress_percent = service_completion
-    else:
-        total_milestones = len(milestones)
-        completed_milestones = len([m for m in milestones if m.is_completed])
-        progress_percent = int(completed_milestones / total_milestones * 100) if total_milestones else 0
-        service_completion = progress_percent
+def _compute_project_metric(project, timeline):
+    progress_percent = timeline.percent
+    total_milestones = timeline.total
+    completed_milestones = timeline.completed
 
     quality_score = 80 + (progress_percent % 15)
     risk_score = 90 - (progress_percent % 15)
@@ -1225,7 +1027,8 @@ def _compute_project_metric(project):
         'quality_score': quality_score,
         'risk_score': risk_score,
         'health_score': health_score,
-        'team_size': project.team_members.filter(is_active=True).count(),
+        # 复用预取的团队成员，避免每个项目单独计数
+        'team_size': sum(1 for member in project.team_members.all() if member.is_active),
         'client_company': project.client_company_name or '—',
         'design_company': project.design_company or '—',
     }
@@ -1237,7 +1040,6 @@ def build_project_dashboard_payload(user, permission_set, query_params):
         'business_manager'
     ).prefetch_related(
         'service_professions',
-        'milestones',
         'team_members'
     )
 
@@ -1272,34 +1074,22 @@ def build_project_dashboard_payload(user, permission_set, query_params):
 
     all_projects = projects.distinct()
     project_list = list(all_projects)
-    project_metrics = [_compute_project_metric(p) for p in project_list]
-
-    today = timezone.now().date()
-    delayed_task_reminders = []
-    for project_obj, metric in zip(project_list, project_metrics):
-        for milestone in project_obj.milestones.all():
-            delay_days = 0
-            if milestone.planned_date and milestone.actual_date and milestone.actual_date > milestone.planned_date:
-                delay_days = (milestone.actual_date - milestone.planned_date).days
-            elif (
-                milestone.planned_date
-                and milestone.planned_date < today
-                and not milestone.is_completed
-            ):
-                delay_days = (today - milestone.planned_date).days
-            if delay_days <= 0:
-                continue
-            delayed_task_reminders.append({
-                'project_id': project_obj.id,
-                'project_name': metric['project_name'],
-                'milestone_id': milestone.id,
-                'name': milestone.name,
-                'delay_days': delay_days,
-                'url': f"{reverse('project_pages:project_detail', args=[project_obj.id])}?tab=progress&milestone={milestone.id}",
-            })
+    today = timezone.localdate()
+    timelines = build_timelines(project_list, today)
+    project_metrics = [_compute_project_metric(p, timelines[p.id]) for p in project_list]
+    project_names = {metric['project_id']: metric['project_name'] for metric in project_metrics}
 
-    delayed_task_reminders.sort(key=lambda item: item['delay_days'], reverse=True)
-    delayed_task_reminders = delayed_task_reminders[:5]
+    delayed_task_reminders = [
+        {
+            'project_id': owner_id,
+            'project_name': project_names[owner_id],
+            'milestone_id': task['milestone_id'],
+            'name': task['name'],
+            'delay_days': task['delay_days'],
+            'url': f"{reverse('project_pages:project_detail', args=[owner_id])}?tab=progress&milestone={task['milestone_id']}",
+        }
+        for owner_id, task in rank_delayed(timelines.values(), 5)
+    ]
 
     summary = {
         'project_count': all_projects.count(),
@@ -1912,29 +1702,21 @@ def project_team(request, project_id):
         messages.error(request, '您无权配置该项目团队。')
         return redirect('home')
     
-    existing_snapshot = list(ProjectTeam.objects.filter(project=project, is_active=True).values_list('user_id', 'role', 'unit', 'is_external', 'service_profession_id'))
-
     if request.method == 'POST':
         try:
             with transaction.atomic():
                 def _normalize_ids(raw_list):
                     return [int(uid) for uid in raw_list if str(uid).strip()]
 
+                # 收集整张表单的目标名单，最后一次性同步
+                roster = []
+                scopes = []
+
                 def sync_role(role_code, new_ids, profession_obj=None):
                     meta = ROLE_META[role_code]
                     if meta['per_profession'] and profession_obj is None:
                         return
-                    qs = ProjectTeam.objects.filter(
-                        project=project,
-                        role=role_code,
-                        unit=meta['unit'],
-                        is_external=meta['is_external'],
-                    )
-                    if meta['per_profession']:
-                        qs = qs.filter(service_profession=profession_obj)
-                    else:
-                        qs = qs.filter(service_profession__isnull=True)
-                    existing_ids = set(qs.values_list('user_id', flat=True))
+                    profession_id = profession_obj.id if meta['per_profession'] else None
                     new_ids_clean = []
                     for uid in new_ids:
                         try:
@@ -1945,21 +1727,8 @@ def project_team(request, project_id):
                             new_ids_clean.append(val)
                     if not meta['multiple'] and new_ids_clean:
                         new_ids_clean = new_ids_clean[:1]
-                    new_ids_set = set(new_ids_clean)
-                    to_add = new_ids_set - existing_ids
-                    to_remove = existing_ids - new_ids_set
-
-                    for user_id in to_add:
-                        ProjectTeam.objects.create(
-                            project=project,
-                            user_id=user_id,
-                            service_profession=profession_obj if meta['per_profession'] else None,
-                            role=role_code,
-                            unit=meta['unit'],
-                            join_date=timezone.now()
-                        )
-                    if to_remove:
-                        qs.filter(user_id__in=to_remove).delete()
+                    scopes.append((role_code, profession_id))
+                    roster.extend((user_id, role_code, profession_id) for user_id in new_ids_clean)
 
                 # 更新项目负责人
                 project_manager_id = request.POST.get('project_manager')
@@ -2025,11 +1794,11 @@ def project_team(request, project_id):
 
                 project.status = 'waiting_start'
                 project.save(update_fields=['status'])
+                sync_result = sync_project_team(project, roster, operator=request.user, scopes=scopes)
                 _validate_team_configuration(project)
-
-                new_snapshot = list(ProjectTeam.objects.filter(project=project, is_active=True).values_list('user_id', 'role', 'unit', 'is_external', 'service_profession_id'))
-                change_details = _log_team_changes(project, request.user, existing_snapshot, new_snapshot)
-                change_summary = _notify_team_change(project, request.user, change_details)
+                change_summary = sync_result.summary
+                if sync_result.has_changes:
+                    logger.info('项目[%s]团队变更 by %s: %s', project.project_number, request.user.username, change_summary)
 
                 # 标记"配置项目团队"任务为已完成
                 _complete_project_task(project, 'configure_team', actor=request.user)
@@ -2220,25 +1989,10 @@ def project_team(request, project_id):
     }, permission_set, 'project_team', request.user)
     return render(request, 'project_center/project_team.html', context)
 
-@login_required
-def project_monitor(request):
-    """项目监控驾驶舱"""
-    permission_set = get_user_permission_codes(request.user)
-    if not _require_permission(
-        request,
-        permission_set,
-        '您没有访问项目监控的权限。',
-        'project_center.monitor',
-        'project_center.view_all',
-        'project_center.view_assigned',
-    ):
-        return redirect('home')
 
-    dashboard_data = build_project_dashboard_payload(
-        request.user,
-        permission_set,
-        request.GET
-    )
+def _project_monitor_summary(user, permission_set, query_params):
+    """项目监控看板的汇总卡片与趋势列表（可缓存的纯数据）"""
+    dashboard_data = build_project_dashboard_payload(user, permission_set, query_params)
 
     summary_cards = [
         {
@@ -2273,6 +2027,33 @@ def project_monitor(request):
                 'icon': '📊',
             }
         )
+    return {'summary_cards': summary_cards, 'trend_items': trend_items}
+
+
+@login_required
+def project_monitor(request):
+    """项目监控驾驶舱"""
+    permission_set = get_user_permission_codes(request.user)
+    if not _require_permission(
+        request,
+        permission_set,
+        '您没有访问项目监控的权限。',
+        'project_center.monitor',
+        'project_center.view_all',
+        'project_center.view_assigned',
+    ):
+        return redirect('home')
+
+    summary = cached_summary(
+        'project_monitor',
+        ('project_center.Project', 'project_center.ProjectMilestone', 'project_center.ProjectTeam'),
+        lambda: _project_monitor_summary(request.user, permission_set, request.GET),
+        user=request.user,
+        permission_codes=permission_set,
+        params=request.GET,
+    )
+    summary_cards = summary['summary_cards']
+    trend_items = summary['trend_items']
 
     context_payload = {
         'page_title': '项目监控驾驶舱',
@@ -2347,12 +2128,9 @@ def project_list(request):
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
     
-    if project_number:
-        projects = projects.filter(project_number__icontains=project_number)
-    if project_name:
-        projects = projects.filter(name__icontains=project_name)
-    if client_name:
-        projects = projects.filter(client_company_name__icontains=client_name)
+    projects = search_filter(projects, 'project', project_number, fields=('code',))
+    projects = search_filter(projects, 'project', project_name, fields=('title',))
+    projects = search_filter(projects, 'project', client_name, fields=('subtitle',))
     if service_type_ids:
         # 过滤掉非数字，避免 ValueError
         valid_ids = []
@@ -2379,6 +2157,7 @@ def project_list(request):
     }, permission_set, 'project_list', request.user)
     return render(request, 'project_center/project_list.html', context)
 
+@replica_reads
 @login_required
 def project_list_export(request):
     permission_set = get_user_permission_codes(request.user)
@@ -2425,127 +2204,171 @@ def project_list_export(request):
     workbook.save(response)
     return response
 
+
+def _user_can_access_project(user, project_id):
+    permission_set = get_user_permission_codes(user)
+    return _filter_projects_for_user(Project.objects.filter(pk=project_id), user, permission_set).exists()
+
+
 @login_required
-def project_detail(request, project_id):
-    project = get_object_or_404(
-        Project.objects.select_related(
-            'service_type', 'project_manager', 'business_manager', 'created_by'
-        ).prefetch_related('service_professions', 'milestones', 'team_members__user'),
-        id=project_id
+@require_http_methods(["GET"])
+def notification_stream(request):
+    """通知推送（SSE）：新通知与未读数变化实时推送到首页通知中心；本进程连接数已满时返回 503，浏览器改为轮询"""
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    stream = open_notification_stream(
+        request.user.id,
+        last_event_id=int(last_event_id) if last_event_id.isdigit() else None,
     )
+    if stream is None:
+        response = JsonResponse({'fallback': 'poll', 'retry_after': STREAM_MAX_SECONDS}, status=503)
+        response['Retry-After'] = str(STREAM_MAX_SECONDS)
+        return response
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # 禁止 nginx 缓冲，事件即时送达
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
-    permission_set = get_user_permission_codes(request.user)
-    if not _require_permission(request, permission_set, '您没有查看项目详情的权限。', 'project_center.view_all', 'project_center.view_assigned'):
-        return redirect('home')
-    if not _has_permission(permission_set, 'project_center.view_all') and not _user_is_project_member(request.user, project):
-        messages.error(request, '您无权查看该项目详情。')
-        return redirect('home')
 
-    team_manage_permitted = _has_permission(permission_set, 'project_center.configure_team')
-    edit_permitted = _has_permission(permission_set, 'project_center.create')
-    is_technical_manager = request.user.roles.filter(code='technical_manager').exists() or '技术部经理' in (request.user.position or '')
+@login_required
+@require_http_methods(["GET"])
+def notification_poll(request):
+    """通知轮询：SSE 连接名额已满时的降级方案，返回 after 之后的新通知与当前未读数"""
+    after = request.GET.get('after', '')
+    last_id = int(after) if after.isdigit() else latest_notification_id(request.user.id)
+    entries = notifications_since(request.user.id, last_id)
+    return JsonResponse({
+        'notifications': entries,
+        'counts': unread_counts(request.user.id),
+        'last_id': entries[-1]['id'] if entries else last_id,
+    })
 
-    created_by_display = _format_user_display(getattr(project, 'created_by', None), '—')
-    project_manager_display = _format_user_display(project.project_manager, '待分配')
-    business_manager_display = _format_user_display(project.business_manager, '待分配')
 
-    milestones = list(project.milestones.all())
-    service_timeline, service_completion = _build_service_timeline(project, milestones)
-    if service_timeline:
-        total_milestones = len(service_timeline)
-        completed_milestones = len([stage for stage in service_timeline if stage["status"] == "completed"])
-        progress_percent = service_completion
-    else:
-        total_milestones = len(milestones)
-        completed_milestones = len([m for m in milestones if m.is_completed])
-        progress_percent = int(completed_milestones / total_milestones * 100) if total_milestones else 0
-        service_completion = progress_percent
-
-
-    today = timezone.now().date()
-    tasks = []
-    base_start = project.start_date or (milestones[0].planned_date if milestones else today)
-    base_end = project.end_date or (milestones[-1].planned_date if milestones else base_start)
-    if base_start and base_end and base_end <= base_start:
-        base_end = base_start + timedelta(days=30)
-    if not base_start:
-        base_start = today
-    if not base_end:
-        base_end = base_start + timedelta(days=30)
-    total_span_days = max((base_end - base_start).days, 1)
-
-    status_label_map = {
-        'completed': '已完成',
-        'in_progress': '进行中',
-        'delayed': '已延迟',
-    }
-    status_class_map = {
-        'completed': 'success',
-        'in_progress': 'primary',
-        'delayed': 'danger',
-    }
+@login_required
+@require_http_methods(["GET", "HEAD"])
+def drawing_file_download(request, file_id):
+    """下载项目图纸文件（鉴权后由 Web 服务器发送）"""
+    drawing_file = get_object_or_404(ProjectDrawingFile.objects.select_related('submission'), pk=file_id)
+    if not _user_can_access_project(request.user, drawing_file.submission.project_id):
+        raise Http404('文件不存在')
+    return serve_protected_file(request, drawing_file.file, drawing_file.name)
 
-    if project.start_date:
-        previous_planned = project.start_date
-    elif milestones and milestones[0].planned_date:
-        previous_planned = milestones[0].planned_date - timedelta(days=7)
-    else:
-        previous_planned = today
-
-    for index, milestone in enumerate(milestones):
-        planned_start = previous_planned or milestone.planned_date or base_start
-        planned_end = milestone.planned_date or planned_start
-        if planned_end and planned_start and planned_end < planned_start:
-            planned_start = planned_end
-        actual_end = milestone.actual_date
-        status = 'completed' if milestone.is_completed else 'in_progress'
-        delay_days = 0
-        if milestone.is_completed and actual_end and planned_end and actual_end > planned_end:
-            status = 'delayed'
-            delay_days = (actual_end - planned_end).days
-        elif not milestone.is_completed and planned_end and today > planned_end:
-            status = 'delayed'
-            delay_days = (today - planned_end).days
-
-        duration_days = max((planned_end - planned_start).days if planned_end and planned_start else 0, 1)
-        timeline_offset = 0
-        if planned_start:
-            timeline_offset = max(0, (planned_start - base_start).days) / total_span_days * 100
-        timeline_width = min(100, max(duration_days / total_span_days * 100, 4))
-
-        tasks.append({
-            'name': milestone.name,
-            'planned_start': planned_start,
-            'planned_end': planned_end,
-            'actual_end': actual_end,
-            'status': status,
-            'status_label': status_label_map.get(status, status),
-            'status_badge_class': status_class_map.get(status, 'secondary'),
-            'delay_days': delay_days if delay_days > 0 else 0,
-            'timeline_offset': round(timeline_offset, 2),
-            'timeline_width': round(timeline_width, 2),
-        })
-        previous_planned = planned_end or previous_planned
 
-    tasks_summary = {
-        'completed': len([t for t in tasks if t['status'] == 'completed']),
-        'in_progress': len([t for t in tasks if t['status'] == 'in_progress']),
-        'delayed': len([t for t in tasks if t['status'] == 'delayed']),
+@login_required
+@require_http_methods(["GET", "HEAD"])
+def project_document_download(request, document_id):
+    """下载项目文档"""
+    document = get_object_or_404(ProjectDocument, pk=document_id)
+    if not _user_can_access_project(request.user, document.project_id):
+        raise Http404('文件不存在')
+    return serve_protected_file(request, document.file)
+
+
+def _project_detail_denial(user, project, permission_set):
+    """无权查看项目详情时返回提示，有权限时返回 None"""
+    if not _has_permission(permission_set, 'project_center.view_all', 'project_center.view_assigned'):
+        return '您没有查看项目详情的权限。'
+    if not _has_permission(permission_set, 'project_center.view_all') and not _user_is_project_member(user, project):
+        return '您无权查看该项目详情。'
+    return None
+
+
+def _show_risk_section(user, permission_set):
+    return (
+        getattr(user, 'user_type', 'internal') == 'internal'
+        or _has_permission(permission_set, 'project_center.view_all', 'project_center.configure_team')
+    )
+
+
+def _project_membership(user, project):
+    """一次查询得到用户在项目中的角色集合与是否项目成员，口径同 _user_matches_role / _user_is_project_member"""
+    rows = list(project.team_members.filter(user=user).values_list('role', 'is_active'))
+    roles = {role for role, is_active in rows if is_active and role not in PROJECT_FIELD_ROLES}
+    for role, field in PROJECT_FIELD_ROLES.items():
+        if getattr(project, f"{field.split('__', 1)[1]}_id", None) == user.id:
+            roles.add(role)
+    is_member = bool(rows) or bool(roles) or project.created_by_id == user.id
+    return roles, is_member
+
+
+def _project_timeline(project):
+    return build_timelines([project], timezone.localdate())[project.id]
+
+
+def _milestone_progress(timeline):
+    """里程碑甘特、完成统计与服务时间轴（概览、进度页签共用）"""
+    return {
+        'percent': timeline.percent,
+        'completed': timeline.completed,
+        'total': timeline.total,
+        'summary': timeline.summary,
+        'tasks': timeline.tasks,
+        'delayed_tasks': timeline.delayed[:5],
+        'upcoming': timeline.upcoming[:5],
+        'timeline': {
+            'stages': timeline.stages,
+            'completion_rate': timeline.stage_completion,
+        },
     }
-    total_tasks = sum(tasks_summary.values()) or 1
-    tasks_summary['completion_rate'] = round(tasks_summary['completed'] / total_tasks * 100, 1)
 
-    delayed_tasks = [task for task in tasks if task['status'] == 'delayed'][:5]
-    upcoming_milestones = [
+
+def _milestone_risk(timeline, owner_display):
+    """逾期里程碑构成的风险等级与待处理事项"""
+    level_label = '低'
+    level_class = 'success'
+    overdue_milestones = timeline.overdue
+    if overdue_milestones:
+        level_label = '中'
+        level_class = 'warning'
+    if len(overdue_milestones) > 3:
+        level_label = '高'
+        level_class = 'danger'
+    items = [
         {
-            'name': milestone.name,
-            'date': milestone.planned_date,
-            'days_remaining': (milestone.planned_date - today).days if milestone.planned_date else None,
+            'title': milestone['name'],
+            'category': '里程碑延迟',
+            'level': '高' if level_label == '高' else '中',
+            'owner': owner_display,
+            'days': milestone['days'],
         }
-        for milestone in milestones
-        if not milestone.is_completed and milestone.planned_date and milestone.planned_date >= today
-    ][:5]
+        for milestone in overdue_milestones[:5]
+    ]
+    return {
+        'level_label': level_label,
+        'level_class': level_class,
+        'high_count': len(items),
+        'items': items,
+    }
+
+
+def _detail_overview_tab(project):
+    timeline = _project_timeline(project)
+    progress = _milestone_progress(timeline)
+    leaders = project.team_members.filter(
+        is_active=True, role='professional_leader'
+    ).select_related('user').order_by('id')
+    return {
+        'progress': {
+            'percent': progress['percent'],
+            'completion_rate': progress['summary']['completion_rate'],
+            'next_milestone': progress['upcoming'][0] if progress['upcoming'] else None,
+        },
+        'health': {
+            'score': min(max(round(progress['percent'], 1), 0), 100),
+        },
+        'risk_level_label': _milestone_risk(timeline, '')['level_label'],
+        'service_professions': list(project.service_professions.values_list('name', flat=True)),
+        'professional_leaders': list(dict.fromkeys(_format_user_display(member.user, '') for member in leaders)),
+        'project_manager_display': _format_user_display(project.project_manager, '待分配'),
+        'business_manager_display': _format_user_display(project.business_manager, '待分配'),
+    }
 
+
+def _detail_progress_tab(project):
+    return _milestone_progress(_project_timeline(project))
+
+
+def _detail_team_tab(project):
     team_members = project.team_members.filter(is_active=True).select_related('user', 'service_profession')
     role_labels = dict(ProjectTeam.ROLE_CHOICES)
     team_summary = {}
@@ -2563,97 +2386,42 @@ def project_detail(request, project_id):
             'name': member.user.get_full_name() or member.user.username,
             'profession': member.service_profession.name if member.service_profession else '—',
         })
+    return {'groups': list(team_summary.values())}
 
-    professional_leaders = [entry for key, entry in team_summary.items() if 'professional_leader' in key]
-    professional_leader_names = [m['name'] for entry in professional_leaders for m in entry['members']]
 
-    risk_level_label = '低'
-    risk_level_class = 'success'
-    high_risk_items = []
-    overdue_milestones = [m for m in milestones if not m.is_completed and m.planned_date and m.planned_date < today]
-    if overdue_milestones:
-        risk_level_label = '中'
-        risk_level_class = 'warning'
-    if len(overdue_milestones) > 3:
-        risk_level_label = '高'
-        risk_level_class = 'danger'
+def _detail_quality_tab(project):
+    return _milestone_risk(
+        _project_timeline(project),
+        _format_user_display(project.project_manager, '待分配'),
+    )
 
-    for milestone in overdue_milestones[:5]:
-        high_risk_items.append({
-            'title': milestone.name,
-            'category': '里程碑延迟',
-            'level': '高' if risk_level_label == '高' else '中',
-            'owner': project_manager_display,
-            'days': (today - milestone.planned_date).days,
-        })
 
-    recent_documents = list(project.documents.select_related('uploaded_by').order_by('-uploaded_time')[:5])
+def _detail_documents_tab(project):
+    recent_documents = list(project.documents.order_by('-uploaded_time')[:5])
     deliverables_required = Project.DELIVERABLES_MAP.get(project.service_type.code if project.service_type else '', [])
-    deliverables_progress = []
+    deliverables = []
     for item in deliverables_required:
         matched_doc = next((doc for doc in recent_documents if item in doc.name), None)
-        deliverables_progress.append({
+        deliverables.append({
             'name': item,
             'completed': matched_doc is not None,
-            'document': matched_doc,
+            'document_name': matched_doc.name if matched_doc else '',
         })
-
-    activity_feed = []
-    for milestone in milestones[:5]:
-        if milestone.actual_date:
-            activity_feed.append({
-                'title': f"里程碑完成 · {milestone.name}",
-                'time': milestone.actual_date.strftime('%Y-%m-%d'),
-                'description': milestone.description or '里程碑已完成',
-            })
-    for doc in recent_documents:
-        activity_feed.append({
-            'title': f"文档上传 · {doc.name}",
-            'time': doc.uploaded_time.strftime('%Y-%m-%d'),
-            'description': doc.get_document_type_display(),
-        })
-    activity_feed = sorted(activity_feed, key=lambda x: x['time'], reverse=True)[:8]
-
-    metrics = {
-        'progress': {
-            'percent': progress_percent,
-            'completed': completed_milestones,
-            'total': total_milestones,
-            'summary': tasks_summary,
-            'tasks': tasks,
-            'delayed_tasks': delayed_tasks,
-            'upcoming': upcoming_milestones,
-            'milestones': [
-                {
-                    'name': stage['name'],
-                    'date': stage['planned_start'].isoformat() if stage.get('planned_start') else '待定',
-                    'is_completed': stage['status'] == 'completed',
-                }
-                for stage in service_timeline[:5]
-            ],
-        },
-        'health': {
-            'score': min(max(round(progress_percent, 1), 0), 100),
-            'level_label': '良好' if progress_percent > 70 else '关注',
-            'level_class': 'success' if progress_percent > 70 else 'warning',
-        },
-        'risk': {
-            'level_label': risk_level_label,
-            'level_class': risk_level_class,
-            'high_count': len(high_risk_items),
-            'items': high_risk_items,
-        },
-        'timeline': {
-            'stages': service_timeline,
-            'completion_rate': service_completion,
-        },
-        'team': {
-            'professional_leaders': professional_leader_names,
-            'summary': team_summary,
-        },
-        'activity': activity_feed,
+    return {
+        'deliverables': deliverables,
+        'recent_documents': [
+            {
+                'name': doc.name,
+                'document_type_label': doc.get_document_type_display(),
+                'uploaded_time': doc.uploaded_time,
+                'url': reverse('project_pages:project_document_download', args=[doc.id]) if doc.file else '',
+            }
+            for doc in recent_documents
+        ],
     }
 
+
+def _detail_drawings_tab(project):
     launch_status_choices = dict(Project.LAUNCH_STATUS)
     launch_status_order = [code for code, _ in Project.LAUNCH_STATUS]
     current_launch_index = launch_status_order.index(project.launch_status) if project.launch_status in launch_status_order else -1
@@ -2665,16 +2433,16 @@ def project_detail(request, project_id):
         'ready_to_start': project.drawing_precheck_completed_time,
         'started': project.start_notice_sent_time,
     }
-
-    launch_timeline = []
-    for idx, status_code in enumerate(launch_status_order):
-        launch_timeline.append({
+    launch_timeline = [
+        {
             'code': status_code,
             'label': launch_status_choices.get(status_code, status_code),
             'is_current': idx == current_launch_index,
             'is_completed': idx < current_launch_index,
             'timestamp': status_timestamps.get(status_code),
-        })
+        }
+        for idx, status_code in enumerate(launch_status_order)
+    ]
 
     drawing_status_class_map = {
         'submitted': 'secondary',
@@ -2688,37 +2456,14 @@ def project_detail(request, project_id):
         'approved': 'success',
         'changes_requested': 'warning',
     }
-
     drawing_submissions_queryset = project.drawing_submissions.select_related(
-        'submitter', 'latest_review'
+        'submitter', 'latest_review', 'latest_review__reviewer'
     ).prefetch_related(
         'files', 'reviews', 'reviews__reviewer'
     ).order_by('-submitted_time')
 
     drawing_submissions_payload = []
     for submission in drawing_submissions_queryset:
-        files_payload = [
-            {
-                'id': file.id,
-                'name': file.name,
-                'category_label': file.get_category_display(),
-                'url': file.file.url if file.file else '',
-                'uploaded_time': file.uploaded_time,
-            }
-            for file in submission.files.all()
-        ]
-        reviews_payload = [
-            {
-                'id': review.id,
-                'result': review.result,
-                'result_label': review.get_result_display(),
-                'result_class': review_result_class_map.get(review.result, 'secondary'),
-                'comment': review.comment,
-                'reviewer_name': _format_user_display(review.reviewer, '—'),
-                'reviewed_time': review.reviewed_time,
-            }
-            for review in submission.reviews.all()
-        ]
         latest_review_payload = None
         if submission.latest_review_id:
             latest_review = submission.latest_review
@@ -2742,17 +2487,33 @@ def project_detail(request, project_id):
             'submitted_time': submission.submitted_time,
             'review_deadline': submission.review_deadline,
             'latest_review': latest_review_payload,
-            'files': files_payload,
-            'reviews': reviews_payload,
+            'files': [
+                {
+                    'id': file.id,
+                    'name': file.name,
+                    'category_label': file.get_category_display(),
+                    'url': reverse('project_pages:drawing_file_download', args=[file.id]) if file.file else '',
+                    'uploaded_time': file.uploaded_time,
+                }
+                for file in submission.files.all()
+            ],
+            'reviews': [
+                {
+                    'id': review.id,
+                    'result': review.result,
+                    'result_label': review.get_result_display(),
+                    'result_class': review_result_class_map.get(review.result, 'secondary'),
+                    'comment': review.comment,
+                    'reviewer_name': _format_user_display(review.reviewer, '—'),
+                    'reviewed_time': review.reviewed_time,
+                }
+                for review in submission.reviews.all()
+            ],
             'client_notified': submission.client_notified,
             'client_notification_channel': submission.client_notification_channel,
             'client_notified_time': submission.client_notified_time,
         })
 
-    start_notices_queryset = project.start_notices.select_related(
-        'created_by', 'recipient_user', 'submission'
-    ).order_by('-created_time')
-
     start_notice_status_class_map = {
         'pending': 'secondary',
         'sent': 'primary',
@@ -2779,8 +2540,74 @@ def project_detail(request, project_id):
             'submission_id': notice.submission_id,
             'submission_title': notice.submission.title if notice.submission else '',
         }
-        for notice in start_notices_queryset
+        for notice in project.start_notices.select_related(
+            'created_by', 'recipient_user', 'submission'
+        ).order_by('-created_time')
     ]
+
+    return {
+        'launch': {
+            'status_code': project.launch_status,
+            'status_label': launch_status_choices.get(project.launch_status, '未定义'),
+            'timeline': launch_timeline,
+        },
+        'client_contact': {
+            'name': project.client_contact_person,
+            'phone': project.client_phone,
+            'email': project.client_email,
+        },
+        'drawing_submissions': drawing_submissions_payload,
+        'start_notices': start_notices_payload,
+    }
+
+
+# 项目详情页签：构建函数只依赖项目本身；cached 为 True 的页签按项目数据版本缓存。
+# 图纸页签的审核、文件记录不直接归属项目，不在版本跟踪范围内，每次实时查询。
+PROJECT_DETAIL_TABS = {
+    'overview': {'build': _detail_overview_tab, 'cached': True},
+    'progress': {'build': _detail_progress_tab, 'cached': True},
+    'team': {'build': _detail_team_tab, 'cached': True},
+    'drawings': {'build': _detail_drawings_tab, 'cached': False},
+    'quality': {'build': _detail_quality_tab, 'cached': True},
+    'documents': {'build': _detail_documents_tab, 'cached': True},
+}
+
+
+@replica_reads
+@login_required
+def project_detail(request, project_id):
+    """项目详情外壳：头部、流程进度与待办侧栏；其余页签由 project_detail_tab 按需加载"""
+    project = get_object_or_404(
+        Project.objects.select_related('service_type', 'project_manager', 'business_manager'),
+        id=project_id
+    )
+
+    permission_set = get_user_permission_codes(request.user)
+    denial = _project_detail_denial(request.user, project, permission_set)
+    if denial:
+        messages.error(request, denial)
+        return redirect('home')
+
+    team_manage_permitted = _has_permission(permission_set, 'project_center.configure_team')
+    edit_permitted = _has_permission(permission_set, 'project_center.create')
+    user_roles, is_member = _project_membership(request.user, project)
+
+    activity_feed = []
+    for milestone in project.milestones.all()[:5]:
+        if milestone.actual_date:
+            activity_feed.append({
+                'title': f"里程碑完成 · {milestone.name}",
+                'time': milestone.actual_date.strftime('%Y-%m-%d'),
+                'description': milestone.description or '里程碑已完成',
+            })
+    for doc in project.documents.order_by('-uploaded_time')[:5]:
+        activity_feed.append({
+            'title': f"文档上传 · {doc.name}",
+            'time': doc.uploaded_time.strftime('%Y-%m-%d'),
+            'description': doc.get_document_type_display(),
+        })
+    activity_feed = sorted(activity_feed, key=lambda x: x['time'], reverse=True)[:8]
+
     flow_step_labels = dict(Project.FLOW_STEPS)
     flow_step_order = [code for code, _ in Project.FLOW_STEPS]
     current_flow_index = flow_step_order.index(project.flow_step) if project.flow_step in flow_step_order else -1
@@ -2809,9 +2636,7 @@ def project_detail(request, project_id):
     ]
     can_operate_flow = (
         _has_permission(permission_set, 'project_center.configure_team', 'project_center.view_all')
-        or project.project_manager_id == request.user.id
-        or project.business_manager_id == request.user.id
-        or _user_is_project_member(request.user, project)
+        or is_member
     )
     available_flow_actions = []
     if can_operate_flow:
@@ -2819,59 +2644,23 @@ def project_detail(request, project_id):
             if project.flow_step in config.get('from', []):
                 available_flow_actions.append({'key': key, 'label': config.get('label', key)})
 
-
+    view_all = _has_permission(permission_set, 'project_center.view_all')
     is_project_manager = project.project_manager_id == request.user.id
     is_business_manager = project.business_manager_id == request.user.id
-
-    can_submit_drawings = _has_permission(
-        permission_set,
-        'project_center.create',
-        'project_center.configure_team',
-        'project_center.view_all'
-    ) or is_project_manager or is_business_manager or _user_is_project_member(request.user, project)
-
-    can_review_drawings = _has_permission(
-        permission_set,
-        'project_center.configure_team',
-        'project_center.view_all'
-    ) or is_project_manager
-
-    can_manage_start_notice = _has_permission(
-        permission_set,
-        'project_center.configure_team',
-        'project_center.view_all'
-    ) or is_project_manager
-    is_project_manager = project.project_manager_id == request.user.id
-    can_client_upload_pre_docs = (
-        _user_matches_role(request.user, project, 'client_lead') or
-        _user_matches_role(request.user, project, 'client_engineer') or
-        _has_permission(permission_set, 'project_center.view_all')
-    )
-    can_submit_design_reply = (
-        _user_matches_role(request.user, project, 'design_lead') or
-        _user_matches_role(request.user, project, 'design_engineer') or
-        _has_permission(permission_set, 'project_center.view_all')
-    )
+    can_client_upload_pre_docs = bool(user_roles & {'client_lead', 'client_engineer'}) or view_all
+    can_submit_design_reply = bool(user_roles & {'design_lead', 'design_engineer'}) or view_all
     can_manage_meeting_log = (
-        _has_permission(permission_set, 'project_center.configure_team') or
+        team_manage_permitted or
         is_project_manager or
         is_business_manager
     )
-    can_design_upload = can_submit_design_reply
     can_internal_verify = (
-        _has_permission(permission_set, 'project_center.configure_team') or
+        team_manage_permitted or
         is_project_manager or
-        _user_matches_role(request.user, project, 'professional_leader') or
-        _has_permission(permission_set, 'project_center.view_all')
-    )
-    can_client_confirm_outcome = (
-        _user_matches_role(request.user, project, 'client_lead') or
-        _has_permission(permission_set, 'project_center.view_all')
-    )
-    show_risk_section = (
-        getattr(request.user, 'user_type', 'internal') == 'internal'
-        or _has_permission(permission_set, 'project_center.view_all', 'project_center.configure_team')
+        'professional_leader' in user_roles or
+        view_all
     )
+    can_client_confirm_outcome = 'client_lead' in user_roles or view_all
 
     active_tasks_queryset = project.tasks.filter(
         status__in=ProjectTask.ACTIVE_STATUSES
@@ -2881,7 +2670,7 @@ def project_detail(request, project_id):
         assigned_user = task.assigned_to
         is_mine = bool(
             (assigned_user and assigned_user.id == request.user.id)
-            or _user_matches_role(request.user, project, task.assigned_role)
+            or task.assigned_role in user_roles
         )
         task_payload.append({
             'id': task.id,
@@ -2905,37 +2694,20 @@ def project_detail(request, project_id):
 
     context = _with_nav({
         'project': project,
-        'metrics': metrics,
-        'created_by_display': created_by_display,
-        'project_manager_display': project_manager_display,
-        'business_manager_display': business_manager_display,
+        'activity': activity_feed,
         'team_manage_permitted': team_manage_permitted,
         'edit_permitted': edit_permitted,
         'read_only': _is_project_readonly(permission_set),
-        'recent_documents': recent_documents,
-        'deliverables_progress': deliverables_progress,
-        'launch': {
-            'status_code': project.launch_status,
-            'status_label': launch_status_choices.get(project.launch_status, '未定义'),
-            'timeline': launch_timeline,
-            'status_choices': launch_status_choices,
-        },
-        'drawing_submissions': drawing_submissions_payload,
-        'drawing_status_class_map': drawing_status_class_map,
-        'review_result_class_map': review_result_class_map,
-        'start_notices': start_notices_payload,
-        'start_notice_status_class_map': start_notice_status_class_map,
-        'drawing_permissions': {
-            'can_submit': can_submit_drawings,
-            'can_review': can_review_drawings,
-            'can_manage_notice': can_manage_start_notice,
+        'tab_urls': {
+            tab: reverse('project_pages:project_detail_tab', args=[project.id, tab])
+            for tab in PROJECT_DETAIL_TABS
         },
         'quick_links': {
             'client_upload_pre_docs': can_client_upload_pre_docs,
             'complete_info': is_project_manager,
             'design_reply': can_submit_design_reply,
             'meeting_log': can_manage_meeting_log,
-            'design_upload': can_design_upload,
+            'design_upload': can_submit_design_reply,
             'internal_verify': can_internal_verify,
             'client_confirm': can_client_confirm_outcome,
         },
@@ -2960,33 +2732,43 @@ def project_detail(request, project_id):
             'available_actions': available_flow_actions,
             'action_url': reverse('project_pages:project_flow_action', args=[project.id]),
         },
-        'client_contact': {
-            'name': project.client_contact_person,
-            'phone': project.client_phone,
-            'email': project.client_email,
-        },
-        'show_risk_section': show_risk_section,
+        'show_risk_section': _show_risk_section(request.user, permission_set),
         'drawing_file_categories': [
             {'value': value, 'label': label}
             for value, label in ProjectDrawingFile.FILE_CATEGORIES
         ],
-        'review_result_choices': [
-            {'value': value, 'label': label}
-            for value, label in ProjectDrawingReview.RESULT_CHOICES
-        ],
-        'start_notice_channels': [
-            {'value': value, 'label': label}
-            for value, label in ProjectStartNotice.CHANNEL_CHOICES
-        ],
-        'approved_drawing_submissions': [
-            {'id': submission['id'], 'title': submission['title']}
-            for submission in drawing_submissions_payload
-            if submission['status'] == 'approved'
-        ],
     }, permission_set, 'project_list', request.user)
     return render(request, 'project_center/project_detail.html', context)
 
 
+@replica_reads
+@login_required
+@require_http_methods(["GET", "HEAD"])
+def project_detail_tab(request, project_id, tab):
+    """项目详情页签：默认返回局部 HTML，?format=json 返回页签数据"""
+    spec = PROJECT_DETAIL_TABS.get(tab)
+    if spec is None:
+        raise Http404('页签不存在')
+    project = get_object_or_404(
+        Project.objects.select_related('service_type', 'project_manager', 'business_manager'),
+        id=project_id
+    )
+    permission_set = get_user_permission_codes(request.user)
+    denial = _project_detail_denial(request.user, project, permission_set)
+    if denial is None and tab == 'quality' and not _show_risk_section(request.user, permission_set):
+        denial = '您无权查看项目风险信息。'
+    if denial:
+        return JsonResponse({'success': False, 'message': denial}, status=403)
+
+    if spec['cached']:
+        data = cached_tab(project.id, tab, lambda: spec['build'](project))
+    else:
+        data = spec['build'](project)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'success': True, 'tab': tab, 'data': data})
+    return render(request, f'project_center/detail_tabs/{tab}.html', {'project': project, 'data': data})
+
+
 @login_required
 @require_http_methods(['POST'])
 def project_flow_action(request, project_id):
@@ -3077,26 +2859,19 @@ def project_task_action(request, project_id, task_id):
     return redirect(f"{reverse('project_pages:project_detail', args=[project.id])}#section-flow")
 
 
+@replica_reads
 @login_required
 def project_task_dashboard(request):
     permission_set = get_user_permission_codes(request.user)
     projects_queryset = Project.objects.select_related('service_type', 'project_manager', 'business_manager')
     projects = _filter_projects_for_user(projects_queryset, request.user, permission_set)
 
-    tasks_queryset = ProjectTask.objects.select_related(
-        'project',
-        'project__project_manager',
-        'assigned_to',
-    ).order_by('due_time', 'created_time')
-
-    user_active_tasks = []
-    for task in tasks_queryset:
-        if task.status not in ProjectTask.ACTIVE_STATUSES:
-            continue
-        if not task.project:
-            continue
-        if _task_visible_to_user(task, request.user, task.project):
-            user_active_tasks.append(task)
+    user_active_tasks = list(
+        ProjectTask.objects.filter(status__in=ProjectTask.ACTIVE_STATUSES)
+        .filter(_tasks_visible_to_user_q(request.user))
+        .select_related('project', 'project__project_manager', 'assigned_to')
+        .order_by('due_time', 'created_time')
+    )
 
     recent_completed = ProjectTask.objects.filter(
         status='completed',
@@ -3154,6 +2929,90 @@ def project_task_dashboard(request):
     return render(request, 'project_center/task_dashboard.html', context)
 
 
+
+PORTFOLIO_GANTT_PAGE_SIZE = 200
+PORTFOLIO_GANTT_MAX_TICKS = 12
+
+
+def _portfolio_ticks(axis):
+    """共用时间轴上的月份刻度，跨度较长时按季度、半年等间隔抽稀"""
+    start, end = axis
+    months = (end.year - start.year) * 12 + end.month - start.month + 1
+    step = max(1, -(-months // PORTFOLIO_GANTT_MAX_TICKS))
+    ticks = []
+    year, month = start.year, start.month
+    for _offset in range(0, months, step):
+        tick = datetime.date(year, month, 1)
+        if tick >= start:
+            ticks.append({'label': tick.strftime('%Y-%m'), 'position': axis_position(tick, axis)})
+        month += step
+        year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return ticks
+
+
+def _portfolio_gantt_summary(user, permission_set, query_params):
+    """组合甘特：可见项目在同一时间轴上的周期条、里程碑标记与延期汇总（可缓存的纯数据）"""
+    projects = _filter_projects_for_user(
+        Project.objects.select_related('service_type'), user, permission_set,
+    )
+    status_param = (query_params.get('status') or '').strip()
+    if status_param in {'draft', 'in_progress', 'completed', 'archived'}:
+        projects = projects.filter(status=status_param)
+    paginator = Paginator(projects.order_by('start_date', 'id'), PORTFOLIO_GANTT_PAGE_SIZE)
+    page = paginator.get_page(query_params.get('page'))
+    project_list = list(page.object_list)
+
+    today = timezone.localdate()
+    timelines = build_timelines(project_list, today)
+    axis = portfolio_axis(timelines.values())
+    rows = portfolio_rows(project_list, timelines, axis)
+    for row in rows:
+        row['url'] = reverse('project_pages:project_detail', args=[row['project_id']])
+    return {
+        'rows': rows,
+        'axis': {
+            'start': axis[0],
+            'end': axis[1],
+            'today_position': axis_position(today, axis) if axis[0] <= today <= axis[1] else None,
+            'ticks': _portfolio_ticks(axis),
+        },
+        'summary': {
+            'project_count': paginator.count,
+            'delayed_project_count': sum(1 for row in rows if row['delayed_count']),
+            'average_percent': round(sum(row['percent'] for row in rows) / len(rows), 1) if rows else 0,
+        },
+        'page': {
+            'number': page.number,
+            'num_pages': paginator.num_pages,
+            'has_previous': page.has_previous(),
+            'has_next': page.has_next(),
+        },
+        'status_selected': status_param,
+    }
+
+
+@replica_reads
+@login_required
+def project_portfolio_gantt(request):
+    """项目组合甘特：数百个项目共用一根时间轴，按页加载"""
+    permission_set = get_user_permission_codes(request.user)
+    if not _require_permission(request, permission_set, '您没有查看项目组合甘特的权限。', 'project_center.view_all', 'project_center.view_assigned'):
+        return redirect('home')
+
+    data = cached_summary(
+        'project_portfolio_gantt',
+        ('project_center.Project', 'project_center.ProjectMilestone', 'project_center.ProjectTeam'),
+        lambda: _portfolio_gantt_summary(request.user, permission_set, request.GET),
+        user=request.user,
+        permission_codes=permission_set,
+        params=request.GET,
+    )
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'success': True, 'data': data})
+
+    context = _with_nav({'data': data}, permission_set, 'project_portfolio_gantt', request.user)
+    return render(request, 'project_center/portfolio_gantt.html', context)
+
 @login_required
 def project_design_reply(request, project_id):
     project = get_object_or_404(Project, id=project_id)
@@ -3355,7 +3214,7 @@ def project_client_pre_docs(request, project_id):
                 {
                     'id': file.id,
                     'name': file.name,
-                    'url': file.file.url if file.file else '',
+                    'url': reverse('project_pages:drawing_file_download', args=[file.id]) if file.file else '',
                     'category_label': file.get_category_display(),
                 }
                 for file in submission.files.all()
@@ -3867,19 +3726,65 @@ def project_archive(request, project_id):
             
             project.status = 'archived'
             project.save()
+            request_archive_package(archive)
             
-            messages.success(request, '项目归档成功！')
+            messages.success(request, '项目归档成功！归档包正在后台生成，完成后可在历史归档记录中下载。')
             return redirect('project_pages:project_list')
         except Exception as e:
             messages.error(request, f'归档失败：{str(e)}')
     
-    archives = ProjectArchive.objects.filter(project=project).order_by('-archive_version')
+    archives = ProjectArchive.objects.filter(project=project).select_related('archived_by').order_by('-archive_version')
     
     return render(request, 'project_center/project_archive.html', _with_nav({
         'project': project,
         'archives': archives,
     }, permission_set, 'project_list', request.user))
 
+
+def _user_can_download_archive(user, archive):
+    """按归档时选定的下载权限（管理员/项目负责人/商务经理/团队成员）判断；未选定时仅管理员可下载"""
+    if _is_system_admin(user):
+        return True
+    allowed = set(archive.download_permissions or ())
+    project = archive.project
+    if 'project_manager' in allowed and project.project_manager_id == user.id:
+        return True
+    if 'business_manager' in allowed and project.business_manager_id == user.id:
+        return True
+    roles = set(
+        ProjectTeam.objects.filter(project=project, user=user, is_active=True).values_list('role', flat=True)
+    )
+    if 'team_member' in allowed and roles:
+        return True
+    return bool(allowed & roles & {'project_manager', 'business_manager'})
+
+
+@login_required
+@require_http_methods(["GET", "HEAD", "POST"])
+def project_archive_package(request, project_id, archive_id):
+    """归档包：GET 下载已生成的 ZIP，POST 重新打包"""
+    archive = get_object_or_404(ProjectArchive.objects.select_related('project'), pk=archive_id, project_id=project_id)
+    back_url = reverse('project_pages:project_archive', args=[project_id])
+    if request.method == 'POST':
+        if not _has_permission(get_user_permission_codes(request.user), 'project_center.archive'):
+            messages.error(request, '您没有归档项目的权限。')
+            return redirect(back_url)
+        if request_archive_package(archive, force=archive.package_status not in ('pending', 'building')):
+            messages.success(request, '已提交归档包生成任务，请稍后刷新查看。')
+        else:
+            messages.info(request, '归档包正在生成，请稍后刷新查看。')
+        return redirect(back_url)
+
+    if not _user_can_access_project(request.user, project_id):
+        raise Http404('文件不存在')
+    if not _user_can_download_archive(request.user, archive):
+        messages.error(request, '您没有下载该归档包的权限。')
+        return redirect(back_url)
+    if not package_available(archive):
+        messages.warning(request, f'归档包{archive.get_package_status_display()}，暂不可下载。')
+        return redirect(back_url)
+    return serve_protected_file(request, archive.package_file, package_filename(archive))
+
 def _project_ids_user_can_access(user):
     if user.is_superuser:
         return set(Project.objects.values_list('id', flat=True))
@@ -4199,41 +4104,6 @@ def project_import_admin(request):
     )
 
 
-def _build_service_timeline(project, milestone_list):
-    service_code = getattr(project.service_type, "code", "") if project.service_type else ""
-    template = SERVICE_TIMELINE_TEMPLATES.get(service_code, [])
-    if not template and milestone_list:
-        template = [milestone.name for milestone in milestone_list]
-    lookup = {milestone.name: milestone for milestone in milestone_list}
-    stages = []
-    completed = 0
-    current_index = None
-    for index, name in enumerate(template):
-        milestone = lookup.get(name)
-        status = "completed" if milestone and milestone.is_completed else "pending"
-        if status == "completed":
-            completed += 1
-        elif current_index is None:
-            current_index = index
-        stages.append(
-            {
-                "name": name,
-                "status": status,
-                "planned_start": getattr(milestone, "planned_date", None),
-                "planned_end": getattr(milestone, "planned_date", None),
-                "actual_start": getattr(milestone, "actual_start", None),
-                "actual_end": getattr(milestone, "actual_date", None),
-            }
-        )
-    if stages:
-        if current_index is None:
-            current_index = len(stages) - 1
-        if stages[current_index]["status"] != "completed":
-            stages[current_index]["status"] = "current"
-    completion_rate = int(round(completed / len(stages) * 100)) if stages else 0
-    return stages, completion_rate
-
-
 @login_required
 def production_management(request):
     """生产管理主页面"""
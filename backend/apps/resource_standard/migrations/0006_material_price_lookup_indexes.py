@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:40
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resource_standard', '0005_seed_professional_categories'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='materialprice',
+            index=models.Index(fields=['price_type', 'effective_date', 'expire_date'], name='material_price_asof_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='materialprice',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['applicable_regions'], name='material_price_region_gin'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.utils import timezone
 
@@ -222,6 +223,13 @@ class MaterialPrice(models.Model):
         verbose_name = "综合单价"
         verbose_name_plural = "综合单价"
         ordering = ["name", "-version"]
+        indexes = [
+            models.Index(
+                fields=["price_type", "effective_date", "expire_date"],
+                name="material_price_asof_idx",
+            ),
+            GinIndex(fields=["applicable_regions"], name="material_price_region_gin"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.code:
@@ -245,6 +253,16 @@ class MaterialPrice(models.Model):
         if not self.changed_time:
             self.changed_time = timezone.now()
         super().save(*args, **kwargs)
+        from .services import invalidate_material_price_cache
+
+        invalidate_material_price_cache()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from .services import invalidate_material_price_cache
+
+        invalidate_material_price_cache()
+        return result
 
     def __str__(self):
         return f"{self.code} {self.name} v{self.version}"
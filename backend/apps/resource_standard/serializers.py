@@ -0,0 +1,123 @@
+from rest_framework import serializers
+
+from .models import CostIndicator, MaterialPrice, RiskCase, Standard, TechnicalSolution
+
+
+class StandardListSerializer(serializers.ModelSerializer):
+    standard_type_display = serializers.CharField(source="get_standard_type_display", read_only=True)
+    status_display = serializers.CharField(source="get_status_display", read_only=True)
+
+    class Meta:
+        model = Standard
+        fields = [
+            "id",
+            "code",
+            "name",
+            "standard_type",
+            "standard_type_display",
+            "applicable_professions",
+            "applicable_business_types",
+            "effective_date",
+            "status",
+            "status_display",
+            "visible_scope",
+            "created_time",
+            "updated_time",
+        ]
+
+
+class MaterialPriceSerializer(serializers.ModelSerializer):
+    unit_display = serializers.CharField(source="get_unit_display", read_only=True)
+    price_type_display = serializers.CharField(source="get_price_type_display", read_only=True)
+    price_source_display = serializers.CharField(source="get_price_source_display", read_only=True)
+
+    class Meta:
+        model = MaterialPrice
+        fields = [
+            "id",
+            "code",
+            "name",
+            "specification",
+            "unit",
+            "unit_display",
+            "brand_requirement",
+            "applicable_regions",
+            "price",
+            "price_type",
+            "price_type_display",
+            "price_source",
+            "price_source_display",
+            "effective_date",
+            "expire_date",
+            "tax_rate",
+            "version",
+            "changed_time",
+        ]
+
+
+class CostIndicatorSerializer(serializers.ModelSerializer):
+    business_type_display = serializers.CharField(source="get_business_type_display", read_only=True)
+    region_display = serializers.CharField(source="get_region_display", read_only=True)
+
+    class Meta:
+        model = CostIndicator
+        fields = [
+            "id",
+            "code",
+            "name",
+            "business_type",
+            "business_type_display",
+            "building_type",
+            "region",
+            "region_display",
+            "data_year",
+            "steel_consumption",
+            "concrete_consumption",
+            "formwork_consumption",
+            "masonry_consumption",
+            "door_window_index",
+            "decoration_index",
+            "data_reliability",
+            "created_time",
+        ]
+
+
+class RiskCaseListSerializer(serializers.ModelSerializer):
+    case_type_display = serializers.CharField(source="get_case_type_display", read_only=True)
+    project_name = serializers.CharField(source="project.name", read_only=True, default="")
+
+    class Meta:
+        model = RiskCase
+        fields = [
+            "id",
+            "case_code",
+            "title",
+            "case_type",
+            "case_type_display",
+            "project",
+            "project_name",
+            "occurred_on",
+            "loss_estimation",
+            "recommend_score",
+            "is_published",
+            "created_time",
+        ]
+
+
+class TechnicalSolutionListSerializer(serializers.ModelSerializer):
+    domain_display = serializers.CharField(source="get_domain_display", read_only=True)
+
+    class Meta:
+        model = TechnicalSolution
+        fields = [
+            "id",
+            "solution_code",
+            "name",
+            "domain",
+            "domain_display",
+            "issue_type",
+            "saving_effect",
+            "difficulty",
+            "promotion_value",
+            "created_time",
+        ]
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import time
+from datetime import date
+from typing import Dict, Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import MaterialPrice
+
+PRICE_CACHE_PREFIX = "resource_standard:material_price"
+PRICE_CACHE_TIMEOUT = 60 * 60
+_GENERATION_KEY = f"{PRICE_CACHE_PREFIX}:generation"
+_MISSING = "__missing__"
+
+
+def _cache_generation() -> int:
+    """价格缓存代际号；失效时整体换代，旧键自然过期。"""
+    generation = cache.get(_GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        cache.set(_GENERATION_KEY, generation, None)
+    return generation
+
+
+def invalidate_material_price_cache() -> None:
+    """单价新增、修改或删除后调用，使所有最新价缓存失效。"""
+    cache.set(_GENERATION_KEY, time.time_ns(), None)
+
+
+def _cache_key(generation: int, code: str, region: str, price_type: str, as_of: date) -> str:
+    return f"{PRICE_CACHE_PREFIX}:{generation}:{code}:{region or '*'}:{price_type}:{as_of.isoformat()}"
+
+
+def effective_prices(price_type: str, region: Optional[str] = None, as_of: Optional[date] = None):
+    """返回指定日期有效的单价查询集，按生效日期、版本从新到旧排序。"""
+    as_of = as_of or timezone.localdate()
+    queryset = (
+        MaterialPrice.objects.filter(price_type=price_type)
+        .filter(Q(effective_date__isnull=True) | Q(effective_date__lte=as_of))
+        .filter(Q(expire_date__isnull=True) | Q(expire_date__gt=as_of))
+    )
+    if region:
+        queryset = queryset.filter(applicable_regions__contains=[region])
+    return queryset.order_by(F("effective_date").desc(nulls_last=True), "-version")
+
+
+def get_latest_price(
+    code: str,
+    region: Optional[str] = None,
+    price_type: str = "material",
+    as_of: Optional[date] = None,
+) -> Optional[MaterialPrice]:
+    """查询编号在指定地区、价格类型下截至某日的最新单价（带缓存）。"""
+    return get_latest_prices([code], region=region, price_type=price_type, as_of=as_of).get(code)
+
+
+def get_latest_prices(
+    codes: Iterable[str],
+    region: Optional[str] = None,
+    price_type: str = "material",
+    as_of: Optional[date] = None,
+) -> Dict[str, MaterialPrice]:
+    """批量查询最新单价：命中缓存的直接返回，其余一次查询补齐并回填缓存。"""
+    as_of = as_of or timezone.localdate()
+    codes = [code for code in dict.fromkeys(codes) if code]
+    if not codes:
+        return {}
+
+    generation = _cache_generation()
+    keys = {code: _cache_key(generation, code, region, price_type, as_of) for code in codes}
+    cached = cache.get_many(list(keys.values()))
+
+    result: Dict[str, MaterialPrice] = {}
+    missing = []
+    for code, key in keys.items():
+        if key not in cached:
+            missing.append(code)
+        elif cached[key] != _MISSING:
+            result[code] = cached[key]
+
+    if missing:
+        found: Dict[str, MaterialPrice] = {}
+        for price in effective_prices(price_type, region, as_of).filter(code__in=missing):
+            found.setdefault(price.code, price)
+        cache.set_many(
+            {keys[code]: found.get(code, _MISSING) for code in missing},
+            PRICE_CACHE_TIMEOUT,
+        )
+        result.update(found)
+    return result
@@ -0,0 +1,74 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from backend.apps.resource_standard.models import MaterialPrice
+from backend.apps.resource_standard.services import get_latest_price, get_latest_prices
+
+
+class MaterialPriceLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.price = MaterialPrice.objects.create(
+            code="MAT-TEST-0001",
+            name="C30 混凝土",
+            unit="m3",
+            applicable_regions=["sichuan", "chongqing"],
+            price=Decimal("480.00"),
+            price_type="material",
+            effective_date=date(2025, 1, 1),
+            expire_date=date(2026, 1, 1),
+        )
+
+    def test_lookup_respects_region_and_date_window(self):
+        self.assertEqual(get_latest_price("MAT-TEST-0001", "sichuan", as_of=date(2025, 6, 1)), self.price)
+        self.assertIsNone(get_latest_price("MAT-TEST-0001", "yunnan", as_of=date(2025, 6, 1)))
+        self.assertIsNone(get_latest_price("MAT-TEST-0001", "sichuan", as_of=date(2026, 1, 1)))
+        self.assertIsNone(get_latest_price("MAT-TEST-0001", "sichuan", price_type="labor", as_of=date(2025, 6, 1)))
+
+    def test_cached_lookup_is_invalidated_on_change(self):
+        as_of = date(2025, 6, 1)
+        get_latest_price("MAT-TEST-0001", "sichuan", as_of=as_of)
+        with self.assertNumQueries(0):
+            cached = get_latest_prices(["MAT-TEST-0001", "MAT-TEST-0001"], "sichuan", as_of=as_of)
+        self.assertEqual(cached["MAT-TEST-0001"].price, Decimal("480.00"))
+
+        self.price.price = Decimal("500.00")
+        self.price.save()
+        self.assertEqual(get_latest_price("MAT-TEST-0001", "sichuan", as_of=as_of).price, Decimal("500.00"))
+
+    def test_list_api_uses_cursor_pagination(self):
+        user = get_user_model().objects.create_superuser(username="resource_admin", password="pass1234")
+        client = Client()
+        client.force_login(user)
+        for index in range(2, 5):
+            MaterialPrice.objects.create(
+                code=f"MAT-TEST-000{index}",
+                name="钢筋",
+                unit="t",
+                applicable_regions=["sichuan"],
+                price=Decimal("4200.00"),
+            )
+
+        response = client.get(reverse("resource_api:material-price-list"), {"region": "sichuan", "page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIn("cursor=", data["next"])
+
+        second = client.get(data["next"]).json()
+        self.assertEqual(len(second["results"]), 2)
+        self.assertIsNone(second["next"])
+
+        response = client.get(reverse("resource_api:material-price-latest-price"), {
+            "code": ["MAT-TEST-0001", "MAT-MISSING"],
+            "region": "chongqing",
+            "as_of": "2025-03-01",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["MAT-TEST-0001"]["price"], "480.00")
+        self.assertIsNone(response.json()["MAT-MISSING"])
@@ -0,0 +1,21 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .views_api import (
+    CostIndicatorViewSet,
+    MaterialPriceViewSet,
+    RiskCaseViewSet,
+    StandardViewSet,
+    TechnicalSolutionViewSet,
+)
+
+router = DefaultRouter()
+router.register(r"standards", StandardViewSet, basename="standard")
+router.register(r"materials", MaterialPriceViewSet, basename="material-price")
+router.register(r"cost-indicators", CostIndicatorViewSet, basename="cost-indicator")
+router.register(r"risk-cases", RiskCaseViewSet, basename="risk-case")
+router.register(r"technical-solutions", TechnicalSolutionViewSet, basename="technical-solution")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
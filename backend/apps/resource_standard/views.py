@@ -2,13 +2,11 @@ import json
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.utils import timezone
-from django.http import HttpResponse
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.pdfgen import canvas
+from django.http import FileResponse
 
 from backend.apps.system_management.services import user_has_permission
 
@@ -50,6 +48,8 @@ RESOURCE_PERMISSIONS = {
     "maintenance": "resource_center.data_maintenance",
 }
 
+LIST_PAGE_SIZE = 50
+
 
 def _require_permission(request, code):
     if user_has_permission(request.user, code) or request.user.is_superuser:
@@ -58,15 +58,8 @@ def _require_permission(request, code):
     return False
 
 
-def _wrap_text(text, max_chars=60):
-    if not text:
-        return []
-    text = str(text).replace('\r', '').strip()
-    lines = []
-    while text:
-        lines.append(text[:max_chars])
-        text = text[max_chars:]
-    return lines
+def _paginate(request, queryset, per_page=LIST_PAGE_SIZE):
+    return Paginator(queryset, per_page).get_page(request.GET.get("page", 1))
 
 
 @login_required
@@ -75,8 +68,10 @@ def standard_list(request):
         return redirect("home")
 
     standards = Standard.objects.select_related("created_by", "updated_by").prefetch_related("editable_roles")
+    page_obj = _paginate(request, standards)
     return render(request, "resource_standard/standard_list.html", {
-        "standards": standards,
+        "standards": page_obj,
+        "page_obj": page_obj,
     })
 
 
@@ -155,9 +150,10 @@ def standard_edit(request, pk):
 def material_price_list(request):
     if not _require_permission(request, RESOURCE_PERMISSIONS["material"]):
         return redirect("home")
-    materials = MaterialPrice.objects.all()
+    page_obj = _paginate(request, MaterialPrice.objects.all())
     return render(request, "resource_standard/material_price_list.html", {
-        "materials": materials,
+        "materials": page_obj,
+        "page_obj": page_obj,
     })
 
 
@@ -211,9 +207,10 @@ def material_price_edit(request, pk):
 def cost_indicator_list(request):
     if not _require_permission(request, RESOURCE_PERMISSIONS["cost"]):
         return redirect("home")
-    indicators = CostIndicator.objects.all()
+    page_obj = _paginate(request, CostIndicator.objects.all())
     return render(request, "resource_standard/cost_indicator_list.html", {
-        "indicators": indicators,
+        "indicators": page_obj,
+        "page_obj": page_obj,
     })
 
 
@@ -462,8 +459,8 @@ def knowledge_tag_edit(request, pk):
 def risk_case_list(request):
     if not _require_permission(request, RESOURCE_PERMISSIONS["knowledge"]):
         return redirect("home")
-    cases = RiskCase.objects.select_related("project")
-    return render(request, "resource_standard/risk_case_list.html", {"cases": cases})
+    page_obj = _paginate(request, RiskCase.objects.select_related("project"))
+    return render(request, "resource_standard/risk_case_list.html", {"cases": page_obj, "page_obj": page_obj})
 
 
 @login_required
@@ -505,73 +502,14 @@ def risk_case_export(request):
     if not _require_permission(request, RESOURCE_PERMISSIONS["knowledge"]):
         return redirect("home")
 
-    cases = RiskCase.objects.select_related("project").order_by("-occurred_on", "case_code")
-
-    response = HttpResponse(content_type="application/pdf")
-    filename = timezone.now().strftime("risk_cases_%Y%m%d_%H%M%S.pdf")
-    response["Content-Disposition"] = f"attachment; filename=\"{filename}\""
-
-    pdf = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
-    margin_x = 20 * mm
-    margin_y = 20 * mm
-    y = height - margin_y
-
-    pdf.setFont("Helvetica-Bold", 16)
-    pdf.drawString(margin_x, y, "风险案例导出报表")
-    y -= 10 * mm
-    pdf.setFont("Helvetica", 10)
-    pdf.drawString(margin_x, y, f"导出时间：{timezone.now().strftime('%Y-%m-%d %H:%M')}")
-    y -= 8 * mm
-
-    pdf.setFont("Helvetica", 10)
-    for case in cases:
-        if y < margin_y + 40:
-            pdf.showPage()
-            y = height - margin_y
-            pdf.setFont("Helvetica", 10)
-
-        pdf.setFont("Helvetica-Bold", 11)
-        pdf.drawString(margin_x, y, f"[{case.case_code}] {case.title}")
-        y -= 6 * mm
-
-        pdf.setFont("Helvetica", 10)
-        subtitle = f"类型：{case.get_case_type_display()}  项目：{case.project.name if case.project else '—'}  时间：{case.occurred_on or '—'}"
-        pdf.drawString(margin_x, y, subtitle)
-        y -= 6 * mm
-
-        for label, content in (
-            ("风险描述", case.risk_description),
-            ("根本原因", case.root_cause),
-            ("影响评估", case.impact_scope),
-            ("应对措施", case.counter_measure),
-            ("预防措施", case.prevention),
-            ("经验教训", case.lessons),
-        ):
-            lines = _wrap_text(content, max_chars=70)
-            if lines:
-                pdf.setFont("Helvetica-Bold", 9)
-                pdf.drawString(margin_x, y, f"{label}：")
-                y -= 5 * mm
-                pdf.setFont("Helvetica", 9)
-                for line in lines:
-                    if y < margin_y + 20:
-                        pdf.showPage()
-                        y = height - margin_y
-                        pdf.setFont("Helvetica", 9)
-                    pdf.drawString(margin_x + 8 * mm, y, line)
-                    y -= 4.5 * mm
-            else:
-                pdf.setFont("Helvetica-Bold", 9)
-                pdf.drawString(margin_x, y, f"{label}：—")
-                y -= 5 * mm
-
-        y -= 3 * mm
-        pdf.line(margin_x, y, width - margin_x, y)
-        y -= 6 * mm
-
-    pdf.save()
-    return response
+    from backend.apps.production_quality.models import ReportArtifact
+    from backend.apps.production_quality.services_report import artifact_filename, request_risk_case_export
+
+    artifact = request_risk_case_export(request.user)
+    if artifact.status != ReportArtifact.ArtifactStatus.READY:
+        messages.info(request, "风险案例报表正在后台生成，请稍后再次点击导出下载。")
+        return redirect("resource_standard:risk_case_list")
+    return FileResponse(artifact.file.open("rb"), as_attachment=True, filename=artifact_filename(artifact))
 
 
 @login_required
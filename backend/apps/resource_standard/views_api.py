@@ -0,0 +1,131 @@
+from datetime import date
+
+from rest_framework import permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from backend.apps.system_management.services import user_has_permission
+from backend.core.pagination import KeysetPagination
+
+from .models import CostIndicator, MaterialPrice, RiskCase, Standard, TechnicalSolution
+from .serializers import (
+    CostIndicatorSerializer,
+    MaterialPriceSerializer,
+    RiskCaseListSerializer,
+    StandardListSerializer,
+    TechnicalSolutionListSerializer,
+)
+from .services import get_latest_prices
+from .views import RESOURCE_PERMISSIONS
+
+
+class HasResourcePermission(permissions.BasePermission):
+    """按视图声明的 resource_permission 校验资源库权限"""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        code = getattr(view, "resource_permission", None)
+        return user.is_superuser or not code or user_has_permission(user, code)
+
+
+class ResourceListViewSet(viewsets.ReadOnlyModelViewSet):
+    permission_classes = [HasResourcePermission]
+    pagination_class = KeysetPagination
+    resource_permission = None
+
+
+class StandardViewSet(ResourceListViewSet):
+    serializer_class = StandardListSerializer
+    resource_permission = RESOURCE_PERMISSIONS["standard"]
+    filterset_fields = {
+        "standard_type": ["exact"],
+        "status": ["exact"],
+        "effective_date": ["gte", "lte"],
+        "code": ["exact", "istartswith"],
+    }
+
+    def get_queryset(self):
+        queryset = Standard.objects.all()
+        profession = self.request.query_params.get("profession")
+        if profession:
+            queryset = queryset.filter(applicable_professions__contains=[profession])
+        return queryset
+
+
+class MaterialPriceViewSet(ResourceListViewSet):
+    serializer_class = MaterialPriceSerializer
+    resource_permission = RESOURCE_PERMISSIONS["material"]
+    filterset_fields = {
+        "price_type": ["exact"],
+        "price_source": ["exact"],
+        "unit": ["exact"],
+        "effective_date": ["gte", "lte"],
+        "code": ["exact", "istartswith"],
+    }
+
+    def get_queryset(self):
+        queryset = MaterialPrice.objects.all()
+        region = self.request.query_params.get("region")
+        if region:
+            queryset = queryset.filter(applicable_regions__contains=[region])
+        return queryset
+
+    @action(detail=False, methods=["get"], url_path="latest-price", pagination_class=None)
+    def latest_price(self, request):
+        """按编号、地区、价格类型查询截至某日的最新单价；code 可重复传入"""
+        codes = [code.strip() for code in request.query_params.getlist("code") if code.strip()]
+        if not codes:
+            raise ValidationError({"code": "请至少提供一个材料编号。"})
+        as_of_param = request.query_params.get("as_of")
+        try:
+            as_of = date.fromisoformat(as_of_param) if as_of_param else None
+        except ValueError:
+            raise ValidationError({"as_of": "日期格式应为 YYYY-MM-DD。"})
+        prices = get_latest_prices(
+            codes,
+            region=request.query_params.get("region") or None,
+            price_type=request.query_params.get("price_type") or "material",
+            as_of=as_of,
+        )
+        return Response({
+            code: MaterialPriceSerializer(prices[code]).data if code in prices else None
+            for code in codes
+        })
+
+
+class CostIndicatorViewSet(ResourceListViewSet):
+    serializer_class = CostIndicatorSerializer
+    resource_permission = RESOURCE_PERMISSIONS["cost"]
+    queryset = CostIndicator.objects.all()
+    filterset_fields = {
+        "business_type": ["exact"],
+        "building_type": ["exact"],
+        "region": ["exact"],
+        "data_year": ["exact", "gte", "lte"],
+    }
+
+
+class RiskCaseViewSet(ResourceListViewSet):
+    serializer_class = RiskCaseListSerializer
+    resource_permission = RESOURCE_PERMISSIONS["knowledge"]
+    queryset = RiskCase.objects.select_related("project")
+    filterset_fields = {
+        "case_type": ["exact"],
+        "project": ["exact"],
+        "is_published": ["exact"],
+        "occurred_on": ["gte", "lte"],
+    }
+
+
+class TechnicalSolutionViewSet(ResourceListViewSet):
+    serializer_class = TechnicalSolutionListSerializer
+    resource_permission = RESOURCE_PERMISSIONS["knowledge"]
+    queryset = TechnicalSolution.objects.all()
+    filterset_fields = {
+        "domain": ["exact"],
+        "difficulty": ["exact"],
+        "promotion_value": ["exact"],
+    }
@@ -16,6 +16,7 @@ from .services import get_project_output_value_for_settlement, get_project_outpu
 from backend.apps.project_center.models import Project
 from backend.apps.system_management.models import User
 from backend.apps.system_management.services import get_user_permission_codes
+from backend.core.db_router import replica_reads
 from backend.core.views import _permission_granted
 from backend.apps.customer_success.models import BusinessContract
 from django.core.paginator import Paginator
@@ -357,6 +358,7 @@ def output_value_record_confirm(request, record_id):
     return render(request, "settlement_center/output_value_record_confirm.html", context)
 
 
+@replica_reads
 @login_required
 def output_value_statistics(request):
     """产值统计报表"""
@@ -6,3 +6,12 @@ class SystemManagementConfig(AppConfig):
     name = 'backend.apps.system_management'
     verbose_name = '系统管理'
 
+    def ready(self):
+        from backend.core.dashboard_cache import connect_data_version_signals
+
+        from .services_org import connect_org_signals
+        from .services_search import connect_search_signals
+
+        connect_org_signals()
+        connect_search_signals()
+        connect_data_version_signals()
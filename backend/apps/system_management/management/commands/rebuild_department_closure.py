@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backend.apps.system_management.services_org import rebuild_department_closure
+
+
+class Command(BaseCommand):
+    help = "Rebuild the department closure table from Department.parent (e.g. after loaddata or bulk updates)"
+
+    def handle(self, *args, **options):
+        total = rebuild_department_closure()
+        self.stdout.write(self.style.SUCCESS(f"Department closure rebuilt with {total} row(s)."))
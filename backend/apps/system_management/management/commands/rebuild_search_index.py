@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.apps.system_management.services_search import SEARCH_ENTITIES, rebuild_entity
+
+
+class Command(BaseCommand):
+    help = "Rebuild global search documents for projects, opinions, clients, opportunities, employees and risk cases"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entity",
+            action="append",
+            dest="entities",
+            help="Only rebuild the given entity type (repeatable): %s" % ", ".join(SEARCH_ENTITIES),
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        entities = options.get("entities") or list(SEARCH_ENTITIES)
+        unknown = [name for name in entities if name not in SEARCH_ENTITIES]
+        if unknown:
+            raise CommandError(f"Unknown entity type: {', '.join(unknown)}")
+
+        for entity_type in entities:
+            total = rebuild_entity(entity_type, batch_size=options["batch_size"])
+            self.stdout.write(f"{entity_type}: indexed {total} document(s)")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:34
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system_management', '0007_alter_role_custom_permissions'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('project', '项目'), ('opinion', '生产意见'), ('client', '客户'), ('opportunity', '商机'), ('employee', '员工'), ('risk_case', '风险案例')], max_length=20, verbose_name='实体类型')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='实体ID')),
+                ('code', models.TextField(blank=True, verbose_name='编号')),
+                ('title', models.TextField(blank=True, verbose_name='标题')),
+                ('subtitle', models.TextField(blank=True, verbose_name='副标题')),
+                ('content', models.TextField(blank=True, verbose_name='检索内容')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(blank=True, null=True, verbose_name='全文向量')),
+                ('project_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='所属项目ID')),
+                ('owner_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='负责人ID')),
+                ('updated_time', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '检索文档',
+                'verbose_name_plural': '检索文档',
+                'db_table': 'system_search_document',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=models.Index(fields=['entity_type', 'project_id'], name='system_sear_entity__e53a15_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='search_doc_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('code'), name='gin_trgm_ops'), name='search_doc_code_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'), name='search_doc_title_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('subtitle'), name='gin_trgm_ops'), name='search_doc_subtitle_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('content'), name='gin_trgm_ops'), name='search_doc_content_trgm'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='searchdocument',
+            unique_together={('entity_type', 'object_id')},
+        ),
+    ]
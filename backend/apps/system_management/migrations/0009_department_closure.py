@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:14
+
+from collections import defaultdict
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def closure_rows(parents):
+    """由 {部门: 上级} 计算闭包行 (ancestor, descendant, depth)；与 services_org.closure_rows 相同，复制于此以免迁移依赖运行时代码"""
+    children = defaultdict(list)
+    for department_id, parent_id in parents.items():
+        children[parent_id if parent_id in parents else None].append(department_id)
+    rows = []
+    stack = [(department_id, [department_id]) for department_id in children[None]]
+    while stack:
+        department_id, chain = stack.pop()
+        depth = len(chain) - 1
+        rows.extend((ancestor_id, department_id, depth - index) for index, ancestor_id in enumerate(chain))
+        stack.extend((child_id, chain + [child_id]) for child_id in children[department_id])
+    return rows
+
+
+def build_department_closure(apps, schema_editor):
+    """按现有 parent 外键生成部门层级闭包"""
+    Department = apps.get_model('system_management', 'Department')
+    DepartmentClosure = apps.get_model('system_management', 'DepartmentClosure')
+    parents = dict(Department.objects.values_list('id', 'parent_id'))
+    DepartmentClosure.objects.bulk_create([
+        DepartmentClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+        for ancestor_id, descendant_id, depth in closure_rows(parents)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system_management', '0008_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField(default=0, verbose_name='层级差')),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='system_management.department', verbose_name='祖先部门')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='system_management.department', verbose_name='后代部门')),
+            ],
+            options={
+                'verbose_name': '部门层级',
+                'verbose_name_plural': '部门层级',
+                'db_table': 'system_department_closure',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='departmentclosure',
+            index=models.Index(fields=['descendant', 'depth'], name='system_depa_descend_34cd62_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='departmentclosure',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='department_closure_unique_pair'),
+        ),
+        migrations.RunPython(build_department_closure, migrations.RunPython.noop),
+    ]
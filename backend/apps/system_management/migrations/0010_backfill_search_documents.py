@@ -0,0 +1,136 @@
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_CONFIG = 'simple'
+BATCH_SIZE = 500
+
+
+def _join(*parts):
+    return ' '.join(str(part).strip() for part in parts if part not in (None, '') and str(part).strip())
+
+
+# 文档构建逻辑按本迁移时的字段复制一份，不引用运行时的 services_search
+def _project(project):
+    client_name = project.client_company_name or (project.client.name if project.client_id else '')
+    return {
+        'code': project.project_number or '',
+        'title': project.name or '',
+        'subtitle': client_name or '',
+        'content': _join(project.project_number, project.name, client_name, project.description),
+        'project_id': project.id,
+    }
+
+
+def _opinion(opinion):
+    return {
+        'code': opinion.opinion_number or '',
+        'title': opinion.location_name or '',
+        'subtitle': opinion.project.name if opinion.project_id else '',
+        'content': _join(
+            opinion.opinion_number, opinion.location_name, opinion.drawing_number, opinion.issue_description,
+            opinion.current_practice, opinion.recommendation, opinion.reference_codes,
+        ),
+        'project_id': opinion.project_id,
+    }
+
+
+def _client(client):
+    return {
+        'code': client.code or '',
+        'title': client.name or '',
+        'subtitle': client.short_name or '',
+        'content': _join(
+            client.code, client.name, client.short_name, client.unified_credit_code, client.industry,
+            client.region, client.phone, client.email,
+        ),
+    }
+
+
+def _opportunity(opportunity):
+    client_name = opportunity.client.name if opportunity.client_id else ''
+    return {
+        'code': opportunity.opportunity_number or '',
+        'title': opportunity.name or '',
+        'subtitle': client_name,
+        'content': _join(
+            opportunity.opportunity_number, opportunity.name, opportunity.project_name, client_name,
+            opportunity.project_address, opportunity.contract_number,
+        ),
+        'owner_id': opportunity.business_manager_id,
+    }
+
+
+def _employee(employee):
+    department_name = employee.department.name if employee.department_id else ''
+    return {
+        'code': employee.employee_number or '',
+        'title': employee.name or '',
+        'subtitle': _join(department_name, employee.position),
+        'content': _join(
+            employee.employee_number, employee.name, employee.phone, employee.email, department_name,
+            employee.position, employee.job_title,
+        ),
+    }
+
+
+def _risk_case(case):
+    return {
+        'code': case.case_code or '',
+        'title': case.title or '',
+        'subtitle': case.project.name if case.project_id else '',
+        'content': _join(
+            case.case_code, case.title, case.risk_description, case.root_cause, case.counter_measure, case.lessons,
+        ),
+        'project_id': case.project_id,
+    }
+
+
+ENTITIES = (
+    ('project', 'project_center', 'Project', _project, ('client',)),
+    ('opinion', 'production_quality', 'Opinion', _opinion, ('project',)),
+    ('client', 'customer_success', 'Client', _client, ()),
+    ('opportunity', 'customer_success', 'BusinessOpportunity', _opportunity, ('client',)),
+    ('employee', 'personnel_management', 'Employee', _employee, ('department',)),
+    ('risk_case', 'resource_standard', 'RiskCase', _risk_case, ('project',)),
+)
+
+
+def backfill_search_documents(apps, schema_editor):
+    """检索表上线前已有的数据一次性补建文档，否则改用 search_filter 的列表在部署后查不到任何记录"""
+    SearchDocument = apps.get_model('system_management', 'SearchDocument')
+    empty = {'code': '', 'title': '', 'subtitle': '', 'content': '', 'project_id': None, 'owner_id': None}
+    for entity_type, app_label, model_name, build, select_related in ENTITIES:
+        model = apps.get_model(app_label, model_name)
+        queryset = model.objects.select_related(*select_related).order_by('pk')
+        batch = []
+        for obj in queryset.iterator(chunk_size=BATCH_SIZE):
+            batch.append(SearchDocument(entity_type=entity_type, object_id=obj.pk, **{**empty, **build(obj)}))
+            if len(batch) >= BATCH_SIZE:
+                SearchDocument.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            SearchDocument.objects.bulk_create(batch, ignore_conflicts=True)
+    SearchDocument.objects.filter(search_vector__isnull=True).update(
+        search_vector=(
+            SearchVector('code', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('subtitle', weight='B', config=SEARCH_CONFIG)
+            + SearchVector('content', weight='C', config=SEARCH_CONFIG)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system_management', '0009_department_closure'),
+        ('project_center', '0027_project_archive_package'),
+        ('production_quality', '0007_hot_path_indexes'),
+        ('customer_success', '0011_opportunity_pipeline_funnel'),
+        ('personnel_management', '0001_initial'),
+        ('resource_standard', '0006_material_price_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
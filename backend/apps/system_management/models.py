@@ -1,5 +1,8 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 
 
@@ -71,6 +74,32 @@ class Department(models.Model):
     
     def __str__(self):
         return self.name
+    
+    def clean(self):
+        from .services_org import validate_parent
+        super().clean()
+        validate_parent(self)
+
+
+class DepartmentClosure(models.Model):
+    """部门层级闭包表：每对（祖先, 后代）一行，depth 为层级差，自身为 0"""
+    ancestor = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='descendant_links', verbose_name='祖先部门')
+    descendant = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='ancestor_links', verbose_name='后代部门')
+    depth = models.PositiveIntegerField(default=0, verbose_name='层级差')
+    
+    class Meta:
+        db_table = 'system_department_closure'
+        verbose_name = '部门层级'
+        verbose_name_plural = verbose_name
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='department_closure_unique_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'depth']),
+        ]
+    
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
 
 class Role(models.Model):
     """角色表"""
@@ -184,3 +213,43 @@ class SystemConfig(models.Model):
     
     def __str__(self):
         return self.key
+
+
+class SearchDocument(models.Model):
+    """全局检索文档表（由业务实体保存时同步维护）"""
+    ENTITY_CHOICES = [
+        ('project', '项目'),
+        ('opinion', '生产意见'),
+        ('client', '客户'),
+        ('opportunity', '商机'),
+        ('employee', '员工'),
+        ('risk_case', '风险案例'),
+    ]
+
+    entity_type = models.CharField(max_length=20, choices=ENTITY_CHOICES, verbose_name='实体类型')
+    object_id = models.PositiveBigIntegerField(verbose_name='实体ID')
+    code = models.TextField(blank=True, verbose_name='编号')
+    title = models.TextField(blank=True, verbose_name='标题')
+    subtitle = models.TextField(blank=True, verbose_name='副标题')
+    content = models.TextField(blank=True, verbose_name='检索内容')
+    search_vector = SearchVectorField(null=True, blank=True, verbose_name='全文向量')
+    project_id = models.PositiveBigIntegerField(null=True, blank=True, verbose_name='所属项目ID')
+    owner_id = models.PositiveBigIntegerField(null=True, blank=True, verbose_name='负责人ID')
+    updated_time = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        db_table = 'system_search_document'
+        verbose_name = '检索文档'
+        verbose_name_plural = verbose_name
+        unique_together = ('entity_type', 'object_id')
+        indexes = [
+            models.Index(fields=['entity_type', 'project_id']),
+            GinIndex(fields=['search_vector'], name='search_doc_vector_gin'),
+            GinIndex(OpClass(Upper('code'), name='gin_trgm_ops'), name='search_doc_code_trgm'),
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='search_doc_title_trgm'),
+            GinIndex(OpClass(Upper('subtitle'), name='gin_trgm_ops'), name='search_doc_subtitle_trgm'),
+            GinIndex(OpClass(Upper('content'), name='gin_trgm_ops'), name='search_doc_content_trgm'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_entity_type_display()} - {self.title}"
@@ -0,0 +1,150 @@
+"""
+部门层级
+
+DepartmentClosure 为每对（祖先, 后代）保存一行，部门新建、调整上级时由信号增量维护。
+“某部门及其下级”“某部门的全部上级”因此都是一次走索引的查询，不再逐层递归。
+loaddata 等原始保存不触发维护，之后可执行 rebuild_department_closure 全量重建。
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Union
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_save
+
+from .models import Department, DepartmentClosure
+
+DepartmentRef = Union[Department, int, None]
+
+
+def _pk(department: DepartmentRef) -> Optional[int]:
+    return getattr(department, 'pk', department)
+
+
+def subtree_ids(department: DepartmentRef, include_self: bool = True):
+    """部门及其全部下级的主键（可直接用作 __in 子查询）"""
+    links = DepartmentClosure.objects.filter(ancestor_id=_pk(department))
+    if not include_self:
+        links = links.filter(depth__gt=0)
+    return links.values('descendant_id')
+
+
+def descendants(department: DepartmentRef, include_self: bool = True):
+    """部门的全部下级部门，按层级由近及远"""
+    links = DepartmentClosure.objects.filter(ancestor_id=_pk(department))
+    if not include_self:
+        links = links.filter(depth__gt=0)
+    return Department.objects.filter(ancestor_links__in=links).order_by('ancestor_links__depth', 'order', 'id')
+
+
+def ancestors(department: DepartmentRef, include_self: bool = False):
+    """部门的全部上级部门，按层级由近及远（直接上级在前）"""
+    links = DepartmentClosure.objects.filter(descendant_id=_pk(department))
+    if not include_self:
+        links = links.filter(depth__gt=0)
+    return Department.objects.filter(descendant_links__in=links).order_by('descendant_links__depth')
+
+
+def in_subtree(department: DepartmentRef, field: str = 'department', include_self: bool = True) -> Q:
+    """按部门子树过滤的条件，例如 Employee.objects.filter(in_subtree(dept))"""
+    return Q(**{f'{field}_id__in': subtree_ids(department, include_self)})
+
+
+def _link_subtree(department_id: int, parent_id: Optional[int]) -> None:
+    """把以 department_id 为根的子树挂到 parent_id 之下：为每个上级 × 每个下级补一行"""
+    if parent_id is None:
+        return
+    upper = list(DepartmentClosure.objects.filter(descendant_id=parent_id).values_list('ancestor_id', 'depth'))
+    lower = list(DepartmentClosure.objects.filter(ancestor_id=department_id).values_list('descendant_id', 'depth'))
+    DepartmentClosure.objects.bulk_create([
+        DepartmentClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+        for ancestor_id, up in upper
+        for descendant_id, down in lower
+    ])
+
+
+def _unlink_subtree(department_id: int) -> None:
+    """删除子树内部门与子树外上级之间的全部关系，子树内部关系保留"""
+    DepartmentClosure.objects.filter(
+        descendant_id__in=subtree_ids(department_id),
+    ).exclude(
+        ancestor_id__in=subtree_ids(department_id),
+    ).delete()
+
+
+def validate_parent(department: Department) -> None:
+    """上级部门不能是本部门或其下级，否则会形成环"""
+    if not department.parent_id:
+        return
+    if department.parent_id == department.pk or (
+        department.pk and subtree_ids(department).filter(descendant_id=department.parent_id).exists()
+    ):
+        raise ValidationError({'parent': '上级部门不能是本部门或其下级部门'})
+
+
+# ---------------------------------------------------------------------------
+# 信号处理
+# ---------------------------------------------------------------------------
+
+def _remember_parent(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._closure_parent = (
+        Department.objects.filter(pk=instance.pk).values_list('parent_id', flat=True).first()
+        if instance.pk else None
+    )
+    validate_parent(instance)
+
+
+def _department_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    with transaction.atomic():
+        if created or not DepartmentClosure.objects.filter(ancestor=instance, descendant=instance).exists():
+            DepartmentClosure.objects.get_or_create(ancestor=instance, descendant=instance, defaults={'depth': 0})
+            _link_subtree(instance.pk, instance.parent_id)
+        elif getattr(instance, '_closure_parent', instance.parent_id) != instance.parent_id:
+            _unlink_subtree(instance.pk)
+            _link_subtree(instance.pk, instance.parent_id)
+
+
+def connect_org_signals() -> None:
+    """在应用就绪后挂载部门层级维护信号（删除由外键级联完成）"""
+    pre_save.connect(_remember_parent, sender=Department, dispatch_uid='department_closure_pre_save')
+    post_save.connect(_department_saved, sender=Department, dispatch_uid='department_closure_save')
+
+
+# ---------------------------------------------------------------------------
+# 全量重建
+# ---------------------------------------------------------------------------
+
+def closure_rows(parents: Dict[int, Optional[int]]) -> List[tuple]:
+    """由 {部门: 上级} 计算闭包行 (ancestor, descendant, depth)，自上而下逐层展开"""
+    children = defaultdict(list)
+    for department_id, parent_id in parents.items():
+        children[parent_id if parent_id in parents else None].append(department_id)
+    rows = []
+    # chain: 根到当前部门路径上的全部部门
+    stack = [(department_id, [department_id]) for department_id in children[None]]
+    while stack:
+        department_id, chain = stack.pop()
+        depth = len(chain) - 1
+        rows.extend((ancestor_id, department_id, depth - index) for index, ancestor_id in enumerate(chain))
+        stack.extend((child_id, chain + [child_id]) for child_id in children[department_id])
+    return rows
+
+
+def rebuild_department_closure() -> int:
+    """按 parent 外键全量重建闭包表，返回写入行数"""
+    parents = dict(Department.objects.values_list('id', 'parent_id'))
+    rows = closure_rows(parents)
+    with transaction.atomic():
+        DepartmentClosure.objects.all().delete()
+        DepartmentClosure.objects.bulk_create(
+            [DepartmentClosure(ancestor_id=a, descendant_id=d, depth=depth) for a, d, depth in rows],
+            batch_size=1000,
+        )
+    return len(rows)
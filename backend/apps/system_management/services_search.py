@@ -0,0 +1,439 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.apps import apps
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import transaction
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.urls import NoReverseMatch, reverse
+
+from .models import SearchDocument
+from .services import get_user_permission_codes
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'simple'
+SEARCH_FIELDS = ('code', 'title', 'subtitle', 'content')
+DOCUMENT_FIELDS = ('code', 'title', 'subtitle', 'content', 'project_id', 'owner_id')
+MAX_SEARCH_LIMIT = 50
+INDEX_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class SearchEntity:
+    """描述一个可检索实体：来源模型、文档构建方式与详情链接。"""
+    entity_type: str
+    model_label: str
+    build: Callable[[object], Dict[str, object]]
+    url_name: str
+    url_with_id: bool = True
+    select_related: Tuple[str, ...] = ()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+
+@dataclass(frozen=True)
+class SearchDependency:
+    """其他实体的检索文档引用了来源模型的字段，这些字段变化时需刷新对应文档。"""
+    model_label: str
+    fields: Tuple[str, ...]
+    entity_type: str
+    fk_name: str
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+
+def _join(*parts) -> str:
+    return ' '.join(str(part).strip() for part in parts if part not in (None, '') and str(part).strip())
+
+
+def _build_project(project) -> Dict[str, object]:
+    client_name = project.client_company_name or (project.client.name if project.client_id else '')
+    return {
+        'code': project.project_number or '',
+        'title': project.name or '',
+        'subtitle': client_name or '',
+        'content': _join(project.project_number, project.name, client_name, project.description),
+        'project_id': project.id,
+    }
+
+
+def _build_opinion(opinion) -> Dict[str, object]:
+    return {
+        'code': opinion.opinion_number or '',
+        'title': opinion.location_name or '',
+        'subtitle': opinion.project.name if opinion.project_id else '',
+        'content': _join(
+            opinion.opinion_number,
+            opinion.location_name,
+            opinion.drawing_number,
+            opinion.issue_description,
+            opinion.current_practice,
+            opinion.recommendation,
+            opinion.reference_codes,
+        ),
+        'project_id': opinion.project_id,
+    }
+
+
+def _build_client(client) -> Dict[str, object]:
+    return {
+        'code': client.code or '',
+        'title': client.name or '',
+        'subtitle': client.short_name or '',
+        'content': _join(
+            client.code,
+            client.name,
+            client.short_name,
+            client.unified_credit_code,
+            client.industry,
+            client.region,
+            client.phone,
+            client.email,
+        ),
+    }
+
+
+def _build_opportunity(opportunity) -> Dict[str, object]:
+    client_name = opportunity.client.name if opportunity.client_id else ''
+    return {
+        'code': opportunity.opportunity_number or '',
+        'title': opportunity.name or '',
+        'subtitle': client_name,
+        'content': _join(
+            opportunity.opportunity_number,
+            opportunity.name,
+            opportunity.project_name,
+            client_name,
+            opportunity.project_address,
+            opportunity.contract_number,
+        ),
+        'owner_id': opportunity.business_manager_id,
+    }
+
+
+def _build_employee(employee) -> Dict[str, object]:
+    department_name = employee.department.name if employee.department_id else ''
+    return {
+        'code': employee.employee_number or '',
+        'title': employee.name or '',
+        'subtitle': _join(department_name, employee.position),
+        'content': _join(
+            employee.employee_number,
+            employee.name,
+            employee.phone,
+            employee.email,
+            department_name,
+            employee.position,
+            employee.job_title,
+        ),
+    }
+
+
+def _build_risk_case(case) -> Dict[str, object]:
+    return {
+        'code': case.case_code or '',
+        'title': case.title or '',
+        'subtitle': case.project.name if case.project_id else '',
+        'content': _join(
+            case.case_code,
+            case.title,
+            case.risk_description,
+            case.root_cause,
+            case.counter_measure,
+            case.lessons,
+        ),
+        'project_id': case.project_id,
+    }
+
+
+SEARCH_ENTITIES: Dict[str, SearchEntity] = {
+    entity.entity_type: entity
+    for entity in (
+        SearchEntity('project', 'project_center.Project', _build_project, 'project_pages:project_detail',
+                     select_related=('client',)),
+        SearchEntity('opinion', 'production_quality.Opinion', _build_opinion,
+                     'production_quality_pages:opinion_review_detail', select_related=('project',)),
+        SearchEntity('client', 'customer_success.Client', _build_client, 'business_pages:customer_management',
+                     url_with_id=False),
+        SearchEntity('opportunity', 'customer_success.BusinessOpportunity', _build_opportunity,
+                     'business_pages:opportunity_detail', select_related=('client',)),
+        SearchEntity('employee', 'personnel_management.Employee', _build_employee,
+                     'personnel_pages:employee_detail', select_related=('department',)),
+        SearchEntity('risk_case', 'resource_standard.RiskCase', _build_risk_case,
+                     'resource_standard_pages:risk_case_edit', select_related=('project',)),
+    )
+}
+
+# 文档里冗余的关联名称：项目名称 -> 意见/风险案例，客户名称 -> 项目/商机，部门名称 -> 员工
+SEARCH_DEPENDENCIES: Tuple[SearchDependency, ...] = (
+    SearchDependency('project_center.Project', ('name',), 'opinion', 'project_id'),
+    SearchDependency('project_center.Project', ('name',), 'risk_case', 'project_id'),
+    SearchDependency('customer_success.Client', ('name',), 'project', 'client_id'),
+    SearchDependency('customer_success.Client', ('name',), 'opportunity', 'client_id'),
+    SearchDependency('system_management.Department', ('name',), 'employee', 'department_id'),
+)
+
+
+def _search_vector():
+    return (
+        SearchVector('code', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('subtitle', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('content', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def index_objects(entity_type: str, objects: Iterable) -> int:
+    """为指定实体批量写入/刷新检索文档（INSERT ... ON CONFLICT 一次写入），返回处理数量。"""
+    entity = SEARCH_ENTITIES[entity_type]
+    empty = {'code': '', 'title': '', 'subtitle': '', 'content': '', 'project_id': None, 'owner_id': None}
+    documents = [
+        SearchDocument(entity_type=entity_type, object_id=obj.pk, **{**empty, **entity.build(obj)})
+        for obj in objects
+    ]
+    if not documents:
+        return 0
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['entity_type', 'object_id'],
+        update_fields=[*DOCUMENT_FIELDS, 'updated_time'],
+    )
+    SearchDocument.objects.filter(
+        entity_type=entity_type, object_id__in=[document.object_id for document in documents]
+    ).update(search_vector=_search_vector())
+    return len(documents)
+
+
+def remove_documents(entity_type: str, object_ids: Sequence[int]) -> None:
+    SearchDocument.objects.filter(entity_type=entity_type, object_id__in=list(object_ids)).delete()
+
+
+def index_queryset(entity_type: str, queryset: QuerySet, batch_size: int = INDEX_BATCH_SIZE) -> int:
+    """分批为查询集中的对象写入检索文档。"""
+    entity = SEARCH_ENTITIES[entity_type]
+    queryset = queryset.select_related(*entity.select_related).order_by('pk')
+    total = 0
+    batch = []
+    for obj in queryset.iterator(chunk_size=batch_size):
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            total += index_objects(entity_type, batch)
+            batch = []
+    if batch:
+        total += index_objects(entity_type, batch)
+    return total
+
+
+def rebuild_entity(entity_type: str, batch_size: int = INDEX_BATCH_SIZE) -> int:
+    """全量重建某类实体的检索文档，并清理已失效的文档。"""
+    entity = SEARCH_ENTITIES[entity_type]
+    total = index_queryset(entity_type, entity.model.objects.all(), batch_size)
+    SearchDocument.objects.filter(entity_type=entity_type).exclude(
+        object_id__in=entity.model.objects.values('pk')
+    ).delete()
+    return total
+
+
+def _sync(description: str, instance, action: Callable[[], object]) -> None:
+    """检索同步失败不影响业务写入；用保存点隔离，避免数据库错误中断外层事务。"""
+    try:
+        with transaction.atomic():
+            action()
+    except Exception:
+        logger.exception('%s失败: %s #%s', description, instance._meta.label, instance.pk)
+
+
+def _handle_save(sender, instance, **kwargs):
+    entity = _ENTITY_BY_MODEL.get(sender)
+    if entity is None or kwargs.get('raw'):
+        return
+    _sync('同步检索文档', instance, lambda: index_objects(entity.entity_type, [instance]))
+
+
+def _handle_delete(sender, instance, **kwargs):
+    entity = _ENTITY_BY_MODEL.get(sender)
+    if entity is None:
+        return
+    _sync('删除检索文档', instance, lambda: remove_documents(entity.entity_type, [instance.pk]))
+
+
+def _remember_dependency_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """保存前记下被其他文档引用的字段旧值，保存后据此判断是否需要刷新关联文档。"""
+    instance.__dict__.pop('_search_previous', None)
+    watched = _WATCHED_FIELDS.get(sender)
+    if not watched or raw or instance._state.adding:
+        return
+    if update_fields is not None and not watched.intersection(update_fields):
+        return
+    instance._search_previous = sender._default_manager.filter(pk=instance.pk).values(*watched).first()
+
+
+def _handle_dependency_save(sender, instance, created=False, raw=False, **kwargs):
+    previous = instance.__dict__.pop('_search_previous', None)
+    if created or raw or not previous:
+        return
+    for dependency in _DEPENDENCIES_BY_MODEL.get(sender, ()):
+        if any(previous[name] != getattr(instance, name) for name in dependency.fields):
+            related = SEARCH_ENTITIES[dependency.entity_type].model.objects.filter(**{dependency.fk_name: instance.pk})
+            _sync('刷新关联检索文档', instance, lambda: index_queryset(dependency.entity_type, related))
+
+
+_ENTITY_BY_MODEL: Dict[type, SearchEntity] = {}
+_DEPENDENCIES_BY_MODEL: Dict[type, List[SearchDependency]] = {}
+_WATCHED_FIELDS: Dict[type, set] = {}
+
+
+def connect_search_signals() -> None:
+    """在应用就绪后为各检索实体挂载保存/删除信号，并为被引用的来源模型挂载字段变更检测。"""
+    for entity in SEARCH_ENTITIES.values():
+        model = entity.model
+        _ENTITY_BY_MODEL[model] = entity
+        post_save.connect(_handle_save, sender=model, dispatch_uid=f'search_document_save_{entity.entity_type}')
+        post_delete.connect(_handle_delete, sender=model, dispatch_uid=f'search_document_delete_{entity.entity_type}')
+    for dependency in SEARCH_DEPENDENCIES:
+        model = dependency.model
+        _DEPENDENCIES_BY_MODEL.setdefault(model, []).append(dependency)
+        _WATCHED_FIELDS.setdefault(model, set()).update(dependency.fields)
+    for model in _DEPENDENCIES_BY_MODEL:
+        uid = model._meta.label_lower
+        pre_save.connect(_remember_dependency_fields, sender=model, dispatch_uid=f'search_dependency_pre_{uid}')
+        post_save.connect(_handle_dependency_save, sender=model, dispatch_uid=f'search_dependency_save_{uid}')
+
+
+def _keyword_q(keyword: str, fields: Sequence[str]) -> Q:
+    condition = Q()
+    for field_name in fields:
+        condition |= Q(**{f'{field_name}__icontains': keyword})
+    return condition
+
+
+def search_filter(
+    queryset: QuerySet,
+    entity_type: str,
+    keyword: Optional[str],
+    fields: Sequence[str] = ('content',),
+    pk_field: str = 'pk',
+) -> QuerySet:
+    """
+    用检索文档表过滤列表查询集，替代逐字段的 icontains 串联。
+    匹配走检索表上的 trigram GIN 索引，pk_field 指定与文档 object_id 对应的字段。
+    """
+    keyword = (keyword or '').strip()
+    if not keyword:
+        return queryset
+    matched = SearchDocument.objects.filter(
+        _keyword_q(keyword, fields), entity_type=entity_type
+    ).values('object_id')
+    return queryset.filter(**{f'{pk_field}__in': matched})
+
+
+def _accessible_project_q(user) -> Q:
+    ProjectTeam = apps.get_model('project_center', 'ProjectTeam')
+    Project = apps.get_model('project_center', 'Project')
+    owned = Project.objects.filter(
+        Q(project_manager=user) | Q(business_manager=user) | Q(created_by=user)
+    ).values('id')
+    team = ProjectTeam.objects.filter(user=user, is_active=True).values('project_id')
+    return Q(project_id__in=owned) | Q(project_id__in=team)
+
+
+def _has(permission_set, code: str) -> bool:
+    return '__all__' in permission_set or code in permission_set
+
+
+def visible_documents_q(user, permission_set=None) -> Q:
+    """按实体组合当前用户可见的检索文档条件。"""
+    if permission_set is None:
+        permission_set = get_user_permission_codes(user)
+    if getattr(user, 'is_superuser', False) or '__all__' in permission_set:
+        return Q()
+
+    project_q = _accessible_project_q(user)
+    condition = Q(entity_type='opinion') & project_q
+
+    if getattr(user, 'user_type', 'internal') == 'internal' and _has(permission_set, 'project_center.view_all'):
+        condition |= Q(entity_type='project')
+    elif _has(permission_set, 'project_center.view_assigned'):
+        condition |= Q(entity_type='project') & project_q
+
+    if _has(permission_set, 'customer_success.view') or _has(permission_set, 'customer_success.manage'):
+        condition |= Q(entity_type='client')
+
+    if _has(permission_set, 'customer_success.opportunity.view_all'):
+        condition |= Q(entity_type='opportunity')
+    else:
+        condition |= Q(entity_type='opportunity', owner_id=user.id)
+
+    if _has(permission_set, 'personnel_management.employee.view'):
+        condition |= Q(entity_type='employee')
+
+    if _has(permission_set, 'resource_center.view'):
+        condition |= Q(entity_type='risk_case')
+
+    return condition
+
+
+def _document_url(document: SearchDocument) -> str:
+    entity = SEARCH_ENTITIES.get(document.entity_type)
+    if entity is None:
+        return ''
+    try:
+        if entity.url_with_id:
+            return reverse(entity.url_name, args=[document.object_id])
+        return reverse(entity.url_name)
+    except NoReverseMatch:
+        return ''
+
+
+def search_documents(
+    user,
+    keyword: str,
+    entity_types: Optional[Sequence[str]] = None,
+    limit: int = 20,
+) -> List[Dict[str, object]]:
+    """全局检索：按权限过滤后，以 trigram 相似度与全文排名综合排序。"""
+    keyword = (keyword or '').strip()
+    if not keyword:
+        return []
+    limit = max(1, min(int(limit or 20), MAX_SEARCH_LIMIT))
+
+    query = SearchQuery(keyword, config=SEARCH_CONFIG, search_type='plain')
+    documents = SearchDocument.objects.filter(
+        _keyword_q(keyword, SEARCH_FIELDS) | Q(search_vector=query)
+    ).filter(visible_documents_q(user))
+    if entity_types:
+        documents = documents.filter(entity_type__in=[t for t in entity_types if t in SEARCH_ENTITIES])
+
+    documents = documents.annotate(
+        rank=Greatest(
+            TrigramSimilarity('code', keyword),
+            TrigramSimilarity('title', keyword),
+            Value(0.0, output_field=FloatField()),
+        ) + Coalesce(SearchRank(F('search_vector'), query), Value(0.0, output_field=FloatField())),
+    ).order_by('-rank', '-updated_time')[:limit]
+
+    labels = dict(SearchDocument.ENTITY_CHOICES)
+    return [
+        {
+            'entity_type': document.entity_type,
+            'entity_label': labels.get(document.entity_type, document.entity_type),
+            'object_id': document.object_id,
+            'code': document.code,
+            'title': document.title,
+            'subtitle': document.subtitle,
+            'url': _document_url(document),
+            'rank': round(float(document.rank or 0), 4),
+        }
+        for document in documents
+    ]
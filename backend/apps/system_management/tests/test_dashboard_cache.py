@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client as HttpClient, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from backend.apps.customer_success.models import BusinessContract, BusinessPaymentPlan, Client
+from backend.apps.project_center.models import Project, ProjectMilestone
+from backend.core.dashboard_cache import bump_data_version, cached_summary
+
+
+def _card(response, label):
+    return next(card["value"] for card in response.context["summary_cards"] if card["label"] == label)
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username="board_user", password="pass1234")
+        self.other = User.objects.create_user(username="board_other", password="pass1234")
+        self.project = Project.objects.create(name="看板项目", project_number="VIH-DSH-001", created_by=self.user)
+        self.http = HttpClient()
+        self.http.force_login(self.user)
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.http.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_task_board_cached_until_milestones_change(self):
+        url = reverse("collaboration_pages:task_board")
+        first, cold_queries = self._get(url)
+        second, warm_queries = self._get(url)
+        self.assertLess(warm_queries, cold_queries)
+        self.assertEqual(second.context["summary_cards"], first.context["summary_cards"])
+
+        overdue_before = _card(second, "逾期任务")
+        ProjectMilestone.objects.create(
+            project=self.project, name="逾期节点", planned_date=date.today() - timedelta(days=3),
+        )
+        third, _ = self._get(url)
+        self.assertEqual(_card(third, "逾期任务"), overdue_before + 1)
+
+    def test_summary_keyed_by_user_permissions_and_params(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        models = ("project_center.Project",)
+        self.assertEqual(cached_summary("demo", models, compute, user=self.user), 1)
+        self.assertEqual(cached_summary("demo", models, compute, user=self.user), 1)
+        self.assertEqual(cached_summary("demo", models, compute, user=self.other), 2)
+        self.assertEqual(cached_summary("demo", models, compute, user=self.user, permission_codes={"a"}), 3)
+        self.assertEqual(cached_summary("demo", models, compute, user=self.user, params={"project": "1"}), 4)
+        bump_data_version(Project)
+        self.assertEqual(cached_summary("demo", models, compute, user=self.user), 5)
+
+    def test_customer_dashboards_render_and_refresh_on_payment_changes(self):
+        client = Client.objects.create(name="看板甲方", code="CLI-DSH", created_by=self.user)
+        contract = BusinessContract.objects.create(
+            client=client, project=self.project, contract_amount=Decimal("1000"), tax_rate=Decimal("6"),
+            status="signed", created_by=self.user,
+        )
+        BusinessPaymentPlan.objects.create(
+            contract=contract, phase_name="首付款", planned_amount=Decimal("400"), planned_date=date.today(),
+        )
+        for name in ("project_settlement", "output_analysis"):
+            self._get(reverse(f"business_pages:{name}"))
+
+        url = reverse("business_pages:payment_tracking")
+        response, _ = self._get(url)
+        self.assertEqual(_card(response, "提醒节点"), 1)
+        BusinessPaymentPlan.objects.filter(contract=contract).get().delete()
+        response, _ = self._get(url)
+        self.assertEqual(_card(response, "提醒节点"), 0)
+
+    def test_permission_scoped_dashboards_serve_from_cache(self):
+        admin = get_user_model().objects.create_superuser(
+            username="board_admin", password="pass1234", email="board@example.com",
+        )
+        self.http.force_login(admin)
+        for url in (
+            reverse("project_pages:project_monitor"),
+            reverse("production_quality_pages:report_generate"),
+            reverse("system_pages:operation_logs"),
+        ):
+            first, cold_queries = self._get(url)
+            second, warm_queries = self._get(url)
+            self.assertLessEqual(warm_queries, cold_queries)
+            self.assertEqual(second.context["summary_cards"], first.context["summary_cards"])
@@ -0,0 +1,111 @@
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from backend.apps.project_center.services_detail import cached_tab
+from backend.core import db_router
+from backend.core.dashboard_cache import cached_summary
+from backend.middleware.db_middleware import ReplicaRoutingMiddleware
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = db_router.PrimaryReplicaRouter()
+        patcher = mock.patch.object(db_router, "replica_configured", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_follow_routing_state(self):
+        self.assertIsNone(self.router.db_for_read(None))
+        with db_router.read_from_replica() as state:
+            self.assertEqual(self.router.db_for_read(None), db_router.REPLICA_ALIAS)
+            with db_router.use_primary():
+                self.assertIsNone(self.router.db_for_read(None))
+            self.assertEqual(self.router.db_for_read(None), db_router.REPLICA_ALIAS)
+
+            # 写入后本次执行余下的读取回到 default
+            self.assertEqual(self.router.db_for_write(None), "default")
+            self.assertTrue(state.wrote)
+            self.assertIsNone(self.router.db_for_read(None))
+
+    def test_falls_back_to_default_without_replica(self):
+        with mock.patch.object(db_router, "replica_configured", return_value=False):
+            with db_router.read_from_replica():
+                self.assertIsNone(self.router.db_for_read(None))
+
+    def test_shared_caches_compute_on_primary(self):
+        # 按数据版本共享的缓存结果不能来自滞后的副本
+        def probe():
+            return self.router.db_for_read(None) or "default"
+
+        with db_router.read_from_replica():
+            self.assertEqual(cached_tab(-1, "router_probe", probe), "default")
+            self.assertEqual(cached_summary("router_probe", (), probe, timeout=1), "default")
+            self.assertEqual(self.router.db_for_read(None), db_router.REPLICA_ALIAS)
+
+    def test_replica_is_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate(db_router.REPLICA_ALIAS, "project_center"))
+        self.assertIsNone(self.router.allow_migrate("default", "project_center"))
+
+
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = db_router.PrimaryReplicaRouter()
+        patcher = mock.patch.object(db_router, "replica_configured", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _call(self, request, view):
+        seen = {}
+
+        def get_response(req):
+            middleware.process_view(req, view, (), {})
+            return view(req, seen)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+        return response, seen
+
+    def _reading_view(self, write=False):
+        def view(request, seen):
+            seen["read"] = self.router.db_for_read(None)
+            if write:
+                self.router.db_for_write(None)
+            return HttpResponse("ok")
+        return view
+
+    def test_marked_view_reads_replica_until_pinned(self):
+        view = db_router.replica_reads(self._reading_view())
+        response, seen = self._call(self.factory.get("/stats/"), view)
+        self.assertEqual(seen["read"], db_router.REPLICA_ALIAS)
+        self.assertNotIn(db_router.REPLICA_PIN_COOKIE, response.cookies)
+
+        request = self.factory.get("/stats/")
+        request.COOKIES[db_router.REPLICA_PIN_COOKIE] = "1"
+        _, seen = self._call(request, view)
+        self.assertIsNone(seen["read"])
+
+    def test_unmarked_views_and_writes(self):
+        _, seen = self._call(self.factory.get("/plain/"), self._reading_view())
+        self.assertIsNone(seen["read"])
+
+        view = db_router.replica_reads(self._reading_view(write=True))
+        response, _ = self._call(self.factory.get("/stats/"), view)
+        self.assertEqual(response.cookies[db_router.REPLICA_PIN_COOKIE]["max-age"], 15)
+
+        response, seen = self._call(self.factory.post("/stats/"), view)
+        self.assertIsNone(seen["read"])
+        self.assertIn(db_router.REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_viewset_replica_actions(self):
+        view = self._reading_view()
+        view.cls = type("StatsViewSet", (), {"replica_actions": ("statistics",)})
+        view.actions = {"get": "statistics"}
+        _, seen = self._call(self.factory.get("/api/stats/"), view)
+        self.assertEqual(seen["read"], db_router.REPLICA_ALIAS)
+
+        view.actions = {"get": "list"}
+        _, seen = self._call(self.factory.get("/api/stats/"), view)
+        self.assertIsNone(seen["read"])
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from backend.apps.project_center.models import Project
+from backend.apps.project_center.views_pages import _filter_projects_for_user
+from backend.apps.system_management.models import Department, DepartmentClosure
+from backend.apps.system_management.services_org import (
+    ancestors,
+    descendants,
+    rebuild_department_closure,
+)
+
+
+class DepartmentClosureTests(TestCase):
+    def setUp(self):
+        self.root = Department.objects.create(name="总部", code="ROOT")
+        self.tech = Department.objects.create(name="技术中心", code="TECH", parent=self.root)
+        self.design = Department.objects.create(name="设计一部", code="DES1", parent=self.tech)
+        self.sales = Department.objects.create(name="市场部", code="SALES", parent=self.root)
+
+    def _ids(self, queryset):
+        return list(queryset.values_list("pk", flat=True))
+
+    def test_descendants_and_ancestors(self):
+        self.assertEqual(self._ids(descendants(self.tech)), [self.tech.pk, self.design.pk])
+        self.assertEqual(
+            set(self._ids(descendants(self.root, include_self=False))),
+            {self.tech.pk, self.design.pk, self.sales.pk},
+        )
+        self.assertEqual(self._ids(ancestors(self.design)), [self.tech.pk, self.root.pk])
+        with self.assertNumQueries(1):
+            list(descendants(self.root))
+
+    def test_move_subtree_updates_closure(self):
+        self.tech.parent = self.sales
+        self.tech.save()
+        self.assertEqual(self._ids(ancestors(self.design)), [self.tech.pk, self.sales.pk, self.root.pk])
+        self.assertIn(self.design.pk, self._ids(descendants(self.sales)))
+
+        self.tech.parent = None
+        self.tech.save()
+        self.assertEqual(self._ids(ancestors(self.design)), [self.tech.pk])
+        self.assertNotIn(self.design.pk, self._ids(descendants(self.root)))
+
+    def test_cycle_is_rejected(self):
+        self.tech.parent = self.design
+        with self.assertRaises(ValidationError):
+            self.tech.full_clean()
+        with self.assertRaises(ValidationError):
+            self.tech.save()
+
+    def test_rebuild_matches_incremental(self):
+        self.tech.parent = self.sales
+        self.tech.save()
+        expected = set(DepartmentClosure.objects.values_list("ancestor_id", "descendant_id", "depth"))
+        self.assertEqual(rebuild_department_closure(), len(expected))
+        self.assertEqual(set(DepartmentClosure.objects.values_list("ancestor_id", "descendant_id", "depth")), expected)
+
+    def test_project_visibility_covers_sub_departments(self):
+        User = get_user_model()
+        head = User.objects.create_user(username="tech_head", password="pass1234", department=self.tech)
+        designer = User.objects.create_user(username="designer", password="pass1234", department=self.design)
+        seller = User.objects.create_user(username="seller", password="pass1234", department=self.sales)
+        sub_project = Project.objects.create(name="设计部项目", project_number="VIH-CL-001", project_manager=designer, created_by=designer)
+        Project.objects.create(name="市场部项目", project_number="VIH-CL-002", project_manager=seller, created_by=seller)
+
+        visible = _filter_projects_for_user(Project.objects.all(), head, {"task_collaboration.view_all"})
+        self.assertEqual(list(visible.values_list("pk", flat=True)), [sub_project.pk])
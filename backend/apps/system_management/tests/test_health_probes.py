@@ -0,0 +1,58 @@
+import tempfile
+from unittest import mock
+
+from django.test import Client as HttpClient, TestCase, override_settings
+from django.urls import reverse
+
+from backend.core import health
+
+
+class HealthProbeTests(TestCase):
+    def setUp(self):
+        health.reset()
+        self.addCleanup(health.reset)
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        overrides = override_settings(MEDIA_ROOT=media_root.name, HEALTH_CHECK_CACHE_SECONDS=60)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.http = HttpClient()
+
+    def test_liveness_reports_current_time_without_dependencies(self):
+        with self.assertNumQueries(0):
+            response = self.http.get(reverse("health-live"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()["timestamp"], "2025-11-06T14:01:28Z")
+
+    def test_readiness_warms_up_then_runs_all_checks(self):
+        response = self.http.get(reverse("health-ready"))
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertTrue(payload["ready"])
+        self.assertTrue(payload["warmed_up"])
+        self.assertEqual(set(payload["checks"]), {"database", "cache", "storage", "migrations"})
+        self.assertTrue(all(check["status"] != "fail" for check in payload["checks"].values()))
+        self.assertIn("latency_ms", payload["checks"]["database"])
+
+    def test_readiness_results_are_cached(self):
+        health.readiness()
+        with mock.patch.dict(health.READINESS_CHECKS, {"database": mock.Mock(side_effect=RuntimeError("down"))}):
+            self.assertTrue(self.http.get(reverse("health-ready")).json()["ready"])
+            health.reset()
+            with self.assertLogs("backend.core.health", "WARNING"):
+                response = self.http.get(reverse("health-ready"))
+        self.assertEqual(response.status_code, 503)
+        # 公开响应不含异常信息
+        self.assertEqual(set(response.json()["checks"]["database"]), {"status", "latency_ms"})
+        with override_settings(HEALTH_CHECK_TOKEN="probe-secret"):
+            detailed = self.http.get(reverse("health-ready"), HTTP_AUTHORIZATION="Bearer probe-secret")
+        self.assertEqual(detailed.json()["checks"]["database"]["detail"], "RuntimeError: down")
+
+    def test_warmup_endpoint_is_idempotent(self):
+        first = self.http.get(reverse("health-warmup"))
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(set(first.json()["steps"]), {"modules", "urls", "templates", "database", "caches"})
+        with self.assertNumQueries(0):
+            second = self.http.get(reverse("health-warmup"))
+        self.assertEqual(second.json(), first.json())
+        self.assertNotIn("detail", first.json()["steps"]["modules"])
@@ -0,0 +1,100 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client as HttpClient, TestCase, override_settings
+from django.urls import reverse
+
+from backend.core import metrics
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset_metrics()
+        self.admin = get_user_model().objects.create_superuser(
+            username="metrics_admin", password="pass1234", email="m@example.com"
+        )
+
+    def test_requests_are_aggregated_per_view(self):
+        http = HttpClient()
+        http.force_login(self.admin)
+        http.get(reverse("health-check"))
+        http.get(reverse("health-check"))
+        http.get(reverse("system_pages:operation_logs"))
+
+        collected = metrics.collect_view_metrics()
+        health = collected["health-check"]
+        self.assertEqual(health["requests"], 2)
+        self.assertEqual(sum(health[bucket] for bucket in metrics.BUCKET_FIELDS), 2)
+        self.assertGreater(health["response_bytes"], 0)
+        # 会话与用户加载会产生查询
+        self.assertGreater(collected["system_pages:operation_logs"]["db_queries"], 0)
+
+    def test_cache_lookups_are_counted(self):
+        metrics.instrument_cache_backends()
+        stats = metrics.RequestStats()
+        token = metrics.activate(stats)
+        try:
+            cache.set("metrics-test", 1)
+            cache.get("metrics-test")
+            cache.get("metrics-missing")
+            cache.get_many(["metrics-test", "metrics-missing"])
+        finally:
+            metrics.deactivate(token)
+        self.assertEqual((stats.cache_hits, stats.cache_misses), (2, 2))
+
+    @override_settings(REQUEST_METRICS_SLOW_MS=0)
+    def test_slow_requests_log_top_queries(self):
+        http = HttpClient()
+        http.force_login(self.admin)
+        with self.assertLogs("backend.performance", level="WARNING") as logs:
+            http.get(reverse("system_pages:operation_logs"))
+        self.assertIn("view=system_pages:operation_logs", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+        self.assertEqual(metrics.collect_view_metrics()["system_pages:operation_logs"]["slow"], 1)
+
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        http = HttpClient()
+        http.get(reverse("health-check"))
+        # 反向代理转发的本机请求不再默认放行
+        self.assertEqual(http.get(reverse("metrics")).status_code, 403)
+        http.force_login(self.admin)
+        response = http.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="health-check"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="health-check",le="+Inf"} 1', body)
+
+    @override_settings(METRICS_ALLOWED_IPS=[], METRICS_TOKEN="secret")
+    def test_metrics_endpoint_requires_token(self):
+        http = HttpClient()
+        self.assertEqual(http.get(reverse("metrics")).status_code, 403)
+        response = http.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_ALLOWED_IPS=["10.0.0.5"], TRUSTED_PROXY_IPS=["127.0.0.1"])
+    def test_allow_list_checks_forwarded_client_address(self):
+        http = HttpClient()
+        url = reverse("metrics")
+        self.assertEqual(http.get(url, HTTP_X_FORWARDED_FOR="10.0.0.5").status_code, 200)
+        self.assertEqual(http.get(url, HTTP_X_FORWARDED_FOR="10.0.0.5, 203.0.113.9").status_code, 403)
+        self.assertEqual(http.get(url).status_code, 403)
+        self.assertEqual(http.get(url, REMOTE_ADDR="10.0.0.5").status_code, 200)
+
+    def test_flush_sends_all_counters_in_one_pipeline(self):
+        pipeline = mock.MagicMock()
+        fake_cache = mock.MagicMock()
+        fake_cache.client.get_client.return_value.pipeline.return_value = pipeline
+        fake_cache.client.make_key.side_effect = lambda key: key
+        fake_cache.get.return_value = []
+        registry = metrics.MetricsRegistry()
+        registry.observe("a", 0.01, metrics.RequestStats(db_queries=2), 10, 200, False)
+        registry.observe("b", 0.2, metrics.RequestStats(), 5, 500, False)
+        with mock.patch.object(metrics, "metrics_cache", return_value=fake_cache):
+            registry.flush()
+        pipeline.execute.assert_called_once()
+        increments = {call.args[0]: call.args[1] for call in pipeline.incrby.call_args_list}
+        self.assertEqual(increments[metrics._field_key("a", "db_queries")], 2)
+        self.assertEqual(increments[metrics._field_key("b", "errors")], 1)
+        fake_cache.incr.assert_not_called()
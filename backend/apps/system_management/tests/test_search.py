@@ -0,0 +1,130 @@
+from datetime import date
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db.models.expressions import RawSQL
+from django.test import Client as HttpClient, TestCase
+from django.urls import reverse
+
+from backend.apps.customer_success.models import BusinessOpportunity, Client
+from backend.apps.personnel_management.models import Employee
+from backend.apps.project_center.models import Project
+from backend.apps.system_management.models import Department, SearchDocument
+from backend.apps.system_management.services_search import search_documents, search_filter
+
+
+class GlobalSearchTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_superuser(username="search_admin", password="pass1234", email="a@example.com")
+        self.manager = User.objects.create_user(username="search_manager", password="pass1234")
+        self.other = User.objects.create_user(username="search_other", password="pass1234")
+
+        self.client_obj = Client.objects.create(name="华东建设集团", code="CLI-001", created_by=self.admin)
+        self.own_opportunity = BusinessOpportunity.objects.create(
+            name="滨江综合体优化",
+            project_name="滨江一期",
+            client=self.client_obj,
+            business_manager=self.manager,
+            created_by=self.admin,
+            health_score=60,
+        )
+        self.foreign_opportunity = BusinessOpportunity.objects.create(
+            name="滨江写字楼优化",
+            client=self.client_obj,
+            business_manager=self.other,
+            created_by=self.admin,
+            health_score=60,
+        )
+        self.project = Project.objects.create(
+            name="滨江综合体结构优化",
+            project_number="VIH-2025-001",
+            client_company_name="华东建设集团",
+            project_manager=self.manager,
+            created_by=self.admin,
+        )
+
+    def test_documents_follow_entity_lifecycle(self):
+        doc = SearchDocument.objects.get(entity_type="opportunity", object_id=self.own_opportunity.id)
+        self.assertEqual(doc.subtitle, "华东建设集团")
+        self.assertEqual(doc.owner_id, self.manager.id)
+        linked_project = Project.objects.create(
+            name="滨江二期", project_number="VIH-2025-002", client=self.client_obj, created_by=self.admin,
+        )
+
+        self.client_obj.name = "华东城建集团"
+        self.client_obj.save()
+        doc.refresh_from_db()
+        self.assertEqual(doc.subtitle, "华东城建集团")
+        # 未填写客户单位名称的项目使用关联客户名称
+        project_doc = SearchDocument.objects.get(entity_type="project", object_id=linked_project.id)
+        self.assertEqual(project_doc.subtitle, "华东城建集团")
+
+        project_id = self.project.id
+        self.project.delete()
+        self.assertFalse(SearchDocument.objects.filter(entity_type="project", object_id=project_id).exists())
+
+    def test_dependents_refresh_only_when_referenced_fields_change(self):
+        doc = SearchDocument.objects.get(entity_type="opportunity", object_id=self.own_opportunity.id)
+        stamp = doc.updated_time
+        self.client_obj.phone = "021-12345678"
+        self.client_obj.save()
+        doc.refresh_from_db()
+        self.assertEqual(doc.updated_time, stamp)
+
+        department = Department.objects.create(name="Structure", code="DEP-SEARCH")
+        employee = Employee.objects.create(
+            employee_number="E-SEARCH-1", name="Zhang", gender="male", id_number="110101199001010011",
+            phone="13800000000", position="Engineer", entry_date=date(2024, 1, 1), department=department,
+        )
+        department.name = "Structure Design"
+        department.save(update_fields=["name"])
+        employee_doc = SearchDocument.objects.get(entity_type="employee", object_id=employee.id)
+        self.assertTrue(employee_doc.subtitle.startswith("Structure Design"))
+
+    def test_index_failure_does_not_break_outer_transaction(self):
+        failing = RawSQL("to_tsvector('simple', (1 / 0)::text)", [])
+        with mock.patch("backend.apps.system_management.services_search._search_vector", return_value=failing), \
+                self.assertLogs("backend.apps.system_management.services_search", "ERROR"):
+            self.client_obj.short_name = "HD"
+            self.client_obj.save()
+        # 保存点已回滚，外层事务仍可继续查询
+        self.assertEqual(Client.objects.get(pk=self.client_obj.pk).short_name, "HD")
+
+    def test_migration_backfills_existing_rows(self):
+        SearchDocument.objects.all().delete()
+        migration = import_module("backend.apps.system_management.migrations.0010_backfill_search_documents")
+        migration.backfill_search_documents(apps, None)
+        self.assertEqual(list(search_filter(Project.objects.all(), "project", "VIH-2025", fields=("code",))),
+                         [self.project])
+        self.assertEqual(SearchDocument.objects.filter(entity_type="opportunity").count(), 2)
+        self.assertFalse(SearchDocument.objects.filter(search_vector__isnull=True).exists())
+
+    def test_search_filter_matches_selected_fields(self):
+        projects = Project.objects.all()
+        self.assertEqual(list(search_filter(projects, "project", "2025-001", fields=("code",))), [self.project])
+        self.assertFalse(search_filter(projects, "project", "2025-001", fields=("title",)).exists())
+        self.assertEqual(list(search_filter(projects, "project", "城建", fields=("subtitle",))), [])
+        self.assertEqual(search_filter(projects, "project", "  ").count(), 1)
+
+    def test_search_results_respect_permissions(self):
+        admin_types = {item["entity_type"] for item in search_documents(self.admin, "滨江")}
+        self.assertEqual(admin_types, {"project", "opportunity"})
+
+        manager_results = search_documents(self.manager, "滨江")
+        opportunity_ids = [item["object_id"] for item in manager_results if item["entity_type"] == "opportunity"]
+        self.assertEqual(opportunity_ids, [self.own_opportunity.id])
+        # 未授予项目查看权限时不返回项目
+        self.assertNotIn("project", {item["entity_type"] for item in manager_results})
+
+    def test_search_api(self):
+        http = HttpClient()
+        http.force_login(self.admin)
+        response = http.get(reverse("system:search-list"), {"q": "VIH-2025", "types": "project"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["results"][0]["object_id"], self.project.id)
+        self.assertTrue(data["results"][0]["url"].endswith(f"/{self.project.id}/detail/"))
@@ -10,6 +10,7 @@ router.register('departments', views.DepartmentViewSet, basename='department')
 router.register('roles', views.RoleViewSet, basename='role')
 router.register('dictionaries', views.DataDictionaryViewSet, basename='dictionary')
 router.register('configs', views.SystemConfigViewSet, basename='config')
+router.register('search', views.GlobalSearchViewSet, basename='search')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -15,6 +15,7 @@ from .serializers import (
     AccountNotificationSerializer,
     AccountPasswordChangeSerializer,
 )
+from .services_search import search_documents
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
@@ -160,3 +161,23 @@ class SystemConfigViewSet(viewsets.ModelViewSet):
                 {'error': f'配置项 {key} 不存在'},
                 status=status.HTTP_404_NOT_FOUND
             )
+
+
+class GlobalSearchViewSet(viewsets.ViewSet):
+    """全局检索：项目、生产意见、客户、商机、员工与风险案例"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        keyword = (request.query_params.get('q') or request.query_params.get('search') or '').strip()
+        types_param = request.query_params.get('types') or ''
+        entity_types = [item.strip() for item in types_param.split(',') if item.strip()]
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except (TypeError, ValueError):
+            limit = 20
+        results = search_documents(request.user, keyword, entity_types=entity_types or None, limit=limit)
+        return Response({
+            'query': keyword,
+            'count': len(results),
+            'results': results,
+        })
@@ -1,5 +1,6 @@
 from django.contrib import messages
 from django.contrib.auth import logout
+from django.conf import settings
 from django.contrib.auth.decorators import login_required, permission_required
 from django.shortcuts import render, redirect
 from django.urls import reverse
@@ -14,6 +15,8 @@ from backend.apps.system_management.serializers import (
     AccountPasswordChangeSerializer,
 )
 from backend.apps.system_management.services import get_user_permission_codes
+from backend.core import metrics as request_metrics
+from backend.core.dashboard_cache import cached_summary
 from backend.apps.system_management.forms import POSITION_CHOICES
 
 
@@ -176,6 +179,35 @@ def system_settings(request):
     return render(request, "shared/center_dashboard.html", context)
 
 
+def _operation_logs_summary():
+    """操作日志页的请求指标卡片与接口耗时排行（可缓存的纯数据）"""
+    view_metrics = request_metrics.collect_view_metrics()
+    totals = {
+        field: sum(data[field] for data in view_metrics.values())
+        for field in ("requests", "errors", "slow")
+    }
+    summary_cards = [
+        {"label": "累计请求", "value": totals["requests"], "hint": "指标重置以来处理的请求数"},
+        {"label": "异常告警", "value": totals["errors"], "hint": "返回 5xx 的请求数量"},
+        {"label": "慢请求", "value": totals["slow"], "hint": "超过慢请求阈值的请求数量"},
+        {"label": "活跃用户", "value": User.objects.filter(is_active=True).count(), "hint": "近期登录的活跃账号"},
+    ]
+    slow_view_items = [
+        {
+            "label": row["view"],
+            "description": (
+                f"平均 {row['avg_ms']:.0f}ms · 查询 {row['avg_queries']:.1f} 次/{row['avg_db_ms']:.0f}ms · "
+                f"响应 {row['avg_bytes'] / 1024:.1f}KB · 缓存命中率 "
+                + (f"{row['cache_hit_rate']:.0%}" if row["cache_hit_rate"] is not None else "—")
+                + f" · 请求 {row['requests']} 次"
+            ),
+            "icon": "⏱",
+        }
+        for row in request_metrics.view_summaries(view_metrics)
+    ]
+    return {"summary_cards": summary_cards, "slow_view_items": slow_view_items}
+
+
 @login_required
 def operation_logs(request):
     # 仅系统管理员可以访问操作日志
@@ -183,12 +215,14 @@ def operation_logs(request):
     if not is_system_admin:
         from django.core.exceptions import PermissionDenied
         raise PermissionDenied("仅系统管理员可以访问操作日志。")
-    summary_cards = [
-        {"label": "今日日志", "value": 0, "hint": "今日新增的操作日志条目"},
-        {"label": "异常告警", "value": 0, "hint": "捕获的异常告警数量"},
-        {"label": "活跃用户", "value": User.objects.filter(is_active=True).count(), "hint": "近期登录的活跃账号"},
-        {"label": "审计状态", "value": "正常", "hint": "系统审计功能运行状态"},
-    ]
+    # 请求指标本身按 REQUEST_METRICS_FLUSH_INTERVAL 合并，缓存时间与之对齐
+    summary = cached_summary(
+        "operation_logs",
+        ("system_management.User",),
+        _operation_logs_summary,
+        timeout=settings.REQUEST_METRICS_FLUSH_INTERVAL,
+    )
+    summary_cards, slow_view_items = summary["summary_cards"], summary["slow_view_items"]
     context = _context(
         "操作日志",
         "🧾",
@@ -203,7 +237,14 @@ def operation_logs(request):
                     {"label": "系统运行", "description": "监控系统服务运行情况。", "url": "#", "icon": "🖥"},
                     {"label": "异常告警", "description": "处理系统异常与安全告警。", "url": "#", "icon": "🚨"},
                 ],
-            }
+            },
+            {
+                "title": "接口耗时排行",
+                "description": "按平均耗时排序的视图，数据汇总自全部工作进程。",
+                "items": slow_view_items or [
+                    {"label": "暂无数据", "description": "尚未采集到请求指标。", "icon": "ℹ️"},
+                ],
+            },
         ],
     )
     return render(request, "shared/center_dashboard.html", context)
@@ -1,4 +1,4 @@
-from datetime import timedelta
+from datetime import date, timedelta
 
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
@@ -8,6 +8,10 @@ from django.urls import reverse
 from django.utils import timezone
 
 from backend.apps.project_center.models import Project, ProjectMilestone
+from backend.apps.project_center.services_detail import bump_project_version
+from backend.apps.project_center.services_timeline import bucket_due, load_milestone_columns
+from backend.core.dashboard_cache import cached_summary
+
 MILESTONE_PRESETS = {
     "result_optimization": [
         "优化前图纸",
@@ -35,18 +39,15 @@ MILESTONE_PRESETS = {
 }
 
 
-def _ensure_project_milestones(project: Project) -> None:
+def _missing_preset_milestones(project: Project, existing) -> list:
     service_type_code = getattr(project.service_type, "code", None)
     preset = MILESTONE_PRESETS.get(service_type_code)
     if not preset:
-        return
+        return []
 
-    existing = set(
-        ProjectMilestone.objects.filter(project=project).values_list("name", flat=True)
-    )
     missing = [name for name in preset if name not in existing]
     if not missing:
-        return
+        return []
 
     base_date = project.start_date or timezone.now().date()
     if project.start_date and project.end_date:
@@ -70,9 +71,7 @@ def _ensure_project_milestones(project: Project) -> None:
                 description=f"{project.project_number} 自动生成的里程碑：{name}",
             )
         )
-    if new_objects:
-        with transaction.atomic():
-            ProjectMilestone.objects.bulk_create(new_objects)
+    return new_objects
 
 
 def _build_context(page_title: str, page_icon: str, description: str, summary_cards=None, sections=None):
@@ -85,14 +84,11 @@ def _build_context(page_title: str, page_icon: str, description: str, summary_ca
     }
 
 
-@login_required
-def task_board(request):
-    user = request.user
+def _task_board_summary(user, project_id):
+    """任务看板的汇总卡片与分组列表（可缓存的纯数据）"""
     today = timezone.now().date()
 
-    project_id = request.GET.get("project")
-
-    project_queryset = Project.objects.select_related("project_manager").prefetch_related("team_members__user")
+    project_queryset = Project.objects.select_related("service_type")
     accessible_projects = project_queryset.filter(
         Q(project_manager=user)
         | Q(team_members__user=user)
@@ -104,45 +100,36 @@ def task_board(request):
         accessible_projects = accessible_projects.filter(id=int(project_id))
 
     accessible_projects = list(accessible_projects)
+    project_numbers = {project.id: project.project_number for project in accessible_projects}
 
+    # 一次读出全部项目的里程碑列，预设里程碑缺失的项目统一补齐后再重读
+    columns = load_milestone_columns(project_numbers)
+    new_objects = []
     for proj in accessible_projects:
-        _ensure_project_milestones(proj)
-
-    milestones = (
-        ProjectMilestone.objects.filter(project__in=accessible_projects)
-        .select_related("project")
-        .order_by("planned_date")
-    )
-
-    overdue_tasks = []
-    due_today_tasks = []
-    upcoming_tasks = []
-    completed_tasks = []
-
-    lookahead_date = today + timedelta(days=7)
-
-    for milestone in milestones:
-        if milestone.is_completed:
-            if milestone.actual_date and milestone.actual_date >= today - timedelta(days=7):
-                completed_tasks.append(milestone)
-            continue
-
-        if milestone.planned_date and milestone.planned_date < today:
-            overdue_tasks.append(milestone)
-        elif milestone.planned_date == today:
-            due_today_tasks.append(milestone)
-        elif milestone.planned_date and milestone.planned_date <= lookahead_date:
-            upcoming_tasks.append(milestone)
-        else:
-            upcoming_tasks.append(milestone)
-
-    def _build_task_card(milestone, icon, status_hint):
-        planned = milestone.planned_date.strftime("%Y-%m-%d") if milestone.planned_date else "待定"
-        completion = f"完成率 {milestone.completion_rate}%" if milestone.completion_rate else "尚未更新进度"
-        url = f"{reverse('project_pages:project_detail', args=[milestone.project_id])}?tab=progress&milestone={milestone.id}"
+        existing = {columns.name[index] for index in columns.rows(proj.id)}
+        new_objects.extend(_missing_preset_milestones(proj, existing))
+    if new_objects:
+        with transaction.atomic():
+            ProjectMilestone.objects.bulk_create(new_objects)
+        for changed_id in {milestone.project_id for milestone in new_objects}:
+            bump_project_version(changed_id)
+        columns = load_milestone_columns(project_numbers)
+
+    buckets = bucket_due(columns, today)
+    overdue_tasks = buckets["overdue"]
+    due_today_tasks = buckets["due_today"]
+    upcoming_tasks = buckets["upcoming"]
+    completed_tasks = buckets["recent_completed"]
+
+    def _build_task_card(index, icon, status_hint):
+        planned = date.fromordinal(columns.planned[index]).strftime("%Y-%m-%d")
+        rate = columns.completion_rate[index]
+        completion = f"完成率 {rate}%" if rate else "尚未更新进度"
+        milestone_project_id = columns.project_id[index]
+        url = f"{reverse('project_pages:project_detail', args=[milestone_project_id])}?tab=progress&milestone={columns.id[index]}"
         return {
             "icon": icon,
-            "label": f"{milestone.project.project_number} · {milestone.name}",
+            "label": f"{project_numbers[milestone_project_id]} · {columns.name[index]}",
             "description": f"{status_hint} · 计划 {planned} · {completion}",
             "url": url,
             "link_label": "查看任务 →",
@@ -159,11 +146,8 @@ def task_board(request):
     if overdue_tasks:
         overdue_items = []
         for task in overdue_tasks[:8]:
-            if task.planned_date:
-                days = (today - task.planned_date).days
-                status_message = f"已逾期 {days} 天" if days > 0 else "已逾期"
-            else:
-                status_message = "已逾期"
+            days = today.toordinal() - columns.planned[task]
+            status_message = f"已逾期 {days} 天" if days > 0 else "已逾期"
             overdue_items.append(_build_task_card(task, "⏰", status_message))
         sections.append({
             "title": "逾期任务",
@@ -184,11 +168,8 @@ def task_board(request):
     if upcoming_tasks:
         upcoming_items = []
         for task in upcoming_tasks[:8]:
-            if task.planned_date:
-                days = (task.planned_date - today).days
-                status_message = f"剩余 {days} 天" if days > 0 else "即将到期"
-            else:
-                status_message = "待安排计划"
+            days = columns.planned[task] - today.toordinal()
+            status_message = f"剩余 {days} 天" if days > 0 else "即将到期"
             upcoming_items.append(_build_task_card(task, "🗂", status_message))
         sections.append({
             "title": "即将到期",
@@ -201,7 +182,7 @@ def task_board(request):
             "title": "最近完成",
             "description": "最近 7 天完成的任务，注意做好经验沉淀与复盘。",
             "items": [
-                _build_task_card(task, "✅", f"完成于 {task.actual_date.strftime('%Y-%m-%d')}" if task.actual_date else "已完成")
+                _build_task_card(task, "✅", f"完成于 {date.fromordinal(columns.actual[task]).strftime('%Y-%m-%d')}")
                 for task in completed_tasks[:8]
             ],
         })
@@ -220,6 +201,19 @@ def task_board(request):
                 }
             ],
         })
+    return {"summary_cards": summary_cards, "sections": sections}
+
+
+@login_required
+def task_board(request):
+    summary = cached_summary(
+        "task_board",
+        ("project_center.Project", "project_center.ProjectMilestone", "project_center.ProjectTeam"),
+        lambda: _task_board_summary(request.user, request.GET.get("project")),
+        user=request.user,
+        params={"project": request.GET.get("project") or ""},
+    )
+    summary_cards, sections = summary["summary_cards"], summary["sections"]
 
     context = _build_context(
         "任务看板",
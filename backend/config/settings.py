@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 
 load_dotenv()
 
@@ -27,6 +28,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -36,7 +38,7 @@ INSTALLED_APPS = [
     # Local apps
     'backend.apps.permission_management.apps.PermissionManagementConfig',  # 必须在 system_management 之前
     'backend.apps.system_management.apps.SystemManagementConfig',
-    'backend.apps.project_center',
+    'backend.apps.project_center.apps.ProjectCenterConfig',
     'backend.apps.customer_success.apps.CustomerSuccessConfig',
     'backend.apps.resource_standard',
     'backend.apps.task_collaboration',
@@ -56,6 +58,10 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     # Static files serving optimization in production
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # 按视图采集请求耗时、查询与缓存指标
+    'backend.middleware.log_middleware.RequestMetricsMiddleware',
+    # 只读视图读取副本；需在会话中间件之外，才能感知会话保存等写入
+    'backend.middleware.db_middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -108,6 +114,21 @@ else:
         }
     }
 
+# 只读副本：配置 DATABASE_REPLICA_URL 后，看板、统计、导出等只读视图与命令读取 replica（见 backend/core/db_router.py）
+# 测试时 replica 镜像 default，不单独建库
+database_replica_url = os.getenv('DATABASE_REPLICA_URL', '').strip()
+if database_replica_url:
+    import dj_database_url
+    DATABASES['replica'] = dj_database_url.parse(
+        database_replica_url,
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['backend.core.db_router.PrimaryReplicaRouter']
+# 发生写入后，该浏览器在多少秒内固定读 default（应大于副本的复制延迟）
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '15'))
+
 EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', '')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25') or 25)
@@ -184,6 +205,11 @@ else:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# 受保护文件（图纸、项目文档、合同、交付文件）的传输方式：django / x-accel / sendfile
+# x-accel 需要 nginx 配置 internal location（见 deployment/config/nginx-media.conf），将 PROTECTED_MEDIA_ACCEL_PREFIX 映射到 MEDIA_ROOT
+PROTECTED_MEDIA_BACKEND = os.getenv('PROTECTED_MEDIA_BACKEND', 'django')
+PROTECTED_MEDIA_ACCEL_PREFIX = os.getenv('PROTECTED_MEDIA_ACCEL_PREFIX', '/protected-media/')
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -214,6 +240,11 @@ LOGGING = {
             'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
             'propagate': False,
         },
+        'backend.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -238,11 +269,50 @@ else:
         }
     }
 
+# Request metrics: per-view latency/query/cache counters, aggregated in the cache and served at /metrics
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'True') == 'True'
+REQUEST_METRICS_SLOW_MS = int(os.getenv('REQUEST_METRICS_SLOW_MS', '1000'))
+REQUEST_METRICS_FLUSH_INTERVAL = int(os.getenv('REQUEST_METRICS_FLUSH_INTERVAL', '10'))
+# /metrics requires METRICS_TOKEN (Bearer) or a superuser; METRICS_ALLOWED_IPS (empty by default) is matched against the
+# client address, which is read from X-Forwarded-For when the request comes from one of TRUSTED_PROXY_IPS
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()]
+TRUSTED_PROXY_IPS = [ip.strip() for ip in os.getenv('TRUSTED_PROXY_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+
+# Health probes: readiness results are cached in-process; checks slower than HEALTH_CHECK_SLOW_MS report "slow"
+HEALTH_CHECK_CACHE_SECONDS = int(os.getenv('HEALTH_CHECK_CACHE_SECONDS', '5'))
+HEALTH_CHECK_SLOW_MS = int(os.getenv('HEALTH_CHECK_SLOW_MS', '500'))
+# Failure details in probe responses are shown only for this Bearer token or a superuser; they are always logged
+HEALTH_CHECK_TOKEN = os.getenv('HEALTH_CHECK_TOKEN', '')
+
+# Center dashboard summary cache: entries are keyed by model data versions, the timeout bounds staleness after bulk updates
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '60'))
+
+# Notification SSE: each open stream holds one gthread worker thread; keep this well below gunicorn --threads.
+# Browsers over the limit get 503 and poll /project/notifications/poll/ until a slot frees up
+NOTIFICATION_STREAM_MAX_PER_PROCESS = int(os.getenv('NOTIFICATION_STREAM_MAX_PER_PROCESS', '4'))
+
+# Celery: tasks go through the Redis broker and are consumed by a separate worker process
+# (celery -A backend.config worker, see docker-compose.yml / deployment/kubernetes/backend-deployment.yaml).
+# Running tasks inline in the web request is a development/test opt-in: CELERY_TASK_ALWAYS_EAGER defaults to DEBUG
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', REDIS_URL or 'memory://')
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', str(DEBUG)) == 'True'
+if not CELERY_TASK_ALWAYS_EAGER and CELERY_BROKER_URL.startswith('memory://'):
+    # 内存 broker 只在当前进程内有效，任务永远不会被 worker 取走
+    raise ImproperlyConfigured('Set REDIS_URL or CELERY_BROKER_URL for the Celery worker, '
+                               'or CELERY_TASK_ALWAYS_EAGER=True to run tasks inline (development only)')
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TIMEZONE = TIME_ZONE
+
 # Security settings for production
 # Read from .env, but allow override for HTTP testing
 SESSION_COOKIE_SECURE = os.getenv('SESSION_COOKIE_SECURE', 'True' if not DEBUG else 'False') == 'True'
 CSRF_COOKIE_SECURE = os.getenv('CSRF_COOKIE_SECURE', 'True' if not DEBUG else 'False') == 'True'
 SECURE_SSL_REDIRECT = os.getenv('SECURE_SSL_REDIRECT', 'True' if not DEBUG else 'False') == 'True'
+# kubelet 探针直接以 HTTP 访问 Pod，不经过 HTTPS 入口
+SECURE_REDIRECT_EXEMPT = [r'^health/']
 SECURE_HSTS_SECONDS = int(os.getenv('SECURE_HSTS_SECONDS', '31536000'))
 if not DEBUG:
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
@@ -1,9 +1,10 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from backend.core.api_views import api_root, api_docs
-from backend.core.views import home, health_check, login_view, logout_view
+from backend.core.downloads import serve_public_media
+from backend.core.views import home, health_check, readiness_check, warmup_check, metrics_view, login_view, logout_view
 from backend.apps.system_management import views_registration as registration_views
 
 # 自定义 Django admin 站点配置
@@ -19,6 +20,10 @@ urlpatterns = [
     path('register/submitted/', registration_views.registration_submitted, name='registration_submitted'),
     path('profile/complete/', registration_views.complete_profile, name='complete_profile'),
     path('health/', health_check, name='health-check'),
+    path('health/live/', health_check, name='health-live'),
+    path('health/ready/', readiness_check, name='health-ready'),
+    path('health/warmup/', warmup_check, name='health-warmup'),
+    path('metrics', metrics_view, name='metrics'),
     path('admin/registrations/', registration_views.registration_list, name='admin_registration_list'),
     path('admin/registrations/<int:pk>/', registration_views.registration_detail, name='admin_registration_detail'),
     path('admin/', admin.site.urls),
@@ -30,6 +35,8 @@ urlpatterns = [
     path('api/project/', include(('backend.apps.project_center.urls', 'project'), namespace='project')),
     path('api/customer/', include(('backend.apps.customer_success.urls', 'customer'), namespace='customer')),
     path('api/delivery/', include(('backend.apps.delivery_customer.urls_api', 'delivery'), namespace='delivery_api')),
+    path('api/resource/', include(('backend.apps.resource_standard.urls_api', 'resource_standard'), namespace='resource_api')),
+    path('api/administrative/', include(('backend.apps.administrative_management.urls_api', 'administrative'), namespace='administrative_api')),
     
     # 页面路由
     path('project/', include(('backend.apps.project_center.urls', 'project'), namespace='project_pages')),
@@ -49,8 +56,11 @@ urlpatterns = [
 # 静态文件服务配置
 # 在 DEBUG 模式下，Django 开发服务器会自动提供静态文件
 # 在生产模式下，使用 Whitenoise 中间件提供静态文件
-# 注意：无论 DEBUG 状态如何，都添加静态文件路由以确保文件可访问
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# 媒体文件：后端前面没有反向代理，无论 DEBUG 状态如何都由 Django 提供公开目录；
+# 图纸、合同等受保护目录一律 404，须经各模块的下载视图
+urlpatterns += [
+    re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_public_media),
+]
 if settings.DEBUG:
     # 开发环境：Django 开发服务器提供静态文件
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
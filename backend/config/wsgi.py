@@ -4,3 +4,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.config.settings')
 
 application = get_wsgi_application()
+
+# 每个 worker 启动时先预热，首批请求不再承担模块导入、模板编译等冷启动开销
+if os.getenv('WARM_UP_ON_START', 'True') == 'True':
+    from backend.core.health import warm_up
+
+    warm_up()
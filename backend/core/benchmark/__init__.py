@@ -0,0 +1,15 @@
+from .query_audit import HOT_QUERIES, HotQuery, analyze_plan, run_query_audit
+from .runner import BENCHMARK_TARGETS, BenchmarkTarget, run_benchmarks
+from .synthetic import SyntheticScale, generate_dataset
+
+__all__ = [
+    "BENCHMARK_TARGETS",
+    "BenchmarkTarget",
+    "HOT_QUERIES",
+    "HotQuery",
+    "SyntheticScale",
+    "analyze_plan",
+    "generate_dataset",
+    "run_benchmarks",
+    "run_query_audit",
+]
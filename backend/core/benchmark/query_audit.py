@@ -0,0 +1,194 @@
+"""
+热点查询执行计划审计
+
+HOT_QUERIES 登记统计、质量提醒、审核看板与任务看板中最常执行的查询。
+逐条执行 EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)，在计划树中查找两类问题：
+
+- 顺序扫描：扫描行数（返回行 + 过滤掉的行）超过 min_rows 的 Seq Scan，通常说明缺少索引；
+- 行数估算偏差：预估行数与实际行数相差 misestimate_ratio 倍以上，通常说明统计信息过期或谓词相关性未被识别。
+
+只支持 PostgreSQL。
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count, QuerySet
+from django.utils import timezone
+
+from backend.apps.production_quality.models import OPINION_PENDING_STATUSES, Opinion
+from backend.apps.project_center.models import (
+    Project,
+    ProjectMilestone,
+    ProjectTask,
+    ProjectTeamNotification,
+)
+from backend.apps.project_center.views_pages import _tasks_visible_to_user_q
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    """热点查询：build 接收审计上下文（日期、样本用户与项目），返回待审计的 QuerySet。"""
+
+    name: str
+    description: str
+    build: Callable[[Dict], QuerySet]
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery(
+        "opinion_pending_overdue", "超期未处理意见（意见统计、质量提醒）",
+        lambda ctx: Opinion.objects.filter(
+            status__in=OPINION_PENDING_STATUSES, response_deadline__lt=ctx["today"],
+        ).values("id"),
+    ),
+    HotQuery(
+        "opinion_pending_unassigned", "未指派审核人的待处理意见",
+        lambda ctx: Opinion.objects.filter(
+            status__in=OPINION_PENDING_STATUSES, current_reviewer__isnull=True,
+        ).values("id", "project_id"),
+    ),
+    HotQuery(
+        "opinion_alert_dispatch", "质量提醒派发：待处理意见按提交时间倒序",
+        lambda ctx: Opinion.objects.filter(status__in=OPINION_PENDING_STATUSES).order_by("-submitted_at")[:200],
+    ),
+    HotQuery(
+        "opinion_reviewer_queue", "审核看板：当前审核人的待处理意见",
+        lambda ctx: Opinion.objects.filter(
+            current_reviewer_id=ctx["user_id"], status__in=OPINION_PENDING_STATUSES,
+        ).order_by("-created_at")[:50],
+    ),
+    HotQuery(
+        "opinion_recent_approved", "近 30 天通过的意见（节省金额统计）",
+        lambda ctx: Opinion.objects.filter(
+            status=Opinion.OpinionStatus.APPROVED, reviewed_at__gte=ctx["now"] - timedelta(days=30),
+        ).values("saving_amount"),
+    ),
+    HotQuery(
+        "opinion_project_status_counts", "单个项目的意见状态分布",
+        lambda ctx: Opinion.objects.filter(project_id=ctx["project_id"])
+        .order_by().values("status").annotate(count=Count("id")),
+    ),
+    HotQuery(
+        "milestone_overdue", "逾期未完成里程碑（任务看板）",
+        lambda ctx: ProjectMilestone.objects.filter(is_completed=False, planned_date__lt=ctx["today"]).values("id"),
+    ),
+    HotQuery(
+        "milestone_due_this_week", "未来 7 天到期的里程碑",
+        lambda ctx: ProjectMilestone.objects.filter(
+            is_completed=False, planned_date__range=(ctx["today"], ctx["today"] + timedelta(days=7)),
+        ).values("id", "project_id"),
+    ),
+    HotQuery(
+        "task_active_by_role", "按指派角色查找项目的进行中任务",
+        lambda ctx: ProjectTask.objects.filter(
+            project_id=ctx["project_id"], assigned_role="project_manager", status__in=ProjectTask.ACTIVE_STATUSES,
+        ),
+    ),
+    HotQuery(
+        "task_home_visible", "首页与任务面板：当前用户可处理的进行中任务",
+        lambda ctx: ProjectTask.objects.filter(status__in=ProjectTask.ACTIVE_STATUSES)
+        .filter(_tasks_visible_to_user_q(ctx["user_id"])).order_by("due_time", "created_time"),
+    ),
+    HotQuery(
+        "notification_unread_page", "未读团队通知首页",
+        lambda ctx: ProjectTeamNotification.objects.filter(
+            recipient_id=ctx["user_id"], is_read=False,
+        ).order_by("-id")[:20],
+    ),
+]
+
+
+def audit_context() -> Dict:
+    """样本参数：取最近的项目与意见审核人，使按用户、按项目的查询有真实的选择度"""
+    now = timezone.now()
+    user_id = (
+        Opinion.objects.filter(current_reviewer__isnull=False).values_list("current_reviewer_id", flat=True).first()
+        or get_user_model().objects.values_list("id", flat=True).first()
+        or 0
+    )
+    project_id = Project.objects.order_by("-id").values_list("id", flat=True).first() or 0
+    return {"now": now, "today": timezone.localdate(now), "user_id": user_id, "project_id": project_id}
+
+
+def _walk(node: Dict) -> Iterable[Dict]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _walk(child)
+
+
+def analyze_plan(plan: Dict, min_rows: int = 1000, misestimate_ratio: float = 10.0) -> List[Dict]:
+    """在 EXPLAIN ANALYZE 的 JSON 计划树中查找顺序扫描与行数估算偏差"""
+    findings = []
+    for node in _walk(plan):
+        loops = node.get("Actual Loops", 1) or 1
+        actual = node.get("Actual Rows", 0)
+        estimated = node.get("Plan Rows", 0)
+        relation = node.get("Relation Name", "")
+        if node.get("Node Type") == "Seq Scan":
+            scanned = (actual + node.get("Rows Removed by Filter", 0)) * loops
+            if scanned >= min_rows:
+                findings.append({
+                    "kind": "seq_scan",
+                    "relation": relation,
+                    "rows_scanned": scanned,
+                    "filter": node.get("Filter", ""),
+                })
+        # 实际行数为每次循环的平均值，与预估行数口径一致
+        high, low = max(actual, estimated), max(min(actual, estimated), 1)
+        if loops and high >= 100 and high / low >= misestimate_ratio:
+            findings.append({
+                "kind": "misestimate",
+                "node": node.get("Node Type"),
+                "relation": relation,
+                "estimated_rows": estimated,
+                "actual_rows": actual,
+            })
+    return findings
+
+
+def explain_query(queryset: QuerySet) -> Dict:
+    """执行 EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) 并返回顶层计划"""
+    return json.loads(queryset.explain(format="json", analyze=True, buffers=True))[0]
+
+
+def run_query_audit(
+    names: Optional[Iterable[str]] = None,
+    min_rows: int = 1000,
+    misestimate_ratio: float = 10.0,
+    context: Optional[Dict] = None,
+) -> Dict:
+    """逐条审计热点查询，返回报告；passed 为 False 表示存在需要关注的计划"""
+    if connection.vendor != "postgresql":
+        raise RuntimeError("查询审计依赖 PostgreSQL 的 EXPLAIN (ANALYZE, BUFFERS)")
+    selected = set(names or ())
+    context = context or audit_context()
+    results = []
+    for query in HOT_QUERIES:
+        if selected and query.name not in selected:
+            continue
+        explained = explain_query(query.build(context))
+        plan = explained["Plan"]
+        findings = analyze_plan(plan, min_rows=min_rows, misestimate_ratio=misestimate_ratio)
+        results.append({
+            "name": query.name,
+            "description": query.description,
+            "execution_ms": round(explained.get("Execution Time", 0.0), 3),
+            "planning_ms": round(explained.get("Planning Time", 0.0), 3),
+            "root_node": plan.get("Node Type"),
+            "shared_hit_blocks": plan.get("Shared Hit Blocks", 0),
+            "shared_read_blocks": plan.get("Shared Read Blocks", 0),
+            "findings": findings,
+            "passed": not findings,
+        })
+    return {
+        "generated_at": timezone.now().isoformat(),
+        "thresholds": {"min_rows": min_rows, "misestimate_ratio": misestimate_ratio},
+        "results": results,
+        "passed": all(result["passed"] for result in results),
+    }
@@ -0,0 +1,101 @@
+"""
+关键页面与接口的性能基准
+
+逐个请求目标页面，记录耗时分位数、SQL 数量与响应大小，并与查询预算比对，
+结果汇总为 JSON 报告，便于部署前在 CI 中发现性能回退。
+"""
+from __future__ import annotations
+
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+
+@dataclass(frozen=True)
+class BenchmarkTarget:
+    """基准目标：query_budget 为单次请求允许的最大 SQL 数量，与数据规模无关。"""
+
+    name: str
+    url_name: str
+    query_budget: int
+    params: Dict[str, str] = field(default_factory=dict)
+
+
+BENCHMARK_TARGETS: List[BenchmarkTarget] = [
+    BenchmarkTarget("home", "home", 36),
+    BenchmarkTarget("project_list", "project_pages:project_list", 10),
+    BenchmarkTarget("project_monitor", "project_pages:project_monitor", 12),
+    BenchmarkTarget("production_stats", "production_quality_pages:production_stats", 8),
+    BenchmarkTarget("opinion_review_dashboard", "production_quality_pages:opinion_review", 8),
+    BenchmarkTarget("task_board", "collaboration_pages:task_board", 6),
+    BenchmarkTarget("portfolio_gantt", "project_pages:project_portfolio_gantt", 10),
+    BenchmarkTarget("dashboard-charts", "project:project-dashboard-charts", 10),
+]
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure_target(client: Client, target: BenchmarkTarget, repeat: int = 3) -> Dict:
+    """先预热一次，再重复请求取耗时分布；查询数取各次最大值。"""
+    url = reverse(target.url_name)
+    client.get(url, target.params)
+
+    durations, query_counts = [], []
+    status_code, response_bytes, slowest_queries = None, 0, []
+    for _ in range(max(1, repeat)):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(url, target.params)
+            durations.append((time.perf_counter() - started) * 1000)
+        query_counts.append(len(captured.captured_queries))
+        status_code = response.status_code
+        response_bytes = len(response.content) if not response.streaming else 0
+        slowest_queries = sorted(captured.captured_queries, key=lambda q: float(q["time"]), reverse=True)[:3]
+
+    queries = max(query_counts)
+    problems = []
+    if status_code != 200:
+        problems.append(f"HTTP {status_code}")
+    if queries > target.query_budget:
+        problems.append(f"查询数 {queries} 超出预算 {target.query_budget}")
+    return {
+        "name": target.name,
+        "url": url,
+        "status_code": status_code,
+        "queries": queries,
+        "query_budget": target.query_budget,
+        "median_ms": round(statistics.median(durations), 2),
+        "p95_ms": round(_percentile(durations, 95), 2),
+        "max_ms": round(max(durations), 2),
+        "response_bytes": response_bytes,
+        "slowest_queries": [{"time": q["time"], "sql": q["sql"][:300]} for q in slowest_queries],
+        "passed": not problems,
+        "problems": problems,
+    }
+
+
+def run_benchmarks(user, targets: Optional[Iterable[BenchmarkTarget]] = None, repeat: int = 3,
+                   context: Optional[Dict] = None) -> Dict:
+    """以指定用户身份执行全部基准，返回可直接序列化为 JSON 的报告。"""
+    client = Client()
+    client.force_login(user)
+    results = [measure_target(client, target, repeat=repeat) for target in (targets or BENCHMARK_TARGETS)]
+    return {
+        "generated_at": timezone.now().isoformat(),
+        "user": user.get_username(),
+        "repeat": repeat,
+        **(context or {}),
+        "results": results,
+        "passed": all(result["passed"] for result in results),
+    }
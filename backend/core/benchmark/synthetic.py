@@ -0,0 +1,240 @@
+"""
+规模化合成数据生成器
+
+按参数批量写入项目、团队、里程碑、任务、意见、通知、交付与产值记录，
+全部使用 bulk_create，便于在接近生产规模的数据量下测量页面与接口性能。
+"""
+from __future__ import annotations
+
+import random
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from backend.apps.delivery_customer.models import DeliveryRecord
+from backend.apps.production_quality.models import Opinion
+from backend.apps.project_center.models import (
+    Project,
+    ProjectMilestone,
+    ProjectTask,
+    ProjectTeam,
+    ProjectTeamNotification,
+    ServiceType,
+)
+from backend.apps.resource_standard.models import ProfessionalCategory
+from backend.apps.settlement_center.models import (
+    OutputValueEvent,
+    OutputValueMilestone,
+    OutputValueRecord,
+    OutputValueStage,
+)
+
+BATCH_SIZE = 1000
+# 合成数据统一前缀，便于识别与清理
+PREFIX = "BENCH"
+
+TEAM_ROLES = ("project_manager", "business_manager", "professional_leader", "engineer")
+MILESTONE_NAMES = ("资料接收", "预审完成", "意见编制", "内部审核", "成果交付")
+PROJECT_STATUSES = ("in_progress", "in_progress", "waiting_start", "configuring", "completed", "suspended")
+
+
+@dataclass(frozen=True)
+class SyntheticScale:
+    """数据规模参数：除 projects/users 外均为每个项目的数量。"""
+
+    projects: int = 200
+    users: int = 50
+    team_members: int = 4
+    milestones: int = 5
+    tasks: int = 6
+    opinions: int = 20
+    notifications: int = 10
+    deliveries: int = 2
+    output_records: int = 3
+
+    @classmethod
+    def small(cls) -> "SyntheticScale":
+        return cls(projects=20, users=10, opinions=5, notifications=3)
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def _bulk(model, objects: List) -> List:
+    return model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+def _ensure_reference_data():
+    service_type, _ = ServiceType.objects.get_or_create(code=f"{PREFIX.lower()}_st", defaults={"name": "性能测试服务"})
+    categories = [
+        ProfessionalCategory.objects.get_or_create(code=f"{PREFIX}-{code}", defaults={"name": name})[0]
+        for code, name in (("STR", "结构"), ("ARC", "建筑"), ("MEP", "机电"))
+    ]
+    stage, _ = OutputValueStage.objects.get_or_create(
+        code=f"{PREFIX}-PROD",
+        defaults={
+            "name": "生产阶段",
+            "stage_type": "production",
+            "stage_percentage": Decimal("40"),
+            "base_amount_type": "contract_amount",
+        },
+    )
+    milestone, _ = OutputValueMilestone.objects.get_or_create(
+        stage=stage, code=f"{PREFIX}-M1", defaults={"name": "意见编制", "milestone_percentage": Decimal("50")}
+    )
+    event, _ = OutputValueEvent.objects.get_or_create(
+        milestone=milestone,
+        code=f"{PREFIX}-E1",
+        defaults={"name": "意见提交", "event_percentage": Decimal("100"), "responsible_role_code": "engineer"},
+    )
+    return service_type, categories, (stage, milestone, event)
+
+
+@transaction.atomic
+def generate_dataset(scale: SyntheticScale, seed: int = 20240101) -> Dict[str, int]:
+    """生成一批合成数据，返回各类记录的写入数量。"""
+    rng = random.Random(seed)
+    now = timezone.now()
+    today = now.date()
+    run_tag = f"{PREFIX}{uuid.uuid4().hex[:6].upper()}"
+    service_type, categories, (stage, milestone, event) = _ensure_reference_data()
+
+    User = get_user_model()
+    password = make_password(None)
+    users = _bulk(User, [
+        User(username=f"{run_tag.lower()}_u{i}", password=password, first_name=f"工程师{i}", email="")
+        for i in range(max(scale.users, scale.team_members, 1))
+    ])
+
+    projects = _bulk(Project, [
+        Project(
+            project_number=f"{run_tag}-{i:06d}",
+            name=f"性能测试项目{i}",
+            status=rng.choice(PROJECT_STATUSES),
+            service_type=service_type,
+            client_company_name=f"测试客户{i % 37}",
+            project_manager=users[i % len(users)],
+            business_manager=users[(i + 1) % len(users)],
+            created_by=users[(i + 2) % len(users)],
+            start_date=today - timedelta(days=rng.randint(10, 300)),
+            end_date=today + timedelta(days=rng.randint(10, 300)),
+            contract_amount=Decimal(rng.randint(10, 500) * 1000),
+        )
+        for i in range(scale.projects)
+    ])
+
+    team, milestones, tasks, opinions, notifications, deliveries, records = [], [], [], [], [], [], []
+    opinion_seq = 0
+    for index, project in enumerate(projects):
+        for offset in range(scale.team_members):
+            role = TEAM_ROLES[offset % len(TEAM_ROLES)]
+            team.append(ProjectTeam(
+                project=project,
+                user=users[(index + offset) % len(users)],
+                role=role,
+                unit=ProjectTeam.ROLE_UNIT_MAP[role],
+            ))
+        for offset in range(scale.milestones):
+            done = offset < scale.milestones // 2
+            milestones.append(ProjectMilestone(
+                project=project,
+                name=MILESTONE_NAMES[offset % len(MILESTONE_NAMES)],
+                planned_date=project.start_date + timedelta(days=30 * (offset + 1)),
+                actual_date=project.start_date + timedelta(days=30 * (offset + 1)) if done else None,
+                is_completed=done,
+                completion_rate=100 if done else rng.randint(0, 90),
+            ))
+        for offset in range(scale.tasks):
+            tasks.append(ProjectTask(
+                project=project,
+                title=f"任务{offset}",
+                task_type=ProjectTask.TASK_TYPE_CHOICES[offset % len(ProjectTask.TASK_TYPE_CHOICES)][0],
+                status=rng.choice(("pending", "in_progress", "completed")),
+                assigned_to=users[(index + offset) % len(users)],
+                assigned_role=TEAM_ROLES[offset % len(TEAM_ROLES)],
+                due_time=now + timedelta(days=rng.randint(-20, 40)),
+            ))
+        for offset in range(scale.opinions):
+            opinion_seq += 1
+            status = rng.choice(Opinion.OpinionStatus.values)
+            # 提交、审核时间与整改期限按状态填充，使热点查询的谓词有接近真实的选择度
+            submitted_at = None if status == "draft" else now - timedelta(hours=rng.randint(1, 2000))
+            opinions.append(Opinion(
+                opinion_number=f"{run_tag}-OP-{opinion_seq:07d}",
+                project=project,
+                professional_category=categories[offset % len(categories)],
+                created_by=users[(index + offset) % len(users)],
+                current_reviewer=None if rng.random() < 0.15 else users[(index + offset + 1) % len(users)],
+                status=status,
+                submitted_at=submitted_at,
+                reviewed_at=submitted_at + timedelta(hours=rng.randint(1, 240)) if status in ("approved", "rejected") else None,
+                response_deadline=today + timedelta(days=rng.randint(-15, 30)) if submitted_at else None,
+                location_name=f"{offset % 30 + 1}层",
+                issue_description="合成数据：构件配筋偏大",
+                recommendation="合成数据：按计算结果优化配筋",
+                issue_category=rng.choice(Opinion.IssueCategory.values),
+                severity_level=rng.choice(Opinion.SeverityLevel.values),
+                saving_amount=Decimal(rng.randint(0, 50000)),
+            ))
+        for offset in range(scale.notifications):
+            notifications.append(ProjectTeamNotification(
+                project=project,
+                recipient=users[(index + offset) % len(users)],
+                title=f"团队变更通知{offset}",
+                message="合成数据",
+                is_read=rng.random() < 0.6,
+                created_time=now - timedelta(hours=rng.randint(0, 2000)),
+            ))
+        for offset in range(scale.deliveries):
+            deliveries.append(DeliveryRecord(
+                delivery_number=f"{run_tag}-DL-{index:06d}-{offset}",
+                title=f"{project.name} 成果交付{offset}",
+                project=project,
+                recipient_name="甲方联系人",
+                status=rng.choice(("draft", "submitted", "sent", "confirmed")),
+                deadline=now + timedelta(days=rng.randint(-10, 30)),
+                created_by=project.project_manager,
+            ))
+        for offset in range(scale.output_records):
+            base = Decimal(rng.randint(10, 500) * 1000)
+            records.append(OutputValueRecord(
+                project=project,
+                stage=stage,
+                milestone=milestone,
+                event=event,
+                responsible_user=users[(index + offset) % len(users)],
+                base_amount=base,
+                base_amount_type="contract_amount",
+                stage_percentage=stage.stage_percentage,
+                milestone_percentage=milestone.milestone_percentage,
+                event_percentage=event.event_percentage,
+                calculated_value=(base * Decimal("0.2")).quantize(Decimal("0.01")),
+            ))
+
+    # 同一项目内成员-角色组合可能重复，忽略冲突
+    ProjectTeam.objects.bulk_create(team, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    _bulk(ProjectMilestone, milestones)
+    _bulk(ProjectTask, tasks)
+    _bulk(Opinion, opinions)
+    _bulk(ProjectTeamNotification, notifications)
+    _bulk(DeliveryRecord, deliveries)
+    _bulk(OutputValueRecord, records)
+
+    return {
+        "users": len(users),
+        "projects": len(projects),
+        "team_members": len(team),
+        "milestones": len(milestones),
+        "tasks": len(tasks),
+        "opinions": len(opinions),
+        "notifications": len(notifications),
+        "deliveries": len(deliveries),
+        "output_records": len(records),
+    }
@@ -0,0 +1,125 @@
+"""
+中心看板汇总缓存
+
+各中心首页（shared/center_dashboard.html）的汇总卡片和列表按
+（视图, 用户/权限指纹, 筛选参数, 相关模型数据版本）缓存。
+
+每个被跟踪的模型都有一个数据版本号。模型保存或删除时，信号会把版本号换成新值，
+缓存键随之改变，旧条目自然过期，因此不需要逐键删除。
+queryset.update() 之类的批量操作不会触发信号，这种情况下由条目的过期时间兜底。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from backend.core.db_router import use_primary
+
+KEY_PREFIX = 'dashboard:v1'
+VERSION_KEY_PREFIX = f'{KEY_PREFIX}:version'
+
+# 看板汇总依赖的模型；只有这些模型的保存、删除会更新数据版本
+TRACKED_MODELS: Sequence[str] = (
+    'project_center.Project',
+    'project_center.ProjectMilestone',
+    'project_center.ProjectTeam',
+    'customer_success.BusinessContract',
+    'customer_success.BusinessPaymentPlan',
+    'customer_success.BusinessOpportunity',
+    'production_quality.ProductionReport',
+    'resource_standard.ReportTemplate',
+    'system_management.User',
+)
+
+
+def _label(model) -> str:
+    return model if isinstance(model, str) else model._meta.label
+
+
+def _version_key(label: str) -> str:
+    return f'{VERSION_KEY_PREFIX}:{label.lower()}'
+
+
+def data_versions(models: Iterable) -> list:
+    """一次 get_many 读取多个模型的数据版本；缺失（被淘汰）的版本号重新生成"""
+    keys = [_version_key(_label(model)) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_data_version(model) -> None:
+    """模型数据已变化（批量更新后可显式调用），使依赖它的看板缓存失效"""
+    cache.set(_version_key(_label(model)), time.time_ns(), None)
+
+
+def _data_changed(sender, raw=False, **kwargs):
+    if raw:
+        return
+    bump_data_version(sender)
+
+
+def connect_data_version_signals() -> None:
+    """在应用就绪后为 TRACKED_MODELS 挂载数据版本信号"""
+    for label in TRACKED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_data_changed, sender=model, dispatch_uid=f'dashboard_version_save_{label}')
+        post_delete.connect(_data_changed, sender=model, dispatch_uid=f'dashboard_version_delete_{label}')
+
+
+def permission_fingerprint(permission_codes: Iterable[str]) -> str:
+    return hashlib.sha1('|'.join(sorted(permission_codes)).encode()).hexdigest()[:16]
+
+
+def _params(params) -> list:
+    if params is None:
+        return []
+    if hasattr(params, 'lists'):
+        return sorted((key, sorted(values)) for key, values in params.lists())
+    return sorted((key, str(value)) for key, value in dict(params).items())
+
+
+def cached_summary(
+    name: str,
+    models: Sequence,
+    compute: Callable[[], Any],
+    *,
+    user=None,
+    permission_codes: Iterable[str] = (),
+    params=None,
+    timeout: Optional[int] = None,
+) -> Any:
+    """读取或计算看板汇总数据
+
+    name 为视图名；结果依赖当前用户时传入 user，依赖权限时传入 permission_codes，
+    依赖筛选条件时放入 params；跨天自动换键，逾期、本月到期等按日期统计的卡片不会沿用前一天的结果。
+    compute 的返回值须可序列化（不含模型实例、QuerySet）。
+    """
+    scope = [
+        name,
+        timezone.localdate(),
+        getattr(user, 'pk', None),
+        permission_fingerprint(permission_codes),
+        _params(params),
+        data_versions(models),
+    ]
+    digest = hashlib.sha1(json.dumps(scope, default=str).encode()).hexdigest()
+    key = f'{KEY_PREFIX}:{name}:{digest}'
+    value = cache.get(key)
+    if value is None:
+        # 结果按数据版本共享给所有用户，从主库计算，避免缓存副本上滞后的数据
+        with use_primary():
+            value = compute()
+        cache.set(key, value, timeout if timeout is not None else getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60))
+    return value
@@ -0,0 +1,106 @@
+"""
+只读副本路由
+
+配置 DATABASE_REPLICA_URL 后，settings 中会多出 replica 数据库别名。被标记的只读视图与管理命令读取副本，
+写入一律走 default：
+- 函数视图用 @replica_reads 标记；
+- 视图集在 replica_actions 中列出走副本的动作（如 statistics、dashboard）；
+- 管理命令在 handle 中使用 `with read_from_replica():`。
+
+读己之写：请求中发生写入后，本请求余下的读取改走 default，响应写入 REPLICA_PIN_COOKIE，
+之后 REPLICA_PIN_SECONDS 秒内该浏览器的请求都读 default，不会看到复制延迟前的旧数据。
+default 上已开启事务时同样读 default。未配置副本时一切读写都在 default 上。
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = 'replica'
+REPLICA_PIN_COOKIE = 'db_pin'
+
+
+@dataclass
+class RoutingState:
+    """当前请求 / 命令的路由状态"""
+    replica: bool = False   # 读取走副本
+    pinned: bool = False    # 已固定到 default（发生过写入或显式要求）
+    wrote: bool = False     # 本次执行中有过写入
+
+
+# 未处于请求或 read_from_replica 块中时为 None，读写都走 default
+_state: ContextVar[Optional[RoutingState]] = ContextVar('db_routing_state', default=None)
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def current_state() -> Optional[RoutingState]:
+    return _state.get()
+
+
+@contextmanager
+def routing(state: RoutingState):
+    """在 with 块内使用给定的路由状态（中间件为每个请求建立一个）"""
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def read_from_replica():
+    """with 块内的读取走副本；块内一旦写入，其后的读取回到 default"""
+    with routing(RoutingState(replica=True)) as state:
+        yield state
+
+
+@contextmanager
+def use_primary():
+    """with 块内的读取固定走 default（如需要写入缓存的汇总计算）"""
+    outer = _state.get()
+    with routing(RoutingState(replica=bool(outer and outer.replica), pinned=True)) as state:
+        yield state
+    if outer is not None and state.wrote:
+        outer.wrote = True
+
+
+def replica_reads(view):
+    """标记函数视图为只读，GET/HEAD 请求的读取走副本"""
+    view.replica_reads = True
+    return view
+
+
+class PrimaryReplicaRouter:
+    """读取按路由状态选择 replica 或 default，写入与迁移只在 default 上执行"""
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        state = _state.get()
+        if state is None or not state.replica or state.pinned or not replica_configured():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints) -> str:
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        # 副本与主库数据相同，跨别名加载的对象之间可以互相关联
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> Optional[bool]:
+        if db == REPLICA_ALIAS:
+            return False
+        return None
@@ -0,0 +1,155 @@
+"""
+受保护文件下载
+
+业务视图完成权限校验后调用 serve_protected_file，由 PROTECTED_MEDIA_BACKEND 决定传输方式：
+
+- ``x-accel``：返回 X-Accel-Redirect，由 nginx 的 internal location 发送文件；
+- ``sendfile``：返回 X-Sendfile（Apache mod_xsendfile / lighttpd）；
+- ``django``（默认，开发环境）：worker 分块发送，支持单段 Range 与条件请求。
+
+前两种方式下 Range、断点续传均由 Web 服务器处理，gunicorn worker 只负责鉴权。
+PROTECTED_MEDIA_PREFIXES 下的文件不再经公开的 MEDIA_URL 提供。
+"""
+from __future__ import annotations
+
+import mimetypes
+import posixpath
+import re
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+from django.views.static import serve
+
+# 只能通过鉴权下载视图访问的上传目录
+PROTECTED_MEDIA_PREFIXES: Tuple[str, ...] = (
+    'project_drawings/',
+    'project_documents/',
+    'contracts/',
+    'delivery_files/',
+    'project_archives/',
+)
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def nginx_protected_location() -> str:
+    """与 PROTECTED_MEDIA_PREFIXES 一致的 nginx 拒绝规则，deployment/config/nginx-media.conf 须包含此行"""
+    prefixes = '|'.join(re.escape(prefix.rstrip('/')) for prefix in PROTECTED_MEDIA_PREFIXES)
+    return f'location ~ ^/media/({prefixes})/ {{'
+
+
+def is_protected_media(name: str) -> bool:
+    return posixpath.normpath(name).lstrip('/').startswith(PROTECTED_MEDIA_PREFIXES)
+
+
+def _requested_range(request, size: int, etag: str, last_modified: int) -> Optional[Tuple[int, int]]:
+    """解析单段 Range 头，返回闭区间 (start, end)；无效或 If-Range 不匹配时返回 None 表示整文件"""
+    header = request.META.get('HTTP_RANGE', '').strip()
+    if not header or request.method not in ('GET', 'HEAD'):
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+        return None
+    match = RANGE_RE.match(header)
+    if not match:
+        # 多段或无法识别的 Range 按整文件返回，符合 RFC 9110
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def _iter_range(handle, start: int, length: int):
+    try:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = handle.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        handle.close()
+
+
+def _stream_response(request, field_file, size: int, etag: str, last_modified: int, content_type: str):
+    try:
+        byte_range = _requested_range(request, size, etag, last_modified)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    handle = field_file.storage.open(field_file.name, 'rb')
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type)
+        response.block_size = CHUNK_SIZE
+        return response
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_iter_range(handle, start, length), status=206, content_type=content_type)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+def serve_protected_file(request, field_file, filename: Optional[str] = None, as_attachment: bool = True):
+    """发送已通过权限校验的 FileField 文件"""
+    if not field_file:
+        raise Http404('文件不存在')
+    storage, name = field_file.storage, field_file.name
+    try:
+        size = storage.size(name)
+        last_modified = int(storage.get_modified_time(name).timestamp())
+    except (OSError, NotImplementedError):
+        raise Http404('文件不存在')
+    # 显示名称（如“结构图 A 版”）缺少扩展名时补上存储文件的扩展名
+    extension = posixpath.splitext(name)[1]
+    filename = filename or posixpath.basename(name)
+    if extension and not filename.lower().endswith(extension.lower()):
+        filename += extension
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    etag = quote_etag(f'{last_modified:x}-{size:x}')
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        backend = getattr(settings, 'PROTECTED_MEDIA_BACKEND', 'django')
+        if backend == 'x-accel':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = settings.PROTECTED_MEDIA_ACCEL_PREFIX + quote(name)
+        elif backend == 'sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = storage.path(name)
+        else:
+            response = _stream_response(request, field_file, size, etag, last_modified, content_type)
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return response
+
+
+def serve_public_media(request, path, document_root=None):
+    """公开的 MEDIA_URL：受保护目录一律 404，须经下载视图访问"""
+    if is_protected_media(path):
+        raise Http404('文件不存在')
+    return serve(request, path, document_root=document_root or settings.MEDIA_ROOT)
@@ -0,0 +1,218 @@
+"""
+存活 / 就绪 / 预热探针
+
+- 存活（/health/live/）：进程能处理请求即可，不检查外部依赖，避免数据库抖动导致容器被反复重启；
+- 就绪（/health/ready/）：数据库往返、缓存读写、媒体存储写入与未执行迁移，任一失败返回 503；
+  本进程尚未预热时先完成预热，冷启动的 Pod 在此之前不会接流量；
+- 预热（/health/warmup/）：导入各模块视图、解析 URL、编译常用模板并预填进程内缓存。
+
+检查结果在进程内缓存 HEALTH_CHECK_CACHE_SECONDS 秒，频繁探测只在过期后真正访问依赖。
+探针端点无需登录，公开响应只含状态与耗时；失败原因写入日志，携带 HEALTH_CHECK_TOKEN 或超级管理员
+才能在响应中看到 detail（异常信息可能包含数据库主机等内部信息）。
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+# 预热时编译的常用模板
+WARMUP_TEMPLATES: Tuple[str, ...] = ('base.html', 'home.html', 'login.html')
+# 预热时尝试导入的各应用模块（不存在的跳过）
+WARMUP_MODULES: Tuple[str, ...] = ('views', 'views_pages', 'views_api', 'serializers', 'admin')
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_warm_up_lock = threading.Lock()
+_cached: Optional[Tuple[float, Dict]] = None
+_migrations_applied = False
+_warm_up_report: Optional[Dict] = None
+_last_warm_up_failure: Optional[Dict] = None
+
+
+def _timed(check: Callable[[], Optional[str]]) -> Dict:
+    """执行单项检查：返回状态、耗时（毫秒）与说明；异常堆栈写入日志，detail 只含类型和消息"""
+    started = time.perf_counter()
+    try:
+        detail = check()
+        status = 'ok'
+    except Exception as exc:  # noqa: BLE001 - 任何异常都视为依赖不可用
+        logger.warning('健康检查失败: %s', getattr(check, '__name__', check), exc_info=True)
+        detail = f'{type(exc).__name__}: {exc}'
+        status = 'fail'
+    latency_ms = round((time.perf_counter() - started) * 1000, 2)
+    result = {'status': status, 'latency_ms': latency_ms}
+    if status == 'ok' and latency_ms > getattr(settings, 'HEALTH_CHECK_SLOW_MS', 500):
+        result['status'] = 'slow'
+    if detail:
+        result['detail'] = detail
+    return result
+
+
+def check_database() -> Optional[str]:
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    return None
+
+
+def check_cache() -> Optional[str]:
+    key = f'health:probe:{os.getpid()}'
+    token = uuid.uuid4().hex
+    cache.set(key, token, 30)
+    if cache.get(key) != token:
+        raise RuntimeError('缓存读回的值与写入不一致')
+    cache.delete(key)
+    return None
+
+
+def check_storage() -> Optional[str]:
+    name = default_storage.save(f'.health/{uuid.uuid4().hex}', ContentFile(b'ok'))
+    default_storage.delete(name)
+    return None
+
+
+def check_migrations() -> Optional[str]:
+    """未执行的迁移；全部执行后本进程不再重复加载迁移图"""
+    global _migrations_applied
+    if _migrations_applied:
+        return None
+    connection = connections[DEFAULT_DB_ALIAS]
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if plan:
+        pending = ', '.join(f'{migration.app_label}.{migration.name}' for migration, _ in plan[:5])
+        raise RuntimeError(f'{len(plan)} 个迁移未执行: {pending}')
+    _migrations_applied = True
+    return None
+
+
+READINESS_CHECKS: Dict[str, Callable[[], Optional[str]]] = {
+    'database': check_database,
+    'cache': check_cache,
+    'storage': check_storage,
+    'migrations': check_migrations,
+}
+
+
+def readiness(force: bool = False) -> Dict:
+    """就绪检查结果（带进程内缓存）；ready 为 False 时探针应返回 503"""
+    global _cached
+    ttl = getattr(settings, 'HEALTH_CHECK_CACHE_SECONDS', 5)
+    cached = _cached
+    if not force and cached and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    with _lock:
+        # 并发的探测请求只由一个线程真正执行检查
+        if not force and _cached and time.monotonic() - _cached[0] < ttl:
+            return _cached[1]
+        if _warm_up_report is None:
+            warm_up()
+        checks = {name: _timed(check) for name, check in READINESS_CHECKS.items()}
+        warmed_up = _warm_up_report is not None
+        result = {
+            'ready': warmed_up and all(item['status'] != 'fail' for item in checks.values()),
+            'warmed_up': warmed_up,
+            'checks': checks,
+        }
+        _cached = (time.monotonic(), result)
+    return result
+
+
+def _import_app_modules() -> List[str]:
+    imported = []
+    for app_config in apps.get_app_configs():
+        if not app_config.name.startswith('backend.'):
+            continue
+        for module in WARMUP_MODULES:
+            name = f'{app_config.name}.{module}'
+            try:
+                importlib.import_module(name)
+            except ModuleNotFoundError as exc:
+                if exc.name != name:
+                    raise
+                continue
+            imported.append(name)
+    return imported
+
+
+def _compile_templates() -> str:
+    for name in WARMUP_TEMPLATES:
+        get_template(name)
+    return f'{len(WARMUP_TEMPLATES)} templates'
+
+
+def _prime_caches() -> None:
+    from django.contrib.contenttypes.models import ContentType
+
+    from backend.apps.project_center.services_notifications import get_channel
+    from backend.apps.resource_standard.services import _cache_generation
+
+    # 权限、admin 等处按模型取 ContentType，一次批量查询填满进程内缓存
+    ContentType.objects.get_for_models(*apps.get_models())
+    _cache_generation()
+    get_channel()
+
+
+def warm_up() -> Dict:
+    """预热当前进程（幂等）；返回各步骤耗时"""
+    global _warm_up_report
+    if _warm_up_report is not None:
+        return _warm_up_report
+    with _warm_up_lock:
+        if _warm_up_report is None:
+            _warm_up_report = _run_warm_up()
+    return _warm_up_report or _last_warm_up_failure
+
+
+def _run_warm_up() -> Optional[Dict]:
+    """执行预热步骤；任一步失败时返回 None，失败报告保存在 _last_warm_up_failure"""
+    global _last_warm_up_failure
+    steps = {
+        'modules': _timed(lambda: f'{len(_import_app_modules())} modules'),
+        'urls': _timed(lambda: f'{len(get_resolver().reverse_dict)} url names'),
+        'templates': _timed(_compile_templates),
+        'database': _timed(check_database),
+        'caches': _timed(_prime_caches),
+    }
+    report = {'warmed_up': all(step['status'] != 'fail' for step in steps.values()), 'steps': steps}
+    if report['warmed_up']:
+        return report
+    _last_warm_up_failure = report
+    return None
+
+
+def public_view(report: Dict) -> Dict:
+    """去掉各检查项的 detail，只保留状态与耗时，供未授权的探测请求使用"""
+    public = dict(report)
+    for section in ('checks', 'steps'):
+        if section in public:
+            public[section] = {
+                name: {key: value for key, value in item.items() if key != 'detail'}
+                for name, item in public[section].items()
+            }
+    return public
+
+
+def reset() -> None:
+    """清除进程内的探针状态（测试用）"""
+    global _cached, _migrations_applied, _warm_up_report, _last_warm_up_failure
+    _cached = None
+    _migrations_applied = False
+    _warm_up_report = None
+    _last_warm_up_failure = None
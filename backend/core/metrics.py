@@ -0,0 +1,341 @@
+"""
+请求性能指标：按视图名聚合耗时、数据库查询、响应大小与缓存命中。
+
+每个 worker 先在进程内累加，定期把全部增量合并到共享计数器（Redis 用一个 pipeline 提交），
+配置 Redis 时多个 gunicorn worker 的数据汇总在一起，/metrics 读取汇总结果。
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger("backend.performance")
+
+KEY_PREFIX = "metrics:v1"
+VIEW_INDEX_KEY = f"{KEY_PREFIX}:views"
+# 耗时直方图分桶上限（秒），与 Prometheus 默认分桶接近
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 整数计数字段；耗时类字段以微秒存储以便使用 incr
+COUNTER_FIELDS: Tuple[str, ...] = (
+    "requests",
+    "errors",
+    "slow",
+    "duration_us",
+    "db_queries",
+    "db_time_us",
+    "response_bytes",
+    "cache_hits",
+    "cache_misses",
+)
+BUCKET_FIELDS: Tuple[str, ...] = tuple(f"le_{bound:g}" for bound in LATENCY_BUCKETS)
+TOP_QUERY_COUNT = 5
+UNRESOLVED_VIEW = "<unresolved>"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def metrics_cache():
+    return caches[_setting("REQUEST_METRICS_CACHE", "default")]
+
+
+@dataclass
+class RequestStats:
+    """单个请求的采集结果。"""
+
+    db_queries: int = 0
+    db_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    top_queries: List[Tuple[float, int, str]] = field(default_factory=list)
+    _seq: itertools.count = field(default_factory=itertools.count, repr=False)
+
+    def record_query(self, sql: str, duration: float) -> None:
+        self.db_queries += 1
+        self.db_time += duration
+        entry = (duration, next(self._seq), sql)
+        if len(self.top_queries) < TOP_QUERY_COUNT:
+            heapq.heappush(self.top_queries, entry)
+        elif duration > self.top_queries[0][0]:
+            heapq.heapreplace(self.top_queries, entry)
+
+    def slowest_queries(self) -> List[Tuple[float, str]]:
+        return [(duration, sql) for duration, _, sql in sorted(self.top_queries, reverse=True)]
+
+
+_current_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_metrics_stats", default=None
+)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+def activate(stats: RequestStats):
+    return _current_stats.set(stats)
+
+
+def deactivate(token) -> None:
+    _current_stats.reset(token)
+
+
+class QueryRecorder:
+    """connection.execute_wrapper 回调：统计查询次数与耗时。"""
+
+    def __init__(self, stats: RequestStats):
+        self.stats = stats
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.stats.record_query(sql, time.perf_counter() - started)
+
+
+_MISSING = object()
+_cache_instrumented = set()
+_cache_lock = threading.Lock()
+
+
+def instrument_cache_backends() -> None:
+    """包装各缓存后端类的 get/get_many，在请求上下文中统计命中与未命中。"""
+    with _cache_lock:
+        for alias in settings.CACHES:
+            backend_class = type(caches[alias])
+            if backend_class in _cache_instrumented:
+                continue
+            if not getattr(backend_class.get, "_records_metrics", False):
+                backend_class.get = _wrap_cache_get(backend_class.get)
+            if not getattr(backend_class.get_many, "_records_metrics", False):
+                backend_class.get_many = _wrap_cache_get_many(backend_class.get_many)
+            _cache_instrumented.add(backend_class)
+
+
+def _wrap_cache_get(original):
+    @functools.wraps(original)
+    def get(self, key, default=None, *args, **kwargs):
+        stats = _current_stats.get()
+        if stats is None:
+            return original(self, key, default, *args, **kwargs)
+        value = original(self, key, _MISSING, *args, **kwargs)
+        if value is _MISSING:
+            stats.cache_misses += 1
+            return default
+        stats.cache_hits += 1
+        return value
+
+    get._records_metrics = True
+    return get
+
+
+def _wrap_cache_get_many(original):
+    @functools.wraps(original)
+    def get_many(self, keys, *args, **kwargs):
+        stats = _current_stats.get()
+        if stats is None:
+            return original(self, keys, *args, **kwargs)
+        keys = list(keys)
+        # 默认实现逐个调用 get，这里暂停统计避免重复计数
+        token = _current_stats.set(None)
+        try:
+            found = original(self, keys, *args, **kwargs)
+        finally:
+            _current_stats.reset(token)
+        stats.cache_hits += len(found)
+        stats.cache_misses += len(keys) - len(found)
+        return found
+
+    get_many._records_metrics = True
+    return get_many
+
+
+def _field_key(view_name: str, field_name: str) -> str:
+    return f"{KEY_PREFIX}:{view_name}:{field_name}"
+
+
+class MetricsRegistry:
+    """进程内累加器：达到刷新间隔后把增量合并到共享缓存。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, int]] = {}
+        self._last_flush = time.monotonic()
+
+    def observe(self, view_name: str, duration: float, stats: RequestStats, response_bytes: int,
+                status_code: int, slow: bool) -> None:
+        with self._lock:
+            counters = self._pending.setdefault(view_name, dict.fromkeys(COUNTER_FIELDS + BUCKET_FIELDS, 0))
+            counters["requests"] += 1
+            counters["errors"] += int(status_code >= 500)
+            counters["slow"] += int(slow)
+            counters["duration_us"] += int(duration * 1_000_000)
+            counters["db_queries"] += stats.db_queries
+            counters["db_time_us"] += int(stats.db_time * 1_000_000)
+            counters["response_bytes"] += response_bytes
+            counters["cache_hits"] += stats.cache_hits
+            counters["cache_misses"] += stats.cache_misses
+            for bound, bucket in zip(LATENCY_BUCKETS, BUCKET_FIELDS):
+                if duration <= bound:
+                    counters[bucket] += 1
+                    break
+            due = time.monotonic() - self._last_flush >= _setting("REQUEST_METRICS_FLUSH_INTERVAL", 10)
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        cache = metrics_cache()
+        deltas = {
+            _field_key(view_name, field_name): delta
+            for view_name, counters in pending.items()
+            for field_name, delta in counters.items()
+            if delta
+        }
+        try:
+            self._register_views(cache, pending.keys())
+            _incr_many(cache, deltas)
+        except Exception:
+            # 指标写入失败不能影响业务请求
+            logger.warning("请求指标写入缓存失败", exc_info=True)
+
+    @staticmethod
+    def _register_views(cache, view_names) -> None:
+        # 每次刷新都核对索引：并发写入丢失的视图名会在下一次刷新时补回
+        index = set(cache.get(VIEW_INDEX_KEY) or ())
+        if not set(view_names) <= index:
+            cache.set(VIEW_INDEX_KEY, sorted(index | set(view_names)), None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending = {}
+            self._last_flush = time.monotonic()
+
+
+def _incr(cache, key: str, delta: int) -> None:
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def _incr_many(cache, deltas: Dict[str, int]) -> None:
+    """批量累加：django-redis 后端用一个 pipeline 一次往返提交全部 INCRBY，其它后端逐个 incr。"""
+    client = getattr(cache, "client", None)
+    if hasattr(client, "get_client") and hasattr(client, "make_key"):
+        pipeline = client.get_client(write=True).pipeline(transaction=False)
+        for key, delta in deltas.items():
+            pipeline.incrby(client.make_key(key), delta)
+        pipeline.execute()
+        return
+    for key, delta in deltas.items():
+        _incr(cache, key, delta)
+
+
+registry = MetricsRegistry()
+
+
+def collect_view_metrics() -> Dict[str, Dict[str, int]]:
+    """读取共享缓存中的汇总结果（含当前进程尚未刷新的增量）。"""
+    registry.flush()
+    cache = metrics_cache()
+    view_names = cache.get(VIEW_INDEX_KEY) or []
+    keys = [_field_key(name, f) for name in view_names for f in COUNTER_FIELDS + BUCKET_FIELDS]
+    values = cache.get_many(keys) if keys else {}
+    result = {}
+    for name in view_names:
+        result[name] = {f: int(values.get(_field_key(name, f), 0)) for f in COUNTER_FIELDS + BUCKET_FIELDS}
+    return result
+
+
+def reset_metrics() -> None:
+    cache = metrics_cache()
+    view_names = cache.get(VIEW_INDEX_KEY) or []
+    cache.delete_many([_field_key(name, f) for name in view_names for f in COUNTER_FIELDS + BUCKET_FIELDS])
+    cache.delete(VIEW_INDEX_KEY)
+    registry.reset()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(metrics: Dict[str, Dict[str, int]]) -> str:
+    """输出 Prometheus 文本格式。"""
+    lines = []
+
+    def family(name, metric_type, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    family("http_request_duration_seconds", "histogram", "Request wall time by view.")
+    for view_name, data in sorted(metrics.items()):
+        label = _escape_label(view_name)
+        cumulative = 0
+        for bound, bucket in zip(LATENCY_BUCKETS, BUCKET_FIELDS):
+            cumulative += data[bucket]
+            lines.append(f'http_request_duration_seconds_bucket{{view="{label}",le="{bound:g}"}} {cumulative}')
+        lines.append(f'http_request_duration_seconds_bucket{{view="{label}",le="+Inf"}} {data["requests"]}')
+        lines.append(f'http_request_duration_seconds_sum{{view="{label}"}} {data["duration_us"] / 1_000_000:.6f}')
+        lines.append(f'http_request_duration_seconds_count{{view="{label}"}} {data["requests"]}')
+
+    simple_families = (
+        ("http_request_errors_total", "errors", "Responses with status >= 500.", 1),
+        ("http_request_slow_total", "slow", "Requests slower than the slow-request threshold.", 1),
+        ("http_request_db_queries_total", "db_queries", "Database queries executed.", 1),
+        ("http_request_db_seconds_total", "db_time_us", "Time spent in database queries.", 1_000_000),
+        ("http_response_bytes_total", "response_bytes", "Response body bytes.", 1),
+        ("http_request_cache_hits_total", "cache_hits", "Cache lookups that hit.", 1),
+        ("http_request_cache_misses_total", "cache_misses", "Cache lookups that missed.", 1),
+    )
+    for metric_name, field_name, help_text, divisor in simple_families:
+        family(metric_name, "counter", help_text)
+        for view_name, data in sorted(metrics.items()):
+            value = data[field_name] / divisor if divisor != 1 else data[field_name]
+            formatted = f"{value:.6f}" if divisor != 1 else str(value)
+            lines.append(f'{metric_name}{{view="{_escape_label(view_name)}"}} {formatted}')
+
+    family("process_worker_info", "gauge", "Worker serving this scrape.")
+    lines.append(f'process_worker_info{{pid="{os.getpid()}"}} 1')
+    return "\n".join(lines) + "\n"
+
+
+def view_summaries(metrics: Dict[str, Dict[str, int]], limit: int = 10) -> List[Dict]:
+    """按平均耗时排序的视图摘要，供管理页面展示。"""
+    rows = []
+    for view_name, data in metrics.items():
+        requests = data["requests"]
+        if not requests:
+            continue
+        lookups = data["cache_hits"] + data["cache_misses"]
+        rows.append({
+            "view": view_name,
+            "requests": requests,
+            "errors": data["errors"],
+            "slow": data["slow"],
+            "avg_ms": data["duration_us"] / requests / 1000,
+            "avg_queries": data["db_queries"] / requests,
+            "avg_db_ms": data["db_time_us"] / requests / 1000,
+            "avg_bytes": data["response_bytes"] / requests,
+            "cache_hit_rate": (data["cache_hits"] / lookups) if lookups else None,
+        })
+    rows.sort(key=lambda row: row["avg_ms"], reverse=True)
+    return rows[:limit]
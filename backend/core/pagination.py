@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """基于游标（keyset）的分页：按排序键定位下一页，避免大表 OFFSET 扫描"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-id'
@@ -0,0 +1,137 @@
+"""
+稀疏字段集与查询规划
+
+接口支持两个查询参数：
+- ?fields=a,b：只返回指定字段；
+- ?expand=x,y：展开序列化器 Meta.expandable_fields 中默认不返回的嵌套字段。
+
+视图集按序列化器最终保留的字段组装查询，未返回的关联不会加载：
+- source 经过外键的字段（如 project_manager.get_full_name）自动 select_related；
+- 嵌套的一对多、多对多序列化器自动 prefetch_related，其内部关联沿用同一前缀预取；
+- SerializerMethodField 等无法推导的字段在 Meta.query_plan 中用 FieldPlan 声明。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """单个字段所需的查询：select 为外键路径，prefetch 为路径或 Prefetch，annotate 为注解表达式"""
+    select: Tuple[str, ...] = ()
+    prefetch: Tuple = ()
+    annotate: Dict = field(default_factory=dict)
+
+
+def parse_field_list(value: Optional[str]) -> List[str]:
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+class SparseFieldsMixin:
+    """序列化器混入：按请求的 fields / expand 参数裁剪字段（仅 GET 等安全方法）"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 只处理直接由视图创建的序列化器，嵌套序列化器实例化时没有 context
+        request = self._context.get('request') if hasattr(self, '_context') else None
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        expand = set(parse_field_list(request.query_params.get('expand')))
+        requested = set(parse_field_list(request.query_params.get('fields')))
+        for name in getattr(self.Meta, 'expandable_fields', ()):
+            if name not in expand:
+                self.fields.pop(name, None)
+        if requested:
+            for name in list(self.fields):
+                if name not in requested and name not in expand:
+                    self.fields.pop(name)
+
+
+def _relation_lookup(model, bits: Iterable[str]) -> Tuple[List[str], Optional[object], bool]:
+    """沿 source 路径走关联，返回（经过的关联名, 终点模型, 是否经过一对多/多对多）"""
+    path = []
+    for bit in bits:
+        try:
+            model_field = model._meta.get_field(bit)
+        except FieldDoesNotExist:
+            break
+        if not model_field.is_relation or model_field.related_model is None:
+            break
+        path.append(bit)
+        model = model_field.related_model
+        if model_field.one_to_many or model_field.many_to_many:
+            return path, model, True
+    return path, model, False
+
+
+def _collect(serializer, model, prefix: str, select: List, prefetch: List, annotate: Dict) -> None:
+    plans = getattr(getattr(serializer, 'Meta', None), 'query_plan', {})
+    nested = bool(prefix)
+    for name, serializer_field in serializer.fields.items():
+        plan = plans.get(name)
+        if plan is not None:
+            # 嵌套层只能继续 prefetch，外键也转为带前缀的预取
+            for lookup in plan.select:
+                (prefetch if nested else select).append(prefix + lookup)
+            for lookup in plan.prefetch:
+                if isinstance(lookup, Prefetch):
+                    if not nested:
+                        prefetch.append(lookup)
+                else:
+                    prefetch.append(prefix + lookup)
+            if not nested:
+                annotate.update(plan.annotate)
+
+        source = serializer_field.source
+        if not source or source == '*':
+            continue
+        bits = source.split('.')
+        is_nested = isinstance(serializer_field, serializers.BaseSerializer)
+        # 普通字段读取终点对象的属性，只需要路径上的关联；嵌套序列化器需要整条关联
+        path, related_model, to_many = _relation_lookup(model, bits if is_nested else bits[:-1])
+        if not path:
+            continue
+        lookup = prefix + '__'.join(path)
+        if to_many or nested:
+            prefetch.append(lookup)
+        else:
+            select.append(lookup)
+        if is_nested and path == bits:
+            child = serializer_field.child if isinstance(serializer_field, serializers.ListSerializer) else serializer_field
+            _collect(child, related_model, lookup + '__', select, prefetch, annotate)
+
+
+def plan_queryset(queryset, serializer):
+    """按序列化器保留的字段为 queryset 添加 select_related / prefetch_related / annotate"""
+    select, prefetch, annotate = [], [], {}
+    _collect(serializer, queryset.model, '', select, prefetch, annotate)
+    if select:
+        queryset = queryset.select_related(*dict.fromkeys(select))
+    if prefetch:
+        # 显式 Prefetch 优先，同一路径的字符串预取不再重复
+        explicit = {lookup.prefetch_to for lookup in prefetch if isinstance(lookup, Prefetch)}
+        lookups = [
+            lookup for lookup in dict.fromkeys(prefetch)
+            if isinstance(lookup, Prefetch) or lookup not in explicit
+        ]
+        queryset = queryset.prefetch_related(*lookups)
+    if annotate:
+        queryset = queryset.annotate(**annotate)
+    return queryset
+
+
+class SparseFieldsViewSetMixin:
+    """视图集混入：planned_actions 中的动作按最终返回字段规划查询"""
+    planned_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in self.planned_actions:
+            queryset = plan_queryset(queryset, self.get_serializer())
+        return queryset
@@ -1,17 +1,25 @@
 from datetime import timedelta
 
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import login, logout, authenticate
 from django.contrib import messages
 from django.db.models import Sum, Q
 from django.utils import timezone
 from django.urls import reverse, NoReverseMatch
+from django.conf import settings
 
 from backend.apps.project_center.models import Project, ProjectMilestone, ProjectTeamNotification, ProjectTask
-from backend.apps.project_center.views_pages import _user_matches_role
+from backend.apps.project_center.services_notifications import (
+    notification_entry,
+    unread_counts as unread_notification_counts,
+)
+from backend.apps.project_center.views_pages import _tasks_visible_to_user_q
 from backend.apps.system_management.services import get_user_permission_codes
+from backend.core import health
+from backend.core.db_router import replica_reads
+from backend.core import metrics as request_metrics
 
 
 def _permission_granted(required_code, user_permissions: set) -> bool:
@@ -99,6 +107,7 @@ def _serialize_task_for_home(task):
     }
 
 
+@replica_reads
 def home(request):
     """系统首页"""
     if not request.user.is_authenticated:
@@ -112,16 +121,16 @@ def home(request):
 
         # 使用 try-except 包裹所有数据库查询，避免数据库连接问题导致页面崩溃
         try:
+            # 可见性在 SQL 中判断，只取当前用户的任务，不再逐条查询团队角色
             task_queryset = ProjectTask.objects.filter(
                 status__in=ProjectTask.ACTIVE_STATUSES
+            ).filter(
+                _tasks_visible_to_user_q(user)
             ).select_related(
                 'project',
                 'project__project_manager',
-                'project__business_manager',
-                'project__client_leader',
-                'project__design_leader',
                 'assigned_to',
-            ).prefetch_related('project__team_members', 'project__team_members__user').order_by('due_time', 'created_time')
+            ).order_by('due_time', 'created_time')
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
@@ -129,15 +138,7 @@ def home(request):
             # 使用空查询集，避免后续代码出错
             task_queryset = ProjectTask.objects.none()
 
-        user_active_tasks = []
-        for task in task_queryset:
-            try:
-                project = task.project
-                if task.assigned_to_id == user.id or _user_matches_role(user, project, task.assigned_role):
-                    user_active_tasks.append(task)
-            except Exception:
-                # 跳过有问题的任务，继续处理下一个
-                continue
+        user_active_tasks = list(task_queryset)
 
         # 查找已完成的任务：分配给当前用户的任务，或者由当前用户完成的任务
         try:
@@ -343,7 +344,7 @@ def home(request):
         try:
             notifications_qs = ProjectTeamNotification.objects.filter(
                 recipient=user,
-            ).select_related('project').order_by('is_read', '-created_time')[:20]
+            ).select_related('project', 'recipient').order_by('is_read', '-created_time')[:20]
         except Exception:
             notifications_qs = ProjectTeamNotification.objects.none()
 
@@ -351,41 +352,15 @@ def home(request):
         if notifications_qs:
             team_items = []
             quality_items = []
-            team_unread = 0
-            quality_unread = 0
-
-            def _build_entry(notification_obj):
-                project = notification_obj.project
-                context_data = notification_obj.context or {}
-                base_url = '#'
-                if project:
-                    # 项目立项相关通知，使用立项详情页
-                    if context_data.get('action') in {'pending_receive', 'received', 'rejected'} or '项目立项' in notification_obj.title:
-                        base_url = reverse('project_pages:project_initiation_detail', args=[project.id])
-                    elif context_data.get('action') in {'project_received', 'assigned_project_manager'} and project.status in {'waiting_receive', 'configuring'} and notification_obj.recipient.roles.filter(code='project_manager').exists():
-                        base_url = reverse('project_pages:project_complete', args=[project.id])
-                    else:
-                        base_url = reverse('project_pages:project_detail', args=[project.id])
-                link_url = notification_obj.action_url or base_url
-                return {
-                    'id': notification_obj.id,
-                    'title': notification_obj.title,
-                    'subtitle': project.project_number if project else '',
-                    'detail': notification_obj.message,
-                    'is_unread': not notification_obj.is_read,
-                    'url': link_url,
-                }
+            # 未读数按全部通知统计，与推送通道发布的计数一致
+            unread = unread_notification_counts(user.id)
 
             for notif in notifications_qs:
-                entry = _build_entry(notif)
+                entry = notification_entry(notif)
                 if notif.category == 'quality_alert':
-                    if entry['is_unread']:
-                        quality_unread += 1
                     if len(quality_items) < 6:
                         quality_items.append(entry)
                 else:
-                    if entry['is_unread']:
-                        team_unread += 1
                     if len(team_items) < 6:
                         team_items.append(entry)
 
@@ -393,7 +368,8 @@ def home(request):
                 notification_center.append({
                     'title': '质量提醒',
                     'icon': '⚠️',
-                    'unread_count': quality_unread,
+                    'category': 'quality_alert',
+                    'unread_count': unread['quality_alert'],
                     'items': quality_items,
                 })
 
@@ -401,7 +377,8 @@ def home(request):
                 notification_center.append({
                     'title': '团队通知',
                     'icon': '👥',
-                    'unread_count': team_unread,
+                    'category': 'team_change',
+                    'unread_count': unread['team_change'],
                     'items': team_items,
                 })
             if 'task_collaboration.execute' in user_permissions:
@@ -624,10 +601,70 @@ def logout_view(request):
 
 @csrf_exempt
 def health_check(request):
-    """健康检查端点"""
+    """存活探针：进程能响应即为健康，不检查外部依赖"""
     return JsonResponse({
         'status': 'healthy',
         'service': '维海科技信息化管理平台',
         'version': '1.0.0',
-        'timestamp': '2025-11-06T14:01:28Z'
+        'timestamp': timezone.now().isoformat(),
     })
+
+
+def _health_details_allowed(request) -> bool:
+    token = getattr(settings, 'HEALTH_CHECK_TOKEN', '')
+    if token and request.headers.get('Authorization') == f'Bearer {token}':
+        return True
+    return request.user.is_authenticated and request.user.is_superuser
+
+
+@csrf_exempt
+def readiness_check(request):
+    """就绪探针：数据库、缓存、媒体存储与迁移检查（结果短时缓存），未就绪返回 503"""
+    result = health.readiness()
+    if not _health_details_allowed(request):
+        result = health.public_view(result)
+    return JsonResponse(
+        {'status': 'ready' if result['ready'] else 'unavailable', **result},
+        status=200 if result['ready'] else 503,
+    )
+
+
+@csrf_exempt
+def warmup_check(request):
+    """预热端点：导入模块、编译模板并预填缓存，完成后返回 200（可作为 startupProbe）"""
+    report = health.warm_up()
+    if not _health_details_allowed(request):
+        report = health.public_view(report)
+    return JsonResponse(report, status=200 if report['warmed_up'] else 503)
+
+
+def _client_ip(request):
+    """真实客户端地址：经可信反向代理转发时取 X-Forwarded-For 中最后一个非代理地址。"""
+    trusted = set(getattr(settings, 'TRUSTED_PROXY_IPS', ()))
+    remote = request.META.get('REMOTE_ADDR', '')
+    if remote not in trusted:
+        return remote
+    forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    for ip in reversed(forwarded):
+        if ip not in trusted:
+            return ip
+    # 经代理却拿不到客户端地址时不做 IP 放行
+    return None
+
+
+def _metrics_access_allowed(request) -> bool:
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') == f'Bearer {token}':
+        return True
+    if request.user.is_authenticated and request.user.is_superuser:
+        return True
+    allowed_ips = getattr(settings, 'METRICS_ALLOWED_IPS', ())
+    return bool(allowed_ips) and _client_ip(request) in allowed_ips
+
+
+def metrics_view(request):
+    """Prometheus 指标端点：按视图汇总耗时直方图、查询、响应大小与缓存命中"""
+    if not _metrics_access_allowed(request):
+        return HttpResponse(status=403)
+    body = request_metrics.render_prometheus(request_metrics.collect_view_metrics())
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
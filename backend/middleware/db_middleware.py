@@ -0,0 +1,50 @@
+from django.conf import settings
+
+from backend.core import db_router
+
+
+class ReplicaRoutingMiddleware:
+    """
+    只读副本路由中间件
+
+    为每个请求建立路由状态：被标记为只读的视图（@replica_reads 或视图集的 replica_actions）
+    在 GET/HEAD 请求中读取副本；带有读己之写标记 Cookie 的请求固定读 default。
+    请求中发生写入（含会话保存）时下发标记 Cookie，有效期 REPLICA_PIN_SECONDS 秒。
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, "REPLICA_PIN_SECONDS", 15)
+
+    def __call__(self, request):
+        pinned = bool(request.COOKIES.get(db_router.REPLICA_PIN_COOKIE))
+        with db_router.routing(db_router.RoutingState(pinned=pinned)) as state:
+            response = self.get_response(request)
+        if db_router.replica_configured() and (state.wrote or request.method not in self.SAFE_METHODS):
+            response.set_cookie(
+                db_router.REPLICA_PIN_COOKIE,
+                "1",
+                max_age=self.pin_seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = db_router.current_state()
+        if state is not None and request.method in self.SAFE_METHODS:
+            state.replica = self._wants_replica(request, view_func)
+        return None
+
+    @staticmethod
+    def _wants_replica(request, view_func):
+        if getattr(view_func, "replica_reads", False):
+            return True
+        # DRF 视图集：as_view 返回的函数带有 cls 与 {方法: 动作} 映射
+        view_class = getattr(view_func, "cls", None)
+        actions = getattr(view_func, "actions", None)
+        if view_class is None or not actions:
+            return False
+        return actions.get(request.method.lower()) in getattr(view_class, "replica_actions", ())
@@ -0,0 +1,87 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from backend.core import metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    请求性能采集中间件
+
+    按解析后的视图名记录耗时、数据库查询次数与耗时、响应大小、缓存命中情况，
+    慢请求输出耗时最长的若干条 SQL。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "REQUEST_METRICS_ENABLED", True)
+        self.slow_threshold = getattr(settings, "REQUEST_METRICS_SLOW_MS", 1000) / 1000
+        if self.enabled:
+            metrics.instrument_cache_backends()
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = metrics.RequestStats()
+        recorder = metrics.QueryRecorder(stats)
+        token = metrics.activate(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - started
+            metrics.deactivate(token)
+
+        view_name = self._view_name(request)
+        slow = duration >= self.slow_threshold
+        metrics.registry.observe(
+            view_name,
+            duration,
+            stats,
+            self._response_size(response),
+            response.status_code,
+            slow,
+        )
+        if slow:
+            self._log_slow_request(request, view_name, duration, stats)
+        return response
+
+    @staticmethod
+    def _view_name(request):
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return metrics.UNRESOLVED_VIEW
+        return match.view_name or match.route or metrics.UNRESOLVED_VIEW
+
+    @staticmethod
+    def _response_size(response):
+        if getattr(response, "streaming", False):
+            length = response.get("Content-Length")
+            return int(length) if length and length.isdigit() else 0
+        return len(response.content)
+
+    @staticmethod
+    def _log_slow_request(request, view_name, duration, stats):
+        lines = [
+            f"  {query_time * 1000:.1f}ms  {sql[:500]}"
+            for query_time, sql in stats.slowest_queries()
+        ]
+        metrics.logger.warning(
+            "慢请求 %s %s view=%s 耗时=%.0fms 查询=%d次/%.0fms 缓存=%d命中/%d未命中\n%s",
+            request.method,
+            request.path,
+            view_name,
+            duration * 1000,
+            stats.db_queries,
+            stats.db_time * 1000,
+            stats.cache_hits,
+            stats.cache_misses,
+            "\n".join(lines),
+        )
@@ -12,18 +12,30 @@ source "$VENV_DIR/bin/activate" || exit 1
 
 # 停止旧的服务
 pkill -f "gunicorn.*wsgi" 2>/dev/null
+pkill -f "celery -A backend.config worker" 2>/dev/null
 sleep 2
 
 # 启动 Gunicorn 服务
+# 必须使用多线程 worker（gthread）：通知推送（SSE）是长连接，每个连接占用一个线程而不是整个 worker；
+# 每个进程最多保持 NOTIFICATION_STREAM_MAX_PER_PROCESS 个（默认 4），超出的浏览器改为轮询
 echo "启动 Gunicorn 服务..."
 nohup gunicorn \
     --bind 127.0.0.1:8000 \
+    --worker-class gthread \
     --workers 4 \
+    --threads 16 \
     --timeout 120 \
     --access-logfile "$LOG_DIR/gunicorn_access.log" \
     --error-logfile "$LOG_DIR/gunicorn_error.log" \
     backend.config.wsgi:application > "$LOG_DIR/gunicorn.log" 2>&1 &
 
+# 启动 Celery worker：报告渲染、项目归档打包等后台任务（需要在环境中配置 REDIS_URL）
+echo "启动 Celery worker..."
+nohup celery -A backend.config worker \
+    --loglevel=info \
+    --concurrency 2 \
+    --logfile "$LOG_DIR/celery_worker.log" > "$LOG_DIR/celery.log" 2>&1 &
+
 sleep 3
 
 # 检查服务状态
@@ -38,6 +50,15 @@ else
     exit 1
 fi
 
+if ps aux | grep -E "celery -A backend.config worker" | grep -v grep > /dev/null; then
+    echo "✓ Celery worker 已启动"
+    echo "  - 日志: $LOG_DIR/celery_worker.log"
+else
+    echo "✗ Celery worker 启动失败"
+    echo "  请查看日志: $LOG_DIR/celery.log"
+    exit 1
+fi
+
 # 重新加载 Nginx 配置
 echo "重新加载 Nginx 配置..."
 if sudo nginx -s reload 2>/dev/null; then